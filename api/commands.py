@@ -1,4 +1,5 @@
 import base64
+import datetime
 import json
 import logging
 import secrets
@@ -27,7 +28,14 @@ from libs.helper import email as email_validate
 from libs.password import hash_password, password_pattern, valid_password
 from libs.rsa import generate_key_pair
 from models import Tenant
-from models.dataset import Dataset, DatasetCollectionBinding, DatasetMetadata, DatasetMetadataBinding, DocumentSegment
+from models.dataset import (
+    Dataset,
+    DatasetCollectionBinding,
+    DatasetKeywordTable,
+    DatasetMetadata,
+    DatasetMetadataBinding,
+    DocumentSegment,
+)
 from models.dataset import Document as DatasetDocument
 from models.model import Account, App, AppAnnotationSetting, AppMode, Conversation, MessageAnnotation
 from models.provider import Provider, ProviderModel
@@ -550,6 +558,63 @@ def add_qdrant_index(field: str):
     click.echo(click.style(f"Index creation complete. Created {create_count} collection indexes.", fg="green"))
 
 
+@click.command("add-oceanbase-document-id-index", help="Add the indexed document_id column to OceanBase collections.")
+@click.option("--batch-size", default=100, help="Number of datasets to load per batch, default is 100.")
+def add_oceanbase_document_id_index(batch_size: int):
+    """
+    Add the generated document_id column and its index to OceanBase collections created before it existed.
+    The column is virtual and the index is built online, collections stay readable and writable meanwhile.
+    Collections that already have the column are skipped, so the command can be re-run.
+    """
+    from core.rag.datasource.vdb.oceanbase.oceanbase_vector import OceanBaseVector, OceanBaseVectorFactory
+    from core.rag.datasource.vdb.vector_type import VectorType
+
+    click.echo(click.style("Starting OceanBase document_id index creation.", fg="green"))
+
+    config = OceanBaseVectorFactory.get_config()
+    create_count = 0
+    failed_dataset_ids = []
+    last_id = None
+    while True:
+        stmt = (
+            select(Dataset)
+            .where(Dataset.indexing_technique == "high_quality", Dataset.index_struct.is_not(None))
+            .order_by(Dataset.id)
+            .limit(batch_size)
+        )
+        if last_id is not None:
+            stmt = stmt.where(Dataset.id > last_id)
+        datasets = db.session.scalars(stmt).all()
+        if not datasets:
+            break
+        last_id = datasets[-1].id
+
+        for dataset in datasets:
+            index_struct_dict = dataset.index_struct_dict
+            if not index_struct_dict or index_struct_dict.get("type") != VectorType.OCEANBASE:
+                continue
+            collection_name = index_struct_dict["vector_store"]["class_prefix"].lower()
+            try:
+                vector = OceanBaseVector(collection_name, config)
+                if vector._client.check_table_exists(collection_name) and vector.add_document_id_column():
+                    create_count += 1
+                    click.echo(f"Created document_id index for collection: {collection_name}.")
+            except Exception as e:
+                failed_dataset_ids.append(dataset.id)
+                click.echo(
+                    click.style(
+                        f"Failed to create document_id index for collection {collection_name}: {str(e)}", fg="red"
+                    )
+                )
+
+    click.echo(
+        click.style(
+            f"Index creation complete. Created {create_count} collection indexes, {len(failed_dataset_ids)} failed.",
+            fg="green",
+        )
+    )
+
+
 @click.command("old-metadata-migration", help="Old metadata migration.")
 def old_metadata_migration():
     """
@@ -625,6 +690,101 @@ def old_metadata_migration():
     click.echo(click.style("Old metadata migration completed.", fg="green"))
 
 
+@click.command("migrate-keyword-tables-to-postings", help="Migrate jieba keyword tables to keyword posting rows.")
+@click.option("--batch-size", default=100, help="Number of keyword tables to load per batch, default is 100.")
+def migrate_keyword_tables_to_postings(batch_size: int):
+    """
+    Move the JSON keyword tables of economy datasets (stored in the database or the storage) into
+    dataset_keyword_postings rows. Datasets are migrated one by one under their keyword indexing lock,
+    migrated datasets are skipped, so the command can be interrupted and re-run.
+    """
+    from core.rag.datasource.keyword.jieba.jieba import KEYWORD_POSTING_DATA_SOURCE_TYPE, Jieba
+
+    click.echo(click.style("Starting keyword table migration.", fg="green"))
+
+    migrated_count = 0
+    failed_dataset_ids = []
+    last_id = None
+    while True:
+        stmt = (
+            select(DatasetKeywordTable.id, DatasetKeywordTable.dataset_id)
+            .where(DatasetKeywordTable.data_source_type != KEYWORD_POSTING_DATA_SOURCE_TYPE)
+            .order_by(DatasetKeywordTable.id)
+            .limit(batch_size)
+        )
+        if last_id is not None:
+            stmt = stmt.where(DatasetKeywordTable.id > last_id)
+        keyword_tables = db.session.execute(stmt).all()
+        if not keyword_tables:
+            break
+        last_id = keyword_tables[-1].id
+
+        for keyword_table in keyword_tables:
+            dataset = db.session.query(Dataset).where(Dataset.id == keyword_table.dataset_id).first()
+            if not dataset:
+                continue
+            try:
+                posting_count = Jieba(dataset).migrate_to_postings()
+                migrated_count += 1
+                click.echo(f"Migrated keyword table of dataset {dataset.id}, {posting_count} postings.")
+            except Exception as e:
+                db.session.rollback()
+                failed_dataset_ids.append(dataset.id)
+                click.echo(
+                    click.style(f"Failed to migrate keyword table of dataset {dataset.id}: {str(e)}", fg="red")
+                )
+
+    click.echo(
+        click.style(
+            f"Keyword table migration completed, {migrated_count} migrated, {len(failed_dataset_ids)} failed.",
+            fg="green",
+        )
+    )
+
+
+@click.command("rollup-app-statistics", help="Backfill the hourly app statistics rollups.")
+@click.option(
+    "--start-date",
+    type=click.DateTime(formats=["%Y-%m-%d", "%Y-%m-%d %H:%M"]),
+    default=None,
+    help="UTC time to backfill from, default is the first message or workflow run.",
+)
+def rollup_app_statistics(start_date: Optional[datetime.datetime]):
+    """
+    Recompute the hourly app statistics rollups from the start date until the last run of the rollup task.
+    Until the history is backfilled, dashboards reading earlier dates fall back to the raw tables.
+    """
+    from services.app_statistic_service import ROLLUP_LOCK_KEY, AppStatisticService
+
+    click.echo(click.style("Starting app statistics backfill.", fg="green"))
+    lock = redis_client.lock(ROLLUP_LOCK_KEY, timeout=None)
+    # the rollup task skips its runs while the backfill holds the lock
+    if not lock.acquire(blocking=False):
+        click.echo(click.style("App statistics rollup is running, try again later.", fg="red"))
+        return
+    try:
+        hours = AppStatisticService.rollup_history(start_date)
+    finally:
+        lock.release()
+    click.echo(click.style(f"App statistics backfill completed, {hours} hours rolled up.", fg="green"))
+
+
+@click.command(
+    "backfill-workflow-app-log-search-text", help="Extract the search text of workflow app logs written before."
+)
+@click.option("--batch-size", default=1000, show_default=True, help="Logs updated per transaction.")
+def backfill_workflow_app_log_search_text(batch_size: int):
+    """
+    Fill in the full-text searched text of the workflow app logs written before it was extracted on run completion,
+    run it before enabling WORKFLOW_LOG_FULLTEXT_SEARCH_ENABLED.
+    """
+    from services.workflow_app_service import WorkflowAppService
+
+    click.echo(click.style("Starting workflow app log search text backfill.", fg="green"))
+    count = WorkflowAppService.backfill_search_text(batch_size)
+    click.echo(click.style(f"Workflow app log search text backfill completed, {count} logs updated.", fg="green"))
+
+
 @click.command("create-tenant", help="Create account and tenant.")
 @click.option("--email", prompt=True, help="Tenant account email.")
 @click.option("--name", prompt=True, help="Workspace name.")
@@ -689,10 +849,34 @@ def ensure_caches_table_exists():
             INDEX caches_expire_time_idx (expire_time)
         ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
         """
-        
+        # 有序集合与哈希按成员/字段逐行存储，每个操作只需一条走索引的 SQL
+        create_cache_zsets_table_sql = """
+        CREATE TABLE IF NOT EXISTS cache_zsets (
+            cache_key VARCHAR(255) NOT NULL,
+            member VARBINARY(255) NOT NULL,
+            score DOUBLE NOT NULL,
+            expire_time DATETIME NULL,
+            PRIMARY KEY (cache_key, member),
+            INDEX cache_zsets_cache_key_score_idx (cache_key, score),
+            INDEX cache_zsets_expire_time_idx (expire_time)
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+        """
+        create_cache_hashes_table_sql = """
+        CREATE TABLE IF NOT EXISTS cache_hashes (
+            cache_key VARCHAR(255) NOT NULL,
+            field VARBINARY(255) NOT NULL,
+            value LONGBLOB NOT NULL,
+            expire_time DATETIME NULL,
+            PRIMARY KEY (cache_key, field),
+            INDEX cache_hashes_expire_time_idx (expire_time)
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+        """
+
         with db.engine.begin() as conn:
             conn.execute(db.text(create_caches_table_sql))
-            click.echo(click.style("Caches table ensured for MySQL cache mode.", fg="green"))
+            conn.execute(db.text(create_cache_zsets_table_sql))
+            conn.execute(db.text(create_cache_hashes_table_sql))
+            click.echo(click.style("Caches tables ensured for MySQL cache mode.", fg="green"))
                 
     except Exception as e:
         click.echo(click.style(f"Error: Could not ensure caches table after 3 attempts: {e}", fg="red"))
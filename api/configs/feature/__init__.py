@@ -5,6 +5,7 @@ from pydantic import (
     Field,
     HttpUrl,
     NegativeInt,
+    NonNegativeFloat,
     NonNegativeInt,
     PositiveFloat,
     PositiveInt,
@@ -184,6 +185,27 @@ class PluginConfig(BaseSettings):
         default=15728640 * 12,
     )
 
+    PLUGIN_DAEMON_POOL_MAX_CONNECTIONS: PositiveInt = Field(
+        description="Maximum number of keep-alive connections to the plugin daemon kept per process",
+        default=100,
+    )
+
+    PLUGIN_DAEMON_CONNECT_TIMEOUT: PositiveFloat = Field(
+        description="Timeout in seconds for connecting to the plugin daemon",
+        default=10.0,
+    )
+
+    PLUGIN_DAEMON_READ_TIMEOUT: PositiveFloat = Field(
+        description="Timeout in seconds for waiting on the plugin daemon, between two chunks of streamed responses",
+        default=600.0,
+    )
+
+    PLUGIN_MODEL_CACHE_TTL: NonNegativeInt = Field(
+        description="Seconds a process reuses the plugin model providers and model schemas of a workspace, they are"
+        " also dropped when plugins are installed, upgraded or uninstalled. Set to 0 to disable the cache.",
+        default=300,
+    )
+
 
 class MarketplaceConfig(BaseSettings):
     """
@@ -476,6 +498,12 @@ class ModelLoadBalanceConfig(BaseSettings):
         default=False,
     )
 
+    PROVIDER_CONFIGURATIONS_CACHE_TTL: NonNegativeInt = Field(
+        description="Seconds a process reuses the model provider configurations of a workspace, they are also"
+        " dropped when providers, credentials, load balancing or plugins are changed. Set to 0 to disable the cache.",
+        default=60,
+    )
+
 
 class BillingConfig(BaseSettings):
     """
@@ -540,6 +568,32 @@ class WorkflowNodeExecutionConfig(BaseSettings):
         default=100,
     )
 
+    WORKFLOW_WORKER_POOL_MAX_WORKERS: PositiveInt = Field(
+        description="Maximum number of worker threads shared by all workflow runs in a process for parallel branches"
+        " and parallel iterations",
+        default=100,
+    )
+
+    WORKFLOW_WORKER_POOL_TENANT_MAX_ACTIVE: PositiveInt = Field(
+        description="Maximum number of shared workflow workers a single tenant can occupy at a time",
+        default=30,
+    )
+
+    WORKFLOW_WORKER_POOL_APP_MAX_ACTIVE: PositiveInt = Field(
+        description="Maximum number of shared workflow workers a single app can occupy at a time",
+        default=20,
+    )
+
+    WORKFLOW_WORKER_POOL_TENANT_MAX_QUEUED: PositiveInt = Field(
+        description="Maximum number of queued workflow tasks per tenant before new submissions are rejected",
+        default=1000,
+    )
+
+    WORKFLOW_WORKER_POOL_MAX_QUEUED: PositiveInt = Field(
+        description="Maximum number of queued workflow tasks in a process before new submissions are rejected",
+        default=10000,
+    )
+
     WORKFLOW_NODE_EXECUTION_STORAGE: str = Field(
         default="rdbms",
         description="Storage backend for WorkflowNodeExecution. Options: 'rdbms', 'hybrid'",
@@ -740,9 +794,10 @@ class RagEtlConfig(BaseSettings):
     )
 
     KEYWORD_DATA_SOURCE_TYPE: str = Field(
-        description="Data source type for keyword extraction"
-        " ('database' or other supported types), default to 'database'",
-        default="database",
+        description="Data source type of the keyword index of new datasets ('posting' for indexed keyword rows,"
+        " 'database' for a JSON table in the database or 'file' for a JSON file in the storage),"
+        " default to 'posting'",
+        default="posting",
     )
 
     UNSTRUCTURED_API_URL: Optional[str] = Field(
@@ -796,6 +851,12 @@ class DataSetConfig(BaseSettings):
         default=30,
     )
 
+    QUERY_EMBEDDING_LOCAL_CACHE_SIZE: NonNegativeInt = Field(
+        description="Maximum number of query embeddings kept in process memory in front of the shared cache,"
+        " 0 to disable",
+        default=1024,
+    )
+
 
 class WorkspaceConfig(BaseSettings):
     """
@@ -823,6 +884,23 @@ class IndexingConfig(BaseSettings):
         default=50,
     )
 
+    INDEXING_STREAMING_ENABLED: bool = Field(
+        description="Index paragraph documents as a pipeline: pages are split, embedded and loaded in batches while"
+        " the file is still being parsed, and segments become available as their batch completes",
+        default=False,
+    )
+
+    INDEXING_STREAMING_BATCH_SIZE: PositiveInt = Field(
+        description="Number of chunks embedded and written to the vector store per batch in streaming indexing",
+        default=100,
+    )
+
+    INDEXING_STREAMING_MAX_WORKERS: PositiveInt = Field(
+        description="Maximum number of batches embedded and loaded concurrently in streaming indexing,"
+        " parsing waits while this many batches are in flight",
+        default=4,
+    )
+
 
 class MultiModalTransferConfig(BaseSettings):
     MULTIMODAL_SEND_FORMAT: Literal["base64", "url"] = Field(
@@ -871,6 +949,20 @@ class CeleryScheduleTasksConfig(BaseSettings):
         description="Enable check upgradable plugin task",
         default=True,
     )
+    ENABLE_APP_STATISTICS_ROLLUP_TASK: bool = Field(
+        description="Enable the task maintaining the hourly app statistics rollups, which the app statistics"
+        " dashboards read instead of scanning all messages and workflow runs",
+        default=False,
+    )
+    APP_STATISTICS_ROLLUP_INTERVAL: PositiveInt = Field(
+        description="Interval in minutes between runs of the app statistics rollup task",
+        default=10,
+    )
+    APP_STATISTICS_ROLLUP_LAG: PositiveInt = Field(
+        description="Number of hours before the last rollup that every run of the app statistics rollup task"
+        " recomputes, to pick up messages and workflow runs finishing late",
+        default=2,
+    )
 
 
 class PositionConfig(BaseSettings):
@@ -974,6 +1066,38 @@ class WorkflowLogConfig(BaseSettings):
     WORKFLOW_LOG_CLEANUP_BATCH_SIZE: int = Field(
         default=100, description="Batch size for workflow run log cleanup operations"
     )
+    WORKFLOW_LOG_FULLTEXT_SEARCH_ENABLED: bool = Field(
+        default=False,
+        description="Search workflow app logs by keyword through an index on their extracted search text, a pg_trgm"
+        " index on PostgreSQL and an ngram full-text index on MySQL, instead of scanning the inputs and outputs of"
+        " the runs, logs written before are found after running the backfill-workflow-app-log-search-text command",
+    )
+    WORKFLOW_LOG_COUNT_LIMIT: NonNegativeInt = Field(
+        default=0,
+        description="Count at most this many matching workflow app logs for the total of the log list,"
+        " 0 counts all of them",
+    )
+
+
+class RetentionConfig(BaseSettings):
+    RETENTION_BATCH_SIZE: PositiveInt = Field(
+        description="Number of expired messages or embedding cache rows deleted per batch by the cleanup tasks",
+        default=1000,
+    )
+    RETENTION_BATCH_INTERVAL: NonNegativeFloat = Field(
+        description="Seconds to pause between the batches of the cleanup tasks",
+        default=0.0,
+    )
+    RETENTION_MAX_REPLICATION_LAG: NonNegativeFloat = Field(
+        description="Replication lag in seconds above which the cleanup tasks wait before deleting the next batch,"
+        " 0 disables the check",
+        default=10.0,
+    )
+    RETENTION_REPLICATION_LAG_QUERY: Optional[str] = Field(
+        description="SQL returning the replication lag in seconds, by default the lag of the slowest standby is read"
+        " from pg_stat_replication on PostgreSQL and not checked on MySQL",
+        default=None,
+    )
 
 
 class SwaggerUIConfig(BaseSettings):
@@ -1025,5 +1149,6 @@ class FeatureConfig(
     CeleryBeatConfig,
     CeleryScheduleTasksConfig,
     WorkflowLogConfig,
+    RetentionConfig,
 ):
     pass
@@ -1,4 +1,4 @@
-from typing import Optional
+from typing import Literal, Optional
 
 from pydantic import Field, NonNegativeInt, PositiveFloat, PositiveInt
 from pydantic_settings import BaseSettings
@@ -14,6 +14,84 @@ class RedisConfig(BaseSettings):
         default="redis",
     )
 
+    MYSQL_CACHE_L1_ENABLED: bool = Field(
+        description="Enable the in-process LRU/TTL tier in front of the MySQL cache backend",
+        default=False,
+    )
+
+    MYSQL_CACHE_L1_MAX_SIZE: PositiveInt = Field(
+        description="Maximum number of keys held by the in-process tier of the MySQL cache backend",
+        default=1024,
+    )
+
+    MYSQL_CACHE_L1_TTL: PositiveFloat = Field(
+        description="Maximum seconds a key may be served from the in-process tier of the MySQL cache backend,"
+        " bounding staleness against writes from other processes",
+        default=1.0,
+    )
+
+    MYSQL_CACHE_WRITE_BEHIND_KEY_PREFIXES: str = Field(
+        description="Comma-separated key prefixes of non-critical keys (e.g. rate-limit counters, embedding caches)"
+        " whose set/setex/expire/delete are buffered in process and flushed in batches by the MySQL cache backend."
+        " Empty disables write-behind",
+        default="",
+    )
+
+    MYSQL_CACHE_WRITE_BEHIND_INTERVAL: PositiveFloat = Field(
+        description="Seconds between write-behind flushes of the MySQL cache backend",
+        default=0.5,
+    )
+
+    MYSQL_CACHE_WRITE_BEHIND_MAX_PENDING: PositiveInt = Field(
+        description="Number of pending write-behind keys that triggers an early flush of the MySQL cache backend",
+        default=1000,
+    )
+
+    MYSQL_CACHE_LOCK_TYPE: Literal["get_lock", "table"] = Field(
+        description="Distributed lock implementation of the MySQL cache backend: 'get_lock' waits on server-side"
+        " GET_LOCK/RELEASE_LOCK on unpooled connections, 'table' polls lock rows in the caches table for servers"
+        " without GET_LOCK",
+        default="get_lock",
+    )
+
+    MYSQL_CACHE_SWEEP_INTERVAL: PositiveFloat = Field(
+        description="Seconds between passes of the expiry sweeper of the MySQL cache backend,"
+        " only one process in the cluster sweeps at a time",
+        default=300,
+    )
+
+    MYSQL_CACHE_SWEEP_BATCH_SIZE: PositiveInt = Field(
+        description="Initial primary-key window deleted per batch by the expiry sweeper of the MySQL cache backend,"
+        " adapted between 1/16 and 16 times this value",
+        default=1000,
+    )
+
+    MYSQL_CACHE_SWEEP_TARGET_BATCH_TIME: PositiveFloat = Field(
+        description="Target seconds per delete batch of the expiry sweeper of the MySQL cache backend",
+        default=0.05,
+    )
+
+    MYSQL_CACHE_POOL_SIZE: PositiveInt = Field(
+        description="Connections kept open in the dedicated pool of the MySQL cache backend, separate from the pool"
+        " of SQLALCHEMY_POOL_SIZE. Every held 'get_lock' lock occupies one of them",
+        default=10,
+    )
+
+    MYSQL_CACHE_MAX_OVERFLOW: NonNegativeInt = Field(
+        description="Connections the MySQL cache backend may open beyond MYSQL_CACHE_POOL_SIZE under load",
+        default=10,
+    )
+
+    MYSQL_CACHE_POOL_TIMEOUT: PositiveFloat = Field(
+        description="Seconds a cache command of the MySQL cache backend waits for a free connection before failing",
+        default=5.0,
+    )
+
+    MYSQL_CACHE_POOL_RECYCLE: NonNegativeInt = Field(
+        description="Seconds after which connections of the MySQL cache backend are recycled",
+        default=3600,
+    )
+
     REDIS_HOST: str = Field(
         description="Hostname or IP address of the Redis server",
         default="localhost",
@@ -34,12 +34,23 @@ class OceanBaseVectorConfig(BaseSettings):
         default=None,
     )
 
+    OCEANBASE_VECTOR_BATCH_SIZE: PositiveInt = Field(
+        description="Number of rows per multi-row insert when adding documents to an OceanBase collection",
+        default=100,
+    )
+
     OCEANBASE_ENABLE_HYBRID_SEARCH: bool = Field(
         description="Enable hybrid search features (requires OceanBase >= 4.3.5.1). Set to false for compatibility "
         "with older versions",
         default=False,
     )
 
+    OCEANBASE_NATIVE_HYBRID_SEARCH: bool = Field(
+        description="Run weighted-score hybrid retrieval as a single statement fusing ANN and full-text scores in "
+        "OceanBase, instead of two searches fused by the weight rerank. Requires OCEANBASE_ENABLE_HYBRID_SEARCH",
+        default=False,
+    )
+
     OCEANBASE_FULLTEXT_PARSER: Optional[str] = Field(
         description="Fulltext parser to use for text indexing. Options: 'thai_ftparser' (Thai), 'ik' (Chinese), "
         "'auto' (automatic language detection). Default is 'ik'",
@@ -15,6 +15,7 @@ from extensions.ext_database import db
 from libs.helper import DatetimeString, convert_datetime_to_date, convert_datetime_to_date_func
 from libs.login import login_required
 from models import AppMode, Message
+from services.app_statistic_service import AppStatisticService, DailyStatistic
 
 
 class DailyMessageStatistic(Resource):
@@ -68,10 +69,14 @@ WHERE
 
         response_data = []
 
-        with db.engine.begin() as conn:
-            rs = conn.execute(sa.text(sql_query), arg_dict)
-            for i in rs:
-                response_data.append({"date": str(i.date), "message_count": i.message_count})
+        rs = AppStatisticService.get_daily_statistic(
+            DailyStatistic.MESSAGES, app_model.id, account.timezone, arg_dict.get("start"), arg_dict.get("end")
+        )
+        if rs is None:
+            with db.engine.begin() as conn:
+                rs = conn.execute(sa.text(sql_query), arg_dict).all()
+        for i in rs:
+            response_data.append({"date": str(i.date), "message_count": i.message_count})
 
         return jsonify({"data": response_data})
 
@@ -100,6 +105,7 @@ class DailyConversationStatistic(Resource):
             .select_from(Message)
             .where(Message.app_id == app_model.id, Message.invoke_from != InvokeFrom.DEBUGGER.value)
         )
+        start_datetime_utc = end_datetime_utc = None
 
         if args["start"]:
             start_datetime = datetime.strptime(args["start"], "%Y-%m-%d %H:%M")
@@ -118,10 +124,14 @@ class DailyConversationStatistic(Resource):
         stmt = stmt.group_by("date").order_by("date")
 
         response_data = []
-        with db.engine.begin() as conn:
-            rs = conn.execute(stmt, {"tz": account.timezone})
-            for row in rs:
-                response_data.append({"date": str(row.date), "conversation_count": row.conversation_count})
+        rs = AppStatisticService.get_daily_statistic(
+            DailyStatistic.CONVERSATIONS, app_model.id, account.timezone, start_datetime_utc, end_datetime_utc
+        )
+        if rs is None:
+            with db.engine.begin() as conn:
+                rs = conn.execute(stmt, {"tz": account.timezone}).all()
+        for row in rs:
+            response_data.append({"date": str(row.date), "conversation_count": row.conversation_count})
 
         return jsonify({"data": response_data})
 
@@ -177,10 +187,14 @@ WHERE
 
         response_data = []
 
-        with db.engine.begin() as conn:
-            rs = conn.execute(sa.text(sql_query), arg_dict)
-            for i in rs:
-                response_data.append({"date": str(i.date), "terminal_count": i.terminal_count})
+        rs = AppStatisticService.get_daily_statistic(
+            DailyStatistic.END_USERS, app_model.id, account.timezone, arg_dict.get("start"), arg_dict.get("end")
+        )
+        if rs is None:
+            with db.engine.begin() as conn:
+                rs = conn.execute(sa.text(sql_query), arg_dict).all()
+        for i in rs:
+            response_data.append({"date": str(i.date), "terminal_count": i.terminal_count})
 
         return jsonify({"data": response_data})
 
@@ -237,12 +251,16 @@ WHERE
 
         response_data = []
 
-        with db.engine.begin() as conn:
-            rs = conn.execute(sa.text(sql_query), arg_dict)
-            for i in rs:
-                response_data.append(
-                    {"date": str(i.date), "token_count": i.token_count, "total_price": i.total_price, "currency": "USD"}
-                )
+        rs = AppStatisticService.get_daily_statistic(
+            DailyStatistic.TOKEN_COSTS, app_model.id, account.timezone, arg_dict.get("start"), arg_dict.get("end")
+        )
+        if rs is None:
+            with db.engine.begin() as conn:
+                rs = conn.execute(sa.text(sql_query), arg_dict).all()
+        for i in rs:
+            response_data.append(
+                {"date": str(i.date), "token_count": i.token_count, "total_price": i.total_price, "currency": "USD"}
+            )
 
         return jsonify({"data": response_data})
 
@@ -315,12 +333,18 @@ ORDER BY
 
         response_data = []
 
-        with db.engine.begin() as conn:
-            rs = conn.execute(sa.text(sql_query), arg_dict)
-            for i in rs:
-                response_data.append(
-                    {"date": str(i.date), "interactions": float(i.interactions.quantize(Decimal("0.01")))}
-                )
+        rs = AppStatisticService.get_daily_statistic(
+            DailyStatistic.AVERAGE_SESSION_INTERACTIONS,
+            app_model.id,
+            account.timezone,
+            arg_dict.get("start"),
+            arg_dict.get("end"),
+        )
+        if rs is None:
+            with db.engine.begin() as conn:
+                rs = conn.execute(sa.text(sql_query), arg_dict).all()
+        for i in rs:
+            response_data.append({"date": str(i.date), "interactions": float(i.interactions.quantize(Decimal("0.01")))})
 
         return jsonify({"data": response_data})
 
@@ -380,15 +404,23 @@ WHERE
 
         response_data = []
 
-        with db.engine.begin() as conn:
-            rs = conn.execute(sa.text(sql_query), arg_dict)
-            for i in rs:
-                response_data.append(
-                    {
-                        "date": str(i.date),
-                        "rate": round((i.feedback_count * 1000 / i.message_count) if i.message_count > 0 else 0, 2),
-                    }
-                )
+        rs = AppStatisticService.get_daily_statistic(
+            DailyStatistic.USER_SATISFACTION_RATE,
+            app_model.id,
+            account.timezone,
+            arg_dict.get("start"),
+            arg_dict.get("end"),
+        )
+        if rs is None:
+            with db.engine.begin() as conn:
+                rs = conn.execute(sa.text(sql_query), arg_dict).all()
+        for i in rs:
+            response_data.append(
+                {
+                    "date": str(i.date),
+                    "rate": round((i.feedback_count * 1000 / i.message_count) if i.message_count > 0 else 0, 2),
+                }
+            )
 
         return jsonify({"data": response_data})
 
@@ -444,10 +476,18 @@ WHERE
 
         response_data = []
 
-        with db.engine.begin() as conn:
-            rs = conn.execute(sa.text(sql_query), arg_dict)
-            for i in rs:
-                response_data.append({"date": str(i.date), "latency": round(i.latency * 1000, 4)})
+        rs = AppStatisticService.get_daily_statistic(
+            DailyStatistic.AVERAGE_RESPONSE_TIME,
+            app_model.id,
+            account.timezone,
+            arg_dict.get("start"),
+            arg_dict.get("end"),
+        )
+        if rs is None:
+            with db.engine.begin() as conn:
+                rs = conn.execute(sa.text(sql_query), arg_dict).all()
+        for i in rs:
+            response_data.append({"date": str(i.date), "latency": round(i.latency * 1000, 4)})
 
         return jsonify({"data": response_data})
 
@@ -506,10 +546,14 @@ WHERE
 
         response_data = []
 
-        with db.engine.begin() as conn:
-            rs = conn.execute(sa.text(sql_query), arg_dict)
-            for i in rs:
-                response_data.append({"date": str(i.date), "tps": round(i.tokens_per_second, 4)})
+        rs = AppStatisticService.get_daily_statistic(
+            DailyStatistic.TOKENS_PER_SECOND, app_model.id, account.timezone, arg_dict.get("start"), arg_dict.get("end")
+        )
+        if rs is None:
+            with db.engine.begin() as conn:
+                rs = conn.execute(sa.text(sql_query), arg_dict).all()
+        for i in rs:
+            response_data.append({"date": str(i.date), "tps": round(i.tokens_per_second, 4)})
 
         return jsonify({"data": response_data})
 
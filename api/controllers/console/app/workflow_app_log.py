@@ -2,6 +2,7 @@ from dateutil.parser import isoparse
 from flask_restx import Resource, marshal_with, reqparse
 from flask_restx.inputs import int_range
 from sqlalchemy.orm import Session
+from werkzeug.exceptions import NotFound
 
 from controllers.console import api
 from controllers.console.app.wraps import get_app_model
@@ -9,9 +10,11 @@ from controllers.console.wraps import account_initialization_required, setup_req
 from core.workflow.entities.workflow_execution import WorkflowExecutionStatus
 from extensions.ext_database import db
 from fields.workflow_app_log_fields import workflow_app_log_pagination_fields
+from libs.helper import uuid_value
 from libs.login import login_required
 from models import App
 from models.model import AppMode
+from services.errors.workflow_service import LastWorkflowAppLogNotExistsError
 from services.workflow_app_service import WorkflowAppService
 
 
@@ -50,6 +53,9 @@ class WorkflowAppLogApi(Resource):
         )
         parser.add_argument("page", type=int_range(1, 99999), default=1, location="args")
         parser.add_argument("limit", type=int_range(1, 100), default=20, location="args")
+        parser.add_argument(
+            "last_id", type=uuid_value, location="args", help="Last log ID for pagination, replaces page"
+        )
         args = parser.parse_args()
 
         args.status = WorkflowExecutionStatus(args.status) if args.status else None
@@ -62,18 +68,22 @@ class WorkflowAppLogApi(Resource):
         # get paginate workflow app logs
         workflow_app_service = WorkflowAppService()
         with Session(db.engine) as session:
-            workflow_app_log_pagination = workflow_app_service.get_paginate_workflow_app_logs(
-                session=session,
-                app_model=app_model,
-                keyword=args.keyword,
-                status=args.status,
-                created_at_before=args.created_at__before,
-                created_at_after=args.created_at__after,
-                page=args.page,
-                limit=args.limit,
-                created_by_end_user_session_id=args.created_by_end_user_session_id,
-                created_by_account=args.created_by_account,
-            )
+            try:
+                workflow_app_log_pagination = workflow_app_service.get_paginate_workflow_app_logs(
+                    session=session,
+                    app_model=app_model,
+                    keyword=args.keyword,
+                    status=args.status,
+                    created_at_before=args.created_at__before,
+                    created_at_after=args.created_at__after,
+                    page=args.page,
+                    limit=args.limit,
+                    created_by_end_user_session_id=args.created_by_end_user_session_id,
+                    created_by_account=args.created_by_account,
+                    last_id=args.last_id,
+                )
+            except LastWorkflowAppLogNotExistsError:
+                raise NotFound("Last Workflow App Log Not Exists.")
 
             return workflow_app_log_pagination
 
@@ -15,6 +15,7 @@ from libs.helper import DatetimeString, convert_datetime_to_date
 from libs.login import login_required
 from models.enums import WorkflowRunTriggeredFrom
 from models.model import AppMode
+from services.app_statistic_service import AppStatisticService, DailyStatistic
 
 
 class WorkflowDailyRunsStatistic(Resource):
@@ -73,10 +74,14 @@ WHERE
 
         response_data = []
 
-        with db.engine.begin() as conn:
-            rs = conn.execute(sa.text(sql_query), arg_dict)
-            for i in rs:
-                response_data.append({"date": str(i.date), "runs": i.runs})
+        rs = AppStatisticService.get_daily_statistic(
+            DailyStatistic.WORKFLOW_RUNS, app_model.id, account.timezone, arg_dict.get("start"), arg_dict.get("end")
+        )
+        if rs is None:
+            with db.engine.begin() as conn:
+                rs = conn.execute(sa.text(sql_query), arg_dict).all()
+        for i in rs:
+            response_data.append({"date": str(i.date), "runs": i.runs})
 
         return jsonify({"data": response_data})
 
@@ -137,10 +142,18 @@ WHERE
 
         response_data = []
 
-        with db.engine.begin() as conn:
-            rs = conn.execute(sa.text(sql_query), arg_dict)
-            for i in rs:
-                response_data.append({"date": str(i.date), "terminal_count": i.terminal_count})
+        rs = AppStatisticService.get_daily_statistic(
+            DailyStatistic.WORKFLOW_TERMINALS,
+            app_model.id,
+            account.timezone,
+            arg_dict.get("start"),
+            arg_dict.get("end"),
+        )
+        if rs is None:
+            with db.engine.begin() as conn:
+                rs = conn.execute(sa.text(sql_query), arg_dict).all()
+        for i in rs:
+            response_data.append({"date": str(i.date), "terminal_count": i.terminal_count})
 
         return jsonify({"data": response_data})
 
@@ -201,15 +214,23 @@ WHERE
 
         response_data = []
 
-        with db.engine.begin() as conn:
-            rs = conn.execute(sa.text(sql_query), arg_dict)
-            for i in rs:
-                response_data.append(
-                    {
-                        "date": str(i.date),
-                        "token_count": i.token_count,
-                    }
-                )
+        rs = AppStatisticService.get_daily_statistic(
+            DailyStatistic.WORKFLOW_TOKEN_COSTS,
+            app_model.id,
+            account.timezone,
+            arg_dict.get("start"),
+            arg_dict.get("end"),
+        )
+        if rs is None:
+            with db.engine.begin() as conn:
+                rs = conn.execute(sa.text(sql_query), arg_dict).all()
+        for i in rs:
+            response_data.append(
+                {
+                    "date": str(i.date),
+                    "token_count": i.token_count,
+                }
+            )
 
         return jsonify({"data": response_data})
 
@@ -285,12 +306,18 @@ GROUP BY
 
         response_data = []
 
-        with db.engine.begin() as conn:
-            rs = conn.execute(sa.text(sql_query), arg_dict)
-            for i in rs:
-                response_data.append(
-                    {"date": str(i.date), "interactions": float(i.interactions.quantize(Decimal("0.01")))}
-                )
+        rs = AppStatisticService.get_daily_statistic(
+            DailyStatistic.WORKFLOW_AVERAGE_INTERACTIONS,
+            app_model.id,
+            account.timezone,
+            arg_dict.get("start"),
+            arg_dict.get("end"),
+        )
+        if rs is None:
+            with db.engine.begin() as conn:
+                rs = conn.execute(sa.text(sql_query), arg_dict).all()
+        for i in rs:
+            response_data.append({"date": str(i.date), "interactions": float(i.interactions.quantize(Decimal("0.01")))})
 
         return jsonify({"data": response_data})
 
@@ -36,6 +36,7 @@ from repositories.factory import DifyAPIRepositoryFactory
 from services.app_generate_service import AppGenerateService
 from services.errors.app import IsDraftWorkflowError, WorkflowIdFormatError, WorkflowNotFoundError
 from services.errors.llm import InvokeRateLimitError
+from services.errors.workflow_service import LastWorkflowAppLogNotExistsError
 from services.workflow_app_service import WorkflowAppService
 
 logger = logging.getLogger(__name__)
@@ -67,6 +68,9 @@ workflow_log_parser.add_argument(
 )
 workflow_log_parser.add_argument("page", type=int_range(1, 99999), default=1, location="args")
 workflow_log_parser.add_argument("limit", type=int_range(1, 100), default=20, location="args")
+workflow_log_parser.add_argument(
+    "last_id", type=helper.uuid_value, location="args", help="Last log ID for pagination, replaces page"
+)
 
 workflow_run_fields = {
     "id": fields.String,
@@ -297,17 +301,21 @@ class WorkflowAppLogApi(Resource):
         # get paginate workflow app logs
         workflow_app_service = WorkflowAppService()
         with Session(db.engine) as session:
-            workflow_app_log_pagination = workflow_app_service.get_paginate_workflow_app_logs(
-                session=session,
-                app_model=app_model,
-                keyword=args.keyword,
-                status=args.status,
-                created_at_before=args.created_at__before,
-                created_at_after=args.created_at__after,
-                page=args.page,
-                limit=args.limit,
-                created_by_end_user_session_id=args.created_by_end_user_session_id,
-                created_by_account=args.created_by_account,
-            )
+            try:
+                workflow_app_log_pagination = workflow_app_service.get_paginate_workflow_app_logs(
+                    session=session,
+                    app_model=app_model,
+                    keyword=args.keyword,
+                    status=args.status,
+                    created_at_before=args.created_at__before,
+                    created_at_after=args.created_at__after,
+                    page=args.page,
+                    limit=args.limit,
+                    created_by_end_user_session_id=args.created_by_end_user_session_id,
+                    created_by_account=args.created_by_account,
+                    last_id=args.last_id,
+                )
+            except LastWorkflowAppLogNotExistsError:
+                raise NotFound("Last Workflow App Log Not Exists.")
 
             return workflow_app_log_pagination
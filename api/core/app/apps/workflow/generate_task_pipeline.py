@@ -73,6 +73,7 @@ from models.workflow import (
     WorkflowAppLog,
     WorkflowAppLogCreatedFrom,
 )
+from services.workflow_app_service import WorkflowAppService
 
 logger = logging.getLogger(__name__)
 
@@ -102,10 +103,12 @@ class WorkflowAppGenerateTaskPipeline:
         if isinstance(user, EndUser):
             self._user_id = user.id
             user_session_id = user.session_id
+            self._end_user_session_id: Optional[str] = user.session_id
             self._created_by_role = CreatorUserRole.END_USER
         elif isinstance(user, Account):
             self._user_id = user.id
             user_session_id = user.id
+            self._end_user_session_id = None
             self._created_by_role = CreatorUserRole.ACCOUNT
         else:
             raise ValueError(f"Invalid user type: {type(user)}")
@@ -764,6 +767,9 @@ class WorkflowAppGenerateTaskPipeline:
         workflow_app_log.created_from = created_from.value
         workflow_app_log.created_by_role = self._created_by_role
         workflow_app_log.created_by = self._user_id
+        workflow_app_log.search_text = WorkflowAppService.build_search_text(
+            workflow_execution.inputs, workflow_execution.outputs, self._end_user_session_id
+        )
 
         session.add(workflow_app_log)
         session.commit()
@@ -0,0 +1,87 @@
+import logging
+import threading
+from typing import TYPE_CHECKING, Optional
+
+from cachetools import TTLCache
+
+from configs import dify_config
+from extensions.ext_redis import redis_client
+
+if TYPE_CHECKING:
+    from core.model_runtime.entities.model_entities import AIModelEntity
+    from core.plugin.entities.plugin_daemon import PluginModelProviderEntity
+
+logger = logging.getLogger(__name__)
+
+# Process-wide plugin model providers per tenant and model schemas per cache key, tagged with the tenant's
+# plugin installation version. The version is a counter in redis bumped by `invalidate` whenever plugins of
+# the tenant are installed, upgraded or uninstalled, so entries of other processes are dropped on next use.
+_providers_cache: TTLCache = TTLCache(maxsize=1000, ttl=max(dify_config.PLUGIN_MODEL_CACHE_TTL, 1))
+_schemas_cache: TTLCache = TTLCache(maxsize=10000, ttl=max(dify_config.PLUGIN_MODEL_CACHE_TTL, 1))
+_cache_lock = threading.Lock()
+
+
+class PluginModelCache:
+    """
+    Cross-request cache of what the plugin daemon returns for model providers and model schemas.
+    Cached entities are shared by all requests of the process, treat them as read-only.
+    """
+
+    @staticmethod
+    def get_version(tenant_id: str) -> Optional[bytes]:
+        """
+        Get the plugin installation version of the tenant, None when the cache is disabled or the version
+        cannot be read.
+        """
+        if dify_config.PLUGIN_MODEL_CACHE_TTL <= 0:
+            return None
+        try:
+            version = redis_client.get(PluginModelCache._version_key(tenant_id))
+        except Exception:
+            # without the shared version, other processes' installs could not be seen, skip the cache
+            logger.warning("Failed to get plugin installation version of tenant %s", tenant_id, exc_info=True)
+            return None
+        return version or b"0"
+
+    @staticmethod
+    def get_providers(tenant_id: str, version: bytes) -> Optional[list["PluginModelProviderEntity"]]:
+        with _cache_lock:
+            cached = _providers_cache.get(tenant_id)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+        return None
+
+    @staticmethod
+    def set_providers(tenant_id: str, version: bytes, providers: list["PluginModelProviderEntity"]) -> None:
+        with _cache_lock:
+            _providers_cache[tenant_id] = (version, providers)
+
+    @staticmethod
+    def get_schema(cache_key: str, version: bytes) -> Optional["AIModelEntity"]:
+        with _cache_lock:
+            cached = _schemas_cache.get(cache_key)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+        return None
+
+    @staticmethod
+    def set_schema(cache_key: str, version: bytes, schema: "AIModelEntity") -> None:
+        with _cache_lock:
+            _schemas_cache[cache_key] = (version, schema)
+
+    @staticmethod
+    def invalidate(tenant_id: str) -> None:
+        """
+        Drop the cached model providers and schemas of the tenant in all processes, call after installing,
+        upgrading or uninstalling plugins.
+        """
+        with _cache_lock:
+            _providers_cache.pop(tenant_id, None)
+        try:
+            redis_client.incr(PluginModelCache._version_key(tenant_id))
+        except Exception:
+            logger.exception("Failed to bump plugin installation version of tenant %s", tenant_id)
+
+    @staticmethod
+    def _version_key(tenant_id: str) -> str:
+        return f"plugin_installation_version:{tenant_id}"
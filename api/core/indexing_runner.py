@@ -5,6 +5,7 @@ import re
 import threading
 import time
 import uuid
+from collections import deque
 from typing import Any, Optional, cast
 
 from flask import current_app
@@ -67,6 +68,9 @@ class IndexingRunner:
                     raise ValueError("no process rule found")
                 index_type = dataset_document.doc_form
                 index_processor = IndexProcessorFactory(index_type).init_index_processor()
+                if dify_config.INDEXING_STREAMING_ENABLED and index_type == IndexType.PARAGRAPH_INDEX:
+                    self._run_streaming(index_processor, dataset, dataset_document, processing_rule.to_dict())
+                    continue
                 # extract
                 text_docs = self._extract(index_processor, dataset_document, processing_rule.to_dict())
 
@@ -334,8 +338,33 @@ class IndexingRunner:
         if dataset_document.data_source_type not in {"upload_file", "notion_import", "website_crawl"}:
             return []
 
-        data_source_info = dataset_document.data_source_info_dict
+        extract_setting = self._get_extract_setting(dataset_document)
         text_docs = []
+        if extract_setting:
+            text_docs = index_processor.extract(extract_setting, process_rule_mode=process_rule["mode"])
+        # update document status to splitting
+        self._update_document_index_status(
+            document_id=dataset_document.id,
+            after_indexing_status="splitting",
+            extra_update_params={
+                DatasetDocument.word_count: sum(len(text_doc.page_content) for text_doc in text_docs),
+                DatasetDocument.parsing_completed_at: naive_utc_now(),
+            },
+        )
+
+        # replace doc id to document model id
+        text_docs = cast(list[Document], text_docs)
+        for text_doc in text_docs:
+            if text_doc.metadata is not None:
+                text_doc.metadata["document_id"] = dataset_document.id
+                text_doc.metadata["dataset_id"] = dataset_document.dataset_id
+
+        return text_docs
+
+    @staticmethod
+    def _get_extract_setting(dataset_document: DatasetDocument) -> Optional[ExtractSetting]:
+        data_source_info = dataset_document.data_source_info_dict
+        extract_setting = None
         if dataset_document.data_source_type == "upload_file":
             if not data_source_info or "upload_file_id" not in data_source_info:
                 raise ValueError("no upload file found")
@@ -348,7 +377,6 @@ class IndexingRunner:
                 extract_setting = ExtractSetting(
                     datasource_type="upload_file", upload_file=file_detail, document_model=dataset_document.doc_form
                 )
-                text_docs = index_processor.extract(extract_setting, process_rule_mode=process_rule["mode"])
         elif dataset_document.data_source_type == "notion_import":
             if (
                 not data_source_info
@@ -367,7 +395,6 @@ class IndexingRunner:
                 },
                 document_model=dataset_document.doc_form,
             )
-            text_docs = index_processor.extract(extract_setting, process_rule_mode=process_rule["mode"])
         elif dataset_document.data_source_type == "website_crawl":
             if (
                 not data_source_info
@@ -388,25 +415,7 @@ class IndexingRunner:
                 },
                 document_model=dataset_document.doc_form,
             )
-            text_docs = index_processor.extract(extract_setting, process_rule_mode=process_rule["mode"])
-        # update document status to splitting
-        self._update_document_index_status(
-            document_id=dataset_document.id,
-            after_indexing_status="splitting",
-            extra_update_params={
-                DatasetDocument.word_count: sum(len(text_doc.page_content) for text_doc in text_docs),
-                DatasetDocument.parsing_completed_at: naive_utc_now(),
-            },
-        )
-
-        # replace doc id to document model id
-        text_docs = cast(list[Document], text_docs)
-        for text_doc in text_docs:
-            if text_doc.metadata is not None:
-                text_doc.metadata["document_id"] = dataset_document.id
-                text_doc.metadata["dataset_id"] = dataset_document.dataset_id
-
-        return text_docs
+        return extract_setting
 
     @staticmethod
     def filter_string(text):
@@ -671,11 +680,16 @@ class IndexingRunner:
         db.session.commit()
 
     @staticmethod
-    def _update_segments_by_document(dataset_document_id: str, update_params: dict) -> None:
+    def _update_segments_by_document(
+        dataset_document_id: str, update_params: dict, index_node_ids: Optional[list[str]] = None
+    ) -> None:
         """
-        Update the document segment by document id.
+        Update the document segment by document id, or only the given segments of the document.
         """
-        db.session.query(DocumentSegment).filter_by(document_id=dataset_document_id).update(update_params)
+        query = db.session.query(DocumentSegment).filter_by(document_id=dataset_document_id)
+        if index_node_ids is not None:
+            query = query.where(DocumentSegment.index_node_id.in_(index_node_ids))
+        query.update(update_params)
         db.session.commit()
 
     def _transform(
@@ -685,22 +699,11 @@ class IndexingRunner:
         text_docs: list[Document],
         doc_language: str,
         process_rule: dict,
+        embedding_model_instance: Optional[ModelInstance] = None,
     ) -> list[Document]:
         # get embedding model instance
-        embedding_model_instance = None
-        if dataset.indexing_technique == "high_quality":
-            if dataset.embedding_model_provider:
-                embedding_model_instance = self.model_manager.get_model_instance(
-                    tenant_id=dataset.tenant_id,
-                    provider=dataset.embedding_model_provider,
-                    model_type=ModelType.TEXT_EMBEDDING,
-                    model=dataset.embedding_model,
-                )
-            else:
-                embedding_model_instance = self.model_manager.get_default_model_instance(
-                    tenant_id=dataset.tenant_id,
-                    model_type=ModelType.TEXT_EMBEDDING,
-                )
+        if embedding_model_instance is None:
+            embedding_model_instance = self._get_splitting_model_instance(dataset)
 
         documents = index_processor.transform(
             text_docs,
@@ -712,6 +715,145 @@ class IndexingRunner:
 
         return documents
 
+    def _get_splitting_model_instance(self, dataset: Dataset) -> Optional[ModelInstance]:
+        if dataset.indexing_technique != "high_quality":
+            return None
+        if dataset.embedding_model_provider:
+            return self.model_manager.get_model_instance(
+                tenant_id=dataset.tenant_id,
+                provider=dataset.embedding_model_provider,
+                model_type=ModelType.TEXT_EMBEDDING,
+                model=dataset.embedding_model,
+            )
+        return self.model_manager.get_default_model_instance(
+            tenant_id=dataset.tenant_id,
+            model_type=ModelType.TEXT_EMBEDDING,
+        )
+
+    def _run_streaming(
+        self,
+        index_processor: BaseIndexProcessor,
+        dataset: Dataset,
+        dataset_document: DatasetDocument,
+        process_rule: dict,
+    ) -> None:
+        """
+        Extract, split, embed and load as a pipeline instead of sequential stages over whole-document lists.
+
+        Pages are split as soon as they are parsed, chunks are saved as segments and embedded and loaded
+        in batches of INDEXING_STREAMING_BATCH_SIZE by up to INDEXING_STREAMING_MAX_WORKERS workers. Parsing
+        waits while that many batches are in flight, so only those batches are held in memory. Segments
+        are committed and completed batch by batch, so the document progress reflects partial indexing.
+        """
+        # like `_extract`, other data sources have nothing to extract and the document completes empty
+        extract_setting = None
+        if dataset_document.data_source_type in {"upload_file", "notion_import", "website_crawl"}:
+            extract_setting = self._get_extract_setting(dataset_document)
+
+        splitting_model_instance = self._get_splitting_model_instance(dataset)
+        embedding_model_instance = None
+        if dataset.indexing_technique == "high_quality":
+            embedding_model_instance = self.model_manager.get_model_instance(
+                tenant_id=dataset.tenant_id,
+                provider=dataset.embedding_model_provider,
+                model_type=ModelType.TEXT_EMBEDDING,
+                model=dataset.embedding_model,
+            )
+        doc_store = DatasetDocumentStore(
+            dataset=dataset, user_id=dataset_document.created_by, document_id=dataset_document.id
+        )
+        flask_app = current_app._get_current_object()  # type: ignore
+
+        self._update_document_index_status(document_id=dataset_document.id, after_indexing_status="indexing")
+        indexing_start_at = time.perf_counter()
+        word_count = 0
+        tokens = 0
+        batch_size = dify_config.INDEXING_STREAMING_BATCH_SIZE
+        max_workers = dify_config.INDEXING_STREAMING_MAX_WORKERS
+        futures: deque[concurrent.futures.Future] = deque()
+        pending: list[Document] = []
+        with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+
+            def submit(batch: list[Document]) -> None:
+                nonlocal tokens
+                # backpressure, wait for the oldest batch before taking on another one
+                while len(futures) >= max_workers:
+                    tokens += futures.popleft().result() or 0
+                self._check_document_paused_status(dataset_document.id)
+                doc_store.add_documents(docs=batch)
+                self._update_segments_by_document(
+                    dataset_document_id=dataset_document.id,
+                    update_params={
+                        DocumentSegment.status: "indexing",
+                        DocumentSegment.indexing_at: naive_utc_now(),
+                    },
+                    index_node_ids=[document.metadata["doc_id"] for document in batch],
+                )
+                if dataset.indexing_technique == "high_quality":
+                    futures.append(
+                        executor.submit(
+                            self._process_chunk,
+                            flask_app,
+                            index_processor,
+                            batch,
+                            dataset,
+                            dataset_document,
+                            embedding_model_instance,
+                        )
+                    )
+                else:
+                    futures.append(
+                        executor.submit(self._process_keyword_index, flask_app, dataset.id, dataset_document.id, batch)
+                    )
+
+            try:
+                if extract_setting:
+                    for text_doc in index_processor.extract_iter(
+                        extract_setting, process_rule_mode=process_rule["mode"]
+                    ):
+                        word_count += len(text_doc.page_content)
+                        if text_doc.metadata is not None:
+                            text_doc.metadata["document_id"] = dataset_document.id
+                            text_doc.metadata["dataset_id"] = dataset_document.dataset_id
+                        pending.extend(
+                            self._transform(
+                                index_processor,
+                                dataset,
+                                [text_doc],
+                                dataset_document.doc_language,
+                                process_rule,
+                                embedding_model_instance=splitting_model_instance,
+                            )
+                        )
+                        while len(pending) >= batch_size:
+                            submit(pending[:batch_size])
+                            pending = pending[batch_size:]
+                if pending:
+                    submit(pending)
+                while futures:
+                    tokens += futures.popleft().result() or 0
+            except BaseException:
+                for future in futures:
+                    future.cancel()
+                raise
+        indexing_end_at = time.perf_counter()
+
+        cur_time = naive_utc_now()
+        self._update_document_index_status(
+            document_id=dataset_document.id,
+            after_indexing_status="completed",
+            extra_update_params={
+                DatasetDocument.word_count: word_count,
+                DatasetDocument.parsing_completed_at: cur_time,
+                DatasetDocument.cleaning_completed_at: cur_time,
+                DatasetDocument.splitting_completed_at: cur_time,
+                DatasetDocument.tokens: tokens,
+                DatasetDocument.completed_at: cur_time,
+                DatasetDocument.indexing_latency: indexing_end_at - indexing_start_at,
+                DatasetDocument.error: None,
+            },
+        )
+
     def _load_segments(self, dataset, dataset_document, documents):
         # save node to document segment
         doc_store = DatasetDocumentStore(
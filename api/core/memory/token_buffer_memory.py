@@ -1,3 +1,6 @@
+import logging
+import math
+from collections import defaultdict
 from collections.abc import Sequence
 from typing import Optional
 
@@ -15,12 +18,18 @@ from core.model_runtime.entities import (
     UserPromptMessage,
 )
 from core.model_runtime.entities.message_entities import PromptMessageContentUnionTypes
+from core.model_runtime.model_providers.__base.tokenizers.gpt2_tokenizer import GPT2Tokenizer
 from core.prompt.utils.extract_thread_messages import extract_thread_messages
 from extensions.ext_database import db
 from factories import file_factory
 from models.model import AppMode, Conversation, Message, MessageFile
 from models.workflow import Workflow, WorkflowRun
 
+logger = logging.getLogger(__name__)
+
+# set to False after the local tokenizer failed to load, so it is not retried for every message
+_local_tokenizer_available = True
+
 
 class TokenBufferMemory:
     def __init__(
@@ -65,9 +74,18 @@ class TokenBufferMemory:
 
         messages = list(reversed(thread_messages))
 
+        message_files: defaultdict[str, list[MessageFile]] = defaultdict(list)
+        if messages:
+            for message_file in db.session.scalars(
+                select(MessageFile).where(MessageFile.message_id.in_([message.id for message in messages]))
+            ):
+                message_files[message_file.message_id].append(message_file)
+
         prompt_messages: list[PromptMessage] = []
+        # local token count of each prompt message, used to prune without asking the model per message
+        prompt_message_tokens: list[int] = []
         for message in messages:
-            files = db.session.query(MessageFile).where(MessageFile.message_id == message.id).all()
+            files = message_files.get(message.id)
             if files:
                 file_extra_config = None
                 if self.conversation.mode in {AppMode.AGENT_CHAT, AppMode.COMPLETION, AppMode.CHAT}:
@@ -113,6 +131,16 @@ class TokenBufferMemory:
                 prompt_messages.append(UserPromptMessage(content=message.query))
 
             prompt_messages.append(AssistantPromptMessage(content=message.answer))
+            prompt_message_tokens.append(
+                message.memory_query_tokens
+                if message.memory_query_tokens is not None
+                else self.get_num_tokens(message.query)
+            )
+            prompt_message_tokens.append(
+                message.memory_answer_tokens
+                if message.memory_answer_tokens is not None
+                else self.get_num_tokens(message.answer)
+            )
 
         if not prompt_messages:
             return []
@@ -120,13 +148,39 @@ class TokenBufferMemory:
         # prune the chat message if it exceeds the max token limit
         curr_message_tokens = self.model_instance.get_llm_num_tokens(prompt_messages)
 
-        if curr_message_tokens > max_token_limit:
-            while curr_message_tokens > max_token_limit and len(prompt_messages) > 1:
+        while curr_message_tokens > max_token_limit and len(prompt_messages) > 1:
+            # local counts miss files, roles and the model's own tokenizer, scale them to the model's count of the
+            # remaining messages, drop the oldest ones in one pass and verify the rest with the model once more.
+            # The scaled sum is at least the model's count, so each round drops a message.
+            local_tokens = [max(tokens, 1) for tokens in prompt_message_tokens]
+            scale = curr_message_tokens / sum(local_tokens)
+            scaled_tokens = [math.ceil(tokens * scale) for tokens in local_tokens]
+            estimated_tokens = sum(scaled_tokens)
+            while estimated_tokens > max_token_limit and len(prompt_messages) > 1:
                 prompt_messages.pop(0)
-                curr_message_tokens = self.model_instance.get_llm_num_tokens(prompt_messages)
+                prompt_message_tokens.pop(0)
+                estimated_tokens -= scaled_tokens.pop(0)
+            curr_message_tokens = self.model_instance.get_llm_num_tokens(prompt_messages)
 
         return prompt_messages
 
+    @staticmethod
+    def get_num_tokens(text: str) -> int:
+        """
+        Count the tokens of a query or answer locally, stored with the message when it is saved.
+        The counts are only used in proportion to each other, the model counts the pruned history.
+        """
+        global _local_tokenizer_available
+        if not text:
+            return 0
+        if _local_tokenizer_available:
+            try:
+                return GPT2Tokenizer.get_num_tokens(text)
+            except Exception:
+                _local_tokenizer_available = False
+                logger.warning("Failed to load the local tokenizer, estimating memory tokens by length", exc_info=True)
+        return math.ceil(len(text) / 4)
+
     def get_history_prompt_text(
         self,
         human_prefix: str = "Human",
@@ -6,6 +6,7 @@ from typing import Optional
 from pydantic import BaseModel, ConfigDict, Field
 
 import contexts
+from core.helper.plugin_model_cache import PluginModelCache
 from core.model_runtime.entities.common_entities import I18nObject
 from core.model_runtime.entities.defaults import PARAMETER_RULE_TEMPLATE
 from core.model_runtime.entities.model_entities import (
@@ -156,6 +157,13 @@ class AIModel(BaseModel):
             if cache_key in contexts.plugin_model_schemas.get():
                 return contexts.plugin_model_schemas.get()[cache_key]
 
+            version = PluginModelCache.get_version(self.tenant_id)
+            if version is not None:
+                schema = PluginModelCache.get_schema(cache_key, version)
+                if schema is not None:
+                    contexts.plugin_model_schemas.get()[cache_key] = schema
+                    return schema
+
             schema = plugin_model_manager.get_model_schema(
                 tenant_id=self.tenant_id,
                 user_id="unknown",
@@ -168,6 +176,8 @@ class AIModel(BaseModel):
 
             if schema:
                 contexts.plugin_model_schemas.get()[cache_key] = schema
+                if version is not None:
+                    PluginModelCache.set_schema(cache_key, version, schema)
 
             return schema
 
@@ -8,6 +8,7 @@ from typing import Optional
 from pydantic import BaseModel
 
 import contexts
+from core.helper.plugin_model_cache import PluginModelCache
 from core.helper.position_helper import get_provider_position_map, sort_to_dict_by_position_map
 from core.model_runtime.entities.model_entities import AIModelEntity, ModelType
 from core.model_runtime.entities.provider_entities import ProviderConfig, ProviderEntity, SimpleProviderEntity
@@ -88,6 +89,13 @@ class ModelProviderFactory:
             if plugin_model_providers is not None:
                 return plugin_model_providers
 
+            version = PluginModelCache.get_version(self.tenant_id)
+            if version is not None:
+                plugin_model_providers = PluginModelCache.get_providers(self.tenant_id, version)
+                if plugin_model_providers is not None:
+                    contexts.plugin_model_providers.set(plugin_model_providers)
+                    return plugin_model_providers
+
             plugin_model_providers = []
             contexts.plugin_model_providers.set(plugin_model_providers)
 
@@ -98,6 +106,10 @@ class ModelProviderFactory:
                 provider.declaration.provider = provider.plugin_id + "/" + provider.declaration.provider
                 plugin_model_providers.append(provider)
 
+            # tagged with the version read before fetching, a concurrent install makes it stale right away
+            if version is not None:
+                PluginModelCache.set_providers(self.tenant_id, version, plugin_model_providers)
+
             return plugin_model_providers
 
     def get_provider_schema(self, provider: str) -> ProviderEntity:
@@ -222,6 +234,13 @@ class ModelProviderFactory:
             if cache_key in contexts.plugin_model_schemas.get():
                 return contexts.plugin_model_schemas.get()[cache_key]
 
+            version = PluginModelCache.get_version(self.tenant_id)
+            if version is not None:
+                schema = PluginModelCache.get_schema(cache_key, version)
+                if schema is not None:
+                    contexts.plugin_model_schemas.get()[cache_key] = schema
+                    return schema
+
             schema = self.plugin_model_manager.get_model_schema(
                 tenant_id=self.tenant_id,
                 user_id="unknown",
@@ -234,6 +253,8 @@ class ModelProviderFactory:
 
             if schema:
                 contexts.plugin_model_schemas.get()[cache_key] = schema
+                if version is not None:
+                    PluginModelCache.set_schema(cache_key, version, schema)
 
             return schema
 
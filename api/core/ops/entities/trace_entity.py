@@ -116,6 +116,16 @@ class TaskData(BaseModel):
     trace_info: Any
 
 
+class TraceBatchGroup(BaseModel):
+    app_id: str
+    tracing_provider: str
+    traces: list[TaskData]
+
+
+class TraceBatchData(BaseModel):
+    groups: list[TraceBatchGroup]
+
+
 trace_info_info_map = {
     "WorkflowTraceInfo": WorkflowTraceInfo,
     "MessageTraceInfo": MessageTraceInfo,
@@ -26,6 +26,8 @@ from core.ops.entities.trace_entity import (
     SuggestedQuestionTraceInfo,
     TaskData,
     ToolTraceInfo,
+    TraceBatchData,
+    TraceBatchGroup,
     TraceTaskName,
     WorkflowTraceInfo,
 )
@@ -35,7 +37,7 @@ from extensions.ext_database import db
 from extensions.ext_storage import storage
 from models.model import App, AppModelConfig, Conversation, Message, MessageFile, TraceAppConfig
 from models.workflow import WorkflowAppLog, WorkflowRun
-from tasks.ops_trace_task import process_trace_tasks
+from tasks.ops_trace_task import process_trace_batch, process_trace_tasks
 
 logger = logging.getLogger(__name__)
 
@@ -831,6 +833,8 @@ trace_manager_timer: Optional[threading.Timer] = None
 trace_manager_queue: queue.Queue = queue.Queue()
 trace_manager_interval = int(os.getenv("TRACE_QUEUE_MANAGER_INTERVAL", 5))
 trace_manager_batch_size = int(os.getenv("TRACE_QUEUE_MANAGER_BATCH_SIZE", 100))
+# ship the traces collected in one interval as a single payload and task instead of one per trace
+trace_manager_batch_enabled = os.getenv("TRACE_QUEUE_MANAGER_BATCH_ENABLED", "false").lower() == "true"
 
 
 class TraceQueueManager:
@@ -882,6 +886,9 @@ class TraceQueueManager:
 
     def send_to_celery(self, tasks: list[TraceTask]):
         with self.flask_app.app_context():
+            if trace_manager_batch_enabled:
+                self.send_batch_to_celery(tasks)
+                return
             for task in tasks:
                 if task.app_id is None:
                     continue
@@ -899,3 +906,43 @@ class TraceQueueManager:
                     "app_id": task.app_id,
                 }
                 process_trace_tasks.delay(file_info)
+
+    def send_batch_to_celery(self, tasks: list[TraceTask]):
+        """
+        Send the traces as one payload and task, grouped by app and tracing provider. Apps whose tracing was
+        disabled since the traces were queued are skipped.
+        """
+        app_ids = {task.app_id for task in tasks if task.app_id is not None}
+        if not app_ids:
+            return
+        tracing_providers: dict[str, str] = {}
+        for app_id, tracing in db.session.execute(select(App.id, App.tracing).where(App.id.in_(app_ids))):
+            tracing_config = json.loads(tracing) if tracing else None
+            if tracing_config and tracing_config.get("enabled") and tracing_config.get("tracing_provider"):
+                tracing_providers[app_id] = tracing_config["tracing_provider"]
+
+        groups: dict[str, TraceBatchGroup] = {}
+        for task in tasks:
+            if task.app_id not in tracing_providers:
+                continue
+            trace_info = task.execute()
+            if trace_info is None:
+                continue
+            group = groups.setdefault(
+                task.app_id,
+                TraceBatchGroup(app_id=task.app_id, tracing_provider=tracing_providers[task.app_id], traces=[]),
+            )
+            group.traces.append(
+                TaskData(
+                    app_id=task.app_id,
+                    trace_info_type=type(trace_info).__name__,
+                    trace_info=trace_info.model_dump(),
+                )
+            )
+        if not groups:
+            return
+
+        batch_data = TraceBatchData(groups=sorted(groups.values(), key=lambda g: (g.tracing_provider, g.app_id)))
+        file_id = uuid4().hex
+        storage.save(f"{OPS_FILE_PATH}batch/{file_id}.json", batch_data.model_dump_json().encode("utf-8"))
+        process_trace_batch.delay({"file_id": file_id})
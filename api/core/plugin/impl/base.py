@@ -1,11 +1,14 @@
 import inspect
 import json
 import logging
+import os
+import threading
 from collections.abc import Callable, Generator
-from typing import TypeVar
+from typing import Any, Optional, TypeVar, cast
 
 import requests
 from pydantic import BaseModel
+from requests.adapters import HTTPAdapter
 from requests.exceptions import HTTPError
 from yarl import URL
 
@@ -37,6 +40,62 @@ T = TypeVar("T", bound=(BaseModel | dict | list | bool | str))
 
 logger = logging.getLogger(__name__)
 
+# Keep-alive connections to the plugin daemon, shared by all threads of the process. Created lazily and
+# again after a fork, so workers never share sockets with their parent.
+_session: Optional[requests.Session] = None
+_session_pid: Optional[int] = None
+_session_lock = threading.Lock()
+_session_stats = {"requests_total": 0, "connection_errors_total": 0, "awaiting_response": 0}
+
+
+def _get_session() -> requests.Session:
+    global _session, _session_pid
+    pid = os.getpid()
+    if _session is None or _session_pid != pid:
+        with _session_lock:
+            if _session is None or _session_pid != pid:
+                session = requests.Session()
+                # the daemon is a single host, pool_maxsize bounds the idle connections kept for reuse
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=dify_config.PLUGIN_DAEMON_POOL_MAX_CONNECTIONS)
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                _session, _session_pid = session, pid
+    return _session
+
+
+def _update_session_stats(**deltas: int) -> None:
+    with _session_lock:
+        for name, delta in deltas.items():
+            _session_stats[name] += delta
+
+
+def get_plugin_daemon_pool_metrics() -> dict[str, Any]:
+    """Request counters and the connection pools of the plugin daemon session of this process."""
+    with _session_lock:
+        metrics: dict[str, Any] = dict(_session_stats)
+        session = _session if _session_pid == os.getpid() else None
+    pools = []
+    if session is not None:
+        adapter = cast(HTTPAdapter, session.get_adapter(str(plugin_daemon_inner_api_baseurl)))
+        # RecentlyUsedContainer cannot be iterated, keys() returns a copy
+        for key in adapter.poolmanager.pools.keys():  # noqa: SIM118
+            pool = adapter.poolmanager.pools.get(key)
+            if pool is None:
+                continue
+            pools.append(
+                {
+                    "host": f"{pool.host}:{pool.port}",
+                    "max_size": pool.pool.maxsize if pool.pool else 0,
+                    "idle_connections": sum(1 for conn in list(pool.pool.queue) if conn is not None)
+                    if pool.pool
+                    else 0,
+                    "connections_created": pool.num_connections,
+                    "requests": pool.num_requests,
+                }
+            )
+    metrics["pools"] = pools
+    return metrics
+
 
 class BasePluginClient:
     def _request(
@@ -60,13 +119,24 @@ class BasePluginClient:
         if headers.get("Content-Type") == "application/json" and isinstance(data, dict):
             data = json.dumps(data)
 
+        _update_session_stats(requests_total=1, awaiting_response=1)
         try:
-            response = requests.request(
-                method=method, url=str(url), headers=headers, data=data, params=params, stream=stream, files=files
+            response = _get_session().request(
+                method=method,
+                url=str(url),
+                headers=headers,
+                data=data,
+                params=params,
+                stream=stream,
+                files=files,
+                timeout=(dify_config.PLUGIN_DAEMON_CONNECT_TIMEOUT, dify_config.PLUGIN_DAEMON_READ_TIMEOUT),
             )
         except requests.exceptions.ConnectionError:
+            _update_session_stats(connection_errors_total=1)
             logger.exception("Request to Plugin Daemon Service failed")
             raise PluginDaemonInnerError(code=-500, message="Request to Plugin Daemon Service failed")
+        finally:
+            _update_session_stats(awaiting_response=-1)
 
         return response
 
@@ -1,9 +1,12 @@
 import contextlib
 import json
+import logging
+import threading
 from collections import defaultdict
 from json import JSONDecodeError
 from typing import Any, Optional, cast
 
+from cachetools import TTLCache
 from sqlalchemy import select
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
@@ -51,6 +54,14 @@ from models.provider import (
 )
 from services.feature_service import FeatureService
 
+logger = logging.getLogger(__name__)
+
+# Process-wide snapshots of `ProviderManager.get_configurations` per tenant, tagged with the tenant's
+# configuration version. The version is a counter in redis bumped by every write path through
+# `ProviderManager.invalidate_configurations`, so snapshots of other processes are dropped on next use.
+_configurations_cache: TTLCache = TTLCache(maxsize=1000, ttl=max(dify_config.PROVIDER_CONFIGURATIONS_CACHE_TTL, 1))
+_configurations_cache_lock = threading.Lock()
+
 
 class ProviderManager:
     """
@@ -95,9 +106,57 @@ class ProviderManager:
         - Get provider instance
         - Switch selection priority
 
+        Configurations are reused until PROVIDER_CONFIGURATIONS_CACHE_TTL expires or the tenant's
+        configuration version changes, treat them as read-only.
+
         :param tenant_id:
         :return:
         """
+        if dify_config.PROVIDER_CONFIGURATIONS_CACHE_TTL <= 0:
+            return self._build_configurations(tenant_id)
+
+        version = self._get_configurations_version(tenant_id)
+        if version is not None:
+            with _configurations_cache_lock:
+                cached = _configurations_cache.get(tenant_id)
+            if cached is not None and cached[0] == version:
+                return cached[1]
+
+        provider_configurations = self._build_configurations(tenant_id)
+        # tagged with the version read before building, a concurrent change makes it stale right away
+        if version is not None:
+            with _configurations_cache_lock:
+                _configurations_cache[tenant_id] = (version, provider_configurations)
+        return provider_configurations
+
+    @staticmethod
+    def invalidate_configurations(tenant_id: str) -> None:
+        """
+        Drop the cached configurations of the tenant in all processes, call after changing providers,
+        credentials, model settings or load balancing configs.
+        """
+        with _configurations_cache_lock:
+            _configurations_cache.pop(tenant_id, None)
+        try:
+            redis_client.incr(ProviderManager._configurations_version_key(tenant_id))
+        except Exception:
+            logger.exception("Failed to bump provider configurations version of tenant %s", tenant_id)
+
+    @staticmethod
+    def _configurations_version_key(tenant_id: str) -> str:
+        return f"provider_configurations_version:{tenant_id}"
+
+    @staticmethod
+    def _get_configurations_version(tenant_id: str) -> Optional[bytes]:
+        try:
+            version = redis_client.get(ProviderManager._configurations_version_key(tenant_id))
+        except Exception:
+            # without the shared version, other processes' changes could not be seen, build uncached
+            logger.warning("Failed to get provider configurations version of tenant %s", tenant_id, exc_info=True)
+            return None
+        return version or b"0"
+
+    def _build_configurations(self, tenant_id: str) -> ProviderConfigurations:
         # Get all provider records of the workspace
         provider_name_to_provider_records_dict = self._get_all_providers(tenant_id)
 
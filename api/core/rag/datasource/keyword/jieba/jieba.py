@@ -3,6 +3,9 @@ from typing import Any, Optional
 
 import orjson
 from pydantic import BaseModel
+from sqlalchemy import and_, delete, func, select
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 
 from configs import dify_config
 from core.rag.datasource.keyword.jieba.jieba_keyword_table_handler import JiebaKeywordTableHandler
@@ -11,7 +14,16 @@ from core.rag.models.document import Document
 from extensions.ext_database import db
 from extensions.ext_redis import redis_client
 from extensions.ext_storage import storage
-from models.dataset import Dataset, DatasetKeywordTable, DocumentSegment
+from models.dataset import Dataset, DatasetKeywordPosting, DatasetKeywordTable, DocumentSegment
+
+# `DatasetKeywordTable.data_source_type` of datasets whose keyword index is stored as DatasetKeywordPosting rows
+KEYWORD_POSTING_DATA_SOURCE_TYPE = "posting"
+
+# rows per insert statement and node ids per delete statement of keyword postings
+KEYWORD_POSTING_BATCH_SIZE = 500
+
+# ranked chunk ids per segment query of a keyword search
+KEYWORD_SEARCH_HYDRATION_BATCH_SIZE = 500
 
 
 class KeywordTableConfig(BaseModel):
@@ -24,108 +36,218 @@ class Jieba(BaseKeyword):
         self._config = KeywordTableConfig()
 
     def create(self, texts: list[Document], **kwargs) -> BaseKeyword:
-        lock_name = f"keyword_indexing_lock_{self.dataset.id}"
-        with redis_client.lock(lock_name, timeout=600):
-            keyword_table_handler = JiebaKeywordTableHandler()
-            keyword_table = self._get_dataset_keyword_table()
-            for text in texts:
-                keywords = keyword_table_handler.extract_keywords(
-                    text.page_content, self._config.max_keywords_per_chunk
-                )
-                if text.metadata is not None:
-                    self._update_segment_keywords(self.dataset.id, text.metadata["doc_id"], list(keywords))
-                    keyword_table = self._add_text_to_keyword_table(
-                        keyword_table or {}, text.metadata["doc_id"], list(keywords)
-                    )
+        keyword_table_handler = JiebaKeywordTableHandler()
+        node_keywords = []
+        for text in texts:
+            keywords = keyword_table_handler.extract_keywords(text.page_content, self._config.max_keywords_per_chunk)
+            if text.metadata is not None:
+                self._update_segment_keywords(self.dataset.id, text.metadata["doc_id"], list(keywords))
+                node_keywords.append((text.metadata["doc_id"], list(keywords)))
 
-            self._save_dataset_keyword_table(keyword_table)
+        self._add_keywords(node_keywords)
 
-            return self
+        return self
 
     def add_texts(self, texts: list[Document], **kwargs):
-        lock_name = f"keyword_indexing_lock_{self.dataset.id}"
-        with redis_client.lock(lock_name, timeout=600):
-            keyword_table_handler = JiebaKeywordTableHandler()
+        keyword_table_handler = JiebaKeywordTableHandler()
 
-            keyword_table = self._get_dataset_keyword_table()
-            keywords_list = kwargs.get("keywords_list")
-            for i in range(len(texts)):
-                text = texts[i]
-                if keywords_list:
-                    keywords = keywords_list[i]
-                    if not keywords:
-                        keywords = keyword_table_handler.extract_keywords(
-                            text.page_content, self._config.max_keywords_per_chunk
-                        )
-                else:
+        node_keywords = []
+        keywords_list = kwargs.get("keywords_list")
+        for i in range(len(texts)):
+            text = texts[i]
+            if keywords_list:
+                keywords = keywords_list[i]
+                if not keywords:
                     keywords = keyword_table_handler.extract_keywords(
                         text.page_content, self._config.max_keywords_per_chunk
                     )
-                if text.metadata is not None:
-                    self._update_segment_keywords(self.dataset.id, text.metadata["doc_id"], list(keywords))
-                    keyword_table = self._add_text_to_keyword_table(
-                        keyword_table or {}, text.metadata["doc_id"], list(keywords)
-                    )
+            else:
+                keywords = keyword_table_handler.extract_keywords(
+                    text.page_content, self._config.max_keywords_per_chunk
+                )
+            if text.metadata is not None:
+                self._update_segment_keywords(self.dataset.id, text.metadata["doc_id"], list(keywords))
+                node_keywords.append((text.metadata["doc_id"], list(keywords)))
 
-            self._save_dataset_keyword_table(keyword_table)
+        self._add_keywords(node_keywords)
 
     def text_exists(self, id: str) -> bool:
+        if self._uses_postings():
+            stmt = (
+                select(DatasetKeywordPosting.index_node_id)
+                .where(DatasetKeywordPosting.dataset_id == self.dataset.id, DatasetKeywordPosting.index_node_id == id)
+                .limit(1)
+            )
+            return db.session.scalar(stmt) is not None
+
         keyword_table = self._get_dataset_keyword_table()
         if keyword_table is None:
             return False
         return id in set.union(*keyword_table.values())
 
     def delete_by_ids(self, ids: list[str]) -> None:
-        lock_name = f"keyword_indexing_lock_{self.dataset.id}"
-        with redis_client.lock(lock_name, timeout=600):
-            keyword_table = self._get_dataset_keyword_table()
-            if keyword_table is not None:
-                keyword_table = self._delete_ids_from_keyword_table(keyword_table, ids)
-
-            self._save_dataset_keyword_table(keyword_table)
+        if not self._uses_postings():
+            lock_name = f"keyword_indexing_lock_{self.dataset.id}"
+            with redis_client.lock(lock_name, timeout=600):
+                # the dataset may have been migrated to postings while waiting for the lock
+                if not self._uses_postings():
+                    keyword_table = self._get_dataset_keyword_table()
+                    if keyword_table is not None:
+                        keyword_table = self._delete_ids_from_keyword_table(keyword_table, ids)
+
+                    self._save_dataset_keyword_table(keyword_table)
+                    return
+
+        for i in range(0, len(ids), KEYWORD_POSTING_BATCH_SIZE):
+            db.session.execute(
+                delete(DatasetKeywordPosting).where(
+                    DatasetKeywordPosting.dataset_id == self.dataset.id,
+                    DatasetKeywordPosting.index_node_id.in_(ids[i : i + KEYWORD_POSTING_BATCH_SIZE]),
+                )
+            )
+        db.session.commit()
 
     def search(self, query: str, **kwargs: Any) -> list[Document]:
-        keyword_table = self._get_dataset_keyword_table()
-
         k = kwargs.get("top_k", 4)
         document_ids_filter = kwargs.get("document_ids_filter")
-        sorted_chunk_indices = self._retrieve_ids_by_query(keyword_table or {}, query, k)
+        if self._uses_postings():
+            sorted_chunk_indices = self._retrieve_ids_by_query_from_postings(query, k, document_ids_filter)
+        else:
+            keyword_table = self._get_dataset_keyword_table()
+            # filtered-out chunks must not take top_k slots, so rank all chunks when filtering
+            sorted_chunk_indices = self._retrieve_ids_by_query(
+                keyword_table or {}, query, None if document_ids_filter else k
+            )
 
         documents = []
-        for chunk_index in sorted_chunk_indices:
+        for segment in self._get_segments_in_order(sorted_chunk_indices, k, document_ids_filter):
+            documents.append(
+                Document(
+                    page_content=segment.content,
+                    metadata={
+                        "doc_id": segment.index_node_id,
+                        "doc_hash": segment.index_node_hash,
+                        "document_id": segment.document_id,
+                        "dataset_id": segment.dataset_id,
+                    },
+                )
+            )
+
+        return documents
+
+    def _get_segments_in_order(
+        self, sorted_chunk_indices: list[str], k: int, document_ids_filter: Optional[list[str]] = None
+    ) -> list[DocumentSegment]:
+        """
+        Load the segments of the ranked chunks with one `IN` query per batch, in ranking order, skipping
+        chunks outside of `document_ids_filter`, until `k` segments are found.
+        """
+        segments: list[DocumentSegment] = []
+        for i in range(0, len(sorted_chunk_indices), KEYWORD_SEARCH_HYDRATION_BATCH_SIZE):
+            chunk_indices = sorted_chunk_indices[i : i + KEYWORD_SEARCH_HYDRATION_BATCH_SIZE]
             segment_query = db.session.query(DocumentSegment).where(
-                DocumentSegment.dataset_id == self.dataset.id, DocumentSegment.index_node_id == chunk_index
+                DocumentSegment.dataset_id == self.dataset.id, DocumentSegment.index_node_id.in_(chunk_indices)
             )
             if document_ids_filter:
                 segment_query = segment_query.where(DocumentSegment.document_id.in_(document_ids_filter))
-            segment = segment_query.first()
-
-            if segment:
-                documents.append(
-                    Document(
-                        page_content=segment.content,
-                        metadata={
-                            "doc_id": chunk_index,
-                            "doc_hash": segment.index_node_hash,
-                            "document_id": segment.document_id,
-                            "dataset_id": segment.dataset_id,
-                        },
-                    )
-                )
+            segments_by_index = {segment.index_node_id: segment for segment in segment_query.all()}
 
-        return documents
+            for chunk_index in chunk_indices:
+                segment = segments_by_index.get(chunk_index)
+                if segment:
+                    segments.append(segment)
+                    if len(segments) >= k:
+                        return segments
+        return segments
 
     def delete(self) -> None:
         lock_name = f"keyword_indexing_lock_{self.dataset.id}"
         with redis_client.lock(lock_name, timeout=600):
             dataset_keyword_table = self.dataset.dataset_keyword_table
             if dataset_keyword_table:
+                if dataset_keyword_table.data_source_type == KEYWORD_POSTING_DATA_SOURCE_TYPE:
+                    db.session.execute(
+                        delete(DatasetKeywordPosting).where(DatasetKeywordPosting.dataset_id == self.dataset.id)
+                    )
                 db.session.delete(dataset_keyword_table)
                 db.session.commit()
-                if dataset_keyword_table.data_source_type != "database":
+                if dataset_keyword_table.data_source_type not in {"database", KEYWORD_POSTING_DATA_SOURCE_TYPE}:
                     file_key = "keyword_files/" + self.dataset.tenant_id + "/" + self.dataset.id + ".txt"
                     storage.delete(file_key)
 
+    def migrate_to_postings(self) -> int:
+        """
+        Move the dataset's JSON keyword table into DatasetKeywordPosting rows, return the number of postings.
+        """
+        lock_name = f"keyword_indexing_lock_{self.dataset.id}"
+        with redis_client.lock(lock_name, timeout=600):
+            dataset_keyword_table = self.dataset.dataset_keyword_table
+            if not dataset_keyword_table or dataset_keyword_table.data_source_type == KEYWORD_POSTING_DATA_SOURCE_TYPE:
+                return 0
+            source_type = dataset_keyword_table.data_source_type
+            keyword_table = self._get_dataset_keyword_table() or {}
+            node_keywords: dict[str, list[str]] = defaultdict(list)
+            for keyword, node_ids in keyword_table.items():
+                for node_id in node_ids:
+                    node_keywords[node_id].append(keyword)
+
+            # postings and the switch of the data source type are committed together
+            posting_count = self._insert_postings(list(node_keywords.items()))
+            dataset_keyword_table.data_source_type = KEYWORD_POSTING_DATA_SOURCE_TYPE
+            dataset_keyword_table.keyword_table = ""
+            db.session.commit()
+
+            if source_type != "database":
+                file_key = "keyword_files/" + self.dataset.tenant_id + "/" + self.dataset.id + ".txt"
+                if storage.exists(file_key):
+                    storage.delete(file_key)
+            return posting_count
+
+    def _uses_postings(self) -> bool:
+        dataset_keyword_table = self.dataset.dataset_keyword_table
+        if dataset_keyword_table:
+            return dataset_keyword_table.data_source_type == KEYWORD_POSTING_DATA_SOURCE_TYPE
+        # creates the keyword table of the dataset with the configured data source type
+        self._get_dataset_keyword_table()
+        return dify_config.KEYWORD_DATA_SOURCE_TYPE == KEYWORD_POSTING_DATA_SOURCE_TYPE
+
+    def _add_keywords(self, node_keywords: list[tuple[str, list[str]]]) -> None:
+        if not self._uses_postings():
+            lock_name = f"keyword_indexing_lock_{self.dataset.id}"
+            with redis_client.lock(lock_name, timeout=600):
+                # the dataset may have been migrated to postings while waiting for the lock
+                if not self._uses_postings():
+                    keyword_table = self._get_dataset_keyword_table()
+                    for node_id, keywords in node_keywords:
+                        keyword_table = self._add_text_to_keyword_table(keyword_table or {}, node_id, keywords)
+                    self._save_dataset_keyword_table(keyword_table)
+                    return
+
+        self._insert_postings(node_keywords)
+        db.session.commit()
+
+    def _insert_postings(self, node_keywords: list[tuple[str, list[str]]]) -> int:
+        """Insert the postings of the given segments, skipping postings that already exist."""
+        postings = {
+            (keyword[: DatasetKeywordPosting.MAX_KEYWORD_LENGTH], node_id)
+            for node_id, keywords in node_keywords
+            for keyword in keywords
+            if keyword
+        }
+        rows = [
+            {"dataset_id": self.dataset.id, "keyword": keyword, "index_node_id": node_id}
+            for keyword, node_id in postings
+        ]
+        for i in range(0, len(rows), KEYWORD_POSTING_BATCH_SIZE):
+            batch_rows = rows[i : i + KEYWORD_POSTING_BATCH_SIZE]
+            if dify_config.SQLALCHEMY_DATABASE_URI_SCHEME == "postgresql":
+                stmt = pg_insert(DatasetKeywordPosting).values(batch_rows).on_conflict_do_nothing()
+            else:
+                # MySQL: INSERT IGNORE 跳过已存在的 (dataset_id, keyword, index_node_id)
+                stmt = mysql_insert(DatasetKeywordPosting).values(batch_rows).prefix_with("IGNORE")
+            db.session.execute(stmt)
+        return len(rows)
+
     def _save_dataset_keyword_table(self, keyword_table):
         keyword_table_dict = {
             "__type__": "keyword_table",
@@ -191,7 +313,7 @@ class Jieba(BaseKeyword):
 
         return keyword_table
 
-    def _retrieve_ids_by_query(self, keyword_table: dict, query: str, k: int = 4):
+    def _retrieve_ids_by_query(self, keyword_table: dict, query: str, k: Optional[int] = 4):
         keyword_table_handler = JiebaKeywordTableHandler()
         keywords = keyword_table_handler.extract_keywords(query)
 
@@ -210,6 +332,38 @@ class Jieba(BaseKeyword):
 
         return sorted_chunk_indices[:k]
 
+    def _retrieve_ids_by_query_from_postings(
+        self, query: str, k: int = 4, document_ids_filter: Optional[list[str]] = None
+    ) -> list[str]:
+        keyword_table_handler = JiebaKeywordTableHandler()
+        keywords = {
+            keyword[: DatasetKeywordPosting.MAX_KEYWORD_LENGTH]
+            for keyword in keyword_table_handler.extract_keywords(query)
+            if keyword
+        }
+        if not keywords:
+            return []
+
+        # rank chunks by the number of matching keywords, reading only the postings of the query keywords
+        match_count = func.count().label("match_count")
+        stmt = (
+            select(DatasetKeywordPosting.index_node_id, match_count)
+            .where(DatasetKeywordPosting.dataset_id == self.dataset.id, DatasetKeywordPosting.keyword.in_(keywords))
+            .group_by(DatasetKeywordPosting.index_node_id)
+            .order_by(match_count.desc())
+            .limit(k)
+        )
+        if document_ids_filter:
+            # filter before the limit, so filtered-out chunks do not take top_k slots
+            stmt = stmt.join(
+                DocumentSegment,
+                and_(
+                    DocumentSegment.dataset_id == DatasetKeywordPosting.dataset_id,
+                    DocumentSegment.index_node_id == DatasetKeywordPosting.index_node_id,
+                ),
+            ).where(DocumentSegment.document_id.in_(document_ids_filter))
+        return [index_node_id for index_node_id, _ in db.session.execute(stmt)]
+
     def _update_segment_keywords(self, dataset_id: str, node_id: str, keywords: list[str]):
         document_segment = (
             db.session.query(DocumentSegment)
@@ -222,33 +376,25 @@ class Jieba(BaseKeyword):
             db.session.commit()
 
     def create_segment_keywords(self, node_id: str, keywords: list[str]):
-        keyword_table = self._get_dataset_keyword_table()
         self._update_segment_keywords(self.dataset.id, node_id, keywords)
-        keyword_table = self._add_text_to_keyword_table(keyword_table or {}, node_id, keywords)
-        self._save_dataset_keyword_table(keyword_table)
+        self._add_keywords([(node_id, keywords)])
 
     def multi_create_segment_keywords(self, pre_segment_data_list: list):
         keyword_table_handler = JiebaKeywordTableHandler()
-        keyword_table = self._get_dataset_keyword_table()
+        node_keywords = []
         for pre_segment_data in pre_segment_data_list:
             segment = pre_segment_data["segment"]
             if pre_segment_data["keywords"]:
                 segment.keywords = pre_segment_data["keywords"]
-                keyword_table = self._add_text_to_keyword_table(
-                    keyword_table or {}, segment.index_node_id, pre_segment_data["keywords"]
-                )
+                node_keywords.append((segment.index_node_id, pre_segment_data["keywords"]))
             else:
                 keywords = keyword_table_handler.extract_keywords(segment.content, self._config.max_keywords_per_chunk)
                 segment.keywords = list(keywords)
-                keyword_table = self._add_text_to_keyword_table(
-                    keyword_table or {}, segment.index_node_id, list(keywords)
-                )
-        self._save_dataset_keyword_table(keyword_table)
+                node_keywords.append((segment.index_node_id, list(keywords)))
+        self._add_keywords(node_keywords)
 
     def update_segment_keywords_index(self, node_id: str, keywords: list[str]):
-        keyword_table = self._get_dataset_keyword_table()
-        keyword_table = self._add_text_to_keyword_table(keyword_table or {}, node_id, keywords)
-        self._save_dataset_keyword_table(keyword_table)
+        self._add_keywords([(node_id, keywords)])
 
 
 def set_orjson_default(obj: Any) -> Any:
@@ -1,4 +1,5 @@
 import concurrent.futures
+import logging
 from concurrent.futures import ThreadPoolExecutor
 from typing import Optional
 
@@ -20,6 +21,8 @@ from models.dataset import ChildChunk, Dataset, DocumentSegment
 from models.dataset import Document as DatasetDocument
 from services.external_knowledge_service import ExternalDatasetService
 
+logger = logging.getLogger(__name__)
+
 default_retrieval_model = {
     "search_method": RetrievalMethod.SEMANTIC_SEARCH.value,
     "reranking_enable": False,
@@ -50,6 +53,11 @@ class RetrievalService:
         if not dataset:
             return []
 
+        if retrieval_method == RetrievalMethod.HYBRID_SEARCH.value and reranking_mode == RerankMode.WEIGHTED_SCORE:
+            documents = cls.native_hybrid_search(dataset, query, top_k, score_threshold, weights, document_ids_filter)
+            if documents is not None:
+                return documents
+
         all_documents: list[Document] = []
         exceptions: list[str] = []
 
@@ -147,6 +155,43 @@ class RetrievalService:
         with Session(db.engine) as session:
             return session.query(Dataset).where(Dataset.id == dataset_id).first()
 
+    @classmethod
+    def native_hybrid_search(
+        cls,
+        dataset: Dataset,
+        query: str,
+        top_k: int,
+        score_threshold: Optional[float],
+        weights: Optional[dict],
+        document_ids_filter: Optional[list[str]] = None,
+    ) -> Optional[list[Document]]:
+        """
+        Weighted-score hybrid search in one round trip, for vector stores that fuse both searches natively.
+        Returns None when the vector store cannot, then the separate searches and weight rerank are used.
+        """
+        vector_type = dataset.index_struct_dict["type"] if dataset.index_struct_dict else dify_config.VECTOR_STORE
+        if not weights or not vector_type:
+            return None
+        try:
+            # checked before building the vector, which connects to the store and loads the embedding model
+            if not Vector.get_vector_factory(vector_type).supports_hybrid_search():
+                return None
+            vector = Vector(dataset=dataset)
+            if not vector.supports_hybrid_search():
+                return None
+            return vector.search_hybrid(
+                query,
+                full_text_query=cls.escape_query_for_search(query),
+                top_k=top_k,
+                score_threshold=score_threshold,
+                vector_weight=weights["vector_setting"]["vector_weight"],
+                keyword_weight=weights["keyword_setting"]["keyword_weight"],
+                document_ids_filter=document_ids_filter,
+            )
+        except Exception:
+            logger.warning("Native hybrid search of dataset %s failed, falling back", dataset.id, exc_info=True)
+            return None
+
     @classmethod
     def keyword_search(
         cls,
@@ -1,11 +1,13 @@
 import json
 import logging
 import math
+import threading
 from typing import Any
 
+from cachetools import TTLCache
 from pydantic import BaseModel, model_validator
 from pyobvector import VECTOR, FtsIndexParam, FtsParser, ObVecClient, l2_distance  # type: ignore
-from sqlalchemy import JSON, Column, String
+from sqlalchemy import JSON, Column, Computed, Index, String, bindparam, column, func, text
 from sqlalchemy.dialects.mysql import LONGTEXT
 
 from configs import dify_config
@@ -24,6 +26,12 @@ DEFAULT_OCEANBASE_HNSW_SEARCH_PARAM = {"efSearch": 64}
 OCEANBASE_SUPPORTED_VECTOR_INDEX_TYPE = "HNSW"
 DEFAULT_OCEANBASE_VECTOR_METRIC_TYPE = "l2"
 
+# Indexed virtual column generated from metadata.document_id, so document filters are index lookups
+# instead of JSON extraction over every row
+DOCUMENT_ID_COLUMN_NAME = "document_id"
+DOCUMENT_ID_INDEX_NAME = "document_id_index"
+DOCUMENT_ID_COLUMN_EXPRESSION = "json_unquote(json_extract(`metadata`, '$.document_id'))"
+
 
 class OceanBaseVectorConfig(BaseModel):
     host: str
@@ -32,6 +40,8 @@ class OceanBaseVectorConfig(BaseModel):
     password: str
     database: str
     enable_hybrid_search: bool = False
+    batch_size: int = 100
+    native_hybrid_search: bool = False
 
     @model_validator(mode="before")
     @classmethod
@@ -47,19 +57,48 @@ class OceanBaseVectorConfig(BaseModel):
         return values
 
 
+# Process-wide ObVecClients (each owning an engine and its connection pool) and hybrid search support
+# results, keyed by connection config, so building an OceanBaseVector per request opens no new connections
+_clients: dict[tuple, ObVecClient] = {}
+_hybrid_search_support: dict[tuple, bool] = {}
+_clients_lock = threading.Lock()
+
+# Whether a collection has the document_id column, re-checked after the TTL so collections migrated by
+# `flask add-oceanbase-document-id-index` are picked up without a restart
+_document_id_columns: TTLCache = TTLCache(maxsize=10000, ttl=600)
+
+
+def _client_key(config: OceanBaseVectorConfig) -> tuple:
+    return config.host, config.port, config.user, config.password, config.database
+
+
 class OceanBaseVector(BaseVector):
     def __init__(self, collection_name: str, config: OceanBaseVectorConfig):
         super().__init__(collection_name)
         self._config = config
         self._hnsw_ef_search = -1
-        self._client = ObVecClient(
-            uri=f"{self._config.host}:{self._config.port}",
-            user=self._config.user,
-            password=self._config.password,
-            db_name=self._config.database,
-        )
+        self._client = self._get_client()
         self._hybrid_search_enabled = self._check_hybrid_search_support()  # Check if hybrid search is supported
 
+    def _get_client(self) -> ObVecClient:
+        key = _client_key(self._config)
+        client = _clients.get(key)
+        if client is None:
+            with _clients_lock:
+                client = _clients.get(key)
+                if client is None:
+                    client = ObVecClient(
+                        uri=f"{self._config.host}:{self._config.port}",
+                        user=self._config.user,
+                        password=self._config.password,
+                        db_name=self._config.database,
+                        # connections are kept across requests, drop the ones closed by the server
+                        pool_pre_ping=True,
+                        pool_recycle=3600,
+                    )
+                    _clients[key] = client
+        return client
+
     def get_type(self) -> str:
         return VectorType.OCEANBASE
 
@@ -102,6 +141,7 @@ class OceanBaseVector(BaseVector):
                 Column("vector", VECTOR(self._vec_dim)),
                 Column("text", LONGTEXT),
                 Column("metadata", JSON),
+                Column(DOCUMENT_ID_COLUMN_NAME, String(255), Computed(DOCUMENT_ID_COLUMN_EXPRESSION, persisted=False)),
             ]
             vidx_params = self._client.prepare_index_params()
             vidx_params.add_index(
@@ -115,6 +155,7 @@ class OceanBaseVector(BaseVector):
             self._client.create_table_with_index_params(
                 table_name=self._collection_name,
                 columns=cols,
+                indexes=[Index(DOCUMENT_ID_INDEX_NAME, DOCUMENT_ID_COLUMN_NAME)],
                 vidxs=vidx_params,
             )
             if self._hybrid_search_enabled:
@@ -135,6 +176,54 @@ class OceanBaseVector(BaseVector):
 
             redis_client.set(collection_exist_cache_key, 1, ex=3600)
 
+    def add_document_id_column(self) -> bool:
+        """
+        Add the generated document_id column and its index to a collection created without them.
+
+        The column is virtual, so adding it only changes the table definition, the index is then built
+        online while the collection keeps serving reads and writes. Returns False if it already existed.
+        """
+        if self._has_document_id_column(refresh=True):
+            return False
+        lock_name = "vector_indexing_lock_" + self._collection_name
+        with redis_client.lock(lock_name, timeout=600):
+            if self._has_document_id_column(refresh=True):
+                return False
+            self._client.perform_raw_text_sql(
+                f"ALTER TABLE `{self._collection_name}` ADD COLUMN `{DOCUMENT_ID_COLUMN_NAME}` VARCHAR(255) "
+                f"GENERATED ALWAYS AS ({DOCUMENT_ID_COLUMN_EXPRESSION}) VIRTUAL"
+            )
+            self._client.perform_raw_text_sql(
+                f"CREATE INDEX `{DOCUMENT_ID_INDEX_NAME}` ON `{self._collection_name}` (`{DOCUMENT_ID_COLUMN_NAME}`)"
+            )
+            # reflected again with the new column on next use
+            self._client.refresh_metadata([self._collection_name])
+            _document_id_columns[(_client_key(self._config), self._collection_name)] = True
+        return True
+
+    def _has_document_id_column(self, refresh: bool = False) -> bool:
+        key = (_client_key(self._config), self._collection_name)
+        has_column = None if refresh else _document_id_columns.get(key)
+        if has_column is None:
+            result = self._client.perform_raw_text_sql(
+                f"SHOW COLUMNS FROM `{self._collection_name}` LIKE '{DOCUMENT_ID_COLUMN_NAME}'"
+            )
+            has_column = result.fetchone() is not None
+            _document_id_columns[key] = has_column
+        return has_column
+
+    def _document_id_expression(self):
+        if self._has_document_id_column():
+            return column(DOCUMENT_ID_COLUMN_NAME)
+        # collections created before the document_id column, see `add_document_id_column`
+        return func.json_unquote(func.json_extract(column("metadata"), "$.document_id"))
+
+    def _document_id_sql(self) -> str:
+        # same as `_document_id_expression`, for raw SQL statements
+        if self._has_document_id_column():
+            return DOCUMENT_ID_COLUMN_NAME
+        return "metadata->>'$.document_id'"
+
     def _check_hybrid_search_support(self) -> bool:
         """
         Check if the current OceanBase version supports hybrid search.
@@ -143,6 +232,14 @@ class OceanBaseVector(BaseVector):
         if not self._config.enable_hybrid_search:
             return False
 
+        key = _client_key(self._config)
+        supported = _hybrid_search_support.get(key)
+        if supported is None:
+            supported = self._probe_hybrid_search_support()
+            _hybrid_search_support[key] = supported
+        return supported
+
+    def _probe_hybrid_search_support(self) -> bool:
         try:
             from packaging import version
 
@@ -158,16 +255,18 @@ class OceanBaseVector(BaseVector):
 
     def add_texts(self, documents: list[Document], embeddings: list[list[float]], **kwargs):
         ids = self._get_uuids(documents)
-        for id, doc, emb in zip(ids, documents, embeddings):
-            self._client.insert(
-                table_name=self._collection_name,
-                data={
-                    "id": id,
-                    "vector": emb,
-                    "text": doc.page_content,
-                    "metadata": doc.metadata,
-                },
-            )
+        rows = [
+            {
+                "id": id,
+                "vector": emb,
+                "text": doc.page_content,
+                "metadata": doc.metadata,
+            }
+            for id, doc, emb in zip(ids, documents, embeddings)
+        ]
+        # multi-row inserts, one statement and transaction per batch
+        for i in range(0, len(rows), self._config.batch_size):
+            self._client.insert(table_name=self._collection_name, data=rows[i : i + self._config.batch_size])
 
     def text_exists(self, id: str) -> bool:
         cur = self._client.get(table_name=self._collection_name, ids=id)
@@ -179,12 +278,14 @@ class OceanBaseVector(BaseVector):
         self._client.delete(table_name=self._collection_name, ids=ids)
 
     def get_ids_by_metadata_field(self, key: str, value: str) -> list[str]:
-        from sqlalchemy import text
-
+        if key == DOCUMENT_ID_COLUMN_NAME:
+            where_clause = self._document_id_expression() == value
+        else:
+            where_clause = text(f"metadata->>'$.{key}' = :value").bindparams(value=value)
         cur = self._client.get(
             table_name=self._collection_name,
             ids=None,
-            where_clause=[text(f"metadata->>'$.{key}' = '{value}'")],
+            where_clause=[where_clause],
             output_column_name=["id"],
         )
         return [row[0] for row in cur]
@@ -204,9 +305,10 @@ class OceanBaseVector(BaseVector):
 
             document_ids_filter = kwargs.get("document_ids_filter")
             where_clause = ""
+            params: dict[str, Any] = {"query": query}
             if document_ids_filter:
-                document_ids = ", ".join(f"'{id}'" for id in document_ids_filter)
-                where_clause = f" AND metadata->>'$.document_id' IN ({document_ids})"
+                where_clause = f" AND {self._document_id_sql()} IN :document_ids"
+                params["document_ids"] = list(document_ids_filter)
 
             full_sql = f"""SELECT metadata, text, MATCH (text) AGAINST (:query) AS score
             FROM {self._collection_name}
@@ -215,11 +317,12 @@ class OceanBaseVector(BaseVector):
             ORDER BY score DESC
             LIMIT {top_k}"""
 
+            statement = text(full_sql)
+            if document_ids_filter:
+                statement = statement.bindparams(bindparam("document_ids", expanding=True))
             with self._client.engine.connect() as conn:
                 with conn.begin():
-                    from sqlalchemy import text
-
-                    result = conn.execute(text(full_sql), {"query": query})
+                    result = conn.execute(statement, params)
                     rows = result.fetchall()
 
                     docs = []
@@ -242,11 +345,8 @@ class OceanBaseVector(BaseVector):
         document_ids_filter = kwargs.get("document_ids_filter")
         _where_clause = None
         if document_ids_filter:
-            document_ids = ", ".join(f"'{id}'" for id in document_ids_filter)
-            where_clause = f"metadata->>'$.document_id' in ({document_ids})"
-            from sqlalchemy import text
-
-            _where_clause = [text(where_clause)]
+            # rendered by pyobvector with escaped literals
+            _where_clause = [self._document_id_expression().in_(list(document_ids_filter))]
         ef_search = kwargs.get("ef_search", self._hnsw_ef_search)
         if ef_search != self._hnsw_ef_search:
             self._client.set_ob_hnsw_ef_search(ef_search)
@@ -277,6 +377,79 @@ class OceanBaseVector(BaseVector):
             )
         return docs
 
+    def supports_hybrid_search(self) -> bool:
+        return self._config.native_hybrid_search and self._hybrid_search_enabled
+
+    def search_hybrid(self, query: str, query_vector: list[float], **kwargs: Any) -> list[Document]:
+        """
+        ANN and full-text search fused by weighted score in one statement.
+
+        Each side contributes its top_k candidates like `search_by_vector` and `search_by_full_text` do,
+        the vector score is the same `1 - distance / sqrt(2)` and the full-text relevance is normalized by
+        the best match of the query, then both are weighted and the best top_k above the threshold returned.
+        """
+        if not self._hybrid_search_enabled:
+            raise ValueError("Hybrid search is not enabled for this OceanBase collection.")
+        top_k = kwargs.get("top_k", 4)
+        if not isinstance(top_k, int) or top_k <= 0:
+            raise ValueError("top_k must be a positive integer")
+
+        document_ids_filter = kwargs.get("document_ids_filter")
+        vector_where_clause = ""
+        full_text_where_clause = ""
+        params: dict[str, Any] = {
+            "query": query,
+            "query_vector": json.dumps(query_vector),
+            "vector_weight": kwargs.get("vector_weight", 0.5),
+            "keyword_weight": kwargs.get("keyword_weight", 0.5),
+            "score_threshold": kwargs.get("score_threshold") or 0.0,
+            "top_k": top_k,
+        }
+        if document_ids_filter:
+            vector_where_clause = f"WHERE {self._document_id_sql()} IN :document_ids"
+            full_text_where_clause = f"AND {self._document_id_sql()} IN :document_ids"
+            params["document_ids"] = list(document_ids_filter)
+
+        full_sql = f"""WITH vector_hits AS (
+            SELECT id, l2_distance(vector, :query_vector) AS distance
+            FROM {self._collection_name}
+            {vector_where_clause}
+            ORDER BY l2_distance(vector, :query_vector)
+            APPROXIMATE LIMIT :top_k
+        ), text_hits AS (
+            SELECT id, MATCH (text) AGAINST (:query) AS relevance
+            FROM {self._collection_name}
+            WHERE MATCH (text) AGAINST (:query) > 0
+            {full_text_where_clause}
+            ORDER BY relevance DESC
+            LIMIT :top_k
+        ), candidates AS (
+            SELECT c.text, c.metadata,
+                :vector_weight * COALESCE(1 - v.distance / SQRT(2), 0)
+                + :keyword_weight * COALESCE(t.relevance / MAX(t.relevance) OVER (), 0) AS score
+            FROM (SELECT id FROM vector_hits UNION SELECT id FROM text_hits) hits
+            JOIN {self._collection_name} c ON c.id = hits.id
+            LEFT JOIN vector_hits v ON v.id = hits.id
+            LEFT JOIN text_hits t ON t.id = hits.id
+        )
+        SELECT text, metadata, score FROM candidates
+        WHERE score >= :score_threshold
+        ORDER BY score DESC
+        LIMIT :top_k"""
+
+        statement = text(full_sql)
+        if document_ids_filter:
+            statement = statement.bindparams(bindparam("document_ids", expanding=True))
+        with self._client.engine.connect() as conn:
+            rows = conn.execute(statement, params).fetchall()
+
+        docs = []
+        for _text, metadata, score in rows:
+            metadata = json.loads(metadata)
+            metadata["score"] = float(score)
+            docs.append(Document(page_content=_text, metadata=metadata))
+        return docs
+
     def delete(self) -> None:
         self._client.drop_table_if_exist(self._collection_name)
 
@@ -295,14 +468,21 @@ class OceanBaseVectorFactory(AbstractVectorFactory):
             dataset_id = dataset.id
             collection_name = Dataset.gen_collection_name_by_id(dataset_id).lower()
             dataset.index_struct = json.dumps(self.gen_index_struct_dict(VectorType.OCEANBASE, collection_name))
-        return OceanBaseVector(
-            collection_name,
-            OceanBaseVectorConfig(
-                host=dify_config.OCEANBASE_VECTOR_HOST or "",
-                port=dify_config.OCEANBASE_VECTOR_PORT or 0,
-                user=dify_config.OCEANBASE_VECTOR_USER or "",
-                password=(dify_config.OCEANBASE_VECTOR_PASSWORD or ""),
-                database=dify_config.OCEANBASE_VECTOR_DATABASE or "",
-                enable_hybrid_search=dify_config.OCEANBASE_ENABLE_HYBRID_SEARCH or False,
-            ),
+        return OceanBaseVector(collection_name, self.get_config())
+
+    @staticmethod
+    def supports_hybrid_search() -> bool:
+        return dify_config.OCEANBASE_NATIVE_HYBRID_SEARCH and bool(dify_config.OCEANBASE_ENABLE_HYBRID_SEARCH)
+
+    @staticmethod
+    def get_config() -> OceanBaseVectorConfig:
+        return OceanBaseVectorConfig(
+            host=dify_config.OCEANBASE_VECTOR_HOST or "",
+            port=dify_config.OCEANBASE_VECTOR_PORT or 0,
+            user=dify_config.OCEANBASE_VECTOR_USER or "",
+            password=(dify_config.OCEANBASE_VECTOR_PASSWORD or ""),
+            database=dify_config.OCEANBASE_VECTOR_DATABASE or "",
+            enable_hybrid_search=dify_config.OCEANBASE_ENABLE_HYBRID_SEARCH or False,
+            batch_size=dify_config.OCEANBASE_VECTOR_BATCH_SIZE,
+            native_hybrid_search=dify_config.OCEANBASE_NATIVE_HYBRID_SEARCH,
         )
@@ -45,6 +45,12 @@ class BaseVector(ABC):
     def search_by_full_text(self, query: str, **kwargs: Any) -> list[Document]:
         raise NotImplementedError
 
+    def supports_hybrid_search(self) -> bool:
+        return False
+
+    def search_hybrid(self, query: str, query_vector: list[float], **kwargs: Any) -> list[Document]:
+        raise NotImplementedError
+
     @abstractmethod
     def delete(self) -> None:
         raise NotImplementedError
@@ -23,6 +23,11 @@ class AbstractVectorFactory(ABC):
     def init_vector(self, dataset: Dataset, attributes: list, embeddings: Embeddings) -> BaseVector:
         raise NotImplementedError
 
+    @staticmethod
+    def supports_hybrid_search() -> bool:
+        """Whether vectors of this store may fuse vector and full-text search natively, see `Vector.search_hybrid`"""
+        return False
+
     @staticmethod
     def gen_index_struct_dict(vector_type: VectorType, collection_name: str) -> dict:
         index_struct_dict = {"type": vector_type, "vector_store": {"class_prefix": collection_name}}
@@ -219,6 +224,11 @@ class Vector:
     def search_by_full_text(self, query: str, **kwargs: Any) -> list[Document]:
         return self._vector_processor.search_by_full_text(query, **kwargs)
 
+    def search_hybrid(self, query: str, **kwargs: Any) -> list[Document]:
+        query_vector = self._embeddings.embed_query(query)
+        full_text_query = kwargs.pop("full_text_query", query)
+        return self._vector_processor.search_hybrid(full_text_query, query_vector, **kwargs)
+
     def delete(self) -> None:
         self._vector_processor.delete()
         # delete collection redis cache
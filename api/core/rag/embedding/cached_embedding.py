@@ -1,8 +1,13 @@
-import base64
 import logging
+import threading
+import uuid
 from typing import Any, Optional, cast
 
 import numpy as np
+from cachetools import TTLCache
+from sqlalchemy import select
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.exc import IntegrityError
 
 from configs import dify_config
@@ -18,6 +23,21 @@ from models.dataset import Embedding
 
 logger = logging.getLogger(__name__)
 
+# number of hashes per lookup query and rows per insert statement of the document embedding cache
+EMBEDDING_CACHE_BATCH_SIZE = 500
+
+# seconds a query embedding stays cached: the shared cache counts from its last use, the process-local cache
+# from when the embedding was stored in it
+QUERY_EMBEDDING_CACHE_TTL = 600
+
+# process-local LRU of float32 query embeddings keyed by (provider, model, text hash)
+_local_query_embeddings: Optional[TTLCache] = (
+    TTLCache(maxsize=dify_config.QUERY_EMBEDDING_LOCAL_CACHE_SIZE, ttl=QUERY_EMBEDDING_CACHE_TTL)
+    if dify_config.QUERY_EMBEDDING_LOCAL_CACHE_SIZE > 0
+    else None
+)
+_local_query_embeddings_lock = threading.Lock()
+
 
 class CacheEmbedding(Embeddings):
     def __init__(self, model_instance: ModelInstance, user: Optional[str] = None) -> None:
@@ -28,23 +48,16 @@ class CacheEmbedding(Embeddings):
         """Embed search docs in batches of 10."""
         # use doc embedding cache or store if not exists
         text_embeddings: list[Any] = [None for _ in range(len(texts))]
+        text_hashes = [helper.generate_text_hash(text) for text in texts]
+        cached_embeddings = self._load_cached_embeddings(set(text_hashes))
         embedding_queue_indices = []
-        for i, text in enumerate(texts):
-            hash = helper.generate_text_hash(text)
-            embedding = (
-                db.session.query(Embedding)
-                .filter_by(
-                    model_name=self._model_instance.model, hash=hash, provider_name=self._model_instance.provider
-                )
-                .first()
-            )
-            if embedding:
-                text_embeddings[i] = embedding.get_embedding()
+        for i, hash in enumerate(text_hashes):
+            if hash in cached_embeddings:
+                text_embeddings[i] = cached_embeddings[hash]
             else:
                 embedding_queue_indices.append(i)
         if embedding_queue_indices:
-            embedding_queue_texts = [texts[i] for i in embedding_queue_indices]
-            embedding_queue_embeddings = []
+            new_embeddings: dict[str, list[float]] = {}
             try:
                 model_type_instance = cast(TextEmbeddingModel, self._model_instance.model_type_instance)
                 model_schema = model_type_instance.get_model_schema(
@@ -55,14 +68,15 @@ class CacheEmbedding(Embeddings):
                     if model_schema and ModelPropertyKey.MAX_CHUNKS in model_schema.model_properties
                     else 1
                 )
-                for i in range(0, len(embedding_queue_texts), max_chunks):
-                    batch_texts = embedding_queue_texts[i : i + max_chunks]
+                for i in range(0, len(embedding_queue_indices), max_chunks):
+                    batch_indices = embedding_queue_indices[i : i + max_chunks]
+                    batch_texts = [texts[index] for index in batch_indices]
 
                     embedding_result = self._model_instance.invoke_text_embedding(
                         texts=batch_texts, user=self._user, input_type=EmbeddingInputType.DOCUMENT
                     )
 
-                    for vector in embedding_result.embeddings:
+                    for index, vector in zip(batch_indices, embedding_result.embeddings):
                         try:
                             # FIXME: type ignore for numpy here
                             normalized_embedding = (vector / np.linalg.norm(vector)).tolist()  # type: ignore
@@ -71,28 +85,11 @@ class CacheEmbedding(Embeddings):
                                 # for issue #11827  float values are not json compliant
                                 logger.warning("Normalized embedding is nan: %s", normalized_embedding)
                                 continue
-                            embedding_queue_embeddings.append(normalized_embedding)
-                        except IntegrityError:
-                            db.session.rollback()
+                            text_embeddings[index] = normalized_embedding
+                            new_embeddings[text_hashes[index]] = normalized_embedding
                         except Exception:
                             logger.exception("Failed transform embedding")
-                cache_embeddings = []
-                try:
-                    for i, n_embedding in zip(embedding_queue_indices, embedding_queue_embeddings):
-                        text_embeddings[i] = n_embedding
-                        hash = helper.generate_text_hash(texts[i])
-                        if hash not in cache_embeddings:
-                            embedding_cache = Embedding(
-                                model_name=self._model_instance.model,
-                                hash=hash,
-                                provider_name=self._model_instance.provider,
-                            )
-                            embedding_cache.set_embedding(n_embedding)
-                            db.session.add(embedding_cache)
-                            cache_embeddings.append(hash)
-                    db.session.commit()
-                except IntegrityError:
-                    db.session.rollback()
+                self._save_embeddings(new_embeddings)
             except Exception as ex:
                 db.session.rollback()
                 logger.exception("Failed to embed documents")
@@ -100,16 +97,68 @@ class CacheEmbedding(Embeddings):
 
         return text_embeddings
 
+    def _load_cached_embeddings(self, hashes: set[str]) -> dict[str, list[float]]:
+        """Load cached document embeddings with one `hash IN (...)` query per chunk of hashes."""
+        cached_embeddings: dict[str, list[float]] = {}
+        ordered_hashes = sorted(hashes)
+        for i in range(0, len(ordered_hashes), EMBEDDING_CACHE_BATCH_SIZE):
+            rows = db.session.execute(
+                select(Embedding.hash, Embedding.embedding).where(
+                    Embedding.model_name == self._model_instance.model,
+                    Embedding.provider_name == self._model_instance.provider,
+                    Embedding.hash.in_(ordered_hashes[i : i + EMBEDDING_CACHE_BATCH_SIZE]),
+                )
+            ).all()
+            for hash, embedding in rows:
+                cached_embeddings[hash] = Embedding.decode_embedding(embedding)
+        return cached_embeddings
+
+    def _save_embeddings(self, embeddings: dict[str, list[float]]) -> None:
+        """
+        Store new document embeddings with multi-row inserts that skip rows another worker already
+        inserted, instead of one ORM object per embedding.
+        """
+        if not embeddings:
+            return
+        rows = [
+            {
+                "id": str(uuid.uuid4()),
+                "model_name": self._model_instance.model,
+                "hash": hash,
+                "provider_name": self._model_instance.provider,
+                "embedding": Embedding.encode_embedding(embedding),
+            }
+            for hash, embedding in embeddings.items()
+        ]
+        try:
+            for i in range(0, len(rows), EMBEDDING_CACHE_BATCH_SIZE):
+                batch_rows = rows[i : i + EMBEDDING_CACHE_BATCH_SIZE]
+                if dify_config.SQLALCHEMY_DATABASE_URI_SCHEME == "postgresql":
+                    stmt = pg_insert(Embedding).values(batch_rows).on_conflict_do_nothing()
+                else:
+                    # MySQL: INSERT IGNORE 跳过已存在的 (model_name, hash, provider_name)
+                    stmt = mysql_insert(Embedding).values(batch_rows).prefix_with("IGNORE")
+                db.session.execute(stmt)
+            db.session.commit()
+        except IntegrityError:
+            db.session.rollback()
+
     def embed_query(self, text: str) -> list[float]:
         """Embed query text."""
-        # use doc embedding cache or store if not exists
+        # use process-local cache, then the shared cache, then the model
         hash = helper.generate_text_hash(text)
-        embedding_cache_key = f"{self._model_instance.provider}_{self._model_instance.model}_{hash}"
-        embedding = redis_client.get(embedding_cache_key)
+        local_cache_key = (self._model_instance.provider, self._model_instance.model, hash)
+        local_embedding = _get_local_query_embedding(local_cache_key)
+        if local_embedding is not None:
+            return local_embedding.tolist()
+
+        embedding_cache_key = f"{self._model_instance.provider}_{self._model_instance.model}_{hash}_f32"
+        # read and refresh the TTL in a single round trip
+        embedding = redis_client.getex(embedding_cache_key, ex=QUERY_EMBEDDING_CACHE_TTL)
         if embedding:
-            redis_client.expire(embedding_cache_key, 600)
-            decoded_embedding = np.frombuffer(base64.b64decode(embedding), dtype="float")
-            return [float(x) for x in decoded_embedding]
+            decoded_embedding = np.frombuffer(embedding, dtype="<f4")
+            _put_local_query_embedding(local_cache_key, decoded_embedding)
+            return decoded_embedding.tolist()
         try:
             embedding_result = self._model_instance.invoke_text_embedding(
                 texts=[text], user=self._user, input_type=EmbeddingInputType.QUERY
@@ -125,15 +174,11 @@ class CacheEmbedding(Embeddings):
                 logger.exception("Failed to embed query text '%s...(%s chars)'", text[:10], len(text))
             raise ex
 
+        embedding_vector = np.asarray(embedding_results, dtype="<f4")
+        _put_local_query_embedding(local_cache_key, embedding_vector)
         try:
-            # encode embedding to base64
-            embedding_vector = np.array(embedding_results)
-            vector_bytes = embedding_vector.tobytes()
-            # Transform to Base64
-            encoded_vector = base64.b64encode(vector_bytes)
-            # Transform to string
-            encoded_str = encoded_vector.decode("utf-8")
-            redis_client.setex(embedding_cache_key, 600, encoded_str)
+            # store raw float32 bytes, no base64 or float64 round trip
+            redis_client.setex(embedding_cache_key, QUERY_EMBEDDING_CACHE_TTL, embedding_vector.tobytes())
         except Exception as ex:
             if dify_config.DEBUG:
                 logger.exception(
@@ -141,4 +186,21 @@ class CacheEmbedding(Embeddings):
                 )
             raise ex
 
-        return embedding_results  # type: ignore
+        # the float32 vector served by later cache hits, so a query always gets the same embedding
+        return embedding_vector.tolist()
+
+
+def _get_local_query_embedding(key: tuple[str, str, str]) -> Optional[np.ndarray]:
+    if _local_query_embeddings is None:
+        return None
+    with _local_query_embeddings_lock:
+        return _local_query_embeddings.get(key)
+
+
+def _put_local_query_embedding(key: tuple[str, str, str], embedding: np.ndarray) -> None:
+    if _local_query_embeddings is None:
+        return
+    # cached arrays are shared between callers, keep them read-only
+    embedding.flags.writeable = False
+    with _local_query_embeddings_lock:
+        _local_query_embeddings[key] = embedding
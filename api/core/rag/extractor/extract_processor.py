@@ -1,5 +1,6 @@
 import re
 import tempfile
+from collections.abc import Iterator
 from pathlib import Path
 from typing import Optional, Union
 from urllib.parse import unquote
@@ -88,6 +89,28 @@ class ExtractProcessor:
             else:
                 return cls.extract(extract_setting=extract_setting, file_path=file_path)
 
+    @classmethod
+    def extract_iter(cls, extract_setting: ExtractSetting, is_automatic: bool = False) -> Iterator[Document]:
+        """
+        Like `extract`, but PDF uploads are parsed lazily and yielded page by page, so a large file is
+        never held in memory as a whole. Other sources are extracted at once and then yielded.
+        """
+        upload_file = extract_setting.upload_file
+        if (
+            extract_setting.datasource_type == DatasourceType.FILE.value
+            and upload_file is not None
+            and Path(upload_file.key).suffix.lower() == ".pdf"
+        ):
+            with tempfile.TemporaryDirectory() as temp_dir:
+                file_path = f"{temp_dir}/{next(tempfile._get_candidate_names())}.pdf"  # type: ignore
+                storage.download(upload_file.key, file_path)
+                for page in PdfExtractor(file_path).load():
+                    # the source is the temporary download, it must not end up in the chunks' metadata
+                    page.metadata.pop("source", None)
+                    yield page
+            return
+        yield from cls.extract(extract_setting=extract_setting, is_automatic=is_automatic)
+
     @classmethod
     def extract(
         cls, extract_setting: ExtractSetting, is_automatic: bool = False, file_path: Optional[str] = None
@@ -1,6 +1,7 @@
 """Abstract interface for document loader implementations."""
 
 from abc import ABC, abstractmethod
+from collections.abc import Iterator
 from typing import Optional
 
 from configs import dify_config
@@ -22,6 +23,10 @@ class BaseIndexProcessor(ABC):
     def extract(self, extract_setting: ExtractSetting, **kwargs) -> list[Document]:
         raise NotImplementedError
 
+    def extract_iter(self, extract_setting: ExtractSetting, **kwargs) -> Iterator[Document]:
+        """Yield the extracted documents as they are parsed, for streaming indexing."""
+        yield from self.extract(extract_setting, **kwargs)
+
     @abstractmethod
     def transform(self, documents: list[Document], **kwargs) -> list[Document]:
         raise NotImplementedError
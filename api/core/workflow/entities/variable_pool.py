@@ -1,9 +1,9 @@
 import re
 from collections import defaultdict
 from collections.abc import Mapping, Sequence
-from typing import Annotated, Any, Union, cast
+from typing import Annotated, Any, Optional, Union, cast
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, PrivateAttr, field_serializer
 
 from core.file import File, FileAttribute, file_manager
 from core.variables import Segment, SegmentGroup, Variable
@@ -47,6 +47,12 @@ class VariablePool(BaseModel):
         default_factory=list,
     )
 
+    # A child pool created by `create_child` reads through to its parent and only stores its own writes.
+    # Removals in the child are recorded as tombstones so that they hide the parent's variables.
+    _parent: Optional["VariablePool"] = PrivateAttr(default=None)
+    _removed_nodes: set[str] = PrivateAttr(default_factory=set)
+    _removed_selectors: set[tuple[str, str]] = PrivateAttr(default_factory=set)
+
     def model_post_init(self, context: Any, /) -> None:
         # Create a mapping from field names to SystemVariableKey enum values
         self._add_system_variables(self.system_variables)
@@ -95,6 +101,7 @@ class VariablePool(BaseModel):
         # Based on the definition of `VariableUnion`,
         # `list[Variable]` can be safely used as `list[VariableUnion]` since they are compatible.
         self.variable_dictionary[node_id][name] = cast(VariableUnion, variable)
+        self._removed_selectors.discard((node_id, name))
 
     @classmethod
     def _selector_to_keys(cls, selector: Sequence[str]) -> tuple[str, str]:
@@ -102,11 +109,18 @@ class VariablePool(BaseModel):
 
     def _has(self, selector: Sequence[str]) -> bool:
         node_id, name = self._selector_to_keys(selector)
-        if node_id not in self.variable_dictionary:
-            return False
-        if name not in self.variable_dictionary[node_id]:
-            return False
-        return True
+        return self._lookup(node_id, name) is not None
+
+    def _lookup(self, node_id: str, name: str) -> VariableUnion | None:
+        pool: VariablePool | None = self
+        while pool is not None:
+            variables = pool.variable_dictionary.get(node_id)
+            if variables is not None and name in variables:
+                return variables[name]
+            if node_id in pool._removed_nodes or (node_id, name) in pool._removed_selectors:
+                return None
+            pool = pool._parent
+        return None
 
     def get(self, selector: Sequence[str], /) -> Segment | None:
         """
@@ -133,7 +147,7 @@ class VariablePool(BaseModel):
             return None
 
         node_id, name = self._selector_to_keys(selector)
-        segment: Segment | None = self.variable_dictionary[node_id].get(name)
+        segment: Segment | None = self._lookup(node_id, name)
 
         if segment is None:
             return None
@@ -185,9 +199,47 @@ class VariablePool(BaseModel):
             return
         if len(selector) == 1:
             self.variable_dictionary[selector[0]] = {}
+            if self._parent is not None:
+                self._removed_nodes.add(selector[0])
             return
         key, hash_key = self._selector_to_keys(selector)
         self.variable_dictionary[key].pop(hash_key, None)
+        if self._parent is not None:
+            self._removed_selectors.add((key, hash_key))
+
+    def create_child(self) -> "VariablePool":
+        """
+        Create a copy-on-write child scope of this pool.
+
+        The child reads through to this pool for any variable it has not written or removed itself,
+        so creating it costs O(1) instead of a deep copy of every segment. Writes and removals in the
+        child never reach this pool, which matches the previous deep-copy semantics as long as segments
+        are treated as immutable values.
+        """
+        child = self.model_copy(update={"variable_dictionary": defaultdict(dict)})
+        child._parent = self
+        child._removed_nodes = set()
+        child._removed_selectors = set()
+        return child
+
+    def _flattened_dictionary(self) -> defaultdict[str, dict[str, VariableUnion]]:
+        if self._parent is None:
+            return self.variable_dictionary
+        flattened: defaultdict[str, dict[str, VariableUnion]] = defaultdict(dict)
+        for node_id, variables in self._parent._flattened_dictionary().items():
+            if node_id in self._removed_nodes:
+                continue
+            flattened[node_id] = {
+                name: variable for name, variable in variables.items() if (node_id, name) not in self._removed_selectors
+            }
+        for node_id, variables in self.variable_dictionary.items():
+            flattened[node_id] = {**flattened.get(node_id, {}), **variables}
+        return flattened
+
+    @field_serializer("variable_dictionary", mode="wrap")
+    def _serialize_variable_dictionary(self, value: Any, handler: Any) -> Any:
+        # a child pool is serialized with the variables it reads through to its parents
+        return handler(self._flattened_dictionary())
 
     def convert_template(self, template: str, /):
         parts = VARIABLE_PATTERN.split(template)
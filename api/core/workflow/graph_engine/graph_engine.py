@@ -4,13 +4,12 @@ import queue
 import time
 import uuid
 from collections.abc import Generator, Mapping
-from concurrent.futures import ThreadPoolExecutor, wait
-from copy import copy, deepcopy
+from concurrent.futures import Future
+from copy import copy
 from typing import Any, Optional, cast
 
 from flask import Flask, current_app
 
-from configs import dify_config
 from core.app.apps.exc import GenerateTaskStoppedError
 from core.app.entities.app_invoke_entities import InvokeFrom
 from core.workflow.entities.node_entities import AgentNodeStrategyInit, NodeRunResult
@@ -41,6 +40,7 @@ from core.workflow.graph_engine.entities.graph import Graph, GraphEdge
 from core.workflow.graph_engine.entities.graph_init_params import GraphInitParams
 from core.workflow.graph_engine.entities.graph_runtime_state import GraphRuntimeState
 from core.workflow.graph_engine.entities.runtime_route_state import RouteNodeState
+from core.workflow.graph_engine.worker_pool import WorkflowTaskScope, get_workflow_worker_pool
 from core.workflow.nodes import NodeType
 from core.workflow.nodes.agent.agent_node import AgentNode
 from core.workflow.nodes.agent.entities import AgentNodeData
@@ -58,36 +58,7 @@ from models.workflow import WorkflowType
 logger = logging.getLogger(__name__)
 
 
-class GraphEngineThreadPool(ThreadPoolExecutor):
-    def __init__(
-        self,
-        max_workers=None,
-        thread_name_prefix="",
-        initializer=None,
-        initargs=(),
-        max_submit_count=dify_config.MAX_SUBMIT_COUNT,
-    ) -> None:
-        super().__init__(max_workers, thread_name_prefix, initializer, initargs)
-        self.max_submit_count = max_submit_count
-        self.submit_count = 0
-
-    def submit(self, fn, /, *args, **kwargs):
-        self.submit_count += 1
-        self.check_is_full()
-
-        return super().submit(fn, *args, **kwargs)
-
-    def task_done_callback(self, future):
-        self.submit_count -= 1
-
-    def check_is_full(self) -> None:
-        if self.submit_count > self.max_submit_count:
-            raise ValueError(f"Max submit count {self.max_submit_count} of workflow thread pool reached.")
-
-
 class GraphEngine:
-    workflow_thread_pool_mapping: dict[str, GraphEngineThreadPool] = {}
-
     def __init__(
         self,
         tenant_id: str,
@@ -105,24 +76,10 @@ class GraphEngine:
         max_execution_time: int,
         thread_pool_id: Optional[str] = None,
     ) -> None:
-        thread_pool_max_submit_count = dify_config.MAX_SUBMIT_COUNT
-        thread_pool_max_workers = 10
-
-        # init thread pool
-        if thread_pool_id:
-            if thread_pool_id not in GraphEngine.workflow_thread_pool_mapping:
-                raise ValueError(f"Max submit count {thread_pool_max_submit_count} of workflow thread pool reached.")
-
-            self.thread_pool_id = thread_pool_id
-            self.thread_pool = GraphEngine.workflow_thread_pool_mapping[thread_pool_id]
-            self.is_main_thread_pool = False
-        else:
-            self.thread_pool = GraphEngineThreadPool(
-                max_workers=thread_pool_max_workers, max_submit_count=thread_pool_max_submit_count
-            )
-            self.thread_pool_id = str(uuid.uuid4())
-            self.is_main_thread_pool = True
-            GraphEngine.workflow_thread_pool_mapping[self.thread_pool_id] = self.thread_pool
+        # parallel branches of all graph engines run on the process-wide worker pool,
+        # nested graph engines (iteration, loop, workflow as tool) share the run id of their parent
+        self.thread_pool = get_workflow_worker_pool()
+        self.thread_pool_id = thread_pool_id or str(uuid.uuid4())
 
         self.graph = graph
         self.init_params = GraphInitParams(
@@ -205,21 +162,14 @@ class GraphEngine:
             else:
                 # trigger graph run success event
                 yield GraphRunSucceededEvent(outputs=self.graph_runtime_state.outputs)
-            self._release_thread()
         except GraphRunFailedError as e:
             yield GraphRunFailedEvent(error=e.error, exceptions_count=len(handle_exceptions))
-            self._release_thread()
             return
         except Exception as e:
             logger.exception("Unknown Error when graph running")
             yield GraphRunFailedEvent(error=str(e), exceptions_count=len(handle_exceptions))
-            self._release_thread()
             raise e
 
-    def _release_thread(self):
-        if self.is_main_thread_pool and self.thread_pool_id in GraphEngine.workflow_thread_pool_mapping:
-            del GraphEngine.workflow_thread_pool_mapping[self.thread_pool_id]
-
     def _run(
         self,
         start_node_id: str,
@@ -467,8 +417,10 @@ class GraphEngine:
         if not parallel:
             raise GraphRunFailedError(f"Parallel {parallel_id} not found.")
 
-        # run parallel nodes, run in new thread and use queue to get results
-        q: queue.Queue = queue.Queue()
+        # run parallel nodes, run in new thread and use queue to get results.
+        # every branch future posts itself to the queue when it is done, so the loop below blocks
+        # until the next event or completion instead of polling with a timeout.
+        q: queue.SimpleQueue = queue.SimpleQueue()
 
         # Create a list to store the threads
         futures = []
@@ -482,6 +434,7 @@ class GraphEngine:
                 continue
 
             future = self.thread_pool.submit(
+                self._task_scope(),
                 self._run_parallel_node,
                 **{
                     "flask_app": current_app._get_current_object(),  # type: ignore[attr-defined]
@@ -495,32 +448,30 @@ class GraphEngine:
                 },
             )
 
-            future.add_done_callback(self.thread_pool.task_done_callback)
+            future.add_done_callback(q.put)
 
             futures.append(future)
 
-        succeeded_count = 0
-        while True:
-            try:
-                event = q.get(timeout=1)
-                if event is None:
-                    break
-
-                yield event
-                if not isinstance(event, BaseAgentEvent) and event.parallel_id == parallel_id:
-                    if isinstance(event, ParallelBranchRunSucceededEvent):
-                        succeeded_count += 1
-                        if succeeded_count == len(futures):
-                            q.put(None)
-
-                        continue
-                    elif isinstance(event, ParallelBranchRunFailedEvent):
-                        raise GraphRunFailedError(event.error)
-            except queue.Empty:
+        finished_count = 0
+        while finished_count < len(futures):
+            event = q.get()
+            if isinstance(event, Future):
+                # branch worker returned, all of its events are already queued before this one
+                finished_count += 1
+                if event.cancelled():
+                    raise GraphRunFailedError(f"Parallel {parallel_id} branch was cancelled.")
+                exception = event.exception()
+                if exception:
+                    raise GraphRunFailedError(str(exception))
                 continue
 
-        # wait all threads
-        wait(futures)
+            yield event
+            if (
+                not isinstance(event, BaseAgentEvent)
+                and event.parallel_id == parallel_id
+                and isinstance(event, ParallelBranchRunFailedEvent)
+            ):
+                raise GraphRunFailedError(event.error)
 
         # get final node id
         final_node_id = parallel.end_to_node_id
@@ -531,7 +482,7 @@ class GraphEngine:
         self,
         flask_app: Flask,
         context: contextvars.Context,
-        q: queue.Queue,
+        q: queue.SimpleQueue,
         parallel_id: str,
         parallel_start_node_id: str,
         parent_parallel_id: Optional[str] = None,
@@ -641,8 +592,6 @@ class GraphEngine:
             try:
                 # run node
                 retry_start_at = naive_utc_now()
-                # yield control to other threads
-                time.sleep(0.001)
                 event_stream = node.run()
                 for event in event_stream:
                     if isinstance(event, GraphEngineEvent):
@@ -846,6 +795,13 @@ class GraphEngine:
                 logger.exception("Node %s run failed", node.title)
                 raise e
 
+    def _task_scope(self) -> WorkflowTaskScope:
+        return WorkflowTaskScope(
+            tenant_id=self.init_params.tenant_id,
+            app_id=self.init_params.app_id,
+            run_id=self.thread_pool_id,
+        )
+
     def _is_timed_out(self, start_at: float, max_execution_time: int) -> bool:
         """
         Check timeout
@@ -858,11 +814,11 @@ class GraphEngine:
     def create_copy(self):
         """
         create a graph engine copy
-        :return: graph engine with a new variable pool and initialized total tokens
+        :return: graph engine with a copy-on-write child variable pool and initialized total tokens
         """
         new_instance = copy(self)
         new_instance.graph_runtime_state = copy(self.graph_runtime_state)
-        new_instance.graph_runtime_state.variable_pool = deepcopy(self.graph_runtime_state.variable_pool)
+        new_instance.graph_runtime_state.variable_pool = self.graph_runtime_state.variable_pool.create_child()
         new_instance.graph_runtime_state.total_tokens = 0
         return new_instance
 
@@ -0,0 +1,244 @@
+import logging
+import threading
+from collections import Counter, OrderedDict, deque
+from collections.abc import Callable
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from typing import Any, Optional
+
+from configs import dify_config
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class WorkflowTaskScope:
+    """
+    Who a task is submitted for.
+
+    `run_id` identifies one workflow run (the graph engine `thread_pool_id`), it is shared by nested graph
+    engines of iteration, loop and workflow-as-tool nodes.
+    """
+
+    tenant_id: str
+    app_id: str
+    run_id: str
+
+
+@dataclass
+class _Task:
+    scope: WorkflowTaskScope
+    fn: Callable[..., Any]
+    args: tuple
+    kwargs: dict
+    nested: bool
+    future: Future = field(default_factory=Future)
+
+
+class WorkflowWorkerPool:
+    """
+    Process-wide bounded worker pool for parallel branches and parallel iterations of all graph engines.
+
+    Top-level tasks are queued per (tenant, app) and dispatched round-robin, so one busy app cannot
+    starve the others, and every tenant and app can only occupy a bounded number of workers at a time.
+    Tasks submitted from a pool worker (nested parallels, iterations inside a branch, workflow-as-tool)
+    skip the fairness queues: they are queued with priority when a worker is
+    guaranteed to be free for them, otherwise they run inline in the submitting thread. A parent that
+    blocks on its children can therefore never deadlock the pool.
+    """
+
+    def __init__(
+        self,
+        max_workers: int,
+        tenant_max_active: int,
+        app_max_active: int,
+        tenant_max_queued: int,
+        max_queued: int,
+        run_max_submit_count: int,
+    ) -> None:
+        self.max_workers = max_workers
+        self.tenant_max_active = tenant_max_active
+        self.app_max_active = app_max_active
+        self.tenant_max_queued = tenant_max_queued
+        self.max_queued = max_queued
+        self.run_max_submit_count = run_max_submit_count
+
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._threads: list[threading.Thread] = []
+        self._idle_workers: deque[threading.Event] = deque()
+
+        self._nested_queue: deque[_Task] = deque()
+        self._queues: OrderedDict[tuple[str, str], deque[_Task]] = OrderedDict()
+        self._queued_count = 0
+
+        self._active_count = 0
+        self._tenant_active: Counter[str] = Counter()
+        self._app_active: Counter[str] = Counter()
+        self._tenant_queued: Counter[str] = Counter()
+        self._run_outstanding: Counter[str] = Counter()
+
+        self._submitted_total = 0
+        self._rejected_total = 0
+        self._inline_total = 0
+        self._completed_total = 0
+
+    def submit(self, scope: WorkflowTaskScope, fn: Callable[..., Any], /, *args: Any, **kwargs: Any) -> Future:
+        run_inline = False
+        with self._lock:
+            if self._run_outstanding[scope.run_id] >= self.run_max_submit_count:
+                self._rejected_total += 1
+                raise ValueError(f"Max submit count {self.run_max_submit_count} of workflow thread pool reached.")
+
+            # only tasks of a task already holding a worker bypass admission control, submissions from
+            # any other thread are top-level and must wait in the fairness queues
+            nested = getattr(self._local, "is_worker", False)
+            task = _Task(scope=scope, fn=fn, args=args, kwargs=kwargs, nested=nested)
+            if nested:
+                # only queue when a worker is guaranteed to pick the task up, see `_next_task`
+                if self.max_workers - self._active_count - len(self._nested_queue) > 0:
+                    self._nested_queue.append(task)
+                else:
+                    run_inline = True
+                    self._inline_total += 1
+            else:
+                if self._queued_count >= self.max_queued:
+                    self._rejected_total += 1
+                    raise ValueError(f"Workflow worker pool queue is full ({self.max_queued} tasks).")
+                if self._tenant_queued[scope.tenant_id] >= self.tenant_max_queued:
+                    self._rejected_total += 1
+                    raise ValueError(
+                        f"Workflow worker pool queue of tenant {scope.tenant_id} is full "
+                        f"({self.tenant_max_queued} tasks)."
+                    )
+                self._queues.setdefault((scope.tenant_id, scope.app_id), deque()).append(task)
+                self._queued_count += 1
+                self._tenant_queued[scope.tenant_id] += 1
+
+            self._submitted_total += 1
+            self._run_outstanding[scope.run_id] += 1
+            if not run_inline:
+                self._wake_worker()
+
+        if run_inline:
+            self._execute(task)
+        return task.future
+
+    def metrics(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "max_workers": self.max_workers,
+                "threads": len(self._threads),
+                "active_workers": self._active_count,
+                "idle_workers": len(self._idle_workers),
+                "queue_depth": self._queued_count,
+                "nested_queue_depth": len(self._nested_queue),
+                "queue_depth_by_tenant": dict(self._tenant_queued),
+                "active_workers_by_tenant": dict(self._tenant_active),
+                "running_workflows": len(self._run_outstanding),
+                "submitted_total": self._submitted_total,
+                "rejected_total": self._rejected_total,
+                "inline_total": self._inline_total,
+                "completed_total": self._completed_total,
+            }
+
+    def _wake_worker(self) -> None:
+        # an event is popped when signalled, so every queued task gets its own wakeup
+        if self._idle_workers:
+            self._idle_workers.popleft().set()
+        elif len(self._threads) < self.max_workers:
+            thread = threading.Thread(
+                target=self._worker_loop, daemon=True, name=f"WorkflowWorker-{len(self._threads)}"
+            )
+            self._threads.append(thread)
+            thread.start()
+
+    def _next_task(self) -> Optional[_Task]:
+        # nested tasks first, they were admitted against the free worker capacity
+        if self._nested_queue:
+            return self._nested_queue.popleft()
+
+        for key in list(self._queues):
+            tenant_id, app_id = key
+            if (
+                self._tenant_active[tenant_id] >= self.tenant_max_active
+                or self._app_active[app_id] >= self.app_max_active
+            ):
+                continue
+            queue = self._queues[key]
+            task = queue.popleft()
+            if queue:
+                self._queues.move_to_end(key)
+            else:
+                del self._queues[key]
+            self._queued_count -= 1
+            _decrement(self._tenant_queued, tenant_id)
+            self._tenant_active[tenant_id] += 1
+            self._app_active[app_id] += 1
+            return task
+        return None
+
+    def _worker_loop(self) -> None:
+        self._local.is_worker = True
+        wakeup = threading.Event()
+        while True:
+            with self._lock:
+                task = self._next_task()
+                if task is None:
+                    wakeup.clear()
+                    self._idle_workers.append(wakeup)
+                else:
+                    self._active_count += 1
+            if task is None:
+                wakeup.wait()
+                continue
+
+            self._execute(task, in_worker=True)
+
+    def _execute(self, task: _Task, in_worker: bool = False) -> None:
+        try:
+            if task.future.set_running_or_notify_cancel():
+                try:
+                    result = task.fn(*task.args, **task.kwargs)
+                except BaseException as e:
+                    task.future.set_exception(e)
+                else:
+                    task.future.set_result(result)
+        except Exception:
+            logger.exception("Workflow worker pool task bookkeeping failed")
+        finally:
+            with self._lock:
+                self._completed_total += 1
+                _decrement(self._run_outstanding, task.scope.run_id)
+                if in_worker:
+                    self._active_count -= 1
+                    if not task.nested:
+                        _decrement(self._tenant_active, task.scope.tenant_id)
+                        _decrement(self._app_active, task.scope.app_id)
+
+
+def _decrement(counter: Counter[str], key: str) -> None:
+    # drop keys at zero so finished runs and tenants do not accumulate
+    counter[key] -= 1
+    if counter[key] <= 0:
+        del counter[key]
+
+
+_worker_pool: Optional[WorkflowWorkerPool] = None
+_worker_pool_lock = threading.Lock()
+
+
+def get_workflow_worker_pool() -> WorkflowWorkerPool:
+    global _worker_pool
+    if _worker_pool is None:
+        with _worker_pool_lock:
+            if _worker_pool is None:
+                _worker_pool = WorkflowWorkerPool(
+                    max_workers=dify_config.WORKFLOW_WORKER_POOL_MAX_WORKERS,
+                    tenant_max_active=dify_config.WORKFLOW_WORKER_POOL_TENANT_MAX_ACTIVE,
+                    app_max_active=dify_config.WORKFLOW_WORKER_POOL_APP_MAX_ACTIVE,
+                    tenant_max_queued=dify_config.WORKFLOW_WORKER_POOL_TENANT_MAX_QUEUED,
+                    max_queued=dify_config.WORKFLOW_WORKER_POOL_MAX_QUEUED,
+                    run_max_submit_count=dify_config.MAX_SUBMIT_COUNT,
+                )
+    return _worker_pool
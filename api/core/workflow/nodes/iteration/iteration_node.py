@@ -5,7 +5,7 @@ import uuid
 from collections.abc import Generator, Mapping, Sequence
 from concurrent.futures import Future, wait
 from datetime import datetime
-from queue import Empty, Queue
+from queue import Queue
 from typing import TYPE_CHECKING, Any, Optional, cast
 
 from flask import Flask, current_app
@@ -159,7 +159,8 @@ class IterationNode(BaseNode):
 
         # init graph engine
         from core.workflow.graph_engine.entities.graph_runtime_state import GraphRuntimeState
-        from core.workflow.graph_engine.graph_engine import GraphEngine, GraphEngineThreadPool
+        from core.workflow.graph_engine.graph_engine import GraphEngine
+        from core.workflow.graph_engine.worker_pool import WorkflowTaskScope, get_workflow_worker_pool
 
         graph_runtime_state = GraphRuntimeState(variable_pool=variable_pool, start_at=time.perf_counter())
 
@@ -208,11 +209,20 @@ class IterationNode(BaseNode):
             if self._node_data.is_parallel:
                 futures: list[Future] = []
                 q: Queue = Queue()
-                thread_pool = GraphEngineThreadPool(
-                    max_workers=self._node_data.parallel_nums, max_submit_count=dify_config.MAX_SUBMIT_COUNT
+                worker_pool = get_workflow_worker_pool()
+                task_scope = WorkflowTaskScope(
+                    tenant_id=self.tenant_id, app_id=self.app_id, run_id=graph_engine.thread_pool_id
                 )
-                for index, item in enumerate(iterator_list_value):
-                    future: Future = thread_pool.submit(
+                pending_items = iter(enumerate(iterator_list_value))
+
+                def submit_next_item() -> None:
+                    # keep at most parallel_nums items of this iteration on the shared worker pool
+                    next_item = next(pending_items, None)
+                    if next_item is None:
+                        return
+                    index, item = next_item
+                    future: Future = worker_pool.submit(
+                        task_scope,
                         self._run_single_iter_parallel,
                         flask_app=current_app._get_current_object(),  # type: ignore
                         q=q,
@@ -227,30 +237,29 @@ class IterationNode(BaseNode):
                         item=item,
                         iter_run_map=iter_run_map,
                     )
-                    future.add_done_callback(thread_pool.task_done_callback)
                     futures.append(future)
-                succeeded_count = 0
-                while True:
-                    try:
-                        event = q.get(timeout=1)
-                        if event is None:
-                            break
-                        if isinstance(event, IterationRunNextEvent):
-                            succeeded_count += 1
-                            if succeeded_count == len(futures):
-                                q.put(None)
-                        yield event
-                        if isinstance(event, RunCompletedEvent):
-                            q.put(None)
-                            for f in futures:
-                                if not f.done():
-                                    f.cancel()
-                            yield event
-                        if isinstance(event, IterationRunFailedEvent):
-                            q.put(None)
-                            yield event
-                    except Empty:
+                    future.add_done_callback(q.put)
+
+                for _ in range(max(1, self._node_data.parallel_nums)):
+                    submit_next_item()
+
+                finished_count = 0
+                while finished_count < len(futures):
+                    event = q.get()
+                    if isinstance(event, Future):
+                        finished_count += 1
+                        submit_next_item()
                         continue
+                    yield event
+                    if isinstance(event, RunCompletedEvent):
+                        for f in futures:
+                            if not f.done():
+                                f.cancel()
+                        yield event
+                        break
+                    if isinstance(event, IterationRunFailedEvent):
+                        yield event
+                        break
 
                 # wait all threads
                 wait(futures)
@@ -151,6 +151,12 @@ def init_app(app: DifyApp) -> Celery:
             "task": "schedule.check_upgradable_plugin_task.check_upgradable_plugin_task",
             "schedule": crontab(minute="*/15"),
         }
+    if dify_config.ENABLE_APP_STATISTICS_ROLLUP_TASK:
+        imports.append("schedule.app_statistics_rollup_task")
+        beat_schedule["app_statistics_rollup_task"] = {
+            "task": "schedule.app_statistics_rollup_task.app_statistics_rollup_task",
+            "schedule": timedelta(minutes=dify_config.APP_STATISTICS_ROLLUP_INTERVAL),
+        }
     if dify_config.WORKFLOW_LOG_CLEANUP_ENABLED:
         # 2:00 AM every day
         imports.append("schedule.clean_workflow_runlogs_precise")
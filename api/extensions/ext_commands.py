@@ -3,7 +3,9 @@ from dify_app import DifyApp
 
 def init_app(app: DifyApp):
     from commands import (
+        add_oceanbase_document_id_index,
         add_qdrant_index,
+        backfill_workflow_app_log_search_text,
         cleanup_orphaned_draft_variables,
         clear_free_plan_tenant_expired_logs,
         clear_orphaned_file_records,
@@ -14,11 +16,13 @@ def init_app(app: DifyApp):
         fix_app_site_missing,
         install_plugins,
         migrate_data_for_plugin,
+        migrate_keyword_tables_to_postings,
         old_metadata_migration,
         remove_orphaned_files_on_storage,
         reset_email,
         reset_encrypt_key_pair,
         reset_password,
+        rollup_app_statistics,
         setup_system_tool_oauth_client,
         upgrade_db,
         vdb_migrate,
@@ -31,6 +35,7 @@ def init_app(app: DifyApp):
         vdb_migrate,
         convert_to_agent_apps,
         add_qdrant_index,
+        add_oceanbase_document_id_index,
         create_tenant,
         upgrade_db,
         fix_app_site_missing,
@@ -44,6 +49,9 @@ def init_app(app: DifyApp):
         remove_orphaned_files_on_storage,
         setup_system_tool_oauth_client,
         cleanup_orphaned_draft_variables,
+        migrate_keyword_tables_to_postings,
+        rollup_app_statistics,
+        backfill_workflow_app_log_search_text,
     ]
     for cmd in cmds_to_register:
         app.cli.add_command(cmd)
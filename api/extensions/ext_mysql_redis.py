@@ -1,10 +1,20 @@
+import atexit
+import functools
+import hashlib
+import itertools
 import logging
 import threading
 import time
+from collections import OrderedDict
+from collections.abc import Sequence
 from datetime import datetime, timedelta
 from typing import Optional, Mapping
 
-from sqlalchemy import func, or_
+from redis.exceptions import LockError, LockNotOwnedError
+from sqlalchemy import bindparam, create_engine, func, or_
+from sqlalchemy import exc as sa_exc
+from sqlalchemy.orm import scoped_session, sessionmaker
+from sqlalchemy.pool import NullPool, QueuePool
 
 from models.engine import db
 from models.base import Base
@@ -26,10 +36,545 @@ class Cache(Base):
     created_at = db.Column(db.DateTime, nullable=False, server_default=func.current_timestamp())
 
 
+class CacheZset(Base):
+    __tablename__ = "cache_zsets"
+    __table_args__ = (
+        db.PrimaryKeyConstraint("cache_key", "member", name="cache_zsets_pkey"),
+        db.Index("cache_zsets_cache_key_score_idx", "cache_key", "score"),
+        db.Index("cache_zsets_expire_time_idx", "expire_time"),
+    )
+
+    cache_key = db.Column(db.String(255), nullable=False)
+    member = db.Column(db.VARBINARY(255), nullable=False)
+    score = db.Column(db.Float(precision=53), nullable=False)
+    expire_time = db.Column(db.DateTime, nullable=True)
+
+
+class CacheHash(Base):
+    __tablename__ = "cache_hashes"
+    __table_args__ = (
+        db.PrimaryKeyConstraint("cache_key", "field", name="cache_hashes_pkey"),
+        db.Index("cache_hashes_expire_time_idx", "expire_time"),
+    )
+
+    cache_key = db.Column(db.String(255), nullable=False)
+    field = db.Column(db.VARBINARY(255), nullable=False)
+    value = db.Column(db.LargeBinary, nullable=False)
+    expire_time = db.Column(db.DateTime, nullable=True)
+
+
+# Tables holding one row per sorted-set member or hash field, the key's TTL is copied onto every row
+_COLLECTION_TABLES = ("cache_zsets", "cache_hashes")
+
+
+class LocalCache:
+    """
+    Bounded in-process LRU/TTL tier placed in front of the caches table.
+
+    Entries live at most ``ttl`` seconds (and never beyond the key's own expire time), which bounds
+    how stale a value can be after another process writes the same key. Local writes invalidate
+    entries immediately. A generation counter prevents a slow reader from re-populating a key with
+    a value that was read before a concurrent local write.
+    """
+
+    def __init__(self, max_size: int, ttl: float):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._data: OrderedDict[str, tuple[bytes, float]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._generation = 0
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def generation(self) -> int:
+        return self._generation
+
+    def get(self, key: str) -> Optional[bytes]:
+        now = time.monotonic()
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                self.misses += 1
+                return None
+            value, deadline = item
+            if deadline <= now:
+                del self._data[key]
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: str, value: bytes, generation: int, expire_time: Optional[datetime] = None) -> None:
+        now = time.monotonic()
+        deadline = now + self.ttl
+        if expire_time is not None:
+            remaining = (expire_time - datetime.now()).total_seconds()
+            if remaining <= 0:
+                return
+            deadline = min(deadline, now + remaining)
+
+        with self._lock:
+            # a local write happened while the value was being read, so it may already be stale
+            if generation != self._generation:
+                return
+            self._data[key] = (value, deadline)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+
+    def invalidate(self, *keys: str) -> None:
+        with self._lock:
+            self._generation += 1
+            for key in keys:
+                self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._generation += 1
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+# Kinds of buffered write commands, see MysqlPipeline and WriteBehindBuffer.
+# Every command is a tuple of (kind, cache_key, cache_value, expire_time).
+_UPSERT = "upsert"
+_INSERT_IGNORE = "insert_ignore"
+_EXPIRE = "expire"
+_DELETE = "delete"
+
+# Upper bound of rows per multi-row statement, keeps statements below max_allowed_packet
+_MAX_ROWS_PER_STATEMENT = 500
+
+# Number of deferred getex TTL refreshes that triggers a flush regardless of the flush interval
+_PENDING_EXPIRES_MAX = 100
+
+
+def _to_bytes(value) -> bytes:
+    return value if isinstance(value, bytes) else str(value).encode('utf-8')
+
+
+def _expire_time_after(ex: None | int | timedelta) -> Optional[datetime]:
+    if not ex:
+        return None
+    return datetime.now() + (ex if isinstance(ex, timedelta) else timedelta(seconds=ex))
+
+
+def _build_insert_sql(row_count: int, ignore: bool) -> str:
+    values = ", ".join(f"(:cache_key_{i}, :cache_value_{i}, :expire_time_{i})" for i in range(row_count))
+    if ignore:
+        return f"INSERT IGNORE INTO caches (cache_key, cache_value, expire_time) VALUES {values}"
+    return (
+        f"INSERT INTO caches (cache_key, cache_value, expire_time) VALUES {values} "
+        "ON DUPLICATE KEY UPDATE cache_value = VALUES(cache_value), expire_time = VALUES(expire_time)"
+    )
+
+
+class MysqlPipeline:
+    """
+    Buffers cache writes and sends them to the database in a single transaction on execute().
+
+    Consecutive commands of the same kind are merged: set/setex become multi-row
+    INSERT ... ON DUPLICATE KEY UPDATE statements, delete a single DELETE ... IN and expire
+    one executemany UPDATE. setnx commands run one INSERT IGNORE each so that execute()
+    can report which of them created their key.
+    """
+
+    def __init__(self, client: 'MysqlRedisClient'):
+        self._client = client
+        self._commands: list[tuple] = []
+
+    def __enter__(self) -> 'MysqlPipeline':
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.reset()
+
+    def __len__(self) -> int:
+        return len(self._commands)
+
+    def set(self, name: str, value, ex: None | int | timedelta = None) -> 'MysqlPipeline':
+        self._commands.append((_UPSERT, name, _to_bytes(value), _expire_time_after(ex)))
+        return self
+
+    def setex(self, name: str, time: int | timedelta, value) -> 'MysqlPipeline':
+        self._commands.append((_UPSERT, name, _to_bytes(value), _expire_time_after(time)))
+        return self
+
+    def setnx(self, name: str, value) -> 'MysqlPipeline':
+        self._commands.append((_INSERT_IGNORE, name, _to_bytes(value), None))
+        return self
+
+    def expire(self, name: str, time: int | timedelta) -> 'MysqlPipeline':
+        self._commands.append((_EXPIRE, name, None, _expire_time_after(time)))
+        return self
+
+    def delete(self, *names: str) -> 'MysqlPipeline':
+        self._commands.extend((_DELETE, name, None, None) for name in names)
+        return self
+
+    def reset(self) -> None:
+        self._commands = []
+
+    def execute(self) -> list[bool]:
+        """Flush the buffered commands, returning one result per command (False for a setnx on an existing key)"""
+        commands, self._commands = self._commands, []
+        return self._client.execute_batch(commands)
+
+
+class WriteBehindBuffer:
+    """
+    Coalesces writes to non-critical keys in memory until a background flusher ships them as one batch.
+
+    Only the latest pending command per key is kept. Readers in the same process see pending
+    writes through lookup(), other processes see them once the batch is flushed.
+    """
+
+    def __init__(self, prefixes: Sequence[str], max_pending: int):
+        self.prefixes = tuple(prefixes)
+        self.max_pending = max_pending
+        self._pending: OrderedDict[str, tuple] = OrderedDict()
+        self._lock = threading.Lock()
+        self._full = threading.Event()
+        self.flushed = 0
+
+    def matches(self, key: str) -> bool:
+        return key.startswith(self.prefixes)
+
+    def add(self, command: tuple) -> None:
+        kind, key, _, expire_time = command
+        with self._lock:
+            previous = self._pending.get(key)
+            if kind == _EXPIRE and previous is not None:
+                if previous[0] == _DELETE:
+                    return
+                if previous[0] == _UPSERT:
+                    command = (_UPSERT, key, previous[2], expire_time)
+            self._pending.pop(key, None)
+            self._pending[key] = command
+            if len(self._pending) >= self.max_pending:
+                self._full.set()
+
+    def lookup(self, key: str) -> tuple[bool, Optional[bytes]]:
+        """Return (found, value) for a pending write of the key; found is False when the database decides"""
+        with self._lock:
+            command = self._pending.get(key)
+        if command is None:
+            return False, None
+        kind, _, value, expire_time = command
+        if kind == _DELETE or (expire_time is not None and expire_time <= datetime.now()):
+            return True, None
+        if kind == _UPSERT:
+            return True, value
+        return False, None
+
+    def pop(self, key: str) -> Optional[tuple]:
+        with self._lock:
+            return self._pending.pop(key, None)
+
+    def drain(self) -> list[tuple]:
+        with self._lock:
+            commands = list(self._pending.values())
+            self._pending.clear()
+            self._full.clear()
+        return commands
+
+    def wait(self, timeout: float) -> None:
+        self._full.wait(timeout)
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+
+class CacheSweeper:
+    """
+    Incremental sweeper deleting expired rows of the caches table.
+
+    It walks the table in primary-key windows, so each DELETE only touches a bounded id range and
+    holds its row locks briefly instead of scanning the whole table in one statement. The window
+    grows while batches finish below the target batch time and shrinks when they don't, and the
+    sweeper pauses in proportion to each batch to leave room for foreground writes.
+    """
+
+    def __init__(self, client: 'MysqlRedisClient', batch_size: int = 1000, target_batch_time: float = 0.05,
+                 duty_cycle: float = 0.5):
+        self._client = client
+        self.min_span = max(1, batch_size // 16)
+        self.max_span = batch_size * 16
+        self.span = batch_size
+        self.target_batch_time = target_batch_time
+        self.duty_cycle = duty_cycle
+        self._cursor = 0
+        self.batch_size = batch_size
+        self.rows_swept = 0
+        self.batches = 0
+        self.total_batch_time = 0.0
+        self.last_batch_time = 0.0
+        self.last_pass_rows = 0
+        self.lag = 0.0
+
+    def sweep(self, deadline: Optional[float] = None) -> int:
+        """
+        Continue the current pass over the table until it completes or the monotonic deadline passes.
+        Return the number of deleted rows.
+        """
+        session = self._client.db.session
+        min_id, max_id = session.execute(db.text("SELECT MIN(id), MAX(id) FROM caches")).one()
+        session.commit()
+        if max_id is None:
+            self._cursor = 0
+            return 0
+        # skip the id gap below the oldest row, e.g. after earlier sweeps deleted the head of the table
+        self._cursor = max(self._cursor, min_id - 1)
+
+        deleted = 0
+        while self._cursor < max_id:
+            if deadline is not None and time.monotonic() >= deadline:
+                break
+            low, high = self._cursor, min(self._cursor + self.span, max_id)
+            started = time.monotonic()
+            result = session.execute(
+                db.text("""
+                DELETE FROM caches
+                WHERE id > :low AND id <= :high AND expire_time IS NOT NULL AND expire_time < :now
+                """),
+                {'low': low, 'high': high, 'now': datetime.now()}
+            )
+            session.commit()
+            elapsed = time.monotonic() - started
+
+            self._cursor = high
+            deleted += result.rowcount
+            self._record_batch(result.rowcount, elapsed)
+            pause = elapsed * (1 - self.duty_cycle) / self.duty_cycle
+            if pause > 0:
+                time.sleep(pause)
+        else:
+            # pass complete, the next one starts from the lowest id again
+            self._cursor = 0
+            self.last_pass_rows = deleted
+            deleted += self._sweep_collections(deadline)
+
+        self.lag = self._measure_lag()
+        return deleted
+
+    def _sweep_collections(self, deadline: Optional[float]) -> int:
+        """Delete expired sorted-set members and hash fields in bounded batches through their expire_time index"""
+        session = self._client.db.session
+        deleted = 0
+        for table in _COLLECTION_TABLES:
+            while deadline is None or time.monotonic() < deadline:
+                started = time.monotonic()
+                result = session.execute(
+                    db.text(f"DELETE FROM {table} WHERE expire_time IS NOT NULL AND expire_time < :now LIMIT :limit"),
+                    {'now': datetime.now(), 'limit': self.batch_size}
+                )
+                session.commit()
+                elapsed = time.monotonic() - started
+                deleted += result.rowcount
+                self.rows_swept += result.rowcount
+                if result.rowcount < self.batch_size:
+                    break
+                time.sleep(elapsed * (1 - self.duty_cycle) / self.duty_cycle)
+        return deleted
+
+    def restart(self) -> None:
+        self._cursor = 0
+
+    def _record_batch(self, rows: int, elapsed: float) -> None:
+        self.rows_swept += rows
+        self.batches += 1
+        self.total_batch_time += elapsed
+        self.last_batch_time = elapsed
+        if elapsed > self.target_batch_time:
+            self.span = max(self.min_span, self.span // 2)
+        elif elapsed < self.target_batch_time / 2:
+            self.span = min(self.max_span, self.span * 2)
+
+    def _measure_lag(self) -> float:
+        """Seconds since the oldest still present row expired"""
+        session = self._client.db.session
+        now = datetime.now()
+        oldest = session.execute(
+            db.text("SELECT MIN(expire_time) FROM caches WHERE expire_time IS NOT NULL AND expire_time < :now"),
+            {'now': now}
+        ).scalar()
+        session.commit()
+        return (now - oldest).total_seconds() if oldest else 0.0
+
+    def metrics(self) -> dict:
+        return {
+            "rows_swept": self.rows_swept,
+            "batches": self.batches,
+            "last_pass_rows": self.last_pass_rows,
+            "last_batch_time": self.last_batch_time,
+            "avg_batch_time": self.total_batch_time / self.batches if self.batches else 0.0,
+            "span": self.span,
+            "cursor": self._cursor,
+            "lag": self.lag,
+        }
+
+
+def _invalidates_local_key(func):
+    """Drop the written key from the in-process tier once the write has finished."""
+
+    @functools.wraps(func)
+    def wrapper(self, name, *args, **kwargs):
+        try:
+            return func(self, name, *args, **kwargs)
+        finally:
+            self._invalidate_local(name)
+
+    return wrapper
+
+
+# Isolation of the multi-statement writes that opt into a transaction, the cache session autocommits otherwise
+_TRANSACTION_ISOLATION_LEVEL = "READ COMMITTED"
+
+
+class PoolWaitStats:
+    """Time cache commands spent waiting for a connection of the dedicated cache pool."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self.last_wait = 0.0
+
+    def record(self, wait: float, timed_out: bool = False) -> None:
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+            else:
+                self.checkouts += 1
+            self.total_wait += wait
+            self.max_wait = max(self.max_wait, wait)
+            self.last_wait = wait
+
+    def metrics(self) -> dict:
+        with self._lock:
+            waits = self.checkouts + self.timeouts
+            return {
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "avg_wait": self.total_wait / waits if waits else 0.0,
+                "max_wait": self.max_wait,
+                "last_wait": self.last_wait,
+            }
+
+
+def _timed_pool_class(stats: PoolWaitStats) -> type[QueuePool]:
+    """QueuePool recording the wait of every checkout, recreated pools keep recording into the same stats"""
+
+    class TimedQueuePool(QueuePool):
+        def _do_get(self):
+            started = time.monotonic()
+            try:
+                connection = super()._do_get()
+            except sa_exc.TimeoutError:
+                stats.record(time.monotonic() - started, timed_out=True)
+                raise
+            stats.record(time.monotonic() - started)
+            return connection
+
+    return TimedQueuePool
+
+
+class CacheDatabase:
+    """
+    Dedicated engine and session of the MySQL cache backend, a drop-in for the ``db`` of Flask-SQLAlchemy.
+
+    Cache commands run on their own thread-scoped session, so their commits and rollbacks never touch the
+    ORM work pending on the request's db.session, and they take connections from a separate pool that
+    business queries can't starve. Statements autocommit, so reads hold no transaction open; the session
+    gives its connection back on every commit and at the end of each app context. Writes spanning several
+    statements opt into a transaction with begin_transaction().
+
+    GET_LOCK session locks are held, and waited for, on connections of the unpooled ``lock_engine``, so
+    blocked lock waiters never take connections from the cache pool.
+    """
+
+    def __init__(
+        self,
+        uri: str,
+        pool_size: int = 10,
+        max_overflow: int = 10,
+        pool_timeout: float = 5.0,
+        pool_recycle: int = 3600,
+        pool_pre_ping: bool = False,
+    ):
+        self.pool_wait = PoolWaitStats()
+        self.engine = create_engine(
+            uri,
+            poolclass=_timed_pool_class(self.pool_wait),
+            pool_size=pool_size,
+            max_overflow=max_overflow,
+            pool_timeout=pool_timeout,
+            pool_recycle=pool_recycle,
+            pool_pre_ping=pool_pre_ping,
+        )
+        self.lock_engine = create_engine(uri, poolclass=NullPool, isolation_level="AUTOCOMMIT")
+        self.session = scoped_session(
+            sessionmaker(bind=self.engine.execution_options(isolation_level="AUTOCOMMIT"), expire_on_commit=False)
+        )
+
+    def begin_transaction(self) -> None:
+        """Run the next statements of the session in one transaction, until it commits or rolls back"""
+        # an earlier read may still hold an autocommit connection, the isolation level only applies to a new one
+        self.session.close()
+        self.session.connection(execution_options={"isolation_level": _TRANSACTION_ISOLATION_LEVEL})
+
+    def remove_session(self, exception=None) -> None:
+        self.session.remove()
+
+    def metrics(self) -> dict:
+        pool = self.engine.pool
+        return {
+            "size": pool.size(),
+            "checked_out": pool.checkedout(),
+            "overflow": pool.overflow(),
+            **self.pool_wait.metrics(),
+        }
+
+
 class MysqlRedisClient:
-    def __init__(self, meta_db=None):
+    def __init__(
+        self,
+        meta_db=None,
+        l1_max_size: int = 0,
+        l1_ttl: float = 1.0,
+        write_behind_prefixes: Sequence[str] = (),
+        write_behind_interval: float = 0.5,
+        write_behind_max_pending: int = 1000,
+        lock_type: str = "get_lock",
+        sweep_interval: float = 300,
+        sweep_batch_size: int = 1000,
+        sweep_target_batch_time: float = 0.05,
+    ):
         self.db = meta_db or db
+        # "get_lock" uses server-side GET_LOCK/RELEASE_LOCK, "table" the polling lock rows in the caches table
+        self._lock_type = lock_type
         self._app = None  # Store Flask app reference
+        # Optional in-process tier, disabled when l1_max_size is 0
+        self._l1 = LocalCache(l1_max_size, l1_ttl) if l1_max_size > 0 else None
+        # Optional write-behind for keys matching the given prefixes, disabled when no prefix is given
+        self._write_behind = (
+            WriteBehindBuffer(write_behind_prefixes, write_behind_max_pending) if write_behind_prefixes else None
+        )
+        self._write_behind_interval = write_behind_interval
+        self._write_behind_thread = None
+        # TTL refreshes issued by getex, applied in batches instead of one UPDATE per read
+        self._pending_expires: OrderedDict[str, Optional[datetime]] = OrderedDict()
+        self._pending_expires_lock = threading.Lock()
+        self._pending_expires_flushed_at = time.monotonic()
+
+        self._sweeper = CacheSweeper(self, sweep_batch_size, sweep_target_batch_time)
+        self._sweep_interval = sweep_interval
 
         self._cleanup_thread = None
         self._stop_cleanup = False
@@ -38,8 +583,13 @@ class MysqlRedisClient:
     def set_app(self, app):
         """Set Flask app reference for cleanup thread"""
         self._app = app
+        if isinstance(self.db, CacheDatabase):
+            # like db.session, hand the connection of the cache session back once a request or task is done
+            app.teardown_appcontext(self.db.remove_session)
         # 现在启动清理线程，确保有正确的应用上下文
         self._start_cleanup_thread()
+        if self._write_behind is not None:
+            self._start_write_behind_thread()
 
     def cleanup_thread_is_alive(self) -> bool:
         """Check if the cleanup thread is alive"""
@@ -58,48 +608,79 @@ class MysqlRedisClient:
             logger.info("Started background cache cleanup thread")
 
     def _cleanup_expired_cache(self):
-        """Background thread function to clean expired cache entries every 5 minutes"""
+        """Background thread function sweeping expired cache entries every sweep interval"""
 
         while not self._stop_cleanup and self.db:
             try:
                 # Use Flask app context if available
                 if self._app:
                     with self._app.app_context():
-                        self.cleanup_expired()
+                        # refreshed keys must not be swept as expired
+                        self.flush_pending_expires()
+                        self._sweep_as_singleton()
                 else:
                     # Fallback without app context
-                    self.cleanup_expired()
+                    self.flush_pending_expires()
+                    self._sweep_as_singleton()
+                if isinstance(self.db, CacheDatabase):
+                    logger.info("Cache connection pool metrics: %s", self.pool_metrics())
             except Exception as e:
-                logger.warning(f"Error during background cache cleanup: {e}")
+                logger.warning("Error during background cache cleanup: %s", e)
 
-            time.sleep(300)
+            time.sleep(self._sweep_interval)
 
         logger.info("Cache cleanup thread stopped")
 
-    def cleanup_expired(self) -> int:
-        """Manually clean expired cache entries and return the number of deleted records"""
-        if not self.db:
+    def _sweep_as_singleton(self) -> int:
+        """Sweep only if no other process in the cluster is sweeping, bounded to most of one interval"""
+        lock = self.lock("mysql_cache_sweeper", timeout=self._sweep_interval)
+        if not lock.acquire(blocking=False):
             return 0
+        try:
+            deleted = self._sweep(deadline=time.monotonic() + self._sweep_interval * 0.8)
+            logger.info("Cache sweeper deleted %s expired entries, metrics: %s", deleted, self._sweeper.metrics())
+            return deleted
+        finally:
+            lock.release()
 
+    def _sweep(self, deadline: Optional[float] = None) -> int:
         try:
-            expired_count = self.db.session.query(Cache).filter(
-                Cache.expire_time.isnot(None),
-                Cache.expire_time < datetime.now()
-            ).delete()
-            self.db.session.commit()
-            return expired_count
+            return self._sweeper.sweep(deadline)
         except Exception as e:
             err_str = str(e)
-            # ERROR 1146 Table 'xxx' doesn't exist
-            if "1146" in err_str and "doesn't exist" in err_str:
-                return 0
-            logger.warning(f"Error during manual cache cleanup: {err_str}")
             try:
                 self.db.session.rollback()
             except Exception as rollback_error:
-                logger.warning(f"Error during rollback: {rollback_error}")
+                logger.warning("Error during rollback: %s", rollback_error)
+            # ERROR 1146 Table 'xxx' doesn't exist
+            if "1146" in err_str and "doesn't exist" in err_str:
+                return 0
+            logger.warning("Error during cache cleanup: %s", err_str)
             return 0
 
+    def cleanup_expired(self) -> int:
+        """Manually clean expired cache entries in one full pass and return the number of deleted records"""
+        if not self.db:
+            return 0
+
+        self._sweeper.restart()
+        return self._sweep()
+
+    def sweep_metrics(self) -> dict:
+        """Return rows swept, lag and batch timings of the expiry sweeper"""
+        return self._sweeper.metrics()
+
+    def pool_metrics(self) -> dict:
+        """Return usage and connection wait times of the dedicated cache pool, empty when sharing the app's pool"""
+        if not isinstance(self.db, CacheDatabase):
+            return {}
+        return self.db.metrics()
+
+    def _begin_transaction(self) -> None:
+        # the session of Flask-SQLAlchemy is transactional already
+        if isinstance(self.db, CacheDatabase):
+            self.db.begin_transaction()
+
     def stop_cleanup(self, sync: bool = True):
         """Stop the background cleanup thread"""
         self._stop_cleanup = True
@@ -108,12 +689,150 @@ class MysqlRedisClient:
                 self._cleanup_thread.join(timeout=5)
             logger.info("Cache cleanup thread stopped")
 
-    def pipeline(self) -> 'MysqlRedisClient':
-        return self
+    def _start_write_behind_thread(self):
+        """Start background thread flushing write-behind keys"""
+        if self._write_behind_thread is not None and self._write_behind_thread.is_alive():
+            return
+        self._write_behind_thread = threading.Thread(
+            target=self._flush_write_behind_loop,
+            daemon=True,
+            name="MysqlRedisClient-WriteBehind"
+        )
+        self._write_behind_thread.start()
+        atexit.register(self.flush_write_behind)
+        logger.info("Started background cache write-behind thread")
+
+    def _flush_write_behind_loop(self):
+        """Background thread function flushing pending writes every interval or once the buffer is full"""
+        assert self._write_behind is not None
+        while not self._stop_cleanup:
+            self._write_behind.wait(self._write_behind_interval)
+            try:
+                self.flush_write_behind()
+            except Exception as e:
+                logger.warning("Error during cache write-behind flush: %s", e)
+
+    def flush_write_behind(self) -> int:
+        """Flush pending write-behind commands and return the number of flushed commands"""
+        if self._write_behind is None or not len(self._write_behind):
+            return 0
+        commands = self._write_behind.drain()
+        if self._app:
+            with self._app.app_context():
+                self.execute_batch(commands)
+        else:
+            self.execute_batch(commands)
+        self._write_behind.flushed += len(commands)
+        return len(commands)
+
+    def _settle_write_behind(self, name: str) -> None:
+        """Apply a pending write-behind command before a synchronous read-modify-write of the same key"""
+        if self._write_behind is None:
+            return
+        command = self._write_behind.pop(name)
+        if command is not None:
+            self.execute_batch([command])
+
+    def execute_batch(self, commands: list[tuple]) -> list[bool]:
+        """
+        Run buffered write commands in a single transaction, merging consecutive commands of the same kind.
+
+        Returns one result per command. setnx commands are inserted one row per statement so that
+        each of them reports whether it actually created the key, like redis-py does.
+        """
+        if not self.db or not commands:
+            return [True] * len(commands)
+
+        results = []
+        try:
+            self._begin_transaction()
+            for kind, group in itertools.groupby(commands, key=lambda command: command[0]):
+                group_commands = list(group)
+                if kind == _INSERT_IGNORE:
+                    for _, key, value, expire_time in group_commands:
+                        result = self.db.session.execute(
+                            db.text(_build_insert_sql(1, ignore=True)),
+                            {'cache_key_0': key, 'cache_value_0': value, 'expire_time_0': expire_time}
+                        )
+                        results.append(result.rowcount == 1)
+                    continue
+                results.extend([True] * len(group_commands))
+                for start in range(0, len(group_commands), _MAX_ROWS_PER_STATEMENT):
+                    chunk = group_commands[start:start + _MAX_ROWS_PER_STATEMENT]
+                    if kind == _DELETE:
+                        cache_keys = list(dict.fromkeys(command[1] for command in chunk))
+                        for table in ("caches",) + _COLLECTION_TABLES:
+                            self.db.session.execute(
+                                db.text(f"DELETE FROM {table} WHERE cache_key IN :cache_keys").bindparams(
+                                    bindparam("cache_keys", expanding=True)
+                                ),
+                                {'cache_keys': cache_keys}
+                            )
+                    elif kind == _EXPIRE:
+                        params = [{'cache_key': command[1], 'expire_time': command[3]} for command in chunk]
+                        for table in ("caches",) + _COLLECTION_TABLES:
+                            self.db.session.execute(
+                                db.text(f"UPDATE {table} SET expire_time = :expire_time WHERE cache_key = :cache_key"),
+                                params
+                            )
+                    else:
+                        params = {}
+                        for i, (_, key, value, expire_time) in enumerate(chunk):
+                            params[f'cache_key_{i}'] = key
+                            params[f'cache_value_{i}'] = value
+                            params[f'expire_time_{i}'] = expire_time
+                        self.db.session.execute(db.text(_build_insert_sql(len(chunk), ignore=False)), params)
+            self.db.session.commit()
+            return results
+        except Exception as e:
+            logger.warning("MySQLRedisClient.execute_batch of %s commands got exception: %s", len(commands), e)
+            self.db.session.rollback()
+            return [False] * len(commands)
+        finally:
+            self._invalidate_local(*{command[1] for command in commands})
+
+    def pipeline(self, transaction: bool = True) -> MysqlPipeline:
+        # commands are always flushed in one transaction, `transaction` is accepted for redis-py compatibility
+        return MysqlPipeline(self)
+
+    def _invalidate_local(self, *names: str) -> None:
+        if self._l1 is not None:
+            self._l1.invalidate(*names)
+        if self._pending_expires:
+            # a write sets its own TTL, an older deferred refresh must not override it
+            with self._pending_expires_lock:
+                for name in names:
+                    self._pending_expires.pop(name, None)
+
+    def local_cache_info(self) -> dict:
+        """Return size and hit statistics of the in-process tier"""
+        if self._l1 is None:
+            return {"enabled": False}
+        return {
+            "enabled": True,
+            "size": len(self._l1),
+            "max_size": self._l1.max_size,
+            "ttl": self._l1.ttl,
+            "hits": self._l1.hits,
+            "misses": self._l1.misses,
+        }
 
     def get(self, name: str) -> Optional[bytes]:
         if not self.db:
             return None
+
+        if self._write_behind is not None:
+            found, value = self._write_behind.lookup(name)
+            if found:
+                return value
+
+        generation = 0
+        if self._l1 is not None:
+            value = self._l1.get(name)
+            if value is not None:
+                return value
+            generation = self._l1.generation
+
         try:
             cache_item = self.db.session.query(Cache).filter(
                 Cache.cache_key == name,
@@ -123,11 +842,75 @@ class MysqlRedisClient:
                 )
             ).first()
 
-            return cache_item.cache_value if cache_item else None
+            if not cache_item:
+                return None
+            if self._l1 is not None:
+                self._l1.put(name, cache_item.cache_value, generation, cache_item.expire_time)
+            return cache_item.cache_value
         except Exception as e:
             logger.warning("MySQLRedisClient.get " + str(name) + " got exception: " + str(e))
             return None
 
+    def getex(
+        self,
+        name: str,
+        ex: None | int | timedelta = None,
+        px: None | int | timedelta = None,
+        exat: None | int | datetime = None,
+        pxat: None | int | datetime = None,
+        persist: bool = False,
+    ) -> Optional[bytes]:
+        """
+        Get the value of a key and refresh its TTL, like redis GETEX.
+
+        The TTL refresh is deferred and applied together with other refreshes in one batch (see
+        `flush_pending_expires`), so a hot read-mostly key costs a single SELECT per read at most.
+        """
+        value = self.get(name)
+        if value is None:
+            return None
+
+        if ex is not None or px is not None:
+            if px is not None:
+                expire = px if isinstance(px, timedelta) else timedelta(milliseconds=px)
+            else:
+                expire = ex if isinstance(ex, timedelta) else timedelta(seconds=ex)  # type: ignore[arg-type]
+            expire_time: Optional[datetime] = datetime.now() + expire
+        elif exat is not None:
+            expire_time = exat if isinstance(exat, datetime) else datetime.fromtimestamp(exat)
+        elif pxat is not None:
+            expire_time = pxat if isinstance(pxat, datetime) else datetime.fromtimestamp(pxat / 1000)
+        elif persist:
+            expire_time = None
+        else:
+            return value
+
+        if self._write_behind is not None and self._write_behind.matches(name):
+            self._write_behind.add((_EXPIRE, name, None, expire_time))
+            return value
+
+        with self._pending_expires_lock:
+            self._pending_expires.pop(name, None)
+            self._pending_expires[name] = expire_time
+            due = (
+                len(self._pending_expires) >= _PENDING_EXPIRES_MAX
+                or time.monotonic() - self._pending_expires_flushed_at >= self._write_behind_interval
+            )
+        if due:
+            self.flush_pending_expires()
+        return value
+
+    def flush_pending_expires(self) -> int:
+        """Apply deferred getex TTL refreshes and return the number of refreshed keys"""
+        with self._pending_expires_lock:
+            commands = [(_EXPIRE, name, None, expire_time) for name, expire_time in self._pending_expires.items()]
+            self._pending_expires.clear()
+            self._pending_expires_flushed_at = time.monotonic()
+        if commands:
+            self.execute_batch(commands)
+        return len(commands)
+
+    @_invalidates_local_key
     def set(self, name: str, value, ex: None | int | timedelta = None) -> None:
         if not self.db:
             return
@@ -140,6 +923,10 @@ class MysqlRedisClient:
             expire = ex if isinstance(ex, timedelta) else timedelta(seconds=ex)
             expire_time = datetime.now() + expire
 
+        if self._write_behind is not None and self._write_behind.matches(name):
+            self._write_behind.add((_UPSERT, name, value, expire_time))
+            return
+
         try:
             # 使用 INSERT ... ON DUPLICATE KEY UPDATE 避免竞态条件
             sql = """
@@ -162,6 +949,7 @@ class MysqlRedisClient:
             logger.warning("MySQLRedisClient.set " + str(name) + " got exception: " + str(e))
             self.db.session.rollback()
 
+    @_invalidates_local_key
     def setex(self, name: str, time: int | timedelta, value) -> None:
         if not self.db:
             return
@@ -172,6 +960,10 @@ class MysqlRedisClient:
         expire = time if isinstance(time, timedelta) else timedelta(seconds=time)
         expire_time = datetime.now() + expire
 
+        if self._write_behind is not None and self._write_behind.matches(name):
+            self._write_behind.add((_UPSERT, name, value, expire_time))
+            return
+
         try:
             # 使用 INSERT ... ON DUPLICATE KEY UPDATE 避免竞态条件
             sql = """
@@ -194,10 +986,13 @@ class MysqlRedisClient:
             logger.warning("MySQLRedisClient.setex " + str(name) + " got exception: " + str(e))
             self.db.session.rollback()
 
+    @_invalidates_local_key
     def setnx(self, name: str, value) -> None:
         if not self.db:
             return
 
+        self._settle_write_behind(name)
+
         if not isinstance(value, bytes):
             value = (str(value)).encode('utf-8')
 
@@ -224,48 +1019,71 @@ class MysqlRedisClient:
         if not self.db or not names:
             return
 
+        if self._write_behind is not None:
+            for name in names:
+                if self._write_behind.matches(name):
+                    self._write_behind.add((_DELETE, name, None, None))
+            self._invalidate_local(*names)
+            names = tuple(name for name in names if not self._write_behind.matches(name))
+            if not names:
+                return
+
         try:
             self.db.session.query(Cache).filter(Cache.cache_key.in_(names)).delete(synchronize_session=False)
+            for table in _COLLECTION_TABLES:
+                self.db.session.execute(
+                    db.text(f"DELETE FROM {table} WHERE cache_key IN :cache_keys").bindparams(
+                        bindparam("cache_keys", expanding=True)
+                    ),
+                    {'cache_keys': list(names)}
+                )
             self.db.session.commit()
         except Exception as e:
             logger.warning("MySQLRedisClient.delete " + str(names) + " got exception: " + str(e))
             self.db.session.rollback()
+        self._invalidate_local(*names)
 
+    @_invalidates_local_key
     def incr(self, name: str, amount: int = 1) -> bytes:
         if not self.db:
             return b'0'
 
+        self._settle_write_behind(name)
+
         try:
             # 使用事务确保原子性，避免并发问题
-            with self.db.session.begin():
-                # 1. 获取当前值（在事务中）
-                current_item = self.db.session.query(Cache).filter(Cache.cache_key == name).first()
-                current_value = 0
-                if current_item:
-                    try:
-                        current_value = int(current_item.cache_value.decode('utf-8'))
-                    except (ValueError, UnicodeDecodeError):
-                        current_value = 0
-                
-                new_value = current_value + amount
-                
-                # 2. 原子更新（在同一个事务中）
-                if current_item:
-                    current_item.cache_value = str(new_value).encode('utf-8')
-                else:
-                    cache_item = Cache()
-                    cache_item.cache_key = name
-                    cache_item.cache_value = str(new_value).encode('utf-8')
-                    cache_item.expire_time = None
-                    self.db.session.add(cache_item)
-                
-                # 3. 事务自动提交，返回结果
-                return str(new_value).encode('utf-8')
-                
+            self._begin_transaction()
+            # 1. 获取当前值（在事务中）
+            current_item = self.db.session.query(Cache).filter(Cache.cache_key == name).first()
+            current_value = 0
+            if current_item:
+                try:
+                    current_value = int(current_item.cache_value.decode('utf-8'))
+                except (ValueError, UnicodeDecodeError):
+                    current_value = 0
+
+            new_value = current_value + amount
+
+            # 2. 原子更新（在同一个事务中）
+            if current_item:
+                current_item.cache_value = str(new_value).encode('utf-8')
+            else:
+                cache_item = Cache()
+                cache_item.cache_key = name
+                cache_item.cache_value = str(new_value).encode('utf-8')
+                cache_item.expire_time = None
+                self.db.session.add(cache_item)
+
+            # 3. 提交事务，返回结果
+            self.db.session.commit()
+            return str(new_value).encode('utf-8')
+
         except Exception as e:
             logger.warning("MySQLRedisClient.incr " + str(name) + " got exception: " + str(e))
+            self.db.session.rollback()
             return b'0'
 
+    @_invalidates_local_key
     def expire(self, name: str, time: int | timedelta) -> None:
         if not self.db:
             return
@@ -273,6 +1091,10 @@ class MysqlRedisClient:
         expire = time if isinstance(time, timedelta) else timedelta(seconds=time)
         expire_time = datetime.now() + expire
 
+        if self._write_behind is not None and self._write_behind.matches(name):
+            self._write_behind.add((_EXPIRE, name, None, expire_time))
+            return
+
         try:
             # 使用 UPDATE 语句避免竞态条件
             sql = """
@@ -280,121 +1102,266 @@ class MysqlRedisClient:
             SET expire_time = :expire_time 
             WHERE cache_key = :cache_key
             """
-            result = self.db.session.execute(
-                db.text(sql),
-                {
-                    'cache_key': name,
-                    'expire_time': expire_time
-                }
-            )
+            params = {
+                'cache_key': name,
+                'expire_time': expire_time
+            }
+            self.db.session.execute(db.text(sql), params)
+            # sorted sets and hashes carry the key's TTL on every member/field row
+            for table in _COLLECTION_TABLES:
+                self.db.session.execute(
+                    db.text(f"UPDATE {table} SET expire_time = :expire_time WHERE cache_key = :cache_key"), params
+                )
             self.db.session.commit()
         except Exception as e:
             logger.warning("MySQLRedisClient.expire " + str(name) + " got exception: " + str(e))
             self.db.session.rollback()
 
-    def zadd(self, name: str, mapping: Mapping) -> None:
-        if not self.db:
-            return
+    def _collection_expire_time(self, table: str, name: str) -> Optional[datetime]:
+        """TTL of a sorted set or hash key, new members/fields inherit it like in redis"""
+        return self.db.session.execute(
+            db.text(f"""
+            SELECT expire_time FROM {table}
+            WHERE cache_key = :cache_key AND expire_time IS NOT NULL AND expire_time > :now
+            LIMIT 1
+            """),
+            {'cache_key': name, 'now': datetime.now()}
+        ).scalar()
+
+    def _count_existing(self, table: str, column: str, name: str, items: list[bytes]) -> int:
+        """Live members/fields of a sorted set or hash key among items, redis only counts the others as added"""
+        return self.db.session.execute(
+            db.text(f"""
+            SELECT COUNT(*) FROM {table}
+            WHERE cache_key = :cache_key AND {column} IN :items AND (expire_time IS NULL OR expire_time > :now)
+            """).bindparams(bindparam("items", expanding=True)),
+            {'cache_key': name, 'items': items, 'now': datetime.now()}
+        ).scalar() or 0
+
+    def exists(self, *names: str) -> int:
+        if not self.db or not names:
+            return 0
+
+        found = set()
+        if self._write_behind is not None:
+            for name in names:
+                pending, value = self._write_behind.lookup(name)
+                if pending and value is not None:
+                    found.add(name)
 
         try:
-            import json
+            rows = self.db.session.execute(
+                db.text("""
+                SELECT cache_key FROM caches
+                WHERE cache_key IN :cache_keys AND (expire_time IS NULL OR expire_time > :now)
+                UNION
+                SELECT cache_key FROM cache_zsets
+                WHERE cache_key IN :cache_keys AND (expire_time IS NULL OR expire_time > :now)
+                UNION
+                SELECT cache_key FROM cache_hashes
+                WHERE cache_key IN :cache_keys AND (expire_time IS NULL OR expire_time > :now)
+                """).bindparams(bindparam("cache_keys", expanding=True)),
+                {'cache_keys': list(set(names)), 'now': datetime.now()}
+            ).fetchall()
+            found.update(row[0] for row in rows)
+        except Exception as e:
+            logger.warning("MySQLRedisClient.exists %s got exception: %s", names, e)
+        # like redis, a key given several times is counted several times
+        return sum(1 for name in names if name in found)
 
-            # 使用事务确保原子性，避免并发问题
-            with self.db.session.begin():
-                # 1. 在事务中获取现有数据
-                cache_item = self.db.session.query(Cache).filter(Cache.cache_key == name).first()
-                
-                if cache_item:
-                    try:
-                        existing_data = json.loads(cache_item.cache_value.decode('utf-8'))
-                        if not isinstance(existing_data, dict):
-                            existing_data = {}
-                    except (json.JSONDecodeError, UnicodeDecodeError):
-                        existing_data = {}
-                    
-                    existing_data.update(mapping)
-                    cache_item.cache_value = json.dumps(existing_data).encode('utf-8')
-                else:
-                    cache_item = Cache()
-                    cache_item.cache_key = name
-                    cache_item.cache_value = json.dumps(dict(mapping)).encode('utf-8')
-                    cache_item.expire_time = None
-                    self.db.session.add(cache_item)
-                
-                # 2. 事务自动提交
-                
+    def zadd(self, name: str, mapping: Mapping) -> int:
+        if not self.db or not mapping:
+            return 0
+
+        self._settle_write_behind(name)
+
+        try:
+            # the count and the upsert share a transaction so concurrent writers do not skew the result
+            self._begin_transaction()
+            scores = {_to_bytes(member): float(score) for member, score in mapping.items()}
+            existing = self._count_existing("cache_zsets", "member", name, list(scores))
+            expire_time = self._collection_expire_time("cache_zsets", name)
+            values = ", ".join(f"(:cache_key, :member_{i}, :score_{i}, :expire_time)" for i in range(len(scores)))
+            params: dict = {'cache_key': name, 'expire_time': expire_time}
+            for i, (member, score) in enumerate(scores.items()):
+                params[f'member_{i}'] = member
+                params[f'score_{i}'] = score
+            self.db.session.execute(
+                db.text(f"""
+                INSERT INTO cache_zsets (cache_key, member, score, expire_time) VALUES {values}
+                ON DUPLICATE KEY UPDATE score = VALUES(score), expire_time = VALUES(expire_time)
+                """),
+                params
+            )
+            self.db.session.commit()
+            # affected rows cannot tell inserts from unchanged rows under CLIENT.FOUND_ROWS
+            return len(scores) - existing
         except Exception as e:
             logger.warning("MySQLRedisClient.zadd " + str(name) + " got exception: " + str(e))
+            self.db.session.rollback()
+            return 0
 
-    def zremrangebyscore(self, name: str, min: int | float | str, max: int | float | str):
+    @staticmethod
+    def _score_bound(bound: int | float | str) -> tuple[Optional[float], bool]:
+        """Parse a redis score bound into (value, exclusive), value is None for an infinite bound"""
+        text = bound.decode('utf-8') if isinstance(bound, bytes) else str(bound)
+        exclusive = text.startswith('(')
+        if exclusive:
+            text = text[1:]
+        if text in ('-inf', '+inf', 'inf'):
+            return None, exclusive
+        return float(text), exclusive
+
+    def zremrangebyscore(self, name: str, min: int | float | str, max: int | float | str) -> int:
         if not self.db:
             return 0
 
-        try:
-            import json
+        self._settle_write_behind(name)
 
-            # 使用事务确保原子性，避免并发问题
-            with self.db.session.begin():
-                # 1. 在事务中获取现有数据
-                cache_item = self.db.session.query(Cache).filter(Cache.cache_key == name).first()
-                if not cache_item:
-                    return 0
+        conditions = ["cache_key = :cache_key"]
+        params: dict = {'cache_key': name}
+        min_score, min_exclusive = self._score_bound(min)
+        if min_score is not None:
+            conditions.append(f"score {'>' if min_exclusive else '>='} :min_score")
+            params['min_score'] = min_score
+        max_score, max_exclusive = self._score_bound(max)
+        if max_score is not None:
+            conditions.append(f"score {'<' if max_exclusive else '<='} :max_score")
+            params['max_score'] = max_score
 
-                try:
-                    existing_data = json.loads(cache_item.cache_value.decode('utf-8'))
-                    if not isinstance(existing_data, dict):
-                        return 0
-                except (json.JSONDecodeError, UnicodeDecodeError):
-                    return 0
-
-                min_score = float(min) if min != '-inf' else float('-inf')
-                max_score = float(max) if max != '+inf' else float('inf')
-
-                members_to_remove = []
-                for member, score in existing_data.items():
-                    try:
-                        score_float = float(score)
-                        if min_score <= score_float <= max_score:
-                            members_to_remove.append(member)
-                    except (ValueError, TypeError):
-                        continue
-
-                for member in members_to_remove:
-                    del existing_data[member]
-
-                cache_item.cache_value = json.dumps(existing_data).encode('utf-8')
-                
-                # 2. 事务自动提交，返回结果
-                return len(members_to_remove)
-                
+        try:
+            result = self.db.session.execute(
+                db.text(f"DELETE FROM cache_zsets WHERE {' AND '.join(conditions)}"), params
+            )
+            self.db.session.commit()
+            return result.rowcount
         except Exception as e:
-            logger.warning("MySQLRedisClient.zremrangebyscore " + str(name) + " got exception: " + str(e))
+            logger.warning("MySQLRedisClient.zremrangebyscore %s got exception: %s", name, e)
+            self.db.session.rollback()
             return 0
 
     def zcard(self, name: str) -> int:
+        return self._count_collection("cache_zsets", name)
+
+    def _count_collection(self, table: str, name: str) -> int:
         if not self.db:
             return 0
 
         try:
-            import json
+            return self.db.session.execute(
+                db.text(f"""
+                SELECT COUNT(*) FROM {table}
+                WHERE cache_key = :cache_key AND (expire_time IS NULL OR expire_time > :now)
+                """),
+                {'cache_key': name, 'now': datetime.now()}
+            ).scalar() or 0
+        except Exception as e:
+            logger.warning("MySQLRedisClient count of %s %s got exception: %s", table, name, e)
+            return 0
 
-            cache_item = self.db.session.query(Cache).filter(Cache.cache_key == name).first()
-            if not cache_item:
-                return 0
+    def hset(self, name: str, key=None, value=None, mapping: Optional[Mapping] = None) -> int:
+        if not self.db:
+            return 0
 
-            try:
-                existing_data = json.loads(cache_item.cache_value.decode('utf-8'))
-                if not isinstance(existing_data, dict):
-                    return 0
-                return len(existing_data)
-            except (json.JSONDecodeError, UnicodeDecodeError):
-                return 0
+        items = dict(mapping or {})
+        if key is not None:
+            items[key] = value
+        if not items:
+            return 0
+
+        self._settle_write_behind(name)
+
+        try:
+            self._begin_transaction()
+            fields = {_to_bytes(field): _to_bytes(field_value) for field, field_value in items.items()}
+            existing = self._count_existing("cache_hashes", "field", name, list(fields))
+            expire_time = self._collection_expire_time("cache_hashes", name)
+            values = ", ".join(f"(:cache_key, :field_{i}, :value_{i}, :expire_time)" for i in range(len(fields)))
+            params: dict = {'cache_key': name, 'expire_time': expire_time}
+            for i, (field, field_value) in enumerate(fields.items()):
+                params[f'field_{i}'] = field
+                params[f'value_{i}'] = field_value
+            self.db.session.execute(
+                db.text(f"""
+                INSERT INTO cache_hashes (cache_key, field, value, expire_time) VALUES {values}
+                ON DUPLICATE KEY UPDATE value = VALUES(value), expire_time = VALUES(expire_time)
+                """),
+                params
+            )
+            self.db.session.commit()
+            return len(fields) - existing
+        except Exception as e:
+            logger.warning("MySQLRedisClient.hset %s got exception: %s", name, e)
+            self.db.session.rollback()
+            return 0
+
+    def hget(self, name: str, key) -> Optional[bytes]:
+        if not self.db:
+            return None
+
+        try:
+            return self.db.session.execute(
+                db.text("""
+                SELECT value FROM cache_hashes
+                WHERE cache_key = :cache_key AND field = :field AND (expire_time IS NULL OR expire_time > :now)
+                """),
+                {'cache_key': name, 'field': _to_bytes(key), 'now': datetime.now()}
+            ).scalar()
+        except Exception as e:
+            logger.warning("MySQLRedisClient.hget %s got exception: %s", name, e)
+            return None
+
+    def hgetall(self, name: str) -> dict[bytes, bytes]:
+        if not self.db:
+            return {}
+
+        try:
+            rows = self.db.session.execute(
+                db.text("""
+                SELECT field, value FROM cache_hashes
+                WHERE cache_key = :cache_key AND (expire_time IS NULL OR expire_time > :now)
+                """),
+                {'cache_key': name, 'now': datetime.now()}
+            ).fetchall()
+            return {bytes(row[0]): bytes(row[1]) for row in rows}
+        except Exception as e:
+            logger.warning("MySQLRedisClient.hgetall %s got exception: %s", name, e)
+            return {}
+
+    def hdel(self, name: str, *keys) -> int:
+        if not self.db or not keys:
+            return 0
+
+        try:
+            result = self.db.session.execute(
+                db.text("DELETE FROM cache_hashes WHERE cache_key = :cache_key AND field IN :fields").bindparams(
+                    bindparam("fields", expanding=True)
+                ),
+                {'cache_key': name, 'fields': [_to_bytes(key) for key in keys]}
+            )
+            self.db.session.commit()
+            return result.rowcount
         except Exception as e:
-            logger.warning("MySQLRedisClient.zcard " + str(name) + " got exception: " + str(e))
+            logger.warning("MySQLRedisClient.hdel %s got exception: %s", name, e)
+            self.db.session.rollback()
             return 0
 
-    def lock(self, name: str, timeout: Optional[float] = None) -> 'MysqlLock':
-        return MysqlLock(self.db, name, timeout)
+    def hlen(self, name: str) -> int:
+        return self._count_collection("cache_hashes", name)
+
+    def lock(
+        self,
+        name: str,
+        timeout: Optional[float] = None,
+        sleep: float = 0.1,
+        blocking: bool = True,
+        blocking_timeout: Optional[float] = None,
+        thread_local: bool = True,
+    ) -> 'MysqlLock | MysqlGetLock':
+        # sleep and thread_local are accepted for redis-py compatibility
+        if self._lock_type == "table":
+            return MysqlLock(self.db, name, timeout)
+        return MysqlGetLock(self.db, name, timeout, blocking=blocking, blocking_timeout=blocking_timeout)
 
 
 class MysqlLock:
@@ -539,6 +1506,193 @@ class MysqlLock:
         self.release()
 
 
+class MysqlGetLock:
+    """
+    Distributed lock built on the session-level GET_LOCK/RELEASE_LOCK functions of MySQL/OceanBase.
+
+    Waiters block inside the server until the holder releases the lock, so acquiring does not poll.
+    Session locks belong to a connection, therefore each waiter and holder uses a dedicated autocommit
+    connection of the unpooled ``lock_engine`` of a CacheDatabase, outside the cache pool, until the
+    lock is released; if the holder dies the server drops the lock together with the connection.
+    Each successful acquisition bumps a ``lock_fence_<name>`` counter row in the caches table, which
+    expires FENCE_TTL after the last acquisition.
+
+    ``timeout`` keeps the redis-py meaning of a lock TTL: once it passes the lock is released even if
+    the holder did not call release(), and extend() pushes it out. Every successful acquisition gets
+    a monotonically increasing ``fencing_token`` so that resources guarded by the lock can reject
+    writes from a holder whose lock has already expired.
+    """
+
+    # GET_LOCK names are limited to 64 characters
+    _MAX_NAME_LENGTH = 64
+    # far beyond any lock TTL, so the counter of a lock name only restarts once no holder can be left
+    FENCE_TTL = timedelta(days=7)
+
+    def __init__(
+        self,
+        db,
+        name: str,
+        timeout: Optional[float] = None,
+        blocking: bool = True,
+        blocking_timeout: Optional[float] = None,
+    ):
+        self.db = db
+        self.name = name
+        self.timeout = timeout
+        self.blocking = blocking
+        self.blocking_timeout = blocking_timeout
+        self.fencing_token: Optional[int] = None
+        self._connection = None
+        self._expire_timer: Optional[threading.Timer] = None
+        self._state_lock = threading.Lock()
+
+    @property
+    def server_name(self) -> str:
+        if len(self.name) <= self._MAX_NAME_LENGTH:
+            return self.name
+        digest = hashlib.sha1(self.name.encode('utf-8')).hexdigest()
+        return f"{self.name[:self._MAX_NAME_LENGTH - len(digest) - 1]}:{digest}"
+
+    def acquire(self, blocking: Optional[bool] = None, blocking_timeout: Optional[float] = None) -> bool:
+        if self.owned():
+            return True
+        if not self.db:
+            return False
+
+        if blocking is None:
+            blocking = self.blocking
+        if blocking_timeout is None:
+            # like MysqlLock, fall back to the lock timeout as the longest wait
+            blocking_timeout = self.blocking_timeout if self.blocking_timeout is not None else self.timeout
+        # GET_LOCK treats a negative timeout as "wait forever"
+        wait = (blocking_timeout if blocking_timeout is not None else -1) if blocking else 0
+
+        connection = None
+        try:
+            # the Flask-SQLAlchemy db has no lock engine, its pool is shared with the business queries anyway
+            engine = getattr(self.db, "lock_engine", None) or self.db.engine
+            connection = engine.connect().execution_options(isolation_level="AUTOCOMMIT")
+            acquired = connection.execute(
+                db.text("SELECT GET_LOCK(:name, :timeout)"), {'name': self.server_name, 'timeout': wait}
+            ).scalar()
+            if acquired != 1:
+                connection.close()
+                return False
+
+            self.fencing_token = self._next_fencing_token(connection)
+            with self._state_lock:
+                self._connection = connection
+                self._schedule_expiry(self.timeout)
+            return True
+        except Exception as e:
+            logger.warning("MysqlGetLock.acquire %s got exception: %s", self.name, e)
+            if connection is not None:
+                # never hand a connection that may still hold the session lock back to a pool
+                connection.invalidate()
+                connection.close()
+            return False
+
+    def _next_fencing_token(self, connection) -> int:
+        fence_key = f"lock_fence_{self.name}"
+        connection.execute(
+            db.text("""
+            INSERT INTO caches (cache_key, cache_value, expire_time)
+            VALUES (:cache_key, '1', :expire_time)
+            ON DUPLICATE KEY UPDATE cache_value = CAST(cache_value AS UNSIGNED) + 1, expire_time = VALUES(expire_time)
+            """),
+            {'cache_key': fence_key, 'expire_time': datetime.now() + self.FENCE_TTL}
+        )
+        token = connection.execute(
+            db.text("SELECT cache_value FROM caches WHERE cache_key = :cache_key"), {'cache_key': fence_key}
+        ).scalar()
+        return int(token)
+
+    def _schedule_expiry(self, ttl: Optional[float]) -> None:
+        if self._expire_timer is not None:
+            self._expire_timer.cancel()
+            self._expire_timer = None
+        if ttl is None:
+            return
+        connection = self._connection
+        self._expire_timer = threading.Timer(ttl, self._expire, args=(connection,))
+        self._expire_timer.daemon = True
+        self._expire_timer.start()
+
+    def _expire(self, connection) -> None:
+        with self._state_lock:
+            # the lock may have been released and re-acquired on another connection meanwhile
+            if self._connection is not connection:
+                return
+            logger.warning("MysqlGetLock %s expired before it was released", self.name)
+            self._expire_timer = None
+            self._close_connection()
+
+    def _close_connection(self) -> None:
+        connection, self._connection = self._connection, None
+        if connection is None:
+            return
+        try:
+            connection.execute(db.text("SELECT RELEASE_LOCK(:name)"), {'name': self.server_name})
+            connection.close()
+        except Exception as e:
+            logger.warning("MysqlGetLock.release %s got exception: %s", self.name, e)
+            connection.invalidate()
+            connection.close()
+
+    def locked(self) -> bool:
+        """Whether the lock is held by anyone, including other processes"""
+        if self.owned():
+            return True
+        try:
+            with self.db.engine.connect() as connection:
+                free = connection.execute(
+                    db.text("SELECT IS_FREE_LOCK(:name)"), {'name': self.server_name}
+                ).scalar()
+            return free != 1
+        except Exception as e:
+            logger.warning("MysqlGetLock.locked %s got exception: %s", self.name, e)
+            return False
+
+    def owned(self) -> bool:
+        return self._connection is not None
+
+    def extend(self, additional_time: float, replace_ttl: bool = False) -> bool:
+        with self._state_lock:
+            if self._connection is None:
+                raise LockNotOwnedError(
+                    f"Cannot extend a lock that is no longer owned: {self.name}", lock_name=self.name
+                )
+            if self.timeout is None:
+                raise LockError("Cannot extend a lock with no timeout", lock_name=self.name)
+            self.timeout = additional_time if replace_ttl else self.timeout + additional_time
+            self._schedule_expiry(self.timeout)
+        return True
+
+    def reacquire(self) -> bool:
+        with self._state_lock:
+            if self._connection is None:
+                raise LockNotOwnedError(
+                    f"Cannot reacquire a lock that is no longer owned: {self.name}", lock_name=self.name
+                )
+            self._schedule_expiry(self.timeout)
+        return True
+
+    def release(self) -> None:
+        with self._state_lock:
+            if self._expire_timer is not None:
+                self._expire_timer.cancel()
+                self._expire_timer = None
+            self._close_connection()
+
+    def __enter__(self):
+        if not self.acquire():
+            raise RuntimeError(f"Failed to acquire lock: {self.name}")
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.release()
+
+
 def main():
     """Main function to run all MysqlRedisClient tests"""
 
@@ -574,8 +1728,14 @@ def main():
 
             # Test 2: Pipeline functionality
             print("Test 2: Pipeline functionality")
-            pipeline = client.pipeline()
-            assert pipeline is client
+            with client.pipeline() as pipeline:
+                pipeline.setex("pipeline_key_1", 60, "v1")
+                pipeline.set("pipeline_key_2", "v2")
+                pipeline.expire("pipeline_key_2", 60)
+                pipeline.delete("pipeline_key_1")
+                assert pipeline.execute() == [True] * 4
+            assert client.get("pipeline_key_1") is None
+            assert client.get("pipeline_key_2") == b"v2"
             print("✓ Pipeline test passed")
 
             # Test 3: Get non-existent key
@@ -615,8 +1775,25 @@ def main():
             client.zadd("test_set", mapping2)
             card = client.zcard("test_set")
             assert card == 4
+            assert client.zremrangebyscore("test_set", "-inf", 2) == 2
+            assert client.zcard("test_set") == 2
+            client.expire("test_set", 60)
+            client.zadd("test_set", {"member5": 5.0})
+            assert client.zcard("test_set") == 3
             print("✓ Zadd update test passed")
 
+            # Test 7b: Hash functionality
+            print("Test 7b: Hash functionality")
+            client.hset("test_hash", "field1", "1")
+            client.hset("test_hash", mapping={"field2": "2", "field3": "3"})
+            assert client.hlen("test_hash") == 3
+            assert client.hgetall("test_hash")[b"field2"] == b"2"
+            assert client.hdel("test_hash", "field1", "field2") == 2
+            assert client.exists("test_hash", "test_set", "nonexistent_key") == 2
+            client.delete("test_hash")
+            assert client.hlen("test_hash") == 0
+            print("✓ Hash test passed")
+
             # Test 8: Background cleanup thread
             print("Test 8: Background cleanup thread")
             assert client._cleanup_thread is not None
@@ -654,11 +1831,49 @@ def main():
             new_lock.release()
             print("✓ Lock blocking functionality test passed")
 
+            # Test 10b: Table lock, the fallback when GET_LOCK is unavailable
+            print("Test 10b: Table lock")
+            table_client = MysqlRedisClient(test_db, lock_type="table")
+            lock = table_client.lock(lock_name, timeout=20)
+            assert lock.acquire(blocking=False) == True
+            assert table_client.lock(lock_name, timeout=20).acquire(blocking=False) == False
+            lock.release()
+            print("✓ Table lock test passed")
+
+            # Test 10c: Fencing tokens and extend
+            print("Test 10c: Fencing tokens and extend")
+            lock = client.lock(lock_name, timeout=1)
+            assert lock.acquire(blocking=False) == True
+            first_token = lock.fencing_token
+            assert lock.extend(5) == True
+            time.sleep(1.5)
+            assert lock.owned()
+            lock.release()
+            assert lock.acquire(blocking=False) == True
+            assert lock.fencing_token > first_token
+            lock.release()
+            print("✓ Fencing tokens and extend test passed")
+
+            # Test 11: In-process tier
+            print("Test 11: In-process tier")
+            l1_client = MysqlRedisClient(test_db, l1_max_size=16, l1_ttl=5)
+            l1_client.set("l1_key", "v1")
+            assert l1_client.get("l1_key") == b"v1"
+            assert l1_client.get("l1_key") == b"v1"
+            assert l1_client.local_cache_info()["hits"] == 1
+            l1_client.set("l1_key", "v2")
+            assert l1_client.get("l1_key") == b"v2"
+            l1_client.delete("l1_key")
+            assert l1_client.get("l1_key") is None
+            print("✓ In-process tier test passed")
+
             print("\n🎉 All MysqlRedisClient tests passed successfully!")
 
         finally:
             try:
                 client.db.session.query(Cache).delete()
+                client.db.session.query(CacheZset).delete()
+                client.db.session.query(CacheHash).delete()
                 client.db.session.commit()
                 print("✓ Test data cleanup completed")
             except Exception as e:
@@ -107,6 +107,7 @@ class RedisClientWrapper:
         def zremrangebyscore(self, name: str | bytes, min: float | str, max: float | str) -> Any: ...
         def zcard(self, name: str | bytes) -> Any: ...
         def getdel(self, name: str | bytes) -> Any: ...
+        def getex(self, name: str | bytes, ex: int | timedelta | None = None) -> Any: ...
 
     def __getattr__(self, item: str) -> Any:
         if self._client is None:
@@ -122,8 +123,30 @@ def init_app(app: DifyApp):
     global redis_client
 
     if "mysql" in dify_config.SQLALCHEMY_DATABASE_URI_SCHEME and dify_config.CACHE_SCHEME == "mysql":
-        from extensions.ext_mysql_redis import MysqlRedisClient
-        mysql_redis_client = MysqlRedisClient()
+        from extensions.ext_mysql_redis import CacheDatabase, MysqlRedisClient
+        mysql_redis_client = MysqlRedisClient(
+            meta_db=CacheDatabase(
+                dify_config.SQLALCHEMY_DATABASE_URI,
+                pool_size=dify_config.MYSQL_CACHE_POOL_SIZE,
+                max_overflow=dify_config.MYSQL_CACHE_MAX_OVERFLOW,
+                pool_timeout=dify_config.MYSQL_CACHE_POOL_TIMEOUT,
+                pool_recycle=dify_config.MYSQL_CACHE_POOL_RECYCLE,
+                pool_pre_ping=dify_config.SQLALCHEMY_POOL_PRE_PING,
+            ),
+            l1_max_size=dify_config.MYSQL_CACHE_L1_MAX_SIZE if dify_config.MYSQL_CACHE_L1_ENABLED else 0,
+            l1_ttl=dify_config.MYSQL_CACHE_L1_TTL,
+            write_behind_prefixes=[
+                prefix.strip()
+                for prefix in dify_config.MYSQL_CACHE_WRITE_BEHIND_KEY_PREFIXES.split(",")
+                if prefix.strip()
+            ],
+            write_behind_interval=dify_config.MYSQL_CACHE_WRITE_BEHIND_INTERVAL,
+            write_behind_max_pending=dify_config.MYSQL_CACHE_WRITE_BEHIND_MAX_PENDING,
+            lock_type=dify_config.MYSQL_CACHE_LOCK_TYPE,
+            sweep_interval=dify_config.MYSQL_CACHE_SWEEP_INTERVAL,
+            sweep_batch_size=dify_config.MYSQL_CACHE_SWEEP_BATCH_SIZE,
+            sweep_target_batch_time=dify_config.MYSQL_CACHE_SWEEP_TARGET_BATCH_TIME,
+        )
         mysql_redis_client.set_app(app)  # Set Flask app reference
         redis_client.initialize(mysql_redis_client)
         app.extensions["redis"] = redis_client
@@ -0,0 +1,34 @@
+"""add workflow app log search text
+
+Revision ID: 3e6a1f8b2c47
+Revises: 8d4f2b6a1c39
+Create Date: 2026-10-18 22:20:41.308257
+
+"""
+from alembic import op
+import models
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3e6a1f8b2c47'
+down_revision: str | None = '8d4f2b6a1c39'
+branch_labels: str | None = None
+depends_on: str | None = None
+
+
+def upgrade():
+    with op.batch_alter_table('workflow_app_logs', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('search_text', sa.Text(), nullable=True))
+        batch_op.create_index('workflow_app_log_app_created_at_idx', ['tenant_id', 'app_id', 'created_at'], unique=False)
+        batch_op.create_index(
+            'workflow_app_log_search_text_idx', ['search_text'], unique=False,
+            mysql_prefix='FULLTEXT', mysql_with_parser='ngram'
+        )
+
+
+def downgrade():
+    with op.batch_alter_table('workflow_app_logs', schema=None) as batch_op:
+        batch_op.drop_index('workflow_app_log_search_text_idx')
+        batch_op.drop_index('workflow_app_log_app_created_at_idx')
+        batch_op.drop_column('search_text')
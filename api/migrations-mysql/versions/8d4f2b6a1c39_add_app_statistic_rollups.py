@@ -0,0 +1,72 @@
+"""add app statistic rollups
+
+Revision ID: 8d4f2b6a1c39
+Revises: 5c3a8e1d9f27
+Create Date: 2026-10-18 21:50:17.604512
+
+"""
+from alembic import op
+import models
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8d4f2b6a1c39'
+down_revision: str | None = '5c3a8e1d9f27'
+branch_labels: str | None = None
+depends_on: str | None = None
+
+
+def upgrade():
+    op.create_table('app_statistic_hourly',
+    sa.Column('app_id', models.types.StringUUID(), nullable=False),
+    sa.Column('hour', sa.DateTime(), nullable=False),
+    sa.Column('message_count', sa.Integer(), server_default=sa.text('0'), nullable=False),
+    sa.Column('token_count', sa.BigInteger(), server_default=sa.text('0'), nullable=False),
+    sa.Column('answer_tokens', sa.BigInteger(), server_default=sa.text('0'), nullable=False),
+    sa.Column('total_price', sa.Numeric(precision=20, scale=7), server_default=sa.text('0'), nullable=False),
+    sa.Column('latency', sa.Float(), server_default=sa.text('0'), nullable=False),
+    sa.Column('like_count', sa.Integer(), server_default=sa.text('0'), nullable=False),
+    sa.Column('workflow_run_count', sa.Integer(), server_default=sa.text('0'), nullable=False),
+    sa.Column('workflow_token_count', sa.BigInteger(), server_default=sa.text('0'), nullable=False),
+    sa.PrimaryKeyConstraint('app_id', 'hour', name='app_statistic_hourly_pkey')
+    )
+    op.create_table('app_statistic_hourly_members',
+    sa.Column('app_id', models.types.StringUUID(), nullable=False),
+    sa.Column('kind', sa.String(length=20), nullable=False),
+    sa.Column('hour', sa.DateTime(), nullable=False),
+    sa.Column('member_id', models.types.StringUUID(), nullable=False),
+    sa.Column('count', sa.Integer(), server_default=sa.text('0'), nullable=False),
+    sa.PrimaryKeyConstraint('app_id', 'kind', 'hour', 'member_id', name='app_statistic_hourly_member_pkey')
+    )
+    op.create_table('app_statistic_dirty_hours',
+    sa.Column('app_id', models.types.StringUUID(), nullable=False),
+    sa.Column('hour', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('app_id', 'hour', name='app_statistic_dirty_hour_pkey')
+    )
+    # the rollup recomputes and replaces the rows of all apps of one hour at a time
+    with op.batch_alter_table('app_statistic_hourly', schema=None) as batch_op:
+        batch_op.create_index('app_statistic_hourly_hour_idx', ['hour'], unique=False)
+    with op.batch_alter_table('app_statistic_hourly_members', schema=None) as batch_op:
+        batch_op.create_index('app_statistic_hourly_member_hour_idx', ['hour'], unique=False)
+    with op.batch_alter_table('app_statistic_dirty_hours', schema=None) as batch_op:
+        batch_op.create_index('app_statistic_dirty_hour_hour_idx', ['hour'], unique=False)
+    # the rollup reads the workflow runs of all apps by hour
+    with op.batch_alter_table('workflow_runs', schema=None) as batch_op:
+        batch_op.create_index('workflow_run_created_at_idx', ['created_at'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('workflow_runs', schema=None) as batch_op:
+        batch_op.drop_index('workflow_run_created_at_idx')
+
+    with op.batch_alter_table('app_statistic_dirty_hours', schema=None) as batch_op:
+        batch_op.drop_index('app_statistic_dirty_hour_hour_idx')
+    with op.batch_alter_table('app_statistic_hourly_members', schema=None) as batch_op:
+        batch_op.drop_index('app_statistic_hourly_member_hour_idx')
+    with op.batch_alter_table('app_statistic_hourly', schema=None) as batch_op:
+        batch_op.drop_index('app_statistic_hourly_hour_idx')
+
+    op.drop_table('app_statistic_dirty_hours')
+    op.drop_table('app_statistic_hourly_members')
+    op.drop_table('app_statistic_hourly')
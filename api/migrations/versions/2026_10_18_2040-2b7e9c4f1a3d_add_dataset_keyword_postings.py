@@ -0,0 +1,36 @@
+"""add dataset keyword postings
+
+Revision ID: 2b7e9c4f1a3d
+Revises: 0e154742a5fa
+Create Date: 2026-10-18 20:40:12.512340
+
+"""
+
+from alembic import op
+import models as models
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '2b7e9c4f1a3d'
+down_revision = '0e154742a5fa'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('dataset_keyword_postings',
+    sa.Column('dataset_id', models.types.StringUUID(), nullable=False),
+    sa.Column('keyword', sa.String(length=255), nullable=False),
+    sa.Column('index_node_id', sa.String(length=255), nullable=False),
+    sa.PrimaryKeyConstraint('dataset_id', 'keyword', 'index_node_id', name='dataset_keyword_posting_pkey')
+    )
+    with op.batch_alter_table('dataset_keyword_postings', schema=None) as batch_op:
+        batch_op.create_index('dataset_keyword_posting_node_idx', ['dataset_id', 'index_node_id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('dataset_keyword_postings', schema=None) as batch_op:
+        batch_op.drop_index('dataset_keyword_posting_node_idx')
+
+    op.drop_table('dataset_keyword_postings')
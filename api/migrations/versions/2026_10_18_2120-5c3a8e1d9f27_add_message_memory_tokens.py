@@ -0,0 +1,30 @@
+"""add message memory tokens
+
+Revision ID: 5c3a8e1d9f27
+Revises: 2b7e9c4f1a3d
+Create Date: 2026-10-18 21:20:41.208315
+
+"""
+
+from alembic import op
+import models as models
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5c3a8e1d9f27'
+down_revision = '2b7e9c4f1a3d'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('messages', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('memory_query_tokens', sa.Integer(), nullable=True))
+        batch_op.add_column(sa.Column('memory_answer_tokens', sa.Integer(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('messages', schema=None) as batch_op:
+        batch_op.drop_column('memory_answer_tokens')
+        batch_op.drop_column('memory_query_tokens')
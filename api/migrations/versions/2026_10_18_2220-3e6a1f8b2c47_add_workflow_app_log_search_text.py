@@ -0,0 +1,37 @@
+"""add workflow app log search text
+
+Revision ID: 3e6a1f8b2c47
+Revises: 8d4f2b6a1c39
+Create Date: 2026-10-18 22:20:41.308257
+
+"""
+
+from alembic import op
+import models as models
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3e6a1f8b2c47'
+down_revision = '8d4f2b6a1c39'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # pg_trgm is a trusted extension, the owner of the database can create it
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm;')
+    with op.batch_alter_table('workflow_app_logs', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('search_text', sa.Text(), nullable=True))
+        batch_op.create_index('workflow_app_log_app_created_at_idx', ['tenant_id', 'app_id', 'created_at'], unique=False)
+        batch_op.create_index(
+            'workflow_app_log_search_text_idx', ['search_text'], unique=False,
+            postgresql_using='gin', postgresql_ops={'search_text': 'gin_trgm_ops'}
+        )
+
+
+def downgrade():
+    with op.batch_alter_table('workflow_app_logs', schema=None) as batch_op:
+        batch_op.drop_index('workflow_app_log_search_text_idx', postgresql_using='gin')
+        batch_op.drop_index('workflow_app_log_app_created_at_idx')
+        batch_op.drop_column('search_text')
@@ -13,6 +13,7 @@ from .dataset import (
     AppDatasetJoin,
     Dataset,
     DatasetCollectionBinding,
+    DatasetKeywordPosting,
     DatasetKeywordTable,
     DatasetPermission,
     DatasetPermissionEnum,
@@ -37,6 +38,10 @@ from .model import (
     AppMCPServer,
     AppMode,
     AppModelConfig,
+    AppStatisticDirtyHour,
+    AppStatisticHourly,
+    AppStatisticHourlyMember,
+    AppStatisticMemberKind,
     Conversation,
     DatasetRetrieverResource,
     DifySetup,
@@ -107,6 +112,10 @@ __all__ = [
     "AppMCPServer",  # Added
     "AppMode",
     "AppModelConfig",
+    "AppStatisticDirtyHour",
+    "AppStatisticHourly",
+    "AppStatisticHourlyMember",
+    "AppStatisticMemberKind",
     "BuiltinToolProvider",
     "CeleryTask",
     "CeleryTaskSet",
@@ -117,6 +126,7 @@ __all__ = [
     "DataSourceOauthBinding",
     "Dataset",
     "DatasetCollectionBinding",
+    "DatasetKeywordPosting",
     "DatasetKeywordTable",
     "DatasetPermission",
     "DatasetPermissionEnum",
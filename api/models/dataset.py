@@ -12,6 +12,7 @@ from datetime import datetime
 from json import JSONDecodeError
 from typing import Any, Optional, cast
 
+import numpy as np
 import sqlalchemy as sa
 from sqlalchemy import DateTime, String, func, select
 from sqlalchemy.dialects.postgresql import JSONB
@@ -32,6 +33,7 @@ from .types import (
     adjusted_json_index,
     adjusted_jsonb,
     adjusted_text,
+    binary_string,
     no_length_string,
     uuid_default,
     varchar_default,
@@ -917,6 +919,9 @@ class DatasetKeywordTable(Base):
             return None
         if self.data_source_type == "database":
             return json.loads(self.keyword_table, cls=SetDecoder) if self.keyword_table else None
+        elif self.data_source_type == "posting":
+            # stored as DatasetKeywordPosting rows
+            return None
         else:
             file_key = "keyword_files/" + dataset.tenant_id + "/" + self.dataset_id + ".txt"
             try:
@@ -929,6 +934,30 @@ class DatasetKeywordTable(Base):
                 return None
 
 
+class DatasetKeywordPosting(Base):
+    """
+    One row per (keyword, segment) of a dataset's jieba keyword index.
+
+    Used instead of the JSON keyword table when the dataset's `DatasetKeywordTable.data_source_type` is
+    "posting", so searches only read the postings of the query keywords and index updates only touch
+    the postings of the changed segments.
+    """
+
+    __tablename__ = "dataset_keyword_postings"
+    __table_args__ = (
+        sa.PrimaryKeyConstraint("dataset_id", "keyword", "index_node_id", name="dataset_keyword_posting_pkey"),
+        sa.Index("dataset_keyword_posting_node_idx", "dataset_id", "index_node_id"),
+    )
+
+    # keywords longer than this are truncated, both when indexing and when searching
+    MAX_KEYWORD_LENGTH = 255
+
+    dataset_id = mapped_column(StringUUID, nullable=False)
+    # keywords are matched exactly, "Apple" and "apple" are different postings
+    keyword = mapped_column(binary_string(MAX_KEYWORD_LENGTH), nullable=False)
+    index_node_id = mapped_column(String(255), nullable=False)
+
+
 class Embedding(Base):
     __tablename__ = "embeddings"
     __table_args__ = (
@@ -946,11 +975,27 @@ class Embedding(Base):
     created_at = mapped_column(DateTime, nullable=False, server_default=func.current_timestamp())
     provider_name = mapped_column(String(255), nullable=False, **varchar_default(""))
 
+    # Vectors are stored as little-endian float32 behind this marker. Rows written before carry a pickled
+    # list of floats, pickle protocol 2+ always starts with b"\x80" so both formats can be told apart.
+    FLOAT32_EMBEDDING_PREFIX = b"f32:"
+
     def set_embedding(self, embedding_data: list[float]):
-        self.embedding = pickle.dumps(embedding_data, protocol=pickle.HIGHEST_PROTOCOL)
+        self.embedding = self.encode_embedding(embedding_data)
 
     def get_embedding(self) -> list[float]:
-        return cast(list[float], pickle.loads(self.embedding))  # noqa: S301
+        return self.decode_embedding(self.embedding)
+
+    @classmethod
+    def encode_embedding(cls, embedding_data: list[float]) -> bytes:
+        return cls.FLOAT32_EMBEDDING_PREFIX + np.asarray(embedding_data, dtype="<f4").tobytes()
+
+    @classmethod
+    def decode_embedding(cls, data: bytes) -> list[float]:
+        if data.startswith(cls.FLOAT32_EMBEDDING_PREFIX):
+            return cast(
+                list[float], np.frombuffer(data, dtype="<f4", offset=len(cls.FLOAT32_EMBEDDING_PREFIX)).tolist()
+            )
+        return cast(list[float], pickle.loads(data))  # noqa: S301
 
 
 class DatasetCollectionBinding(Base):
@@ -908,6 +908,9 @@ class Message(Base):
     answer_tokens: Mapped[int] = mapped_column(sa.Integer, nullable=False, server_default=db.text("0"))
     answer_unit_price = mapped_column(sa.Numeric(10, 4), nullable=False)
     answer_price_unit = mapped_column(sa.Numeric(10, 7), nullable=False, server_default=db.text("0.001"))
+    # local token counts of query and answer as conversation memory, see TokenBufferMemory
+    memory_query_tokens: Mapped[Optional[int]] = mapped_column(sa.Integer, nullable=True)
+    memory_answer_tokens: Mapped[Optional[int]] = mapped_column(sa.Integer, nullable=True)
     parent_message_id = mapped_column(StringUUID, nullable=True)
     provider_response_latency = mapped_column(sa.Float, nullable=False, server_default=db.text("0"))
     total_price = mapped_column(sa.Numeric(10, 7))
@@ -1862,3 +1865,72 @@ class TraceAppConfig(Base):
             "created_at": str(self.created_at) if self.created_at else None,
             "updated_at": str(self.updated_at) if self.updated_at else None,
         }
+
+
+class AppStatisticHourly(Base):
+    """
+    Per-app totals of the messages and workflow app runs created in one UTC hour, maintained by
+    `AppStatisticService` so the statistics dashboards read a few rows per app and day instead of every message.
+    """
+
+    __tablename__ = "app_statistic_hourly"
+    __table_args__ = (
+        sa.PrimaryKeyConstraint("app_id", "hour", name="app_statistic_hourly_pkey"),
+        sa.Index("app_statistic_hourly_hour_idx", "hour"),
+    )
+
+    app_id = mapped_column(StringUUID, nullable=False)
+    hour = mapped_column(sa.DateTime, nullable=False)
+    message_count: Mapped[int] = mapped_column(sa.Integer, nullable=False, server_default=sa.text("0"))
+    # message_tokens + answer_tokens of the messages
+    token_count: Mapped[int] = mapped_column(sa.BigInteger, nullable=False, server_default=sa.text("0"))
+    answer_tokens: Mapped[int] = mapped_column(sa.BigInteger, nullable=False, server_default=sa.text("0"))
+    total_price = mapped_column(sa.Numeric(20, 7), nullable=False, server_default=sa.text("0"))
+    # sum of provider_response_latency of the messages
+    latency: Mapped[float] = mapped_column(sa.Float, nullable=False, server_default=sa.text("0"))
+    like_count: Mapped[int] = mapped_column(sa.Integer, nullable=False, server_default=sa.text("0"))
+    workflow_run_count: Mapped[int] = mapped_column(sa.Integer, nullable=False, server_default=sa.text("0"))
+    workflow_token_count: Mapped[int] = mapped_column(sa.BigInteger, nullable=False, server_default=sa.text("0"))
+
+
+class AppStatisticMemberKind(StrEnum):
+    # conversations with non-debugger messages in the hour, counted by message
+    CONVERSATION = "conversation"
+    # end users who sent messages in the hour, counted by message
+    END_USER = "end_user"
+    # creators of workflow app runs in the hour, counted by run
+    WORKFLOW_USER = "workflow_user"
+    # conversations created in the hour, counted by all of their messages
+    SESSION = "session"
+
+
+class AppStatisticHourlyMember(Base):
+    """
+    The distinct members behind the distinct-count statistics of an app's hour, one row per member with the
+    number of its messages or runs, so daily distinct counts can still be taken across the hours of any timezone.
+    """
+
+    __tablename__ = "app_statistic_hourly_members"
+    __table_args__ = (
+        sa.PrimaryKeyConstraint("app_id", "kind", "hour", "member_id", name="app_statistic_hourly_member_pkey"),
+        sa.Index("app_statistic_hourly_member_hour_idx", "hour"),
+    )
+
+    app_id = mapped_column(StringUUID, nullable=False)
+    kind: Mapped[str] = mapped_column(String(20), nullable=False)
+    hour = mapped_column(sa.DateTime, nullable=False)
+    member_id = mapped_column(StringUUID, nullable=False)
+    count: Mapped[int] = mapped_column(sa.Integer, nullable=False, server_default=sa.text("0"))
+
+
+class AppStatisticDirtyHour(Base):
+    """An app's hour whose rollups changed after the rollup task last recomputed it, e.g. by late feedback."""
+
+    __tablename__ = "app_statistic_dirty_hours"
+    __table_args__ = (
+        sa.PrimaryKeyConstraint("app_id", "hour", name="app_statistic_dirty_hour_pkey"),
+        sa.Index("app_statistic_dirty_hour_hour_idx", "hour"),
+    )
+
+    app_id = mapped_column(StringUUID, nullable=False)
+    hour = mapped_column(sa.DateTime, nullable=False)
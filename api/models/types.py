@@ -58,6 +58,17 @@ def adjusted_json_index(index_name, column_name):
         return None
 
 
+def adjusted_fulltext_index(index_name, column_name):
+    if dify_config.SQLALCHEMY_DATABASE_URI_SCHEME == "postgresql":
+        # trigrams keep the substring semantics of ILIKE, also for text without spaces
+        return db.Index(
+            index_name, column_name, postgresql_using="gin", postgresql_ops={column_name: "gin_trgm_ops"}
+        )
+    else:
+        # the ngram parser also splits text without spaces, e.g. Chinese, into searchable tokens
+        return db.Index(index_name, column_name, mysql_prefix="FULLTEXT", mysql_with_parser="ngram")
+
+
 def no_length_string():
     if "mysql" in dify_config.SQLALCHEMY_DATABASE_URI_SCHEME:
         return db.String(255)
@@ -65,6 +76,14 @@ def no_length_string():
         return db.String
 
 
+def binary_string(length):
+    if "mysql" in dify_config.SQLALCHEMY_DATABASE_URI_SCHEME:
+        # the default collation of MySQL compares case- and accent-insensitively
+        return mysql.VARCHAR(length, collation="utf8mb4_bin")
+    else:
+        return db.String(length)
+
+
 def adjusted_text():
     if "mysql" in dify_config.SQLALCHEMY_DATABASE_URI_SCHEME:
         return mysql.LONGTEXT
@@ -36,7 +36,7 @@ from .account import Account
 from .base import Base
 from .engine import db
 from .enums import CreatorUserRole, DraftVariableType
-from .types import EnumText, StringUUID, adjusted_text, no_length_string, uuid_default
+from .types import EnumText, StringUUID, adjusted_fulltext_index, adjusted_text, no_length_string, uuid_default
 
 logger = logging.getLogger(__name__)
 
@@ -491,6 +491,7 @@ class WorkflowRun(Base):
     __table_args__ = (
         sa.PrimaryKeyConstraint("id", name="workflow_run_pkey"),
         sa.Index("workflow_run_triggerd_from_idx", "tenant_id", "app_id", "triggered_from"),
+        sa.Index("workflow_run_created_at_idx", "created_at"),
     )
 
     id: Mapped[str] = mapped_column(StringUUID, **uuid_default())
@@ -828,12 +829,15 @@ class WorkflowAppLog(Base):
 
     - created_by (uuid) Creator ID, depends on the user table according to created_by_role
     - created_at (timestamp) Creation time
+    - search_text (text) Text of the run inputs and outputs and the end user session ID, matched by keyword search
     """
 
     __tablename__ = "workflow_app_logs"
     __table_args__ = (
         sa.PrimaryKeyConstraint("id", name="workflow_app_log_pkey"),
         sa.Index("workflow_app_log_app_idx", "tenant_id", "app_id"),
+        sa.Index("workflow_app_log_app_created_at_idx", "tenant_id", "app_id", "created_at"),
+        adjusted_fulltext_index("workflow_app_log_search_text_idx", "search_text"),
     )
 
     id: Mapped[str] = mapped_column(StringUUID, **uuid_default())
@@ -845,6 +849,7 @@ class WorkflowAppLog(Base):
     created_by_role: Mapped[str] = mapped_column(String(255), nullable=False)
     created_by: Mapped[str] = mapped_column(StringUUID, nullable=False)
     created_at: Mapped[datetime] = mapped_column(DateTime, nullable=False, server_default=func.current_timestamp())
+    search_text: Mapped[Optional[str]] = mapped_column(sa.Text, nullable=True, deferred=True)
 
     @property
     def workflow_run(self):
@@ -0,0 +1,35 @@
+import logging
+import time
+
+import click
+
+import app
+from extensions.ext_redis import redis_client
+from services.app_statistic_service import ROLLUP_LOCK_KEY, AppStatisticService
+
+logger = logging.getLogger(__name__)
+
+
+@app.celery.task(queue="dataset")
+def app_statistics_rollup_task():
+    """Recompute the hourly app statistics rollups of the recent hours"""
+    lock = redis_client.lock(ROLLUP_LOCK_KEY, timeout=3600)
+    if not lock.acquire(blocking=False):
+        # the previous run or a backfill is still going, the next run catches up
+        logger.info("App statistics rollup is already running, skip")
+        return
+
+    click.echo(click.style("Start app statistics rollup.", fg="green"))
+    start_at = time.perf_counter()
+    try:
+        hours = AppStatisticService.rollup_recent_hours()
+    except Exception:
+        logger.exception("App statistics rollup failed")
+        return
+    finally:
+        lock.release()
+
+    end_at = time.perf_counter()
+    click.echo(
+        click.style(f"App statistics rollup of {hours} hours done, latency: {end_at - start_at:.2f}s", fg="green")
+    )
@@ -1,9 +1,8 @@
 import datetime
 import logging
-import time
 
 import click
-from sqlalchemy.exc import SQLAlchemyError
+import sqlalchemy as sa
 
 import app
 from configs import dify_config
@@ -20,70 +19,57 @@ from models.model import (
 )
 from models.web import SavedMessage
 from services.feature_service import FeatureService
+from services.retention_engine import RetentionEngine
 
 logger = logging.getLogger(__name__)
 
+# the rows referencing an expired message, deleted before the message itself
+MESSAGE_RELATED_COLUMNS = (
+    MessageFeedback.message_id,
+    MessageAnnotation.message_id,
+    MessageChain.message_id,
+    MessageAgentThought.message_id,
+    MessageFile.message_id,
+    SavedMessage.message_id,
+)
+
+
+def _get_plan(tenant_id: str) -> str:
+    features_cache_key = f"features:{tenant_id}"
+    plan_cache = redis_client.get(features_cache_key)
+    if plan_cache is None:
+        features = FeatureService.get_features(tenant_id)
+        redis_client.setex(features_cache_key, 600, features.billing.subscription.plan)
+        return features.billing.subscription.plan
+    return plan_cache.decode()
+
 
 @app.celery.task(queue="dataset")
 def clean_messages():
     click.echo(click.style("Start clean messages.", fg="green"))
-    start_at = time.perf_counter()
     plan_sandbox_clean_message_day = datetime.datetime.now() - datetime.timedelta(
         days=dify_config.PLAN_SANDBOX_CLEAN_MESSAGE_DAY_SETTING
     )
-    while True:
-        try:
-            # Main query with join and filter
-            messages = (
-                db.session.query(Message)
-                .where(Message.created_at < plan_sandbox_clean_message_day)
-                .order_by(Message.created_at.desc())
-                .limit(100)
-                .all()
+    engine = RetentionEngine("messages")
+    app_tenants: dict[str, str] = {}
+    missing_app_ids: set[str] = set()
+    for messages in engine.iter_batches(
+        Message.id, Message.created_at, plan_sandbox_clean_message_day, columns=(Message.app_id,)
+    ):
+        unknown_app_ids = {message.app_id for message in messages} - app_tenants.keys() - missing_app_ids
+        if unknown_app_ids:
+            app_tenants.update(
+                db.session.execute(sa.select(App.id, App.tenant_id).where(App.id.in_(unknown_app_ids))).tuples()
             )
+            for app_id in unknown_app_ids - app_tenants.keys():
+                logger.warning("Expected App record to exist, but none was found, app_id=%s", app_id)
+                missing_app_ids.add(app_id)
 
-        except SQLAlchemyError:
-            raise
-        if not messages:
-            break
-        for message in messages:
-            app = db.session.query(App).filter_by(id=message.app_id).first()
-            if not app:
-                logger.warning(
-                    "Expected App record to exist, but none was found, app_id=%s, message_id=%s",
-                    message.app_id,
-                    message.id,
-                )
-                continue
-            features_cache_key = f"features:{app.tenant_id}"
-            plan_cache = redis_client.get(features_cache_key)
-            if plan_cache is None:
-                features = FeatureService.get_features(app.tenant_id)
-                redis_client.setex(features_cache_key, 600, features.billing.subscription.plan)
-                plan = features.billing.subscription.plan
-            else:
-                plan = plan_cache.decode()
-            if plan == "sandbox":
-                # clean related message
-                db.session.query(MessageFeedback).where(MessageFeedback.message_id == message.id).delete(
-                    synchronize_session=False
-                )
-                db.session.query(MessageAnnotation).where(MessageAnnotation.message_id == message.id).delete(
-                    synchronize_session=False
-                )
-                db.session.query(MessageChain).where(MessageChain.message_id == message.id).delete(
-                    synchronize_session=False
-                )
-                db.session.query(MessageAgentThought).where(MessageAgentThought.message_id == message.id).delete(
-                    synchronize_session=False
-                )
-                db.session.query(MessageFile).where(MessageFile.message_id == message.id).delete(
-                    synchronize_session=False
-                )
-                db.session.query(SavedMessage).where(SavedMessage.message_id == message.id).delete(
-                    synchronize_session=False
-                )
-                db.session.query(Message).where(Message.id == message.id).delete()
-                db.session.commit()
-    end_at = time.perf_counter()
-    click.echo(click.style(f"Cleaned messages from db success latency: {end_at - start_at}", fg="green"))
+        # only messages of sandbox tenants expire
+        message_ids = [
+            message.id
+            for message in messages
+            if message.app_id in app_tenants and _get_plan(app_tenants[message.app_id]) == "sandbox"
+        ]
+        engine.delete_batch(Message.id, message_ids, MESSAGE_RELATED_COLUMNS)
+    engine.report(final=True)
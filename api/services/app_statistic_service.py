@@ -0,0 +1,523 @@
+import logging
+from collections import defaultdict
+from collections.abc import Iterator, Sequence
+from datetime import UTC, datetime, timedelta
+from enum import StrEnum
+from types import SimpleNamespace
+from typing import Any, Optional
+
+import sqlalchemy as sa
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+from configs import dify_config
+from core.app.entities.app_invoke_entities import InvokeFrom
+from extensions.ext_database import db
+from extensions.ext_redis import redis_client
+from libs.datetime_utils import naive_utc_now
+from libs.helper import convert_datetime_to_date
+from models.enums import WorkflowRunTriggeredFrom
+from models.model import (
+    AppStatisticDirtyHour,
+    AppStatisticHourly,
+    AppStatisticHourlyMember,
+    AppStatisticMemberKind,
+    Conversation,
+    Message,
+    MessageFeedback,
+)
+from models.workflow import WorkflowRun
+
+logger = logging.getLogger(__name__)
+
+# the rollups cover the hours in [from, until), "from" is the epoch once the whole history was rolled up
+ROLLUP_FROM_KEY = "app_statistics_rollup:from"
+ROLLUP_UNTIL_KEY = "app_statistics_rollup:until"
+ROLLUP_LOCK_KEY = "app_statistics_rollup:lock"
+ROLLUP_EPOCH = datetime(1970, 1, 1)
+
+ROLLUP_INSERT_BATCH_SIZE = 1000
+
+
+class DailyStatistic(StrEnum):
+    MESSAGES = "messages"
+    CONVERSATIONS = "conversations"
+    END_USERS = "end_users"
+    TOKEN_COSTS = "token_costs"
+    AVERAGE_SESSION_INTERACTIONS = "average_session_interactions"
+    USER_SATISFACTION_RATE = "user_satisfaction_rate"
+    AVERAGE_RESPONSE_TIME = "average_response_time"
+    TOKENS_PER_SECOND = "tokens_per_second"
+    WORKFLOW_RUNS = "workflow_runs"
+    WORKFLOW_TERMINALS = "workflow_terminals"
+    WORKFLOW_TOKEN_COSTS = "workflow_token_costs"
+    WORKFLOW_AVERAGE_INTERACTIONS = "workflow_average_interactions"
+
+
+# Every source is the rollup rows of the covered hours plus the raw rows of the uncovered head and tail of the
+# range, with the same columns. {date} is the date of the row in the timezone of the account, {range} the
+# condition on its time column.
+_MESSAGE_TOTALS_ROLLUP = """SELECT {date} AS date, message_count, token_count, answer_tokens, total_price, latency,
+    like_count
+FROM app_statistic_hourly
+WHERE app_id = :app_id AND message_count > 0 AND {range}"""
+_MESSAGE_TOTALS_RAW = """SELECT {date} AS date, 1 AS message_count,
+    messages.message_tokens + messages.answer_tokens AS token_count, messages.answer_tokens, messages.total_price,
+    messages.provider_response_latency AS latency,
+    (SELECT COUNT(mf.id) FROM message_feedbacks mf WHERE mf.message_id = messages.id AND mf.rating = 'like')
+        AS like_count
+FROM messages
+WHERE messages.app_id = :app_id AND {range}"""
+
+_WORKFLOW_TOTALS_ROLLUP = """SELECT {date} AS date, workflow_run_count AS runs, workflow_token_count AS token_count
+FROM app_statistic_hourly
+WHERE app_id = :app_id AND workflow_run_count > 0 AND {range}"""
+_WORKFLOW_TOTALS_RAW = """SELECT {date} AS date, 1 AS runs, total_tokens AS token_count
+FROM workflow_runs
+WHERE app_id = :app_id AND triggered_from = :triggered_from AND {range}"""
+
+_MEMBERS_ROLLUP = """SELECT {date} AS date, member_id, count
+FROM app_statistic_hourly_members
+WHERE app_id = :app_id AND kind = :kind AND {range}"""
+_MEMBERS_RAW = {
+    AppStatisticMemberKind.CONVERSATION: """SELECT {date} AS date, conversation_id AS member_id, 1 AS count
+FROM messages
+WHERE app_id = :app_id AND invoke_from != :debugger AND {range}""",
+    AppStatisticMemberKind.END_USER: """SELECT {date} AS date, from_end_user_id AS member_id, 1 AS count
+FROM messages
+WHERE app_id = :app_id AND from_end_user_id IS NOT NULL AND {range}""",
+    AppStatisticMemberKind.WORKFLOW_USER: """SELECT {date} AS date, created_by AS member_id, 1 AS count
+FROM workflow_runs
+WHERE app_id = :app_id AND triggered_from = :triggered_from AND {range}""",
+    AppStatisticMemberKind.SESSION: """SELECT {date} AS date, c.id AS member_id, COUNT(m.id) AS count
+FROM conversations c
+JOIN messages m ON c.id = m.conversation_id
+WHERE c.app_id = :app_id AND {range}
+GROUP BY c.id, c.created_at""",
+}
+_MEMBERS_RAW_TIME_COLUMN = {AppStatisticMemberKind.SESSION: "c.created_at"}
+
+
+def _summed(columns: str) -> str:
+    return f"SELECT date, {columns} FROM ({{source}}) t GROUP BY date ORDER BY date"
+
+
+# statistic -> (source, member kind of member sources, query over the source, integer columns of the result)
+_STATISTICS: dict[DailyStatistic, tuple[str, Optional[AppStatisticMemberKind], str, tuple[str, ...]]] = {
+    DailyStatistic.MESSAGES: (
+        "message_totals",
+        None,
+        _summed("SUM(message_count) AS message_count"),
+        ("message_count",),
+    ),
+    DailyStatistic.TOKEN_COSTS: (
+        "message_totals",
+        None,
+        _summed("SUM(token_count) AS token_count, SUM(total_price) AS total_price"),
+        ("token_count",),
+    ),
+    DailyStatistic.USER_SATISFACTION_RATE: (
+        "message_totals",
+        None,
+        _summed("SUM(message_count) AS message_count, SUM(like_count) AS feedback_count"),
+        ("message_count", "feedback_count"),
+    ),
+    DailyStatistic.AVERAGE_RESPONSE_TIME: (
+        "message_totals",
+        None,
+        _summed("SUM(latency) / SUM(message_count) AS latency"),
+        (),
+    ),
+    DailyStatistic.TOKENS_PER_SECOND: (
+        "message_totals",
+        None,
+        _summed("CASE WHEN SUM(latency) = 0 THEN 0 ELSE SUM(answer_tokens) / SUM(latency) END AS tokens_per_second"),
+        (),
+    ),
+    DailyStatistic.CONVERSATIONS: (
+        "members",
+        AppStatisticMemberKind.CONVERSATION,
+        _summed("COUNT(DISTINCT member_id) AS conversation_count"),
+        ("conversation_count",),
+    ),
+    DailyStatistic.END_USERS: (
+        "members",
+        AppStatisticMemberKind.END_USER,
+        _summed("COUNT(DISTINCT member_id) AS terminal_count"),
+        ("terminal_count",),
+    ),
+    DailyStatistic.AVERAGE_SESSION_INTERACTIONS: (
+        "members",
+        AppStatisticMemberKind.SESSION,
+        _summed("AVG(count) AS interactions"),
+        (),
+    ),
+    DailyStatistic.WORKFLOW_RUNS: (
+        "workflow_totals",
+        None,
+        _summed("SUM(runs) AS runs"),
+        ("runs",),
+    ),
+    DailyStatistic.WORKFLOW_TOKEN_COSTS: (
+        "workflow_totals",
+        None,
+        _summed("SUM(token_count) AS token_count"),
+        ("token_count",),
+    ),
+    DailyStatistic.WORKFLOW_TERMINALS: (
+        "members",
+        AppStatisticMemberKind.WORKFLOW_USER,
+        _summed("COUNT(DISTINCT member_id) AS terminal_count"),
+        ("terminal_count",),
+    ),
+    DailyStatistic.WORKFLOW_AVERAGE_INTERACTIONS: (
+        "members",
+        AppStatisticMemberKind.WORKFLOW_USER,
+        """SELECT date, AVG(interactions) AS interactions
+FROM (SELECT date, member_id, SUM(count) AS interactions FROM ({source}) t GROUP BY date, member_id) sub
+GROUP BY date ORDER BY date""",
+        (),
+    ),
+}
+
+
+def _floor_hour(value: datetime) -> datetime:
+    return value.replace(minute=0, second=0, microsecond=0)
+
+
+def _ceil_hour(value: datetime) -> datetime:
+    hour = _floor_hour(value)
+    return hour if hour == value else hour + timedelta(hours=1)
+
+
+def _hours(start: datetime, end: datetime) -> Iterator[datetime]:
+    hour = start
+    while hour < end:
+        yield hour
+        hour += timedelta(hours=1)
+
+
+def _to_naive_utc(value: Optional[datetime]) -> Optional[datetime]:
+    if value is None or value.tzinfo is None:
+        return value
+    return value.astimezone(UTC).replace(tzinfo=None)
+
+
+def _range_condition(column: str, name: str, start: datetime, end: Optional[datetime], params: dict) -> str:
+    params[f"{name}_start"] = start
+    condition = f"{column} >= :{name}_start"
+    if end is not None:
+        params[f"{name}_end"] = end
+        condition += f" AND {column} < :{name}_end"
+    return condition
+
+
+class AppStatisticService:
+    """
+    Hourly per-app rollups of the app statistics.
+
+    The rollup task recomputes the recent hours of all apps from messages, conversations and workflow runs, so the
+    dashboards read the rollups for the covered hours and only scan the raw rows of the hours after the last run.
+    Rollup hours are UTC hours, the dashboards convert them to the dates of the account's timezone when reading.
+    """
+
+    @classmethod
+    def get_daily_statistic(
+        cls,
+        statistic: DailyStatistic,
+        app_id: str,
+        timezone: str,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+    ) -> Optional[Sequence[Any]]:
+        """
+        Get a daily app statistic with the columns of the query on the raw tables, or None when the rollups are
+        disabled or do not cover the range, in which case the caller should run that query.
+
+        :param start: start of the range, inclusive
+        :param end: end of the range, exclusive
+        """
+        if not dify_config.ENABLE_APP_STATISTICS_ROLLUP_TASK:
+            return None
+
+        segments = cls._get_segments(_to_naive_utc(start), _to_naive_utc(end))
+        if segments is None:
+            return None
+        (rollup_start, rollup_end), raw_ranges = segments
+
+        source_name, kind, query, int_columns = _STATISTICS[statistic]
+        params: dict[str, Any] = {
+            "app_id": app_id,
+            "tz": timezone,
+            "debugger": InvokeFrom.DEBUGGER.value,
+            "triggered_from": WorkflowRunTriggeredFrom.APP_RUN.value,
+        }
+        if source_name == "message_totals":
+            rollup_sql, raw_sql, raw_time_column = _MESSAGE_TOTALS_ROLLUP, _MESSAGE_TOTALS_RAW, "messages.created_at"
+        elif source_name == "workflow_totals":
+            rollup_sql, raw_sql, raw_time_column = _WORKFLOW_TOTALS_ROLLUP, _WORKFLOW_TOTALS_RAW, "created_at"
+        else:
+            assert kind is not None
+            params["kind"] = kind.value
+            rollup_sql, raw_sql = _MEMBERS_ROLLUP, _MEMBERS_RAW[kind]
+            raw_time_column = _MEMBERS_RAW_TIME_COLUMN.get(kind, "created_at")
+
+        selects = [
+            rollup_sql.format(
+                date=convert_datetime_to_date("hour"),
+                range=_range_condition("hour", "rollup", rollup_start, rollup_end, params),
+            )
+        ]
+        for i, (raw_start, raw_end) in enumerate(raw_ranges):
+            selects.append(
+                raw_sql.format(
+                    date=convert_datetime_to_date(raw_time_column),
+                    range=_range_condition(raw_time_column, f"raw{i}", raw_start, raw_end, params),
+                )
+            )
+        sql_query = query.format(source="\nUNION ALL\n".join(selects))
+
+        with db.engine.begin() as conn:
+            rows = conn.execute(sa.text(sql_query), params).all()
+
+        # SUM and COUNT return decimals on some databases, keep the integers of the raw queries
+        return [
+            SimpleNamespace(
+                **{
+                    key: int(value) if key in int_columns and value is not None else value
+                    for key, value in row._mapping.items()
+                }
+            )
+            for row in rows
+        ]
+
+    @classmethod
+    def _get_segments(
+        cls, start: Optional[datetime], end: Optional[datetime]
+    ) -> Optional[tuple[tuple[datetime, datetime], list[tuple[datetime, Optional[datetime]]]]]:
+        """
+        Split [start, end) into the hours read from the rollups and the head and tail read from the raw tables,
+        None when the rollups do not cover the start of the range.
+        """
+        rollup_from = cls._get_watermark(ROLLUP_FROM_KEY)
+        rollup_until = cls._get_watermark(ROLLUP_UNTIL_KEY)
+        if rollup_from is None or rollup_until is None:
+            return None
+
+        if start is None:
+            if rollup_from != ROLLUP_EPOCH:
+                return None
+            rollup_start = rollup_from
+        else:
+            rollup_start = _ceil_hour(start)
+            if rollup_start < rollup_from:
+                return None
+        rollup_end = min(rollup_until, _floor_hour(end)) if end is not None else rollup_until
+        if rollup_start >= rollup_end:
+            # shorter than an hour or after the last rollup, scanning the raw rows is cheap
+            return None
+
+        raw_ranges: list[tuple[datetime, Optional[datetime]]] = []
+        if start is not None and start < rollup_start:
+            raw_ranges.append((start, rollup_start))
+        if end is None or rollup_end < end:
+            raw_ranges.append((rollup_end, end))
+        return (rollup_start, rollup_end), raw_ranges
+
+    @classmethod
+    def rollup_recent_hours(cls) -> int:
+        """
+        Recompute the hours since the last run, the APP_STATISTICS_ROLLUP_LAG hours before it and the dirty hours,
+        then move the watermark to the current hour. Returns the number of recomputed hours.
+        """
+        now_hour = _floor_hour(naive_utc_now())
+        until = cls._get_watermark(ROLLUP_UNTIL_KEY) or now_hour
+        start = min(until, now_hour) - timedelta(hours=dify_config.APP_STATISTICS_ROLLUP_LAG)
+
+        dirty_hours = cls._get_dirty_hours(start, now_hour)
+        count = 0
+        for hour in _hours(start, now_hour):
+            cls.rollup_hour(hour)
+            count += 1
+        for hour, app_ids in sorted(dirty_hours.items()):
+            cls.rollup_hour(hour, sorted(app_ids))
+            count += 1
+
+        redis_client.set(ROLLUP_UNTIL_KEY, now_hour.isoformat())
+        if cls._get_watermark(ROLLUP_FROM_KEY) is None:
+            redis_client.set(ROLLUP_FROM_KEY, start.isoformat())
+        return count
+
+    @classmethod
+    def rollup_history(cls, start: Optional[datetime] = None) -> int:
+        """
+        Backfill the rollups from start, or from the first message or workflow run, until the watermark.
+        Returns the number of recomputed hours.
+        """
+        until = cls._get_watermark(ROLLUP_UNTIL_KEY) or _floor_hour(naive_utc_now())
+        if start is None:
+            first = [
+                value
+                for value in (
+                    db.session.scalar(sa.select(sa.func.min(Message.created_at))),
+                    db.session.scalar(sa.select(sa.func.min(WorkflowRun.created_at))),
+                )
+                if value is not None
+            ]
+            backfill_start = _floor_hour(min(first)) if first else until
+        else:
+            backfill_start = _floor_hour(start)
+
+        count = 0
+        for hour in _hours(backfill_start, until):
+            cls.rollup_hour(hour)
+            count += 1
+
+        redis_client.set(ROLLUP_UNTIL_KEY, until.isoformat())
+        rollup_from = cls._get_watermark(ROLLUP_FROM_KEY)
+        new_from = ROLLUP_EPOCH if start is None else backfill_start
+        if rollup_from is None or new_from < rollup_from:
+            redis_client.set(ROLLUP_FROM_KEY, new_from.isoformat())
+        return count
+
+    @classmethod
+    def rollup_hour(cls, hour: datetime, app_ids: Optional[Sequence[str]] = None) -> None:
+        """
+        Recompute the rollups of the hour for all apps, or only for the given apps. Their dirty marks of the hour
+        are removed in the same transaction, so they survive a failed recompute.
+        """
+        hour_end = hour + timedelta(hours=1)
+
+        def in_hour(model) -> list:
+            conditions = [model.created_at >= hour, model.created_at < hour_end]
+            if app_ids is not None:
+                conditions.append(model.app_id.in_(app_ids))
+            return conditions
+
+        totals: dict[str, dict[str, Any]] = defaultdict(lambda: {"hour": hour})
+        for row in db.session.execute(
+            sa.select(
+                Message.app_id,
+                sa.func.count(Message.id).label("message_count"),
+                sa.func.sum(Message.message_tokens + Message.answer_tokens).label("token_count"),
+                sa.func.sum(Message.answer_tokens).label("answer_tokens"),
+                sa.func.sum(Message.total_price).label("total_price"),
+                sa.func.sum(Message.provider_response_latency).label("latency"),
+            )
+            .where(*in_hour(Message))
+            .group_by(Message.app_id)
+        ):
+            totals[row.app_id].update(
+                message_count=row.message_count,
+                token_count=row.token_count or 0,
+                answer_tokens=row.answer_tokens or 0,
+                total_price=row.total_price or 0,
+                latency=row.latency or 0,
+            )
+        for row in db.session.execute(
+            sa.select(Message.app_id, sa.func.count(MessageFeedback.id).label("like_count"))
+            .join(MessageFeedback, MessageFeedback.message_id == Message.id)
+            .where(*in_hour(Message), MessageFeedback.rating == "like")
+            .group_by(Message.app_id)
+        ):
+            totals[row.app_id]["like_count"] = row.like_count
+        for row in db.session.execute(
+            sa.select(
+                WorkflowRun.app_id,
+                sa.func.count(WorkflowRun.id).label("workflow_run_count"),
+                sa.func.sum(WorkflowRun.total_tokens).label("workflow_token_count"),
+            )
+            .where(*in_hour(WorkflowRun), WorkflowRun.triggered_from == WorkflowRunTriggeredFrom.APP_RUN.value)
+            .group_by(WorkflowRun.app_id)
+        ):
+            totals[row.app_id].update(
+                workflow_run_count=row.workflow_run_count, workflow_token_count=row.workflow_token_count or 0
+            )
+
+        member_queries = {
+            AppStatisticMemberKind.CONVERSATION: sa.select(
+                Message.app_id, Message.conversation_id, sa.func.count(Message.id)
+            )
+            .where(*in_hour(Message), Message.invoke_from != InvokeFrom.DEBUGGER.value)
+            .group_by(Message.app_id, Message.conversation_id),
+            AppStatisticMemberKind.END_USER: sa.select(
+                Message.app_id, Message.from_end_user_id, sa.func.count(Message.id)
+            )
+            .where(*in_hour(Message), Message.from_end_user_id.isnot(None))
+            .group_by(Message.app_id, Message.from_end_user_id),
+            AppStatisticMemberKind.WORKFLOW_USER: sa.select(
+                WorkflowRun.app_id, WorkflowRun.created_by, sa.func.count(WorkflowRun.id)
+            )
+            .where(*in_hour(WorkflowRun), WorkflowRun.triggered_from == WorkflowRunTriggeredFrom.APP_RUN.value)
+            .group_by(WorkflowRun.app_id, WorkflowRun.created_by),
+            AppStatisticMemberKind.SESSION: sa.select(Conversation.app_id, Conversation.id, sa.func.count(Message.id))
+            .join(Message, Message.conversation_id == Conversation.id)
+            .where(*in_hour(Conversation))
+            .group_by(Conversation.app_id, Conversation.id),
+        }
+        members = [
+            {"app_id": app_id, "kind": kind.value, "hour": hour, "member_id": member_id, "count": count}
+            for kind, stmt in member_queries.items()
+            for app_id, member_id, count in db.session.execute(stmt)
+        ]
+
+        for model in (AppStatisticHourly, AppStatisticHourlyMember, AppStatisticDirtyHour):
+            stmt = sa.delete(model).where(model.hour == hour)
+            if app_ids is not None:
+                stmt = stmt.where(model.app_id.in_(app_ids))
+            db.session.execute(stmt)
+        rows = [{"app_id": app_id, **values} for app_id, values in totals.items()]
+        for model, values in ((AppStatisticHourly, rows), (AppStatisticHourlyMember, members)):
+            for i in range(0, len(values), ROLLUP_INSERT_BATCH_SIZE):
+                db.session.execute(sa.insert(model), values[i : i + ROLLUP_INSERT_BATCH_SIZE])
+        db.session.commit()
+
+    @classmethod
+    def mark_dirty(cls, app_id: str, created_at: datetime) -> None:
+        """
+        Mark the hour of a message or workflow run changed after the rollup task may have passed it, for its next
+        run to recompute. Hours the next run recomputes anyway are not marked.
+        """
+        if not dify_config.ENABLE_APP_STATISTICS_ROLLUP_TASK:
+            return
+        hour = _floor_hour(created_at)
+        if hour >= _floor_hour(naive_utc_now()) - timedelta(hours=dify_config.APP_STATISTICS_ROLLUP_LAG):
+            return
+        values = {"app_id": app_id, "hour": hour}
+        if dify_config.SQLALCHEMY_DATABASE_URI_SCHEME == "postgresql":
+            stmt = pg_insert(AppStatisticDirtyHour).values(values).on_conflict_do_nothing()
+        else:
+            stmt = mysql_insert(AppStatisticDirtyHour).values(values).prefix_with("IGNORE")
+        db.session.execute(stmt)
+        db.session.commit()
+
+    @classmethod
+    def _get_dirty_hours(cls, start: datetime, end: datetime) -> dict[datetime, set[str]]:
+        """
+        Get the marked dirty hours before start, and the creation hours of the older conversations continued in
+        [start, end), whose session lengths changed. The marks are removed by `rollup_hour`.
+        """
+        dirty_hours: dict[datetime, set[str]] = defaultdict(set)
+        for app_id, created_at in db.session.execute(
+            sa.select(Conversation.app_id, Conversation.created_at)
+            .distinct()
+            .join(Message, Message.conversation_id == Conversation.id)
+            .where(Message.created_at >= start, Message.created_at < end, Conversation.created_at < start)
+        ):
+            dirty_hours[_floor_hour(created_at)].add(app_id)
+
+        # marks from start on are covered by the recomputed hours
+        for app_id, hour in db.session.execute(
+            sa.select(AppStatisticDirtyHour.app_id, AppStatisticDirtyHour.hour).where(
+                AppStatisticDirtyHour.hour < start
+            )
+        ):
+            dirty_hours[hour].add(app_id)
+        return dirty_hours
+
+    @staticmethod
+    def _get_watermark(key: str) -> Optional[datetime]:
+        value = redis_client.get(key)
+        if not value:
+            return None
+        return datetime.fromisoformat(value.decode() if isinstance(value, bytes) else value)
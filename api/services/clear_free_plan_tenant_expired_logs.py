@@ -28,6 +28,7 @@ from models.web import SavedMessage
 from models.workflow import WorkflowAppLog
 from repositories.factory import DifyAPIRepositoryFactory
 from services.billing_service import BillingService
+from services.retention_engine import RetentionEngine
 
 logger = logging.getLogger(__name__)
 
@@ -117,19 +118,13 @@ class ClearFreePlanTenantExpiredLogs:
         with flask_app.app_context():
             apps = db.session.query(App).where(App.tenant_id == tenant_id).all()
             app_ids = [app.id for app in apps]
-            while True:
+            before_date = datetime.datetime.now() - datetime.timedelta(days=days)
+            engine = RetentionEngine(f"expired logs of tenant {tenant_id}", batch_size=batch)
+            for rows in engine.iter_batches(Message.id, Message.created_at, before_date, Message.app_id.in_(app_ids)):
                 with Session(db.engine).no_autoflush as session:
-                    messages = (
-                        session.query(Message)
-                        .where(
-                            Message.app_id.in_(app_ids),
-                            Message.created_at < datetime.datetime.now() - datetime.timedelta(days=days),
-                        )
-                        .limit(batch)
-                        .all()
-                    )
+                    messages = session.query(Message).where(Message.id.in_([row.id for row in rows])).all()
                     if len(messages) == 0:
-                        break
+                        continue
 
                     storage.save(
                         f"free_plan_tenant_expired_logs/"
@@ -151,6 +146,7 @@ class ClearFreePlanTenantExpiredLogs:
 
                     cls._clear_message_related_tables(session, tenant_id, message_ids)
                     session.commit()
+                    engine.record(Message.__tablename__, len(message_ids))
 
                     click.echo(
                         click.style(
@@ -158,20 +154,16 @@ class ClearFreePlanTenantExpiredLogs:
                         )
                     )
 
-            while True:
+            for rows in engine.iter_batches(
+                Conversation.id, Conversation.updated_at, before_date, Conversation.app_id.in_(app_ids)
+            ):
                 with Session(db.engine).no_autoflush as session:
                     conversations = (
-                        session.query(Conversation)
-                        .where(
-                            Conversation.app_id.in_(app_ids),
-                            Conversation.updated_at < datetime.datetime.now() - datetime.timedelta(days=days),
-                        )
-                        .limit(batch)
-                        .all()
+                        session.query(Conversation).where(Conversation.id.in_([row.id for row in rows])).all()
                     )
 
                     if len(conversations) == 0:
-                        break
+                        continue
 
                     storage.save(
                         f"free_plan_tenant_expired_logs/"
@@ -189,6 +181,7 @@ class ClearFreePlanTenantExpiredLogs:
                         Conversation.id.in_(conversation_ids),
                     ).delete(synchronize_session=False)
                     session.commit()
+                    engine.record(Conversation.__tablename__, len(conversation_ids))
 
                     click.echo(
                         click.style(
@@ -200,8 +193,6 @@ class ClearFreePlanTenantExpiredLogs:
             # Process expired workflow node executions with backup
             session_maker = sessionmaker(bind=db.engine, expire_on_commit=False)
             node_execution_repo = DifyAPIRepositoryFactory.create_api_workflow_node_execution_repository(session_maker)
-            before_date = datetime.datetime.now() - datetime.timedelta(days=days)
-            total_deleted = 0
 
             while True:
                 # Get a batch of expired executions for backup
@@ -231,7 +222,7 @@ class ClearFreePlanTenantExpiredLogs:
 
                 # Delete the backed up executions
                 deleted_count = node_execution_repo.delete_executions_by_ids(workflow_node_execution_ids)
-                total_deleted += deleted_count
+                engine.record("workflow_node_executions", deleted_count)
 
                 click.echo(
                     click.style(
@@ -243,12 +234,11 @@ class ClearFreePlanTenantExpiredLogs:
                 # If we got fewer than the batch size, we're done
                 if len(workflow_node_executions) < batch:
                     break
+                engine.after_batch()
 
             # Process expired workflow runs with backup
             session_maker = sessionmaker(bind=db.engine, expire_on_commit=False)
             workflow_run_repo = DifyAPIRepositoryFactory.create_api_workflow_run_repository(session_maker)
-            before_date = datetime.datetime.now() - datetime.timedelta(days=days)
-            total_deleted = 0
 
             while True:
                 # Get a batch of expired workflow runs for backup
@@ -278,7 +268,7 @@ class ClearFreePlanTenantExpiredLogs:
 
                 # Delete the backed up workflow runs
                 deleted_count = workflow_run_repo.delete_runs_by_ids(workflow_run_ids)
-                total_deleted += deleted_count
+                engine.record("workflow_runs", deleted_count)
 
                 click.echo(
                     click.style(
@@ -290,21 +280,18 @@ class ClearFreePlanTenantExpiredLogs:
                 # If we got fewer than the batch size, we're done
                 if len(workflow_runs) < batch:
                     break
+                engine.after_batch()
 
-            while True:
+            for rows in engine.iter_batches(
+                WorkflowAppLog.id, WorkflowAppLog.created_at, before_date, WorkflowAppLog.tenant_id == tenant_id
+            ):
                 with Session(db.engine).no_autoflush as session:
                     workflow_app_logs = (
-                        session.query(WorkflowAppLog)
-                        .filter(
-                            WorkflowAppLog.tenant_id == tenant_id,
-                            WorkflowAppLog.created_at < datetime.datetime.now() - datetime.timedelta(days=days),
-                        )
-                        .limit(batch)
-                        .all()
+                        session.query(WorkflowAppLog).filter(WorkflowAppLog.id.in_([row.id for row in rows])).all()
                     )
 
                     if len(workflow_app_logs) == 0:
-                        break
+                        continue
 
                     # save workflow app logs
                     storage.save(
@@ -325,6 +312,7 @@ class ClearFreePlanTenantExpiredLogs:
                         WorkflowAppLog.id.in_(workflow_app_log_ids),
                     ).delete(synchronize_session=False)
                     session.commit()
+                    engine.record(WorkflowAppLog.__tablename__, len(workflow_app_log_ids))
 
                     click.echo(
                         click.style(
@@ -333,6 +321,8 @@ class ClearFreePlanTenantExpiredLogs:
                         )
                     )
 
+            engine.report(final=True)
+
     @classmethod
     def process(cls, days: int, batch: int, tenant_ids: list[str]):
         """
@@ -1,3 +1,6 @@
+from services.errors.base import BaseServiceError
+
+
 class WorkflowInUseError(ValueError):
     """Raised when attempting to delete a workflow that's in use by an app"""
 
@@ -8,3 +11,7 @@ class DraftWorkflowDeletionError(ValueError):
     """Raised when attempting to delete a draft workflow"""
 
     pass
+
+
+class LastWorkflowAppLogNotExistsError(BaseServiceError):
+    pass
@@ -14,6 +14,7 @@ from extensions.ext_database import db
 from libs.infinite_scroll_pagination import InfiniteScrollPagination
 from models.account import Account
 from models.model import App, AppMode, AppModelConfig, EndUser, Message, MessageFeedback
+from services.app_statistic_service import AppStatisticService
 from services.conversation_service import ConversationService
 from services.errors.message import (
     FirstMessageNotExistsError,
@@ -175,6 +176,8 @@ class MessageService:
             db.session.add(feedback)
 
         db.session.commit()
+        # satisfaction rates count likes in the hour of the message, which may be rolled up already
+        AppStatisticService.mark_dirty(app_model.id, message.created_at)
 
         return feedback
 
@@ -46,6 +46,7 @@ class ModelLoadBalancingService:
 
         # Enable model load balancing
         provider_configuration.enable_model_load_balancing(model=model, model_type=ModelType.value_of(model_type))
+        self.provider_manager.invalidate_configurations(tenant_id)
 
     def disable_model_load_balancing(self, tenant_id: str, provider: str, model: str, model_type: str) -> None:
         """
@@ -67,6 +68,7 @@ class ModelLoadBalancingService:
 
         # disable model load balancing
         provider_configuration.disable_model_load_balancing(model=model, model_type=ModelType.value_of(model_type))
+        self.provider_manager.invalidate_configurations(tenant_id)
 
     def get_load_balancing_configs(
         self, tenant_id: str, provider: str, model: str, model_type: str
@@ -277,6 +279,7 @@ class ModelLoadBalancingService:
         )
         db.session.add(inherit_config)
         db.session.commit()
+        self.provider_manager.invalidate_configurations(tenant_id)
 
         return inherit_config
 
@@ -293,6 +296,15 @@ class ModelLoadBalancingService:
         :param config_from: predefined-model or custom-model
         :return:
         """
+        try:
+            self._update_load_balancing_configs(tenant_id, provider, model, model_type, configs, config_from)
+        finally:
+            # configs are committed one by one, a failure halfway may have changed some of them
+            self.provider_manager.invalidate_configurations(tenant_id)
+
+    def _update_load_balancing_configs(
+        self, tenant_id: str, provider: str, model: str, model_type: str, configs: list[dict], config_from: str
+    ) -> None:
         # Get all provider configurations of the current workspace
         provider_configurations = self.provider_manager.get_configurations(tenant_id)
 
@@ -165,6 +165,7 @@ class ModelProviderService:
         """
         provider_configuration = self._get_provider_configuration(tenant_id, provider)
         provider_configuration.create_provider_credential(credentials, credential_name)
+        self.provider_manager.invalidate_configurations(tenant_id)
 
     def update_provider_credential(
         self,
@@ -190,6 +191,7 @@ class ModelProviderService:
             credentials=credentials,
             credential_name=credential_name,
         )
+        self.provider_manager.invalidate_configurations(tenant_id)
 
     def remove_provider_credential(self, tenant_id: str, provider: str, credential_id: str) -> None:
         """
@@ -201,6 +203,7 @@ class ModelProviderService:
         """
         provider_configuration = self._get_provider_configuration(tenant_id, provider)
         provider_configuration.delete_provider_credential(credential_id=credential_id)
+        self.provider_manager.invalidate_configurations(tenant_id)
 
     def switch_active_provider_credential(self, tenant_id: str, provider: str, credential_id: str) -> None:
         """
@@ -211,6 +214,7 @@ class ModelProviderService:
         """
         provider_configuration = self._get_provider_configuration(tenant_id, provider)
         provider_configuration.switch_active_provider_credential(credential_id=credential_id)
+        self.provider_manager.invalidate_configurations(tenant_id)
 
     def get_model_credential(
         self, tenant_id: str, provider: str, model_type: str, model: str, credential_id: str | None
@@ -269,6 +273,7 @@ class ModelProviderService:
             credentials=credentials,
             credential_name=credential_name,
         )
+        self.provider_manager.invalidate_configurations(tenant_id)
 
     def update_model_credential(
         self,
@@ -300,6 +305,7 @@ class ModelProviderService:
             credential_id=credential_id,
             credential_name=credential_name,
         )
+        self.provider_manager.invalidate_configurations(tenant_id)
 
     def remove_model_credential(
         self, tenant_id: str, provider: str, model_type: str, model: str, credential_id: str
@@ -318,6 +324,7 @@ class ModelProviderService:
         provider_configuration.delete_custom_model_credential(
             model_type=ModelType.value_of(model_type), model=model, credential_id=credential_id
         )
+        self.provider_manager.invalidate_configurations(tenant_id)
 
     def switch_active_custom_model_credential(
         self, tenant_id: str, provider: str, model_type: str, model: str, credential_id: str
@@ -336,6 +343,7 @@ class ModelProviderService:
         provider_configuration.switch_custom_model_credential(
             model_type=ModelType.value_of(model_type), model=model, credential_id=credential_id
         )
+        self.provider_manager.invalidate_configurations(tenant_id)
 
     def add_model_credential_to_model_list(
         self, tenant_id: str, provider: str, model_type: str, model: str, credential_id: str
@@ -354,6 +362,7 @@ class ModelProviderService:
         provider_configuration.add_model_credential_to_model(
             model_type=ModelType.value_of(model_type), model=model, credential_id=credential_id
         )
+        self.provider_manager.invalidate_configurations(tenant_id)
 
     def remove_model(self, tenant_id: str, provider: str, model_type: str, model: str) -> None:
         """
@@ -367,6 +376,7 @@ class ModelProviderService:
         """
         provider_configuration = self._get_provider_configuration(tenant_id, provider)
         provider_configuration.delete_custom_model(model_type=ModelType.value_of(model_type), model=model)
+        self.provider_manager.invalidate_configurations(tenant_id)
 
     def get_models_by_model_type(self, tenant_id: str, model_type: str) -> list[ProviderWithModelsResponse]:
         """
@@ -531,6 +541,7 @@ class ModelProviderService:
 
         # Switch preferred provider type
         provider_configuration.switch_preferred_provider_type(preferred_provider_type_enum)
+        self.provider_manager.invalidate_configurations(tenant_id)
 
     def enable_model(self, tenant_id: str, provider: str, model: str, model_type: str) -> None:
         """
@@ -544,6 +555,7 @@ class ModelProviderService:
         """
         provider_configuration = self._get_provider_configuration(tenant_id, provider)
         provider_configuration.enable_model(model=model, model_type=ModelType.value_of(model_type))
+        self.provider_manager.invalidate_configurations(tenant_id)
 
     def disable_model(self, tenant_id: str, provider: str, model: str, model_type: str) -> None:
         """
@@ -557,3 +569,4 @@ class ModelProviderService:
         """
         provider_configuration = self._get_provider_configuration(tenant_id, provider)
         provider_configuration.disable_model(model=model, model_type=ModelType.value_of(model_type))
+        self.provider_manager.invalidate_configurations(tenant_id)
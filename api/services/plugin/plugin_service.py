@@ -9,6 +9,7 @@ from configs import dify_config
 from core.helper import marketplace
 from core.helper.download import download_with_size_limit
 from core.helper.marketplace import download_plugin_pkg
+from core.helper.plugin_model_cache import PluginModelCache
 from core.plugin.entities.bundle import PluginBundleDependency
 from core.plugin.entities.plugin import (
     GenericProviderID,
@@ -20,12 +21,14 @@ from core.plugin.entities.plugin import (
 from core.plugin.entities.plugin_daemon import (
     PluginDecodeResponse,
     PluginInstallTask,
+    PluginInstallTaskStatus,
     PluginListResponse,
     PluginVerification,
 )
 from core.plugin.impl.asset import PluginAssetManager
 from core.plugin.impl.debugging import PluginDebuggingClient
 from core.plugin.impl.plugin import PluginInstaller
+from core.provider_manager import ProviderManager
 from extensions.ext_redis import redis_client
 from services.errors.plugin import PluginInstallationForbiddenError
 from services.feature_service import FeatureService, PluginInstallationScope
@@ -224,7 +227,11 @@ class PluginService:
     @staticmethod
     def fetch_install_task(tenant_id: str, task_id: str) -> PluginInstallTask:
         manager = PluginInstaller()
-        return manager.fetch_plugin_installation_task(tenant_id, task_id)
+        task = manager.fetch_plugin_installation_task(tenant_id, task_id)
+        # installs and upgrades finish in the daemon after the request that started them
+        if task.status == PluginInstallTaskStatus.Success:
+            PluginService._invalidate_plugin_caches(tenant_id)
+        return task
 
     @staticmethod
     def delete_install_task(tenant_id: str, task_id: str) -> bool:
@@ -286,7 +293,7 @@ class PluginService:
             # check if the plugin is available to install
             PluginService._check_plugin_installation_scope(response.verification)
 
-        return manager.upgrade_plugin(
+        response = manager.upgrade_plugin(
             tenant_id,
             original_plugin_unique_identifier,
             new_plugin_unique_identifier,
@@ -295,6 +302,8 @@ class PluginService:
                 "plugin_unique_identifier": new_plugin_unique_identifier,
             },
         )
+        PluginService._invalidate_plugin_caches(tenant_id)
+        return response
 
     @staticmethod
     def upgrade_plugin_with_github(
@@ -310,7 +319,7 @@ class PluginService:
         """
         PluginService._check_marketplace_only_permission()
         manager = PluginInstaller()
-        return manager.upgrade_plugin(
+        response = manager.upgrade_plugin(
             tenant_id,
             original_plugin_unique_identifier,
             new_plugin_unique_identifier,
@@ -321,6 +330,8 @@ class PluginService:
                 "package": package,
             },
         )
+        PluginService._invalidate_plugin_caches(tenant_id)
+        return response
 
     @staticmethod
     def upload_pkg(tenant_id: str, pkg: bytes, verify_signature: bool = False) -> PluginDecodeResponse:
@@ -378,12 +389,14 @@ class PluginService:
 
         manager = PluginInstaller()
 
-        return manager.install_from_identifiers(
+        response = manager.install_from_identifiers(
             tenant_id,
             plugin_unique_identifiers,
             PluginInstallationSource.Package,
             [{}],
         )
+        PluginService._invalidate_plugin_caches(tenant_id)
+        return response
 
     @staticmethod
     def install_from_github(tenant_id: str, plugin_unique_identifier: str, repo: str, version: str, package: str):
@@ -394,7 +407,7 @@ class PluginService:
         PluginService._check_marketplace_only_permission()
 
         manager = PluginInstaller()
-        return manager.install_from_identifiers(
+        response = manager.install_from_identifiers(
             tenant_id,
             [plugin_unique_identifier],
             PluginInstallationSource.Github,
@@ -406,6 +419,8 @@ class PluginService:
                 }
             ],
         )
+        PluginService._invalidate_plugin_caches(tenant_id)
+        return response
 
     @staticmethod
     def fetch_marketplace_pkg(tenant_id: str, plugin_unique_identifier: str) -> PluginDeclaration:
@@ -473,17 +488,29 @@ class PluginService:
                 actual_plugin_unique_identifiers.append(response.unique_identifier)
                 metas.append({"plugin_unique_identifier": response.unique_identifier})
 
-        return manager.install_from_identifiers(
+        response = manager.install_from_identifiers(
             tenant_id,
             actual_plugin_unique_identifiers,
             PluginInstallationSource.Marketplace,
             metas,
         )
+        PluginService._invalidate_plugin_caches(tenant_id)
+        return response
 
     @staticmethod
     def uninstall(tenant_id: str, plugin_installation_id: str) -> bool:
         manager = PluginInstaller()
-        return manager.uninstall(tenant_id, plugin_installation_id)
+        result = manager.uninstall(tenant_id, plugin_installation_id)
+        PluginService._invalidate_plugin_caches(tenant_id)
+        return result
+
+    @staticmethod
+    def _invalidate_plugin_caches(tenant_id: str) -> None:
+        """
+        Drop the model providers, model schemas and provider configurations cached for the tenant's plugins
+        """
+        PluginModelCache.invalidate(tenant_id)
+        ProviderManager.invalidate_configurations(tenant_id)
 
     @staticmethod
     def check_tools_existence(tenant_id: str, provider_ids: Sequence[GenericProviderID]) -> Sequence[bool]:
@@ -0,0 +1,184 @@
+import logging
+import time
+from collections.abc import Iterator, Sequence
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Optional
+
+import click
+import sqlalchemy as sa
+from sqlalchemy.engine import Row
+from sqlalchemy.orm import InstrumentedAttribute, Session
+
+from configs import dify_config
+from extensions.ext_database import db
+
+logger = logging.getLogger(__name__)
+
+_POSTGRES_REPLICATION_LAG_QUERY = "SELECT COALESCE(EXTRACT(EPOCH FROM MAX(replay_lag)), 0) FROM pg_stat_replication"
+
+# longest wait for the replicas to catch up before a batch, deleting goes on afterwards
+MAX_THROTTLE_WAIT = 600
+REPORT_INTERVAL = 30
+
+
+@dataclass
+class RetentionStats:
+    started_at: float = field(default_factory=time.perf_counter)
+    batches: int = 0
+    # rows deleted per table
+    deleted: dict[str, int] = field(default_factory=dict)
+    throttled: float = 0.0
+
+    @property
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started_at
+
+    @property
+    def total(self) -> int:
+        return sum(self.deleted.values())
+
+    @property
+    def throughput(self) -> float:
+        return self.total / self.elapsed if self.elapsed > 0 else 0.0
+
+
+class RetentionEngine:
+    """
+    Shared engine of the cleanup tasks: walks the expired rows of a table in (time, id) order, deletes them and the
+    rows referencing them with set-based `DELETE ... WHERE <column> IN (...)` statements a batch at a time, waits for
+    the replicas to catch up between batches and reports progress and throughput.
+    """
+
+    def __init__(self, name: str, batch_size: Optional[int] = None, session: Optional[Session] = None):
+        self.name = name
+        self.batch_size = batch_size or dify_config.RETENTION_BATCH_SIZE
+        self.session = session if session is not None else db.session
+        self.stats = RetentionStats()
+        # rows deleted in the open transaction, counted once it commits
+        self._pending: dict[str, int] = {}
+        self._last_report_at = self.stats.started_at
+        self._lag_query = dify_config.RETENTION_REPLICATION_LAG_QUERY or None
+        if self._lag_query is None and dify_config.SQLALCHEMY_DATABASE_URI_SCHEME == "postgresql":
+            self._lag_query = _POSTGRES_REPLICATION_LAG_QUERY
+
+    def iter_batches(
+        self,
+        id_column: InstrumentedAttribute,
+        time_column: InstrumentedAttribute,
+        before: datetime,
+        *where: Any,
+        columns: Sequence[InstrumentedAttribute] = (),
+    ) -> Iterator[Sequence[Row]]:
+        """
+        Yield the rows created before `before` in batches of (id, time, *columns), oldest first. The walk continues
+        after the last row of each batch, so rows the caller keeps are not read again. Progress is reported and
+        replication lag checked after the caller handled each batch.
+        """
+        last: Optional[Row] = None
+        while True:
+            stmt = sa.select(id_column, time_column, *columns).where(time_column < before, *where)
+            if last is not None:
+                stmt = stmt.where(sa.or_(time_column > last[1], sa.and_(time_column == last[1], id_column > last[0])))
+            stmt = stmt.order_by(time_column, id_column).limit(self.batch_size)
+            # read on a short-lived connection, so no transaction stays open across the whole walk
+            with db.engine.connect() as conn:
+                rows = conn.execute(stmt).all()
+            if not rows:
+                return
+
+            last = rows[-1]
+            yield rows
+            self.after_batch()
+            if len(rows) < self.batch_size:
+                return
+
+    def delete_in(self, column: InstrumentedAttribute, values: Sequence[Any]) -> int:
+        """
+        Delete the rows of the column's table whose column is in values, without committing. The rows are counted
+        by the next `commit`, a `rollback` drops them.
+        """
+        if not values:
+            return 0
+        table = column.class_.__tablename__
+        result = self.session.execute(sa.delete(column.class_).where(column.in_(values)))
+        self._pending[table] = self._pending.get(table, 0) + result.rowcount
+        return result.rowcount
+
+    def commit(self) -> None:
+        self.session.commit()
+        pending, self._pending = self._pending, {}
+        for table, count in pending.items():
+            self.record(table, count)
+
+    def rollback(self) -> None:
+        self._pending = {}
+        self.session.rollback()
+
+    def delete_batch(
+        self, id_column: InstrumentedAttribute, ids: Sequence[Any], related: Sequence[InstrumentedAttribute] = ()
+    ) -> int:
+        """Delete the rows referencing the ids through the related columns, then the rows themselves, and commit."""
+        if not ids:
+            return 0
+        for column in related:
+            self.delete_in(column, ids)
+        deleted = self.delete_in(id_column, ids)
+        self.commit()
+        return deleted
+
+    def record(self, table: str, count: int) -> None:
+        """Count rows deleted by the caller, e.g. through a repository."""
+        self.stats.deleted[table] = self.stats.deleted.get(table, 0) + count
+
+    def after_batch(self) -> None:
+        self.stats.batches += 1
+        if time.perf_counter() - self._last_report_at >= REPORT_INTERVAL:
+            self.report()
+        if dify_config.RETENTION_BATCH_INTERVAL > 0:
+            time.sleep(dify_config.RETENTION_BATCH_INTERVAL)
+        self.throttle()
+
+    def throttle(self) -> None:
+        """Wait while the replicas lag more than RETENTION_MAX_REPLICATION_LAG behind."""
+        max_lag = dify_config.RETENTION_MAX_REPLICATION_LAG
+        if max_lag <= 0 or not self._lag_query:
+            return
+        waited = 0.0
+        while waited < MAX_THROTTLE_WAIT:
+            lag = self._get_replication_lag()
+            if lag is None or lag <= max_lag:
+                break
+            wait = min(lag, MAX_THROTTLE_WAIT - waited)
+            logger.info("%s: replication lag %.1fs, waiting %.1fs", self.name, lag, wait)
+            time.sleep(wait)
+            waited += wait
+        else:
+            logger.warning("%s: replicas still lag after waiting %ss, continuing", self.name, MAX_THROTTLE_WAIT)
+        self.stats.throttled += waited
+
+    def _get_replication_lag(self) -> Optional[float]:
+        assert self._lag_query is not None
+        try:
+            with db.engine.connect() as conn:
+                lag = conn.execute(sa.text(self._lag_query)).scalar()
+        except Exception:
+            # e.g. no privilege to read the replication status, stop checking
+            logger.warning("%s: failed to read replication lag, not throttling", self.name, exc_info=True)
+            self._lag_query = None
+            return None
+        return float(lag) if lag is not None else None
+
+    def report(self, final: bool = False) -> RetentionStats:
+        self._last_report_at = time.perf_counter()
+        stats = self.stats
+        deleted = ", ".join(f"{table}: {count}" for table, count in stats.deleted.items()) or "nothing"
+        click.echo(
+            click.style(
+                f"{'Finished' if final else 'Progress of'} {self.name} cleanup: {stats.batches} batches, "
+                f"deleted {deleted}, {stats.throughput:.1f} rows/s, latency: {stats.elapsed:.2f}s, "
+                f"throttled: {stats.throttled:.2f}s",
+                fg="green",
+            )
+        )
+        return stats
@@ -1,12 +1,24 @@
+import json
 import uuid
+from collections.abc import Iterator, Mapping
 from datetime import datetime
+from typing import Any
 
-from sqlalchemy import and_, func, or_, select
+from sqlalchemy import and_, func, or_, select, update
+from sqlalchemy.dialects import mysql
 from sqlalchemy.orm import Session
 
+from configs import dify_config
 from core.workflow.entities.workflow_execution import WorkflowExecutionStatus
+from extensions.ext_database import db
 from models import Account, App, EndUser, WorkflowAppLog, WorkflowRun
 from models.enums import CreatorUserRole
+from services.errors.workflow_service import LastWorkflowAppLogNotExistsError
+
+# long outputs are only searchable by their beginning
+SEARCH_TEXT_MAX_LENGTH = 10000
+# the default ngram_token_size of MySQL, shorter keywords have no ngram in the full-text index
+MYSQL_NGRAM_TOKEN_SIZE = 2
 
 
 class WorkflowAppService:
@@ -23,6 +35,7 @@ class WorkflowAppService:
         limit: int = 20,
         created_by_end_user_session_id: str | None = None,
         created_by_account: str | None = None,
+        last_id: str | None = None,
     ) -> dict:
         """
         Get paginate workflow app logs using SQLAlchemy 2.0 style
@@ -36,6 +49,7 @@ class WorkflowAppService:
         :param limit: items per page
         :param created_by_end_user_session_id: filter by end user session id
         :param created_by_account: filter by account email
+        :param last_id: id of the last log of the previous page, the page is read after it instead of by offset
         :return: Pagination object
         """
         # Build base statement using SQLAlchemy 2.0 style
@@ -43,10 +57,18 @@ class WorkflowAppService:
             WorkflowAppLog.tenant_id == app_model.tenant_id, WorkflowAppLog.app_id == app_model.id
         )
 
-        if keyword or status:
+        search_by_index = bool(keyword) and dify_config.WORKFLOW_LOG_FULLTEXT_SEARCH_ENABLED
+        if (keyword and not search_by_index) or status:
             stmt = stmt.join(WorkflowRun, WorkflowRun.id == WorkflowAppLog.workflow_run_id)
 
-        if keyword:
+        if keyword and search_by_index:
+            keyword_condition = self._match_search_text(keyword[:30])
+            # run ids are not part of the search text
+            keyword_uuid = self._safe_parse_uuid(keyword)
+            if keyword_uuid:
+                keyword_condition = or_(WorkflowAppLog.workflow_run_id == str(keyword_uuid), keyword_condition)
+            stmt = stmt.where(keyword_condition)
+        elif keyword:
             keyword_like_val = f"%{keyword[:30].encode('unicode_escape').decode('utf-8')}%".replace(r"\u", r"\\u")
             keyword_conditions = [
                 WorkflowRun.inputs.ilike(keyword_like_val),
@@ -95,26 +117,134 @@ class WorkflowAppService:
                 ),
             )
 
-        stmt = stmt.order_by(WorkflowAppLog.created_at.desc())
-
-        # Get total count using the same filters
-        count_stmt = select(func.count()).select_from(stmt.subquery())
+        # Get total count using the same filters, stopping at the count limit on large result sets
+        count_limit = dify_config.WORKFLOW_LOG_COUNT_LIMIT
+        count_stmt = select(func.count()).select_from((stmt.limit(count_limit) if count_limit else stmt).subquery())
         total = session.scalar(count_stmt) or 0
 
-        # Apply pagination limits
-        offset_stmt = stmt.offset((page - 1) * limit).limit(limit)
+        stmt = stmt.order_by(WorkflowAppLog.created_at.desc(), WorkflowAppLog.id.desc())
+        if last_id:
+            last_log = session.scalar(
+                select(WorkflowAppLog).where(
+                    WorkflowAppLog.tenant_id == app_model.tenant_id,
+                    WorkflowAppLog.app_id == app_model.id,
+                    WorkflowAppLog.id == last_id,
+                )
+            )
+            if not last_log:
+                raise LastWorkflowAppLogNotExistsError()
 
-        # Execute query and get items
-        items = list(session.scalars(offset_stmt).all())
+            stmt = stmt.where(
+                or_(
+                    WorkflowAppLog.created_at < last_log.created_at,
+                    and_(WorkflowAppLog.created_at == last_log.created_at, WorkflowAppLog.id < last_log.id),
+                )
+            )
+        else:
+            stmt = stmt.offset((page - 1) * limit)
+
+        # Fetch one more log to tell if there are more
+        items = list(session.scalars(stmt.limit(limit + 1)).all())
+        has_more = len(items) > limit
 
         return {
             "page": page,
             "limit": limit,
             "total": total,
-            "has_more": total > page * limit,
-            "data": items,
+            "has_more": has_more,
+            "data": items[:limit],
         }
 
+    @classmethod
+    def build_search_text(cls, *values: Any) -> str:
+        """
+        Join the strings and numbers nested in the values, e.g. the inputs and outputs of a workflow run,
+        into the search text of its log
+        """
+        terms: list[str] = []
+        length = 0
+        for term in cls._iter_search_terms(values):
+            terms.append(term)
+            length += len(term) + 1
+            if length >= SEARCH_TEXT_MAX_LENGTH:
+                break
+        return " ".join(terms)[:SEARCH_TEXT_MAX_LENGTH]
+
+    @classmethod
+    def backfill_search_text(cls, batch_size: int = 1000) -> int:
+        """
+        Fill in the search text of the logs written before it was extracted
+        :param batch_size: logs updated per transaction
+        :return: number of logs updated
+        """
+        total = 0
+        last_id = None
+        while True:
+            with Session(db.engine) as session:
+                stmt = (
+                    select(WorkflowAppLog.id, WorkflowRun.inputs, WorkflowRun.outputs, EndUser.session_id)
+                    .outerjoin(WorkflowRun, WorkflowRun.id == WorkflowAppLog.workflow_run_id)
+                    .outerjoin(
+                        EndUser,
+                        and_(
+                            WorkflowAppLog.created_by == EndUser.id,
+                            WorkflowAppLog.created_by_role == CreatorUserRole.END_USER,
+                        ),
+                    )
+                    .where(WorkflowAppLog.search_text.is_(None))
+                    .order_by(WorkflowAppLog.id)
+                    .limit(batch_size)
+                )
+                if last_id:
+                    stmt = stmt.where(WorkflowAppLog.id > last_id)
+                rows = session.execute(stmt).all()
+                if not rows:
+                    return total
+
+                session.execute(
+                    update(WorkflowAppLog),
+                    [
+                        {
+                            "id": log_id,
+                            "search_text": cls.build_search_text(
+                                json.loads(inputs) if inputs else None,
+                                json.loads(outputs) if outputs else None,
+                                session_id,
+                            ),
+                        }
+                        for log_id, inputs, outputs, session_id in rows
+                    ],
+                )
+                session.commit()
+            total += len(rows)
+            last_id = rows[-1].id
+
+    @classmethod
+    def _iter_search_terms(cls, value: Any) -> Iterator[str]:
+        if isinstance(value, str):
+            if value:
+                yield value
+        elif isinstance(value, bool):
+            return
+        elif isinstance(value, int | float):
+            yield str(value)
+        elif isinstance(value, Mapping):
+            for item in value.values():
+                yield from cls._iter_search_terms(item)
+        elif isinstance(value, list | tuple):
+            for item in value:
+                yield from cls._iter_search_terms(item)
+
+    @staticmethod
+    def _match_search_text(keyword: str):
+        if dify_config.SQLALCHEMY_DATABASE_URI_SCHEME == "postgresql" or len(keyword) < MYSQL_NGRAM_TOKEN_SIZE:
+            # served by the trigram index on PostgreSQL, a scan of the search text of the app's logs on MySQL
+            return WorkflowAppLog.search_text.icontains(keyword, autoescape=True)
+
+        # a phrase of the ngrams of the keyword, the closest to a substring match
+        phrase = '"{}"'.format(keyword.replace('"', " "))
+        return mysql.match(WorkflowAppLog.search_text, against=phrase).in_boolean_mode()
+
     @staticmethod
     def _safe_parse_uuid(value: str):
         # fast check
@@ -5,7 +5,7 @@ from celery import shared_task
 from flask import current_app
 
 from core.ops.entities.config_entity import OPS_FILE_PATH, OPS_TRACE_FAILED_KEY
-from core.ops.entities.trace_entity import trace_info_info_map
+from core.ops.entities.trace_entity import TraceBatchData, trace_info_info_map
 from core.rag.models.document import Document
 from extensions.ext_redis import redis_client
 from extensions.ext_storage import storage
@@ -31,20 +31,10 @@ def process_trace_tasks(file_info):
     trace_info_type = file_data.get("trace_info_type")
     trace_instance = OpsTraceManager.get_ops_trace_instance(app_id)
 
-    if trace_info.get("message_data"):
-        trace_info["message_data"] = Message.from_dict(data=trace_info["message_data"])
-    if trace_info.get("workflow_data"):
-        trace_info["workflow_data"] = WorkflowRun.from_dict(data=trace_info["workflow_data"])
-    if trace_info.get("documents"):
-        trace_info["documents"] = [Document(**doc) for doc in trace_info["documents"]]
-
     try:
         if trace_instance:
             with current_app.app_context():
-                trace_type = trace_info_info_map.get(trace_info_type)
-                if trace_type:
-                    trace_info = trace_type(**trace_info)
-                trace_instance.trace(trace_info)
+                trace_instance.trace(_load_trace_info(trace_info_type, trace_info))
         logger.info("Processing trace tasks success, app_id: %s", app_id)
     except Exception as e:
         logger.info("error:\n\n\n%s\n\n\n\n", e)
@@ -53,3 +43,60 @@ def process_trace_tasks(file_info):
         logger.info("Processing trace tasks failed, app_id: %s", app_id)
     finally:
         storage.delete(file_path)
+
+
+@shared_task(queue="ops_trace")
+def process_trace_batch(file_info):
+    """
+    Async process a batch of trace tasks, grouped by app and tracing provider
+    Usage: process_trace_batch.delay({"file_id": file_id})
+    """
+    from core.ops.ops_trace_manager import OpsTraceManager
+
+    file_path = f"{OPS_FILE_PATH}batch/{file_info.get('file_id')}.json"
+    try:
+        batch_data = TraceBatchData.model_validate_json(storage.load(file_path))
+        with current_app.app_context():
+            for group in batch_data.groups:
+                try:
+                    # resolved once per app, the decrypted config and trace instance serve all traces of the group
+                    trace_instance = OpsTraceManager.get_ops_trace_instance(group.app_id)
+                except Exception:
+                    # e.g. a trace config that fails to decrypt, only this app's traces are lost
+                    logger.exception("Resolving trace instance failed, app_id: %s", group.app_id)
+                    redis_client.incr(f"{OPS_TRACE_FAILED_KEY}_{group.app_id}", len(group.traces))
+                    continue
+                if not trace_instance:
+                    continue
+                failed = 0
+                for task_data in group.traces:
+                    try:
+                        trace_instance.trace(_load_trace_info(task_data.trace_info_type, task_data.trace_info))
+                    except Exception:
+                        failed += 1
+                        logger.exception("Processing trace failed, app_id: %s", group.app_id)
+                if failed:
+                    redis_client.incr(f"{OPS_TRACE_FAILED_KEY}_{group.app_id}", failed)
+                logger.info(
+                    "Processing trace batch of app %s (%s), %s traces, %s failed",
+                    group.app_id,
+                    group.tracing_provider,
+                    len(group.traces),
+                    failed,
+                )
+    finally:
+        storage.delete(file_path)
+
+
+def _load_trace_info(trace_info_type: str, trace_info: dict):
+    if trace_info.get("message_data"):
+        trace_info["message_data"] = Message.from_dict(data=trace_info["message_data"])
+    if trace_info.get("workflow_data"):
+        trace_info["workflow_data"] = WorkflowRun.from_dict(data=trace_info["workflow_data"])
+    if trace_info.get("documents"):
+        trace_info["documents"] = [Document(**doc) for doc in trace_info["documents"]]
+
+    trace_type = trace_info_info_map.get(trace_info_type)
+    if trace_type:
+        return trace_type(**trace_info)
+    return trace_info
@@ -17,6 +17,9 @@ from models import (
     AppDatasetJoin,
     AppMCPServer,
     AppModelConfig,
+    AppStatisticDirtyHour,
+    AppStatisticHourly,
+    AppStatisticHourlyMember,
     Conversation,
     EndUser,
     InstalledApp,
@@ -69,6 +72,7 @@ def remove_app_and_related_data_task(self, tenant_id: str, app_id: str):
         _delete_trace_app_configs(tenant_id, app_id)
         _delete_conversation_variables(app_id=app_id)
         _delete_draft_variables(app_id)
+        _delete_app_statistic_rollups(app_id)
 
         end_at = time.perf_counter()
         logger.info(click.style(f"App and related data deleted: {app_id} latency: {end_at - start_at}", fg="green"))
@@ -269,6 +273,14 @@ def _delete_conversation_variables(*, app_id: str):
         logger.info(click.style(f"Deleted conversation variables for app {app_id}", fg="green"))
 
 
+def _delete_app_statistic_rollups(app_id: str):
+    with db.engine.connect() as conn:
+        for model in (AppStatisticHourly, AppStatisticHourlyMember, AppStatisticDirtyHour):
+            conn.execute(delete(model).where(model.app_id == app_id))
+        conn.commit()
+        logger.info(click.style(f"Deleted app statistic rollups for app {app_id}", fg="green"))
+
+
 def _delete_app_messages(tenant_id: str, app_id: str):
     def del_message(message_id: str):
         db.session.query(MessageFeedback).where(MessageFeedback.message_id == message_id).delete(
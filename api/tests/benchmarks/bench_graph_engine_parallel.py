@@ -0,0 +1,106 @@
+"""
+Benchmark end-to-end latency of a workflow that fans out into many parallel no-op branches.
+
+The graph is start -> N variable-aggregator branches -> end, so the numbers mostly reflect
+GraphEngine scheduling and event fan-in overhead. No database or model provider is needed:
+
+    cd api
+    python -m tests.benchmarks.bench_graph_engine_parallel --branches 50 --rounds 20
+"""
+
+import argparse
+import statistics
+import time
+
+from flask import Flask
+
+from core.app.entities.app_invoke_entities import InvokeFrom
+from core.workflow.entities.variable_pool import VariablePool
+from core.workflow.graph_engine.entities.event import GraphRunSucceededEvent
+from core.workflow.graph_engine.entities.graph import Graph
+from core.workflow.graph_engine.entities.graph_runtime_state import GraphRuntimeState
+from core.workflow.graph_engine.graph_engine import GraphEngine
+from core.workflow.system_variable import SystemVariable
+from models.enums import UserFrom
+from models.workflow import WorkflowType
+
+
+def _graph_config(branches: int) -> dict:
+    edges = []
+    nodes: list[dict] = [{"data": {"type": "start", "title": "start", "variables": []}, "id": "start"}]
+    for i in range(branches):
+        node_id = f"branch{i}"
+        edges.append({"id": f"start-{node_id}", "source": "start", "target": node_id})
+        edges.append({"id": f"{node_id}-end", "source": node_id, "target": "end"})
+        nodes.append(
+            {
+                "data": {
+                    "type": "variable-aggregator",
+                    "title": node_id,
+                    "output_type": "string",
+                    "variables": [["sys", "user_id"]],
+                },
+                "id": node_id,
+            }
+        )
+    nodes.append({"data": {"type": "end", "title": "end", "outputs": []}, "id": "end"})
+    return {"edges": edges, "nodes": nodes}
+
+
+def _run_once(graph_config: dict) -> float:
+    graph_engine = GraphEngine(
+        tenant_id="bench",
+        app_id="bench",
+        workflow_type=WorkflowType.WORKFLOW,
+        workflow_id="bench",
+        graph_config=graph_config,
+        user_id="bench",
+        user_from=UserFrom.ACCOUNT,
+        invoke_from=InvokeFrom.SERVICE_API,
+        call_depth=0,
+        graph=Graph.init(graph_config=graph_config),
+        graph_runtime_state=GraphRuntimeState(
+            variable_pool=VariablePool(
+                system_variables=SystemVariable(user_id="bench", app_id="bench", workflow_id="bench", files=[]),
+                user_inputs={},
+            ),
+            start_at=time.perf_counter(),
+        ),
+        max_execution_steps=10000,
+        max_execution_time=600,
+    )
+
+    start = time.perf_counter()
+    last_event = None
+    for last_event in graph_engine.run():
+        pass
+    elapsed = (time.perf_counter() - start) * 1000
+    if not isinstance(last_event, GraphRunSucceededEvent):
+        raise RuntimeError(f"workflow did not succeed: {last_event}")
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--branches", type=int, default=50, help="number of parallel branches")
+    parser.add_argument("--rounds", type=int, default=20, help="number of workflow runs")
+    args = parser.parse_args()
+
+    app = Flask(__name__)
+    graph_config = _graph_config(args.branches)
+
+    with app.app_context():
+        # warm up imports and node class lookups
+        _run_once(graph_config)
+        samples = [_run_once(graph_config) for _ in range(args.rounds)]
+
+    ordered = sorted(samples)
+    print(
+        f"branches={args.branches} runs={len(samples)} p50={statistics.median(samples):.2f}ms "
+        f"p99={ordered[min(len(ordered) - 1, int(round(0.99 * (len(ordered) - 1))))]:.2f}ms "
+        f"mean={statistics.fmean(samples):.2f}ms"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+Benchmark OceanBase vector and full-text search filtered by document ids.
+
+Loads a collection (1M rows by default) whose chunks are spread over --documents documents, then
+compares filtering on the JSON metadata (as collections without the document_id column, and every
+collection before it, do) with the indexed document_id column. Requires a reachable OceanBase:
+
+    cd api
+    python -m tests.benchmarks.bench_oceanbase_filtered_search --host 127.0.0.1 --port 2881 --user root@test \\
+        --password difyai123456 --database test --rows 1000000
+"""
+
+import argparse
+import time
+import uuid
+
+import numpy as np
+
+from core.rag.datasource.vdb.oceanbase import oceanbase_vector
+from core.rag.datasource.vdb.oceanbase.oceanbase_vector import OceanBaseVector, OceanBaseVectorConfig
+from core.rag.models.document import Document
+from tests.benchmarks.bench_oceanbase_vector import _LocalRedis, _percentiles
+
+
+def _load(vector: OceanBaseVector, rows: int, documents: int, dimension: int, batch_size: int) -> None:
+    rng = np.random.default_rng(0)
+    for start in range(0, rows, batch_size):
+        count = min(batch_size, rows - start)
+        chunks = [
+            Document(
+                page_content=f"benchmark chunk {i} of document {i % documents}",
+                metadata={"doc_id": str(uuid.uuid4()), "document_id": f"document-{i % documents}"},
+            )
+            for i in range(start, start + count)
+        ]
+        embeddings = rng.random((count, dimension), dtype=np.float32)
+        embeddings /= np.linalg.norm(embeddings, axis=1, keepdims=True)
+        if start == 0:
+            vector.create(chunks, embeddings.tolist())
+        else:
+            vector.add_texts(chunks, embeddings.tolist())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=2881)
+    parser.add_argument("--user", default="root@test")
+    parser.add_argument("--password", default="")
+    parser.add_argument("--database", default="test")
+    parser.add_argument("--hybrid", action="store_true", help="also measure full-text search")
+    parser.add_argument("--rows", type=int, default=1000000, help="number of chunks in the collection")
+    parser.add_argument("--documents", type=int, default=10000, help="number of documents the chunks belong to")
+    parser.add_argument("--filter-size", type=int, default=5, help="number of document ids per query")
+    parser.add_argument("--dimension", type=int, default=128)
+    parser.add_argument("--queries", type=int, default=100, help="number of samples per mode")
+    args = parser.parse_args()
+
+    config = OceanBaseVectorConfig(
+        host=args.host,
+        port=args.port,
+        user=args.user,
+        password=args.password,
+        database=args.database,
+        enable_hybrid_search=args.hybrid,
+        batch_size=1000,
+    )
+    oceanbase_vector.redis_client = _LocalRedis()  # type: ignore[assignment]
+    collection_name = f"bench_oceanbase_filter_{uuid.uuid4().hex[:8]}"
+    vector = OceanBaseVector(collection_name, config)
+    column_key = (oceanbase_vector._client_key(config), collection_name)
+    try:
+        start = time.perf_counter()
+        _load(vector, args.rows, args.documents, args.dimension, 1000)
+        print(f"loaded {args.rows} rows in {time.perf_counter() - start:.0f}s")
+
+        rng = np.random.default_rng(1)
+        for label, has_column in (("json metadata", False), ("document_id", True)):
+            oceanbase_vector._document_id_columns[column_key] = has_column
+            searches = [("vector", lambda q, ids: vector.search_by_vector(q, top_k=4, document_ids_filter=ids))]
+            if args.hybrid:
+                searches.append(
+                    ("full-text", lambda q, ids: vector.search_by_full_text("chunk", top_k=4, document_ids_filter=ids))
+                )
+            for search_label, search in searches:
+                samples = []
+                for _ in range(args.queries):
+                    query = rng.random(args.dimension).tolist()
+                    ids = [f"document-{i}" for i in rng.integers(0, args.documents, args.filter_size)]
+                    start = time.perf_counter()
+                    search(query, ids)
+                    samples.append((time.perf_counter() - start) * 1000)
+                print(f"{search_label:<9} filter on {label:<13} {_percentiles(samples)}")
+    finally:
+        vector.delete()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""
+Benchmark weighted-score hybrid retrieval on OceanBase.
+
+The existing path is what RetrievalService.retrieve does for hybrid search: vector and full-text
+searches in two threads, each with its own OceanBaseVector, then the results are merged and weighted
+in Python. The weight rerank also re-embeds the candidates, which is left out here, so the existing
+path is measured at its fastest. The native path is one OceanBaseVector.search_hybrid statement.
+Requires an OceanBase with hybrid search support (>= 4.3.5.1):
+
+    cd api
+    python -m tests.benchmarks.bench_oceanbase_hybrid_search --host 127.0.0.1 --port 2881 --user root@test \\
+        --password difyai123456 --database test
+"""
+
+import argparse
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from core.rag.datasource.vdb.oceanbase import oceanbase_vector
+from core.rag.datasource.vdb.oceanbase.oceanbase_vector import OceanBaseVector, OceanBaseVectorConfig
+from core.rag.models.document import Document
+from tests.benchmarks.bench_oceanbase_vector import _chunks, _LocalRedis, _percentiles
+
+
+def _existing_hybrid_search(
+    collection_name: str, config: OceanBaseVectorConfig, query: str, query_vector: list[float], top_k: int
+) -> list[Document]:
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        vector_future = executor.submit(
+            lambda: OceanBaseVector(collection_name, config).search_by_vector(query_vector, top_k=top_k)
+        )
+        full_text_future = executor.submit(
+            lambda: OceanBaseVector(collection_name, config).search_by_full_text(query, top_k=top_k)
+        )
+        documents = vector_future.result() + full_text_future.result()
+
+    unique_documents: dict[str, Document] = {}
+    for document in documents:
+        unique_documents.setdefault(document.metadata["doc_id"], document)
+    ranked = sorted(unique_documents.values(), key=lambda d: d.metadata["score"], reverse=True)
+    return ranked[:top_k]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=2881)
+    parser.add_argument("--user", default="root@test")
+    parser.add_argument("--password", default="")
+    parser.add_argument("--database", default="test")
+    parser.add_argument("--chunks", type=int, default=20000, help="number of chunks in the collection")
+    parser.add_argument("--dimension", type=int, default=1536)
+    parser.add_argument("--top-k", type=int, default=4)
+    parser.add_argument("--queries", type=int, default=200, help="number of samples per path")
+    args = parser.parse_args()
+
+    config = OceanBaseVectorConfig(
+        host=args.host,
+        port=args.port,
+        user=args.user,
+        password=args.password,
+        database=args.database,
+        enable_hybrid_search=True,
+        native_hybrid_search=True,
+        batch_size=1000,
+    )
+    oceanbase_vector.redis_client = _LocalRedis()  # type: ignore[assignment]
+    run_id = uuid.uuid4().hex[:8]
+    collection_name = f"bench_oceanbase_hybrid_{run_id}"
+    vector = OceanBaseVector(collection_name, config)
+    if not vector.supports_hybrid_search():
+        raise SystemExit("OceanBase server does not support hybrid search")
+    try:
+        documents, embeddings = _chunks(run_id, args.chunks, args.dimension)
+        vector.create(documents, embeddings)
+
+        rng = np.random.default_rng(1)
+        for label, search in (
+            (
+                "existing",
+                lambda q, qv: _existing_hybrid_search(collection_name, config, q, qv, args.top_k),
+            ),
+            (
+                "native",
+                lambda q, qv: OceanBaseVector(collection_name, config).search_hybrid(
+                    q, qv, top_k=args.top_k, vector_weight=0.7, keyword_weight=0.3
+                ),
+            ),
+        ):
+            samples = []
+            for _ in range(args.queries):
+                i = int(rng.integers(0, args.chunks))
+                query = f"benchmark chunk {run_id} {i}"
+                start = time.perf_counter()
+                search(query, embeddings[i])
+                samples.append((time.perf_counter() - start) * 1000)
+            print(f"hybrid search {label:<9} {_percentiles(samples)}")
+    finally:
+        vector.delete()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""
+Benchmark OceanBaseVector indexing throughput and per-query setup cost.
+
+Indexing compares the previous one-INSERT-per-chunk loop with the batched add_texts in chunks/s.
+Retrieval compares building an OceanBaseVector with a fresh ObVecClient (new engine, connections,
+metadata reflection and hybrid search probe, as every Vector(dataset) did before) with the
+process-wide client cache, each followed by one ANN query. Requires a reachable OceanBase:
+
+    cd api
+    python -m tests.benchmarks.bench_oceanbase_vector --host 127.0.0.1 --port 2881 --user root@test \\
+        --password difyai123456 --database test
+"""
+
+import argparse
+import contextlib
+import statistics
+import time
+import uuid
+
+import numpy as np
+
+from core.rag.datasource.vdb.oceanbase import oceanbase_vector
+from core.rag.datasource.vdb.oceanbase.oceanbase_vector import OceanBaseVector, OceanBaseVectorConfig
+from core.rag.models.document import Document
+
+
+class _LocalRedis:
+    """Stands in for the shared cache and lock used when creating collections, no redis is needed."""
+
+    def lock(self, name: str, timeout: float | None = None):
+        return contextlib.nullcontext()
+
+    def get(self, name: str):
+        return None
+
+    def set(self, name: str, value, ex=None):
+        pass
+
+
+def _legacy_add_texts(vector: OceanBaseVector, documents: list[Document], embeddings: list[list[float]]) -> None:
+    for doc, emb in zip(documents, embeddings):
+        vector._client.insert(
+            table_name=vector._collection_name,
+            data={"id": doc.metadata["doc_id"], "vector": emb, "text": doc.page_content, "metadata": doc.metadata},
+        )
+
+
+def _chunks(run_id: str, count: int, dimension: int) -> tuple[list[Document], list[list[float]]]:
+    rng = np.random.default_rng(0)
+    documents = [
+        Document(
+            page_content=f"benchmark chunk {run_id} {i}",
+            metadata={"doc_id": str(uuid.uuid4()), "document_id": f"document-{i % 100}"},
+        )
+        for i in range(count)
+    ]
+    embeddings = rng.random((count, dimension), dtype=np.float32)
+    embeddings /= np.linalg.norm(embeddings, axis=1, keepdims=True)
+    return documents, embeddings.tolist()
+
+
+def _percentiles(samples: list[float]) -> str:
+    ordered = sorted(samples)
+    p99 = ordered[min(len(ordered) - 1, int(round(0.99 * (len(ordered) - 1))))]
+    return f"p50={statistics.median(samples):.2f}ms p99={p99:.2f}ms"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=2881)
+    parser.add_argument("--user", default="root@test")
+    parser.add_argument("--password", default="")
+    parser.add_argument("--database", default="test")
+    parser.add_argument("--hybrid", action="store_true", help="enable hybrid search")
+    parser.add_argument("--chunks", type=int, default=2000, help="number of chunks to index")
+    parser.add_argument("--dimension", type=int, default=1536)
+    parser.add_argument("--batch-size", type=int, default=100)
+    parser.add_argument("--queries", type=int, default=50, help="number of retrieval samples")
+    args = parser.parse_args()
+
+    config = OceanBaseVectorConfig(
+        host=args.host,
+        port=args.port,
+        user=args.user,
+        password=args.password,
+        database=args.database,
+        enable_hybrid_search=args.hybrid,
+        batch_size=args.batch_size,
+    )
+    oceanbase_vector.redis_client = _LocalRedis()  # type: ignore[assignment]
+    run_id = uuid.uuid4().hex[:8]
+    collection_name = f"bench_oceanbase_vector_{run_id}"
+    vector = OceanBaseVector(collection_name, config)
+    try:
+        for label, add_texts in (
+            ("legacy", lambda docs, embs: _legacy_add_texts(vector, docs, embs)),
+            (f"batched ({args.batch_size})", vector.add_texts),
+        ):
+            documents, embeddings = _chunks(run_id, args.chunks, args.dimension)
+            vector.create(documents[:1], embeddings[:1])
+            start = time.perf_counter()
+            add_texts(documents[1:], embeddings[1:])
+            elapsed = time.perf_counter() - start
+            print(f"indexing {label:<16} {(len(documents) - 1) / elapsed:.0f} chunks/s")
+            vector.delete()
+
+        documents, embeddings = _chunks(run_id, args.chunks, args.dimension)
+        vector.create(documents, embeddings)
+        query = embeddings[0]
+        for label, cached in (("fresh client", False), ("cached client", True)):
+            samples = []
+            for _ in range(args.queries):
+                if not cached:
+                    oceanbase_vector._clients.clear()
+                    oceanbase_vector._hybrid_search_support.clear()
+                start = time.perf_counter()
+                OceanBaseVector(collection_name, config).search_by_vector(query, top_k=4)
+                samples.append((time.perf_counter() - start) * 1000)
+            print(f"retrieval {label:<15} {_percentiles(samples)}")
+    finally:
+        vector.delete()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+Benchmark the per-call overhead of requests to the plugin daemon.
+
+Compares the previous path, a new requests.request (and TCP connection) per call, with
+BasePluginClient._request on the pooled keep-alive session, from --threads concurrent callers.
+Without --url a local HTTP/1.1 server answers every call, so only client and connection cost is
+measured; pass the URL and key of a plugin daemon to measure against a real one:
+
+    cd api
+    python -m tests.benchmarks.bench_plugin_client --calls 2000 --threads 8
+"""
+
+import argparse
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+from yarl import URL
+
+from configs import dify_config
+from core.plugin.impl import base
+from core.plugin.impl.base import BasePluginClient, get_plugin_daemon_pool_metrics
+from tests.benchmarks.bench_oceanbase_vector import _percentiles
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # headers and body are written separately, avoid the delayed-ACK stall on kept-alive connections
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        body = b'{"code": 0, "message": "", "data": true}'
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def _legacy_request(path: str) -> requests.Response:
+    """The previous BasePluginClient._request: module-level requests.request, no connection reuse."""
+    url = base.plugin_daemon_inner_api_baseurl / path
+    headers = {"X-Api-Key": dify_config.PLUGIN_DAEMON_KEY, "Accept-Encoding": "gzip, deflate, br"}
+    return requests.request(method="GET", url=str(url), headers=headers)
+
+
+def _measure(label: str, request, path: str, calls: int, threads: int) -> None:
+    def timed_call(_):
+        start = time.perf_counter()
+        request(path).raise_for_status()
+        return (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        samples = list(executor.map(timed_call, range(calls)))
+    elapsed = time.perf_counter() - start
+    print(f"{label:<7} {_percentiles(samples)} throughput={calls / elapsed:.0f}/s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", help="plugin daemon URL, a local server is started when omitted")
+    parser.add_argument("--key", help="plugin daemon key, defaults to PLUGIN_DAEMON_KEY")
+    parser.add_argument("--path", default="health/check", help="daemon path requested by every call")
+    parser.add_argument("--calls", type=int, default=2000, help="number of calls per path")
+    parser.add_argument("--threads", type=int, default=8, help="number of concurrent callers")
+    args = parser.parse_args()
+
+    server = None
+    if args.url:
+        base.plugin_daemon_inner_api_baseurl = URL(args.url)
+    else:
+        server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        base.plugin_daemon_inner_api_baseurl = URL(f"http://127.0.0.1:{server.server_port}")
+    if args.key:
+        dify_config.PLUGIN_DAEMON_KEY = args.key
+
+    try:
+        _measure("legacy", _legacy_request, args.path, args.calls, args.threads)
+        client = BasePluginClient()
+        _measure("pooled", lambda path: client._request("GET", path), args.path, args.calls, args.threads)
+        print(get_plugin_daemon_pool_metrics())
+    finally:
+        if server is not None:
+            server.shutdown()
+            server.server_close()
+
+
+if __name__ == "__main__":
+    main()
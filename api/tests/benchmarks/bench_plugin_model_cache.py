@@ -0,0 +1,111 @@
+"""
+Benchmark cold and warm plugin model lookups of a request.
+
+Every sample is one request in a fresh context, as a new HTTP request or Celery task would be: it lists
+the tenant's plugin model providers and fetches one model schema, like the model resolution at the start of
+a chat or workflow run. Cold samples invalidate the tenant's plugin caches first, so they show the latency
+every request had before the process-level cache; warm samples are served from it.
+
+Without --url the plugin daemon is simulated with --daemon-latency per call, pass the URL and key of a
+plugin daemon and a tenant with the provider installed to measure a real one:
+
+    cd api
+    python -m tests.benchmarks.bench_plugin_model_cache --url http://127.0.0.1:5002 --key <PLUGIN_DAEMON_KEY> \\
+        --tenant-id <tenant id> --provider langgenius/openai/openai --model gpt-4o
+"""
+
+import argparse
+import contextlib
+import json
+import time
+from contextvars import Context
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from yarl import URL
+
+from configs import dify_config
+from core.helper import plugin_model_cache
+from core.helper.plugin_model_cache import PluginModelCache
+from core.model_runtime.entities.model_entities import ModelType
+from core.model_runtime.model_providers.model_provider_factory import ModelProviderFactory
+from core.plugin.impl import base
+from tests.benchmarks.bench_oceanbase_vector import _percentiles
+
+
+class _LocalVersions:
+    """Stands in for redis, which only holds the plugin installation versions here."""
+
+    def __init__(self):
+        self.values: dict[str, int] = {}
+
+    def get(self, name: str):
+        return str(self.values[name]).encode() if name in self.values else None
+
+    def incr(self, name: str, amount: int = 1):
+        self.values[name] = self.values.get(name, 0) + amount
+        return self.values[name]
+
+
+class _SimulatedPluginModelClient:
+    def __init__(self, latency: float):
+        self._latency = latency
+
+    def fetch_model_providers(self, tenant_id: str):
+        time.sleep(self._latency)
+        return [
+            SimpleNamespace(plugin_id=f"bench/provider-{i}", declaration=SimpleNamespace(provider=f"provider-{i}"))
+            for i in range(20)
+        ]
+
+    def get_model_schema(self, **kwargs):
+        time.sleep(self._latency)
+        return SimpleNamespace(model=kwargs["model"])
+
+
+def _request(tenant_id: str, provider: str, model: str, credentials: dict) -> None:
+    factory = ModelProviderFactory(tenant_id)
+    factory.get_plugin_model_providers()
+    factory.get_model_schema(provider=provider, model_type=ModelType.LLM, model=model, credentials=credentials)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", help="plugin daemon URL, the daemon is simulated when omitted")
+    parser.add_argument("--key", help="plugin daemon key, defaults to PLUGIN_DAEMON_KEY")
+    parser.add_argument("--tenant-id", default="bench-tenant")
+    parser.add_argument("--provider", default="bench/provider-0/provider-0")
+    parser.add_argument("--model", default="bench-model")
+    parser.add_argument("--credentials", default="{}", help="model credentials as JSON")
+    parser.add_argument("--daemon-latency", type=float, default=20.0, help="simulated ms per daemon call")
+    parser.add_argument("--requests", type=int, default=200, help="number of samples per mode")
+    args = parser.parse_args()
+
+    dify_config.PLUGIN_MODEL_CACHE_TTL = 300
+    plugin_model_cache.redis_client = _LocalVersions()  # type: ignore[assignment]
+    credentials = json.loads(args.credentials)
+    if args.url:
+        base.plugin_daemon_inner_api_baseurl = URL(args.url)
+        client_patch: contextlib.AbstractContextManager = contextlib.nullcontext()
+    else:
+        client_patch = patch(
+            "core.model_runtime.model_providers.model_provider_factory.PluginModelClient",
+            lambda: _SimulatedPluginModelClient(args.daemon_latency / 1000),
+        )
+    if args.key:
+        dify_config.PLUGIN_DAEMON_KEY = args.key
+
+    with client_patch:
+        for label, cold in (("cold", True), ("warm", False)):
+            samples = []
+            for _ in range(args.requests):
+                if cold:
+                    PluginModelCache.invalidate(args.tenant_id)
+                start = time.perf_counter()
+                Context().run(_request, args.tenant_id, args.provider, args.model, credentials)
+                samples.append((time.perf_counter() - start) * 1000)
+            print(f"request {label} {_percentiles(samples)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+from contextvars import Context
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import pytest
+from cachetools import TTLCache
+
+from core.helper import plugin_model_cache
+from core.helper.plugin_model_cache import PluginModelCache
+from core.model_runtime.entities.model_entities import ModelType
+from core.model_runtime.model_providers.__base.ai_model import AIModel
+from core.model_runtime.model_providers.model_provider_factory import ModelProviderFactory
+
+
+class _FakeRedis:
+    def __init__(self):
+        self.values: dict[str, int] = {}
+
+    def get(self, name):
+        return str(self.values[name]).encode() if name in self.values else None
+
+    def incr(self, name, amount=1):
+        self.values[name] = self.values.get(name, 0) + amount
+        return self.values[name]
+
+
+@pytest.fixture
+def redis():
+    redis = _FakeRedis()
+    with (
+        patch.object(plugin_model_cache, "redis_client", redis),
+        patch.object(plugin_model_cache, "_providers_cache", TTLCache(maxsize=10, ttl=300)),
+        patch.object(plugin_model_cache, "_schemas_cache", TTLCache(maxsize=10, ttl=300)),
+        patch("core.helper.plugin_model_cache.dify_config.PLUGIN_MODEL_CACHE_TTL", 300),
+    ):
+        yield redis
+
+
+def _fetch_providers(tenant_id: str):
+    # every call is a new request, the request-local context caches start empty
+    return Context().run(lambda: ModelProviderFactory(tenant_id).get_plugin_model_providers())
+
+
+@patch("core.model_runtime.model_providers.model_provider_factory.PluginModelClient")
+def test_providers_are_reused_across_requests_until_plugins_change(plugin_model_client, redis):
+    fetch_model_providers = plugin_model_client.return_value.fetch_model_providers
+    fetch_model_providers.side_effect = lambda tenant_id: [
+        SimpleNamespace(plugin_id="langgenius/openai", declaration=SimpleNamespace(provider="openai"))
+    ]
+
+    first = _fetch_providers("tenant-1")
+    second = _fetch_providers("tenant-1")
+
+    assert second is first
+    assert [p.declaration.provider for p in second] == ["langgenius/openai/openai"]
+    assert fetch_model_providers.call_count == 1
+
+    # other tenants have their own entries
+    _fetch_providers("tenant-2")
+    assert fetch_model_providers.call_count == 2
+
+    PluginModelCache.invalidate("tenant-1")
+    _fetch_providers("tenant-1")
+    assert fetch_model_providers.call_count == 3
+
+
+@patch("core.model_runtime.model_providers.__base.ai_model.PluginModelClient")
+def test_model_schemas_follow_the_installation_version(plugin_model_client, redis):
+    get_model_schema = plugin_model_client.return_value.get_model_schema
+    model = AIModel.model_construct(
+        tenant_id="tenant-1", model_type=ModelType.LLM, plugin_id="langgenius/openai", provider_name="openai"
+    )
+
+    def get_schema():
+        return Context().run(lambda: model.get_model_schema("gpt-4o", {"api_key": "key"}))
+
+    assert get_schema() is get_schema()
+    assert get_model_schema.call_count == 1
+
+    # another process installed a plugin, the schema is stale without a local invalidation
+    redis.incr(PluginModelCache._version_key("tenant-1"))
+    get_schema()
+    assert get_model_schema.call_count == 2
+
+
+@patch("core.model_runtime.model_providers.model_provider_factory.PluginModelClient")
+def test_providers_are_fetched_per_request_without_version(plugin_model_client, redis):
+    plugin_model_client.return_value.fetch_model_providers.return_value = []
+
+    with patch.object(redis, "get", side_effect=ConnectionError):
+        _fetch_providers("tenant-1")
+        _fetch_providers("tenant-1")
+
+    assert plugin_model_client.return_value.fetch_model_providers.call_count == 2
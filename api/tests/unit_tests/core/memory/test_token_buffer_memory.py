@@ -0,0 +1,110 @@
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from core.memory.token_buffer_memory import TokenBufferMemory
+from models.model import AppMode
+
+
+def _messages(count: int, memory_tokens: bool = True) -> list[SimpleNamespace]:
+    # newest first, as loaded from the database, every message answers the one before it
+    messages = []
+    for i in range(count):
+        query = " ".join(["question"] * (i + 1))
+        answer = " ".join(["answer"] * 10)
+        messages.append(
+            SimpleNamespace(
+                id=f"message-{i}",
+                parent_message_id=f"message-{i - 1}" if i else None,
+                query=query,
+                answer=answer,
+                answer_tokens=10,
+                memory_query_tokens=i + 1 if memory_tokens else None,
+                memory_answer_tokens=10 if memory_tokens else None,
+            )
+        )
+    return list(reversed(messages))
+
+
+def _result(messages: list[SimpleNamespace]) -> MagicMock:
+    result = MagicMock()
+    result.all.return_value = messages
+    return result
+
+
+def _count_tokens(prompt_messages) -> int:
+    # the model's tokenizer differs from the local one, and every message costs 3 more tokens
+    return sum(len(m.content.split()) * 2 + 3 for m in prompt_messages)
+
+
+def _longest_history(memory: TokenBufferMemory, max_token_limit: int) -> int:
+    prompt_messages = list(memory.get_history_prompt_messages(max_token_limit=10**6))
+    while _count_tokens(prompt_messages) > max_token_limit and len(prompt_messages) > 1:
+        prompt_messages.pop(0)
+    return len(prompt_messages)
+
+
+@pytest.fixture
+def db():
+    with patch("core.memory.token_buffer_memory.db") as db:
+        yield db
+
+
+def _memory():
+    conversation = SimpleNamespace(id="conversation-1", app=None, mode=AppMode.CHAT)
+    model_instance = MagicMock()
+    model_instance.get_llm_num_tokens.side_effect = _count_tokens
+    return TokenBufferMemory(conversation=conversation, model_instance=model_instance), model_instance  # type: ignore[arg-type]
+
+
+def test_history_is_pruned_with_stored_token_counts(db):
+    db.session.scalars.side_effect = [_result(_messages(50)), []]
+    memory, model_instance = _memory()
+
+    with patch.object(TokenBufferMemory, "get_num_tokens") as get_num_tokens:
+        prompt_messages = memory.get_history_prompt_messages(max_token_limit=500)
+
+    get_num_tokens.assert_not_called()
+    # message files of all messages are loaded at once
+    assert db.session.scalars.call_count == 2
+    assert 1 < len(prompt_messages) < 100
+    assert _count_tokens(prompt_messages) <= 500
+    assert prompt_messages[-1].content == " ".join(["answer"] * 10)
+    assert model_instance.get_llm_num_tokens.call_count <= 3
+
+
+def test_history_without_stored_counts_is_counted_locally(db):
+    db.session.scalars.side_effect = [
+        _result(_messages(20, memory_tokens=False)),
+        [],
+        _result(_messages(20, memory_tokens=False)),
+        [],
+    ]
+    memory, model_instance = _memory()
+
+    prompt_messages = memory.get_history_prompt_messages(max_token_limit=200)
+
+    assert _count_tokens(prompt_messages) <= 200
+    # the scaled local counts drop at most one message more than counting with the model after every drop
+    assert model_instance.get_llm_num_tokens.call_count <= 3
+    assert len(prompt_messages) >= _longest_history(memory, 200) - 1
+
+
+def test_history_within_limit_is_counted_once(db):
+    db.session.scalars.side_effect = [_result(_messages(3)), []]
+    memory, model_instance = _memory()
+
+    prompt_messages = memory.get_history_prompt_messages(max_token_limit=2000)
+
+    assert len(prompt_messages) == 6
+    assert model_instance.get_llm_num_tokens.call_count == 1
+
+
+def test_pruning_keeps_the_last_message(db):
+    db.session.scalars.side_effect = [_result(_messages(3, memory_tokens=False)), []]
+    memory, _ = _memory()
+
+    prompt_messages = memory.get_history_prompt_messages(max_token_limit=1)
+
+    assert len(prompt_messages) == 1
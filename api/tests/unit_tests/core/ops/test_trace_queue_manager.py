@@ -0,0 +1,116 @@
+import json
+from unittest.mock import MagicMock, patch
+
+import pytest
+from flask import Flask
+
+from core.ops import ops_trace_manager
+from core.ops.entities.trace_entity import GenerateNameTraceInfo, TraceBatchData
+from core.ops.ops_trace_manager import TraceQueueManager
+from tasks.ops_trace_task import process_trace_batch
+
+
+def _trace_task(app_id: str, name: str) -> MagicMock:
+    task = MagicMock()
+    task.app_id = app_id
+    task.execute.return_value = GenerateNameTraceInfo(
+        tenant_id="tenant-1", conversation_id=name, inputs="query", outputs=name, metadata={}
+    )
+    return task
+
+
+def _tracing(provider: str | None) -> str | None:
+    return json.dumps({"enabled": True, "tracing_provider": provider}) if provider else None
+
+
+@pytest.fixture
+def manager():
+    manager = object.__new__(TraceQueueManager)
+    manager.flask_app = Flask(__name__)
+    with (
+        patch.object(ops_trace_manager, "trace_manager_batch_enabled", True),
+        patch.object(ops_trace_manager, "storage") as storage,
+        patch.object(ops_trace_manager, "process_trace_batch") as process_trace_batch,
+        patch.object(ops_trace_manager, "process_trace_tasks") as process_trace_tasks,
+        patch.object(ops_trace_manager, "db") as db,
+    ):
+        db.session.execute.return_value = [
+            ("app-1", _tracing("langfuse")),
+            ("app-2", _tracing("arize")),
+            ("app-3", _tracing(None)),
+        ]
+        manager.storage = storage
+        manager.process_trace_batch = process_trace_batch
+        manager.process_trace_tasks = process_trace_tasks
+        yield manager
+
+
+def test_traces_are_sent_as_one_batch(manager):
+    tasks = [
+        _trace_task("app-1", "a"),
+        _trace_task("app-2", "b"),
+        _trace_task("app-1", "c"),
+        _trace_task("app-3", "disabled"),
+    ]
+
+    manager.send_to_celery(tasks)
+
+    manager.process_trace_tasks.delay.assert_not_called()
+    manager.storage.save.assert_called_once()
+    manager.process_trace_batch.delay.assert_called_once()
+    file_path, payload = manager.storage.save.call_args.args
+    assert file_path == f"ops_trace/batch/{manager.process_trace_batch.delay.call_args.args[0]['file_id']}.json"
+
+    batch_data = TraceBatchData.model_validate_json(payload)
+    assert [(g.tracing_provider, g.app_id, [t.trace_info["outputs"] for t in g.traces]) for g in batch_data.groups] == [
+        ("arize", "app-2", ["b"]),
+        ("langfuse", "app-1", ["a", "c"]),
+    ]
+    # traces of apps without tracing are not built
+    tasks[3].execute.assert_not_called()
+
+
+def test_batch_reuses_the_trace_instance_of_each_app(manager):
+    manager.send_to_celery([_trace_task("app-1", "a"), _trace_task("app-1", "b"), _trace_task("app-2", "c")])
+    payload = manager.storage.save.call_args.args[1]
+
+    trace_instance = MagicMock()
+    trace_instance.trace.side_effect = [None, RuntimeError("exporter down"), None]
+    with (
+        patch("tasks.ops_trace_task.storage") as storage,
+        patch("tasks.ops_trace_task.redis_client") as redis_client,
+        patch(
+            "core.ops.ops_trace_manager.OpsTraceManager.get_ops_trace_instance", return_value=trace_instance
+        ) as get_ops_trace_instance,
+        Flask(__name__).app_context(),
+    ):
+        storage.load.return_value = payload
+        process_trace_batch({"file_id": "batch-1"})
+
+    assert [call.args[0] for call in get_ops_trace_instance.call_args_list] == ["app-2", "app-1"]
+    assert [call.args[0].outputs for call in trace_instance.trace.call_args_list] == ["c", "a", "b"]
+    redis_client.incr.assert_called_once_with("FAILED_OPS_TRACE_app-1", 1)
+    storage.delete.assert_called_once_with("ops_trace/batch/batch-1.json")
+
+
+def test_batch_continues_after_an_app_fails_to_resolve(manager):
+    manager.send_to_celery([_trace_task("app-1", "a"), _trace_task("app-1", "b"), _trace_task("app-2", "c")])
+    payload = manager.storage.save.call_args.args[1]
+
+    trace_instance = MagicMock()
+    with (
+        patch("tasks.ops_trace_task.storage") as storage,
+        patch("tasks.ops_trace_task.redis_client") as redis_client,
+        patch(
+            "core.ops.ops_trace_manager.OpsTraceManager.get_ops_trace_instance",
+            side_effect=[RuntimeError("decryption failed"), trace_instance],
+        ),
+        Flask(__name__).app_context(),
+    ):
+        storage.load.return_value = payload
+        process_trace_batch({"file_id": "batch-1"})
+
+    # app-2 comes first and fails, the traces of app-1 are still sent
+    redis_client.incr.assert_called_once_with("FAILED_OPS_TRACE_app-2", 1)
+    assert [call.args[0].outputs for call in trace_instance.trace.call_args_list] == ["a", "b"]
+    storage.delete.assert_called_once_with("ops_trace/batch/batch-1.json")
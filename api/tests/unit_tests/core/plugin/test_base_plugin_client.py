@@ -0,0 +1,67 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import patch
+
+import pytest
+from yarl import URL
+
+from core.plugin.impl import base
+from core.plugin.impl.base import BasePluginClient, get_plugin_daemon_pool_metrics
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # headers and body are written separately, avoid the delayed-ACK stall on kept-alive connections
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        body = b'{"code": 0, "message": "", "data": true}'
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def plugin_daemon():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    with (
+        patch.object(base, "plugin_daemon_inner_api_baseurl", URL(f"http://127.0.0.1:{server.server_port}")),
+        patch.object(base, "_session", None),
+        patch.object(base, "_session_pid", None),
+        patch.dict(base._session_stats, {"requests_total": 0, "connection_errors_total": 0, "awaiting_response": 0}),
+    ):
+        yield server
+    server.shutdown()
+    server.server_close()
+
+
+def test_requests_reuse_pooled_connections(plugin_daemon):
+    client = BasePluginClient()
+
+    for _ in range(5):
+        assert client._request("GET", "plugin/ping").json()["data"] is True
+
+    metrics = get_plugin_daemon_pool_metrics()
+    assert metrics["requests_total"] == 5
+    assert metrics["awaiting_response"] == 0
+    (pool,) = metrics["pools"]
+    assert pool["connections_created"] == 1
+    assert pool["requests"] == 5
+    assert pool["idle_connections"] == 1
+
+
+def test_session_is_recreated_after_fork(plugin_daemon):
+    client = BasePluginClient()
+    client._request("GET", "plugin/ping")
+    session = base._session
+
+    with patch("core.plugin.impl.base.os.getpid", return_value=-1):
+        client._request("GET", "plugin/ping")
+        assert base._session is not session
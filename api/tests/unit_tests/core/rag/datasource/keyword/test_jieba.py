@@ -0,0 +1,144 @@
+from unittest.mock import MagicMock, patch
+
+import pytest
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.sql import Delete, Insert, Select
+
+from core.rag.datasource.keyword.jieba.jieba import KEYWORD_POSTING_DATA_SOURCE_TYPE, Jieba
+from core.rag.models.document import Document
+
+
+def _dataset(data_source_type: str, keyword_table: dict | None = None) -> MagicMock:
+    dataset = MagicMock()
+    dataset.id = "dataset-1"
+    dataset.tenant_id = "tenant-1"
+    dataset.dataset_keyword_table.data_source_type = data_source_type
+    dataset.dataset_keyword_table.keyword_table_dict = (
+        {"__data__": {"table": keyword_table}} if keyword_table is not None else None
+    )
+    return dataset
+
+
+def _statements(session: MagicMock, statement_type) -> list:
+    return [call.args[0] for call in session.execute.call_args_list if isinstance(call.args[0], statement_type)]
+
+
+@pytest.fixture
+def session():
+    with patch("core.rag.datasource.keyword.jieba.jieba.db.session") as session:
+        yield session
+
+
+@pytest.fixture
+def redis_client():
+    with patch("core.rag.datasource.keyword.jieba.jieba.redis_client") as redis_client:
+        yield redis_client
+
+
+@pytest.fixture
+def extract_keywords():
+    with patch(
+        "core.rag.datasource.keyword.jieba.jieba.JiebaKeywordTableHandler.extract_keywords",
+        side_effect=lambda text, max_keywords_per_chunk=10: set(text.split()),
+    ) as extract_keywords:
+        yield extract_keywords
+
+
+@patch("core.rag.datasource.keyword.jieba.jieba.dify_config.SQLALCHEMY_DATABASE_URI_SCHEME", "mysql+pymysql")
+def test_add_texts_inserts_postings_without_dataset_lock(session, redis_client, extract_keywords):
+    jieba = Jieba(_dataset(KEYWORD_POSTING_DATA_SOURCE_TYPE))
+    jieba.add_texts(
+        [
+            Document(page_content="apple banana", metadata={"doc_id": "node-1"}),
+            Document(page_content="banana", metadata={"doc_id": "node-2"}),
+        ]
+    )
+
+    redis_client.lock.assert_not_called()
+    (insert,) = _statements(session, Insert)
+    assert str(insert).startswith("INSERT IGNORE INTO dataset_keyword_postings")
+    params = insert.compile().params
+    postings = {(params[f"keyword_m{i}"], params[f"index_node_id_m{i}"]) for i in range(3)}
+    assert postings == {("apple", "node-1"), ("banana", "node-1"), ("banana", "node-2")}
+    session.commit.assert_called()
+
+
+def test_search_reads_only_query_keyword_postings(session, extract_keywords):
+    dataset = _dataset(KEYWORD_POSTING_DATA_SOURCE_TYPE)
+    session.execute.return_value = [("node-2", 2), ("node-1", 1)]
+
+    assert Jieba(dataset)._retrieve_ids_by_query_from_postings("apple banana", k=2) == ["node-2", "node-1"]
+
+    (stmt,) = _statements(session, Select)
+    sql = str(stmt)
+    assert "dataset_keyword_postings.keyword IN" in sql
+    assert "GROUP BY dataset_keyword_postings.index_node_id" in sql
+    assert stmt.compile().params["param_1"] == 2
+
+
+def test_delete_by_ids_deletes_postings_of_nodes(session, redis_client):
+    Jieba(_dataset(KEYWORD_POSTING_DATA_SOURCE_TYPE)).delete_by_ids(["node-1", "node-2"])
+
+    redis_client.lock.assert_not_called()
+    (stmt,) = _statements(session, Delete)
+    assert "dataset_keyword_postings.index_node_id IN" in str(stmt)
+    session.commit.assert_called_once()
+
+
+def test_json_keyword_table_is_still_updated_under_lock(session, redis_client, extract_keywords):
+    dataset = _dataset("database", {"apple": {"node-1"}})
+    Jieba(dataset).add_texts([Document(page_content="banana", metadata={"doc_id": "node-2"})])
+
+    redis_client.lock.assert_called_once_with("keyword_indexing_lock_dataset-1", timeout=600)
+    assert '"banana":["node-2"]' in dataset.dataset_keyword_table.keyword_table
+    assert not _statements(session, Insert)
+
+
+@patch("core.rag.datasource.keyword.jieba.jieba.dify_config.SQLALCHEMY_DATABASE_URI_SCHEME", "postgresql")
+def test_migrate_to_postings(session, redis_client):
+    dataset = _dataset("database", {"apple": {"node-1", "node-2"}, "banana": {"node-2"}})
+
+    assert Jieba(dataset).migrate_to_postings() == 3
+
+    (insert,) = _statements(session, Insert)
+    assert "ON CONFLICT DO NOTHING" in str(insert.compile(dialect=postgresql.dialect()))
+    assert dataset.dataset_keyword_table.data_source_type == KEYWORD_POSTING_DATA_SOURCE_TYPE
+    assert dataset.dataset_keyword_table.keyword_table == ""
+    session.commit.assert_called_once()
+
+    assert Jieba(dataset).migrate_to_postings() == 0
+
+
+def _segment(index_node_id: str, document_id: str) -> MagicMock:
+    segment = MagicMock()
+    segment.index_node_id = index_node_id
+    segment.document_id = document_id
+    segment.content = f"content of {index_node_id}"
+    return segment
+
+
+def test_search_loads_segments_in_one_query_and_filters_before_top_k(session, extract_keywords):
+    dataset = _dataset("database", {"apple": {"n1", "n2"}, "banana": {"n1", "n2"}, "cherry": {"n2", "n3"}})
+    segment_query = session.query.return_value.where.return_value
+    # n2 ranks first but belongs to a filtered-out document, the database returns rows in any order
+    segment_query.where.return_value.all.return_value = [_segment("n3", "doc-1"), _segment("n1", "doc-1")]
+
+    documents = Jieba(dataset).search("apple banana cherry", top_k=2, document_ids_filter=["doc-1"])
+
+    assert [document.metadata["doc_id"] for document in documents] == ["n1", "n3"]
+    session.query.assert_called_once()
+    (chunk_indices_filter,) = session.query.return_value.where.call_args.args[1:]
+    assert set(chunk_indices_filter.right.value) == {"n1", "n2", "n3"}
+
+
+def test_search_postings_applies_document_filter_before_limit(session, extract_keywords):
+    session.execute.return_value = []
+
+    Jieba(_dataset(KEYWORD_POSTING_DATA_SOURCE_TYPE))._retrieve_ids_by_query_from_postings(
+        "apple", k=4, document_ids_filter=["doc-1"]
+    )
+
+    (stmt,) = _statements(session, Select)
+    sql = str(stmt)
+    assert "JOIN document_segments" in sql
+    assert sql.index("document_segments.document_id IN") < sql.index("LIMIT")
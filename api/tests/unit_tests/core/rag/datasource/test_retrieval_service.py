@@ -0,0 +1,61 @@
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from core.rag.datasource.retrieval_service import RetrievalService
+from core.rag.models.document import Document
+
+WEIGHTS = {
+    "vector_setting": {"vector_weight": 0.7, "embedding_provider_name": "p", "embedding_model_name": "m"},
+    "keyword_setting": {"keyword_weight": 0.3},
+}
+
+
+@pytest.fixture
+def dataset():
+    dataset = MagicMock()
+    dataset.id = "dataset-1"
+    dataset.index_struct_dict = {"type": "oceanbase", "vector_store": {"class_prefix": "Vector_index_1_Node"}}
+    return dataset
+
+
+@pytest.fixture
+def vector_cls():
+    with patch("core.rag.datasource.retrieval_service.Vector") as vector_cls:
+        vector_cls.get_vector_factory.return_value.supports_hybrid_search.return_value = True
+        vector_cls.return_value.supports_hybrid_search.return_value = True
+        yield vector_cls
+
+
+def test_retrieve_uses_native_hybrid_search(dataset, vector_cls):
+    documents = [Document(page_content="text", metadata={"doc_id": "node-1", "score": 0.9})]
+    vector_cls.return_value.search_hybrid.return_value = documents
+
+    with patch.object(RetrievalService, "_get_dataset", return_value=dataset):
+        result = RetrievalService.retrieve(
+            "hybrid_search", dataset.id, 'say "hi"', 4, 0.5, None, "weighted_score", WEIGHTS, ["doc-1"]
+        )
+
+    assert result == documents
+    vector_cls.return_value.search_hybrid.assert_called_once_with(
+        'say "hi"',
+        full_text_query='say \\"hi\\"',
+        top_k=4,
+        score_threshold=0.5,
+        vector_weight=0.7,
+        keyword_weight=0.3,
+        document_ids_filter=["doc-1"],
+    )
+
+
+def test_native_hybrid_search_falls_back(dataset, vector_cls):
+    vector_cls.return_value.search_hybrid.side_effect = RuntimeError("unsupported statement")
+    assert RetrievalService.native_hybrid_search(dataset, "query", 4, None, WEIGHTS) is None
+
+    vector_cls.return_value.supports_hybrid_search.return_value = False
+    assert RetrievalService.native_hybrid_search(dataset, "query", 4, None, WEIGHTS) is None
+
+    vector_cls.get_vector_factory.return_value.supports_hybrid_search.return_value = False
+    vector_cls.reset_mock()
+    assert RetrievalService.native_hybrid_search(dataset, "query", 4, None, WEIGHTS) is None
+    vector_cls.assert_not_called()
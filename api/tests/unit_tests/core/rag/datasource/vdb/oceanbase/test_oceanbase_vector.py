@@ -0,0 +1,135 @@
+from unittest.mock import MagicMock, patch
+
+import pytest
+from sqlalchemy.dialects import mysql
+
+from core.rag.datasource.vdb.oceanbase import oceanbase_vector
+from core.rag.datasource.vdb.oceanbase.oceanbase_vector import OceanBaseVector, OceanBaseVectorConfig
+from core.rag.models.document import Document
+
+
+def _config(**kwargs) -> OceanBaseVectorConfig:
+    values = {"host": "127.0.0.1", "port": 2881, "user": "root@test", "password": "", "database": "test"}
+    values.update(kwargs)
+    return OceanBaseVectorConfig(**values)
+
+
+@pytest.fixture
+def ob_vec_client():
+    with (
+        patch.dict(oceanbase_vector._clients, clear=True),
+        patch.dict(oceanbase_vector._hybrid_search_support, clear=True),
+        patch.dict(oceanbase_vector._document_id_columns, clear=True),
+        patch("core.rag.datasource.vdb.oceanbase.oceanbase_vector.ObVecClient") as ob_vec_client,
+    ):
+        ob_vec_client.return_value.perform_raw_text_sql.return_value.fetchone.return_value = [
+            "OceanBase_CE 4.3.5.1 (r101000042025031818-bxxxx) (Built Mar 18 2025 18:13:36)"
+        ]
+        yield ob_vec_client
+
+
+def test_clients_and_hybrid_search_probe_are_shared(ob_vec_client):
+    config = _config(enable_hybrid_search=True)
+
+    first = OceanBaseVector("collection_1", config)
+    second = OceanBaseVector("collection_2", config)
+
+    assert first._client is second._client
+    assert first._hybrid_search_enabled
+    assert second._hybrid_search_enabled
+    ob_vec_client.assert_called_once()
+    ob_vec_client.return_value.perform_raw_text_sql.assert_called_once()
+
+    OceanBaseVector("collection_1", _config(database="other"))
+    assert ob_vec_client.call_count == 2
+
+
+def test_add_texts_inserts_in_batches(ob_vec_client):
+    vector = OceanBaseVector("collection_1", _config(batch_size=2))
+    documents = [Document(page_content=f"text {i}", metadata={"doc_id": f"node-{i}"}) for i in range(5)]
+
+    vector.add_texts(documents, [[float(i), 0.0] for i in range(5)])
+
+    insert = ob_vec_client.return_value.insert
+    assert [len(call.kwargs["data"]) for call in insert.call_args_list] == [2, 2, 1]
+    assert [row["id"] for call in insert.call_args_list for row in call.kwargs["data"]] == [
+        f"node-{i}" for i in range(5)
+    ]
+
+
+def _compile(clause) -> str:
+    return str(clause.compile(dialect=mysql.dialect(), compile_kwargs={"literal_binds": True}))
+
+
+@pytest.mark.parametrize(
+    ("has_column", "expected"),
+    [
+        (True, "document_id IN ('doc-1', 'doc-''2')"),
+        (False, "json_unquote(json_extract(metadata, '$.document_id')) IN ('doc-1', 'doc-''2')"),
+    ],
+)
+def test_search_by_vector_filters_on_document_id(ob_vec_client, has_column, expected):
+    vector = OceanBaseVector("collection_1", _config())
+    oceanbase_vector._document_id_columns[(oceanbase_vector._client_key(vector._config), "collection_1")] = has_column
+    ob_vec_client.return_value.ann_search.return_value = [("text", '{"doc_id": "node-1"}', 0.0)]
+
+    docs = vector.search_by_vector([0.1, 0.2], top_k=2, document_ids_filter=["doc-1", "doc-'2"])
+
+    (where_clause,) = ob_vec_client.return_value.ann_search.call_args.kwargs["where_clause"]
+    assert _compile(where_clause) == expected
+    assert docs[0].metadata == {"doc_id": "node-1", "score": 1.0}
+
+
+def test_search_by_full_text_binds_document_ids(ob_vec_client):
+    vector = OceanBaseVector("collection_1", _config(enable_hybrid_search=True))
+    oceanbase_vector._document_id_columns[(oceanbase_vector._client_key(vector._config), "collection_1")] = True
+    conn = ob_vec_client.return_value.engine.connect.return_value.__enter__.return_value
+    conn.execute.return_value.fetchall.return_value = []
+
+    vector.search_by_full_text("hello", top_k=3, document_ids_filter=["doc-1", "doc-2"])
+
+    statement, params = conn.execute.call_args.args
+    assert "document_id IN (__[POSTCOMPILE_document_ids])" in str(statement.compile(dialect=mysql.dialect()))
+    assert params == {"query": "hello", "document_ids": ["doc-1", "doc-2"]}
+
+
+def test_add_document_id_column(ob_vec_client):
+    vector = OceanBaseVector("collection_1", _config())
+    client = ob_vec_client.return_value
+    client.perform_raw_text_sql.reset_mock()
+    client.perform_raw_text_sql.return_value.fetchone.return_value = None
+
+    with patch("core.rag.datasource.vdb.oceanbase.oceanbase_vector.redis_client", MagicMock()):
+        assert vector.add_document_id_column()
+
+    statements = [call.args[0] for call in client.perform_raw_text_sql.call_args_list]
+    assert statements[-2].startswith("ALTER TABLE `collection_1` ADD COLUMN `document_id` VARCHAR(255) GENERATED")
+    assert statements[-1] == "CREATE INDEX `document_id_index` ON `collection_1` (`document_id`)"
+    client.refresh_metadata.assert_called_once_with(["collection_1"])
+    assert vector._has_document_id_column()
+
+
+def test_search_hybrid_runs_one_statement(ob_vec_client):
+    vector = OceanBaseVector("collection_1", _config(enable_hybrid_search=True, native_hybrid_search=True))
+    oceanbase_vector._document_id_columns[(oceanbase_vector._client_key(vector._config), "collection_1")] = True
+    conn = ob_vec_client.return_value.engine.connect.return_value.__enter__.return_value
+    conn.execute.return_value.fetchall.return_value = [("text", '{"doc_id": "node-1"}', 0.75)]
+
+    assert vector.supports_hybrid_search()
+    docs = vector.search_hybrid(
+        "hello", [0.1, 0.2], top_k=3, vector_weight=0.7, keyword_weight=0.3, document_ids_filter=["doc-1"]
+    )
+
+    conn.execute.assert_called_once()
+    statement, params = conn.execute.call_args.args
+    sql = str(statement.compile(dialect=mysql.dialect()))
+    assert "APPROXIMATE LIMIT" in sql
+    assert "MATCH (text) AGAINST" in sql
+    assert sql.count("document_id IN (__[POSTCOMPILE_document_ids])") == 2
+    assert params["query_vector"] == "[0.1, 0.2]"
+    assert (params["vector_weight"], params["keyword_weight"], params["top_k"]) == (0.7, 0.3, 3)
+    assert docs[0].metadata == {"doc_id": "node-1", "score": 0.75}
+
+
+def test_native_hybrid_search_requires_config(ob_vec_client):
+    assert not OceanBaseVector("collection_1", _config(enable_hybrid_search=True)).supports_hybrid_search()
@@ -0,0 +1,182 @@
+import pickle
+from unittest.mock import MagicMock, patch
+
+import numpy as np
+import pytest
+from cachetools import TTLCache
+from sqlalchemy.sql import Insert, Select
+
+from core.model_runtime.entities.model_entities import ModelPropertyKey
+from core.rag.embedding.cached_embedding import EMBEDDING_CACHE_BATCH_SIZE, CacheEmbedding
+from libs import helper
+from models.dataset import Embedding
+
+
+def _model_instance(max_chunks: int = 10) -> MagicMock:
+    model_instance = MagicMock()
+    model_instance.model = "text-embedding-3-small"
+    model_instance.provider = "openai"
+    model_schema = MagicMock()
+    model_schema.model_properties = {ModelPropertyKey.MAX_CHUNKS: max_chunks}
+    model_instance.model_type_instance.get_model_schema.return_value = model_schema
+
+    def invoke_text_embedding(texts, user, input_type):
+        result = MagicMock()
+        result.embeddings = [[float(len(text)), 1.0] for text in texts]
+        return result
+
+    model_instance.invoke_text_embedding.side_effect = invoke_text_embedding
+    return model_instance
+
+
+def _mock_session(cached: dict[str, list[float]]) -> MagicMock:
+    session = MagicMock()
+
+    def execute(stmt):
+        result = MagicMock()
+        if isinstance(stmt, Select):
+            hashes = stmt.compile().params
+            rows = [
+                (hash, Embedding.encode_embedding(cached[hash]))
+                for value in hashes.values()
+                if isinstance(value, list)
+                for hash in value
+                if hash in cached
+            ]
+            result.all.return_value = rows
+        return result
+
+    session.execute.side_effect = execute
+    return session
+
+
+def _statements(session: MagicMock, statement_type) -> list:
+    return [call.args[0] for call in session.execute.call_args_list if isinstance(call.args[0], statement_type)]
+
+
+def test_embedding_float32_round_trip():
+    data = Embedding.encode_embedding([0.25, -0.5, 1.0])
+
+    assert data.startswith(Embedding.FLOAT32_EMBEDDING_PREFIX)
+    assert len(data) == len(Embedding.FLOAT32_EMBEDDING_PREFIX) + 3 * 4
+    assert Embedding.decode_embedding(data) == [0.25, -0.5, 1.0]
+
+
+def test_embedding_decodes_legacy_pickle():
+    legacy = pickle.dumps([0.1, 0.2], protocol=pickle.HIGHEST_PROTOCOL)
+
+    assert Embedding.decode_embedding(legacy) == [0.1, 0.2]
+
+
+@patch("core.rag.embedding.cached_embedding.dify_config.SQLALCHEMY_DATABASE_URI_SCHEME", "mysql+pymysql")
+def test_embed_documents_batches_cache_lookups_and_inserts():
+    texts = [f"text {i}" for i in range(EMBEDDING_CACHE_BATCH_SIZE * 2 + 10)]
+    cached_vector = [1.0, 0.0]
+    cached = {helper.generate_text_hash(texts[0]): cached_vector}
+    session = _mock_session(cached)
+    model_instance = _model_instance(max_chunks=100)
+
+    with patch("core.rag.embedding.cached_embedding.db.session", session):
+        embeddings = CacheEmbedding(model_instance).embed_documents(texts)
+
+    assert embeddings[0] == cached_vector
+    assert all(embedding is not None for embedding in embeddings)
+    # one lookup per chunk of hashes instead of one per text
+    assert len(_statements(session, Select)) == 3
+    inserts = _statements(session, Insert)
+    assert len(inserts) == 3
+    assert all("IGNORE" in str(insert.compile(dialect=_mysql_dialect())) for insert in inserts)
+    session.commit.assert_called_once()
+    # only texts missing from the cache are sent to the model
+    sent = sum(len(call.kwargs["texts"]) for call in model_instance.invoke_text_embedding.call_args_list)
+    assert sent == len(texts) - 1
+
+
+@patch("core.rag.embedding.cached_embedding.dify_config.SQLALCHEMY_DATABASE_URI_SCHEME", "mysql+pymysql")
+def test_embed_documents_deduplicates_and_keeps_alignment():
+    texts = ["same", "other", "same"]
+    session = _mock_session({})
+    model_instance = _model_instance()
+
+    with patch("core.rag.embedding.cached_embedding.db.session", session):
+        embeddings = CacheEmbedding(model_instance).embed_documents(texts)
+
+    expected_same = (np.array([4.0, 1.0]) / np.linalg.norm([4.0, 1.0])).tolist()
+    assert embeddings[0] == pytest.approx(expected_same)
+    assert embeddings[2] == pytest.approx(expected_same)
+    insert = _statements(session, Insert)[0]
+    assert len(insert.compile(dialect=_mysql_dialect()).params) == 2 * 5
+
+
+def test_embed_documents_all_cached_skips_model_and_insert():
+    texts = ["a", "b"]
+    cached = {helper.generate_text_hash(text): [0.0, 1.0] for text in texts}
+    session = _mock_session(cached)
+    model_instance = _model_instance()
+
+    with patch("core.rag.embedding.cached_embedding.db.session", session):
+        embeddings = CacheEmbedding(model_instance).embed_documents(texts)
+
+    assert embeddings == [[0.0, 1.0], [0.0, 1.0]]
+    model_instance.invoke_text_embedding.assert_not_called()
+    assert _statements(session, Insert) == []
+
+
+@patch("core.rag.embedding.cached_embedding.dify_config.SQLALCHEMY_DATABASE_URI_SCHEME", "postgresql")
+def test_embed_documents_postgresql_skips_conflicts():
+    from sqlalchemy.dialects import postgresql
+
+    session = _mock_session({})
+
+    with patch("core.rag.embedding.cached_embedding.db.session", session):
+        CacheEmbedding(_model_instance()).embed_documents(["a"])
+
+    insert = _statements(session, Insert)[0]
+    assert "ON CONFLICT DO NOTHING" in str(insert.compile(dialect=postgresql.dialect()))
+
+
+def _mysql_dialect():
+    from sqlalchemy.dialects import mysql
+
+    return mysql.dialect()
+
+
+@pytest.fixture
+def local_query_cache():
+    with patch("core.rag.embedding.cached_embedding._local_query_embeddings", TTLCache(maxsize=8, ttl=60)) as cache:
+        yield cache
+
+
+def test_embed_query_stores_float32_bytes_and_serves_local_hits(local_query_cache):
+    model_instance = _model_instance()
+
+    with patch("core.rag.embedding.cached_embedding.redis_client") as redis_client:
+        redis_client.getex.return_value = None
+        embedding = CacheEmbedding(model_instance).embed_query("abc")
+        assert embedding == pytest.approx([0.9486833, 0.3162278])
+
+        key, ttl, value = redis_client.setex.call_args.args
+        assert key.endswith("_f32")
+        assert ttl == 600
+        # the miss returns exactly the float32 vector that later hits return
+        assert np.frombuffer(value, dtype="<f4").tolist() == embedding
+
+        redis_client.reset_mock()
+        assert CacheEmbedding(model_instance).embed_query("abc") == embedding
+        redis_client.getex.assert_not_called()
+    assert model_instance.invoke_text_embedding.call_count == 1
+
+
+def test_embed_query_reads_shared_cache_with_getex(local_query_cache):
+    model_instance = _model_instance()
+    cached = np.asarray([0.6, 0.8], dtype="<f4")
+
+    with patch("core.rag.embedding.cached_embedding.redis_client") as redis_client:
+        redis_client.getex.return_value = cached.tobytes()
+        assert CacheEmbedding(model_instance).embed_query("abc") == cached.tolist()
+
+    redis_client.getex.assert_called_once()
+    assert redis_client.getex.call_args.kwargs == {"ex": 600}
+    redis_client.expire.assert_not_called()
+    model_instance.invoke_text_embedding.assert_not_called()
+    assert len(local_query_cache) == 1
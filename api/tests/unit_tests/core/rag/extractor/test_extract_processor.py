@@ -0,0 +1,20 @@
+from unittest.mock import MagicMock, patch
+
+from core.rag.extractor.entity.datasource_type import DatasourceType
+from core.rag.extractor.extract_processor import ExtractProcessor
+from core.rag.models.document import Document
+
+
+def test_extract_iter_drops_the_temporary_pdf_path():
+    extract_setting = MagicMock(datasource_type=DatasourceType.FILE.value)
+    extract_setting.upload_file.key = "upload_files/tenant/report.pdf"
+    pages = [Document(page_content=f"page {i}", metadata={"source": "/tmp/xyz/abc.pdf", "page": i}) for i in range(2)]
+
+    with (
+        patch("core.rag.extractor.extract_processor.storage"),
+        patch("core.rag.extractor.extract_processor.PdfExtractor") as pdf_extractor,
+    ):
+        pdf_extractor.return_value.load.return_value = iter(pages)
+        documents = list(ExtractProcessor.extract_iter(extract_setting))
+
+    assert [document.metadata for document in documents] == [{"page": 0}, {"page": 1}]
@@ -0,0 +1,121 @@
+import threading
+import time
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+import pytest
+from flask import Flask
+
+from core.indexing_runner import IndexingRunner
+from core.rag.models.document import Document
+from models.dataset import Document as DatasetDocument
+
+DATASET = SimpleNamespace(
+    id="dataset-1",
+    tenant_id="tenant-1",
+    indexing_technique="high_quality",
+    embedding_model_provider="openai",
+    embedding_model="text-embedding-3-small",
+)
+DATASET_DOCUMENT = SimpleNamespace(
+    id="document-1", dataset_id="dataset-1", data_source_type="upload_file", doc_language="English", created_by="user"
+)
+
+
+@pytest.fixture
+def runner():
+    with patch("core.indexing_runner.ModelManager"):
+        runner = IndexingRunner()
+    with (
+        patch.object(IndexingRunner, "_get_extract_setting", return_value=MagicMock()),
+        patch.object(IndexingRunner, "_check_document_paused_status"),
+        patch.object(IndexingRunner, "_update_document_index_status") as update_document_index_status,
+        patch.object(IndexingRunner, "_update_segments_by_document"),
+        patch("core.indexing_runner.DatasetDocumentStore") as doc_store_cls,
+        patch("core.indexing_runner.dify_config.INDEXING_STREAMING_BATCH_SIZE", 4),
+        patch("core.indexing_runner.dify_config.INDEXING_STREAMING_MAX_WORKERS", 2),
+        Flask(__name__).app_context(),
+    ):
+        runner.update_document_index_status = update_document_index_status
+        runner.doc_store = doc_store_cls.return_value
+        yield runner
+
+
+def _index_processor(events: list[str], pages: int, chunks_per_page: int) -> MagicMock:
+    def extract_iter(extract_setting, **kwargs):
+        for page in range(pages):
+            events.append(f"page {page}")
+            yield Document(page_content="x" * 10, metadata={"page": page})
+
+    def transform(documents, **kwargs):
+        (page,) = documents
+        return [
+            Document(page_content=f"chunk {i}", metadata={**page.metadata, "doc_id": f"{page.metadata['page']}-{i}"})
+            for i in range(chunks_per_page)
+        ]
+
+    index_processor = MagicMock()
+    index_processor.extract_iter.side_effect = extract_iter
+    index_processor.transform.side_effect = transform
+    return index_processor
+
+
+def test_run_streaming_indexes_in_bounded_batches(runner):
+    events: list[str] = []
+    running = 0
+    max_running = 0
+    lock = threading.Lock()
+
+    def process_chunk(flask_app, index_processor, chunk_documents, dataset, dataset_document, model_instance):
+        nonlocal running, max_running
+        with lock:
+            running += 1
+            max_running = max(max_running, running)
+        time.sleep(0.01)
+        with lock:
+            running -= 1
+        return len(chunk_documents)
+
+    runner.doc_store.add_documents.side_effect = lambda docs: events.append(f"save {len(docs)}")
+
+    with patch.object(IndexingRunner, "_process_chunk", side_effect=process_chunk) as process_chunk_mock:
+        runner._run_streaming(_index_processor(events, 5, 3), DATASET, DATASET_DOCUMENT, {"mode": "automatic"})
+
+    # chunks are saved and indexed while later pages are still being parsed
+    assert events.index("save 4") < events.index("page 4")
+    assert [len(call.args[2]) for call in process_chunk_mock.call_args_list] == [4, 4, 4, 3]
+    assert max_running <= 2
+    assert all(
+        doc.metadata["document_id"] == "document-1"
+        for call in process_chunk_mock.call_args_list
+        for doc in call.args[2]
+    )
+
+    status_call = runner.update_document_index_status.call_args
+    assert status_call.kwargs["after_indexing_status"] == "completed"
+    extra_update_params = status_call.kwargs["extra_update_params"]
+    assert extra_update_params[DatasetDocument.tokens] == 15
+    assert extra_update_params[DatasetDocument.word_count] == 50
+
+
+def test_run_streaming_stops_on_failed_batch(runner):
+
+    with (
+        patch.object(IndexingRunner, "_process_chunk", side_effect=RuntimeError("embedding failed")),
+        pytest.raises(RuntimeError, match="embedding failed"),
+    ):
+        runner._run_streaming(_index_processor([], 20, 3), DATASET, DATASET_DOCUMENT, {"mode": "automatic"})
+
+    assert runner.update_document_index_status.call_args.kwargs["after_indexing_status"] == "indexing"
+
+
+def test_run_streaming_completes_documents_without_extractable_source(runner):
+    index_processor = _index_processor([], 1, 1)
+    dataset_document = SimpleNamespace(**{**vars(DATASET_DOCUMENT), "data_source_type": "unsupported"})
+
+    runner._run_streaming(index_processor, DATASET, dataset_document, {"mode": "automatic"})
+
+    index_processor.extract_iter.assert_not_called()
+    status_call = runner.update_document_index_status.call_args
+    assert status_call.kwargs["after_indexing_status"] == "completed"
+    assert status_call.kwargs["extra_update_params"][DatasetDocument.word_count] == 0
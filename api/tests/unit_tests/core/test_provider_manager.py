@@ -183,3 +183,41 @@ def test__to_model_settings_lb_disabled(mocker, mock_provider_entity):
     assert result[0].model_type == ModelType.LLM
     assert result[0].enabled is True
     assert len(result[0].load_balancing_configs) == 0
+
+
+def test_get_configurations_reuses_snapshot_until_version_changes(mocker):
+    versions = {}
+    redis_client = mocker.patch("core.provider_manager.redis_client")
+    redis_client.get.side_effect = lambda key: versions.get(key)
+    redis_client.incr.side_effect = lambda key: versions.__setitem__(key, str(int(versions.get(key, 0)) + 1).encode())
+    mocker.patch.dict("core.provider_manager._configurations_cache", clear=True)
+    build_configurations = mocker.patch.object(
+        ProviderManager, "_build_configurations", side_effect=lambda tenant_id: mocker.Mock(tenant_id=tenant_id)
+    )
+
+    first = ProviderManager().get_configurations("tenant-1")
+    assert ProviderManager().get_configurations("tenant-1") is first
+    assert ProviderManager().get_configurations("tenant-2") is not first
+    assert build_configurations.call_count == 2
+
+    # another process bumped the version
+    versions["provider_configurations_version:tenant-1"] = b"1"
+    second = ProviderManager().get_configurations("tenant-1")
+    assert second is not first
+    assert ProviderManager().get_configurations("tenant-1") is second
+
+    ProviderManager.invalidate_configurations("tenant-1")
+    assert versions["provider_configurations_version:tenant-1"] == b"2"
+    assert ProviderManager().get_configurations("tenant-1") is not second
+    assert build_configurations.call_count == 4
+
+
+def test_get_configurations_without_cache(mocker):
+    mocker.patch("core.provider_manager.dify_config.PROVIDER_CONFIGURATIONS_CACHE_TTL", 0)
+    mocker.patch.dict("core.provider_manager._configurations_cache", clear=True)
+    build_configurations = mocker.patch.object(ProviderManager, "_build_configurations")
+
+    ProviderManager().get_configurations("tenant-1")
+    ProviderManager().get_configurations("tenant-1")
+
+    assert build_configurations.call_count == 2
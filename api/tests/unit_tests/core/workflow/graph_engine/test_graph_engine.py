@@ -17,6 +17,7 @@ from core.workflow.graph_engine.entities.event import (
     NodeRunStartedEvent,
     NodeRunStreamChunkEvent,
     NodeRunSucceededEvent,
+    ParallelBranchRunSucceededEvent,
 )
 from core.workflow.graph_engine.entities.graph import Graph
 from core.workflow.graph_engine.entities.graph_runtime_state import GraphRuntimeState
@@ -884,3 +885,87 @@ def test_condition_parallel_correct_output(mock_close, mock_remove, app):
                         assert item.outputs is not None
                         answer = item.outputs["answer"]
                         assert all(rc not in answer for rc in wrong_content)
+
+
+def _fan_out_graph_engine(branch_count: int) -> GraphEngine:
+    edges = []
+    nodes: list[dict] = [{"data": {"type": "start", "title": "start", "variables": []}, "id": "start"}]
+    for i in range(branch_count):
+        node_id = f"branch{i}"
+        edges.append({"id": f"start-{node_id}", "source": "start", "target": node_id})
+        edges.append({"id": f"{node_id}-end", "source": node_id, "target": "end"})
+        nodes.append(
+            {
+                "data": {
+                    "type": "variable-aggregator",
+                    "title": node_id,
+                    "output_type": "string",
+                    "variables": [["sys", "user_id"]],
+                },
+                "id": node_id,
+            }
+        )
+    nodes.append({"data": {"type": "end", "title": "end", "outputs": []}, "id": "end"})
+    graph_config = {"edges": edges, "nodes": nodes}
+
+    return GraphEngine(
+        tenant_id="111",
+        app_id="222",
+        workflow_type=WorkflowType.WORKFLOW,
+        workflow_id="333",
+        graph_config=graph_config,
+        user_id="444",
+        user_from=UserFrom.ACCOUNT,
+        invoke_from=InvokeFrom.WEB_APP,
+        call_depth=0,
+        graph=Graph.init(graph_config=graph_config),
+        graph_runtime_state=GraphRuntimeState(
+            variable_pool=VariablePool(
+                system_variables=SystemVariable(user_id="aaa", app_id="1", workflow_id="1", files=[]),
+                user_inputs={},
+            ),
+            start_at=time.perf_counter(),
+        ),
+        max_execution_steps=500,
+        max_execution_time=1200,
+    )
+
+
+@patch("extensions.ext_database.db.session.remove")
+@patch("extensions.ext_database.db.session.close")
+def test_run_wide_parallel_without_sleeping(mock_close, mock_remove, app):
+    graph_engine = _fan_out_graph_engine(branch_count=20)
+
+    with app.app_context():
+        with patch("core.workflow.graph_engine.graph_engine.time.sleep") as mock_sleep:
+            items = list(graph_engine.run())
+
+    mock_sleep.assert_not_called()
+    assert isinstance(items[-1], GraphRunSucceededEvent)
+    assert len([item for item in items if isinstance(item, ParallelBranchRunSucceededEvent)]) == 20
+    end_started = [
+        index
+        for index, item in enumerate(items)
+        if isinstance(item, NodeRunStartedEvent) and item.route_node_state.node_id == "end"
+    ]
+    assert len(end_started) == 1
+    # the join node only runs after every branch has completed
+    assert all(
+        index < end_started[0] for index, item in enumerate(items) if isinstance(item, ParallelBranchRunSucceededEvent)
+    )
+
+
+@patch("extensions.ext_database.db.session.remove")
+@patch("extensions.ext_database.db.session.close")
+def test_run_parallel_branch_worker_crash(mock_close, mock_remove, app):
+    graph_engine = _fan_out_graph_engine(branch_count=3)
+
+    def crash(*args, **kwargs):
+        raise RuntimeError("worker crashed")
+
+    with app.app_context():
+        with patch.object(GraphEngine, "_run_parallel_node", new=crash):
+            items = list(graph_engine.run())
+
+    assert isinstance(items[-1], GraphRunFailedEvent)
+    assert items[-1].error == "worker crashed"
@@ -0,0 +1,169 @@
+import threading
+import time
+
+import pytest
+
+from core.workflow.graph_engine.worker_pool import WorkflowTaskScope, WorkflowWorkerPool
+
+
+def _pool(**kwargs) -> WorkflowWorkerPool:
+    options = {
+        "max_workers": 4,
+        "tenant_max_active": 4,
+        "app_max_active": 4,
+        "tenant_max_queued": 100,
+        "max_queued": 100,
+        "run_max_submit_count": 100,
+    }
+    options.update(kwargs)
+    return WorkflowWorkerPool(**options)
+
+
+def _scope(tenant_id: str = "tenant", app_id: str = "app", run_id: str = "run") -> WorkflowTaskScope:
+    return WorkflowTaskScope(tenant_id=tenant_id, app_id=app_id, run_id=run_id)
+
+
+def _wait_for(predicate, timeout: float = 5.0) -> None:
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        if time.monotonic() > deadline:
+            raise AssertionError("condition not reached")
+        time.sleep(0.005)
+
+
+def test_submit_returns_future_result():
+    pool = _pool()
+
+    future = pool.submit(_scope(), lambda a, b: a + b, 1, b=2)
+
+    assert future.result(timeout=5) == 3
+    _wait_for(lambda: pool.metrics()["completed_total"] == 1)
+    metrics = pool.metrics()
+    assert metrics["active_workers"] == 0
+    assert metrics["running_workflows"] == 0
+
+
+def test_submit_propagates_exception():
+    pool = _pool()
+
+    def fail():
+        raise RuntimeError("boom")
+
+    with pytest.raises(RuntimeError, match="boom"):
+        pool.submit(_scope(), fail).result(timeout=5)
+
+
+def test_round_robin_across_apps():
+    pool = _pool(max_workers=1)
+    gate = threading.Event()
+    order: list[str] = []
+
+    blocker = pool.submit(_scope(app_id="blocker", run_id="blocker"), gate.wait)
+    _wait_for(lambda: pool.metrics()["active_workers"] == 1)
+
+    futures = [pool.submit(_scope(app_id="a", run_id=f"a{i}"), order.append, "a") for i in range(3)]
+    futures.append(pool.submit(_scope(app_id="b", run_id="b0"), order.append, "b"))
+    assert pool.metrics()["queue_depth"] == 4
+
+    gate.set()
+    blocker.result(timeout=5)
+    for future in futures:
+        future.result(timeout=5)
+
+    assert order == ["a", "b", "a", "a"]
+
+
+def test_tenant_quota_limits_active_workers():
+    pool = _pool(max_workers=4, tenant_max_active=1)
+    gate = threading.Event()
+
+    futures = [pool.submit(_scope(tenant_id="busy", run_id=f"run{i}"), gate.wait) for i in range(3)]
+    other = pool.submit(_scope(tenant_id="other", run_id="other"), lambda: "done")
+
+    assert other.result(timeout=5) == "done"
+    _wait_for(lambda: pool.metrics()["completed_total"] == 1)
+    metrics = pool.metrics()
+    assert metrics["active_workers_by_tenant"] == {"busy": 1}
+    assert metrics["queue_depth_by_tenant"] == {"busy": 2}
+
+    gate.set()
+    for future in futures:
+        future.result(timeout=5)
+
+
+def test_admission_control_rejects_when_tenant_queue_is_full():
+    pool = _pool(max_workers=1, tenant_max_queued=1)
+    gate = threading.Event()
+
+    blocker = pool.submit(_scope(run_id="blocker"), gate.wait)
+    _wait_for(lambda: pool.metrics()["active_workers"] == 1)
+    queued = pool.submit(_scope(run_id="queued"), lambda: None)
+
+    with pytest.raises(ValueError, match="queue of tenant tenant is full"):
+        pool.submit(_scope(run_id="rejected"), lambda: None)
+    assert pool.metrics()["rejected_total"] == 1
+
+    gate.set()
+    blocker.result(timeout=5)
+    queued.result(timeout=5)
+
+
+def test_max_submit_count_per_run():
+    pool = _pool(run_max_submit_count=1)
+    gate = threading.Event()
+
+    future = pool.submit(_scope(), gate.wait)
+    with pytest.raises(ValueError, match="Max submit count 1"):
+        pool.submit(_scope(), lambda: None)
+
+    gate.set()
+    future.result(timeout=5)
+    _wait_for(lambda: pool.metrics()["running_workflows"] == 0)
+    assert pool.submit(_scope(), lambda: "again").result(timeout=5) == "again"
+
+
+def test_nested_submissions_do_not_deadlock_a_saturated_pool():
+    pool = _pool(max_workers=1)
+
+    def parent():
+        # the only worker is busy with this task, so the children run inline
+        children = [pool.submit(_scope(), lambda i=i: i * 2) for i in range(3)]
+        return [child.result(timeout=5) for child in children]
+
+    assert pool.submit(_scope(), parent).result(timeout=5) == [0, 2, 4]
+    assert pool.metrics()["inline_total"] == 3
+
+
+def test_nested_submissions_use_free_workers():
+    pool = _pool(max_workers=2)
+
+    def parent():
+        child = pool.submit(_scope(), threading.current_thread)
+        return threading.current_thread(), child.result(timeout=5)
+
+    parent_thread, child_thread = pool.submit(_scope(), parent).result(timeout=5)
+
+    assert parent_thread is not child_thread
+    assert pool.metrics()["inline_total"] == 0
+
+
+def test_non_worker_submissions_of_an_active_run_keep_admission_control():
+    pool = _pool(max_workers=1, tenant_max_queued=1)
+    gate = threading.Event()
+
+    blocker = pool.submit(_scope(run_id="run"), gate.wait)
+    _wait_for(lambda: pool.metrics()["active_workers"] == 1)
+    queued = pool.submit(_scope(run_id="run"), lambda: "queued")
+
+    # the run already holds a worker, but a submission from outside the pool is not nested
+    assert pool.metrics()["queue_depth_by_tenant"] == {"tenant": 1}
+    with pytest.raises(ValueError, match="queue of tenant tenant is full"):
+        pool.submit(_scope(run_id="run"), lambda: None)
+    metrics = pool.metrics()
+    assert metrics["rejected_total"] == 1
+    assert metrics["inline_total"] == 0
+    assert metrics["nested_queue_depth"] == 0
+
+    gate.set()
+    blocker.result(timeout=5)
+    assert queued.result(timeout=5) == "queued"
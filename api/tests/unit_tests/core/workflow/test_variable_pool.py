@@ -442,3 +442,81 @@ class TestVariablePoolSerialization:
         loaded = VariablePool.model_validate(pool_dict)
         assert isinstance(loaded.variable_dictionary, defaultdict)
         loaded.add(["non_exist_node", "a"], 1)
+
+
+class TestVariablePoolChildScope:
+    def test_child_reads_through_to_parent(self, pool):
+        pool.add(("node_1", "text"), "parent value")
+        child = pool.create_child()
+
+        assert child.get(("node_1", "text")).value == "parent value"
+        assert child.get((SYSTEM_VARIABLE_NODE_ID, "user_id")).value == "test_user_id"
+        assert child.variable_dictionary == {}
+
+        # later parent writes stay visible until the child shadows them
+        pool.add(("node_1", "number"), 1)
+        assert child.get(("node_1", "number")).value == 1
+
+    def test_child_writes_do_not_reach_parent(self, pool):
+        pool.add(("node_1", "text"), "parent value")
+        child = pool.create_child()
+
+        child.add(("node_1", "text"), "child value")
+        child.add(("node_2", "text"), "only in child")
+
+        assert child.get(("node_1", "text")).value == "child value"
+        assert pool.get(("node_1", "text")).value == "parent value"
+        assert pool.get(("node_2", "text")) is None
+
+        sibling = pool.create_child()
+        assert sibling.get(("node_1", "text")).value == "parent value"
+
+    def test_child_removal_hides_parent_variables(self, pool):
+        pool.add(("node_1", "a"), "a")
+        pool.add(("node_1", "b"), "b")
+        pool.add(("node_2", "c"), "c")
+        child = pool.create_child()
+
+        child.remove(("node_1", "a"))
+        child.remove(("node_2",))
+
+        assert child.get(("node_1", "a")) is None
+        assert child.get(("node_1", "b")).value == "b"
+        assert child.get(("node_2", "c")) is None
+        assert pool.get(("node_1", "a")).value == "a"
+        assert pool.get(("node_2", "c")).value == "c"
+
+        child.add(("node_1", "a"), "again")
+        child.add(("node_2", "d"), "d")
+        assert child.get(("node_1", "a")).value == "again"
+        assert child.get(("node_2", "c")) is None
+        assert child.get(("node_2", "d")).value == "d"
+
+    def test_nested_child_scopes(self, pool):
+        pool.add(("node_1", "text"), "root")
+        child = pool.create_child()
+        child.add(("node_2", "text"), "child")
+        grandchild = child.create_child()
+
+        assert grandchild.get(("node_1", "text")).value == "root"
+        assert grandchild.get(("node_2", "text")).value == "child"
+
+        grandchild.remove(("node_1",))
+        assert grandchild.get(("node_1", "text")) is None
+        assert child.get(("node_1", "text")).value == "root"
+
+    def test_child_serialization_includes_parent_variables(self, pool):
+        pool.add(("node_1", "text"), "parent value")
+        pool.add(("node_2", "text"), "removed in child")
+        child = pool.create_child()
+        child.add(("node_1", "number"), 1)
+        child.remove(("node_2",))
+
+        loaded = VariablePool.model_validate_json(child.model_dump_json())
+
+        assert loaded.get(("node_1", "text")).value == "parent value"
+        assert loaded.get(("node_1", "number")).value == 1
+        assert loaded.get(("node_2", "text")) is None
+        assert loaded.get((SYSTEM_VARIABLE_NODE_ID, "user_id")).value == "test_user_id"
+        # the parent is serialized unchanged
+        assert "number" not in pool.model_dump()["variable_dictionary"]["node_1"]
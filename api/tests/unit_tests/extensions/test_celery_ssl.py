@@ -131,6 +131,7 @@ class TestCelerySSLConfiguration:
         mock_config.ENABLE_MAIL_CLEAN_DOCUMENT_NOTIFY_TASK = False
         mock_config.ENABLE_DATASETS_QUEUE_MONITOR = False
         mock_config.ENABLE_CHECK_UPGRADABLE_PLUGIN_TASK = False
+        mock_config.ENABLE_APP_STATISTICS_ROLLUP_TASK = False
 
         with patch("extensions.ext_celery.dify_config", mock_config):
             from dify_app import DifyApp
@@ -0,0 +1,463 @@
+import time
+from datetime import datetime, timedelta
+from unittest.mock import MagicMock, patch
+
+import pytest
+import sqlalchemy as sa
+from redis.exceptions import LockNotOwnedError
+from sqlalchemy.pool import NullPool
+
+from extensions.ext_mysql_redis import CacheDatabase, LocalCache, MysqlRedisClient
+
+
+def _mock_db(cache_value: bytes = b"value", expire_time=None):
+    mock_db = MagicMock()
+    cache_item = MagicMock()
+    cache_item.cache_value = cache_value
+    cache_item.expire_time = expire_time
+    mock_db.session.query.return_value.filter.return_value.first.return_value = cache_item
+    return mock_db
+
+
+def test_local_cache_evicts_least_recently_used():
+    cache = LocalCache(max_size=2, ttl=60)
+    cache.put("a", b"1", cache.generation)
+    cache.put("b", b"2", cache.generation)
+    assert cache.get("a") == b"1"
+    cache.put("c", b"3", cache.generation)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == b"1"
+    assert cache.get("c") == b"3"
+
+
+def test_local_cache_respects_ttl_and_key_expiry():
+    cache = LocalCache(max_size=8, ttl=0.01)
+    cache.put("a", b"1", cache.generation)
+    time.sleep(0.02)
+    assert cache.get("a") is None
+
+    cache = LocalCache(max_size=8, ttl=60)
+    cache.put("expired", b"1", cache.generation, datetime.now() - timedelta(seconds=1))
+    assert cache.get("expired") is None
+
+
+def test_local_cache_rejects_stale_generation():
+    cache = LocalCache(max_size=8, ttl=60)
+    generation = cache.generation
+    cache.invalidate("a")
+    cache.put("a", b"old", generation)
+    assert cache.get("a") is None
+
+
+def test_get_is_served_from_local_tier():
+    mock_db = _mock_db()
+    client = MysqlRedisClient(mock_db, l1_max_size=8, l1_ttl=60)
+
+    assert client.get("key") == b"value"
+    assert client.get("key") == b"value"
+    assert mock_db.session.query.call_count == 1
+    assert client.local_cache_info()["hits"] == 1
+
+
+def test_local_writes_invalidate_local_tier():
+    mock_db = _mock_db()
+    client = MysqlRedisClient(mock_db, l1_max_size=8, l1_ttl=60)
+
+    client.get("key")
+    client.set("key", "new")
+    client.get("key")
+    assert mock_db.session.query.call_count == 2
+
+    client.delete("key")
+    assert client.local_cache_info()["size"] == 0
+
+
+def test_local_tier_disabled_by_default():
+    mock_db = _mock_db()
+    client = MysqlRedisClient(mock_db)
+
+    client.get("key")
+    client.get("key")
+    assert mock_db.session.query.call_count == 2
+    assert client.local_cache_info() == {"enabled": False}
+
+
+def test_pipeline_merges_commands_into_one_transaction():
+    mock_db = _mock_db()
+    client = MysqlRedisClient(mock_db)
+
+    with client.pipeline() as pipe:
+        pipe.setex("a", 60, "1").setex("b", 60, "2").set("c", "3")
+        pipe.expire("a", 10).expire("b", 10)
+        pipe.delete("c", "d")
+        assert pipe.execute() == [True] * 7
+
+    statements = [str(call.args[0]) for call in mock_db.session.execute.call_args_list]
+    # expire and delete also cover the sorted-set and hash tables
+    assert len(statements) == 7
+    assert statements[0].count("(:cache_key_") == 3
+    assert "ON DUPLICATE KEY UPDATE" in statements[0]
+    assert statements[1].startswith("UPDATE caches")
+    assert len(mock_db.session.execute.call_args_list[1].args[1]) == 2
+    assert statements[4].startswith("DELETE FROM caches")
+    mock_db.session.commit.assert_called_once()
+
+
+def test_pipeline_reports_setnx_result_per_command():
+    mock_db = _mock_db()
+    mock_db.session.execute.side_effect = [MagicMock(rowcount=1), MagicMock(rowcount=0), MagicMock()]
+    client = MysqlRedisClient(mock_db)
+
+    with client.pipeline() as pipe:
+        pipe.setnx("new", "1").setnx("existing", "2").set("c", "3")
+        assert pipe.execute() == [True, False, True]
+
+    statements = [str(call.args[0]) for call in mock_db.session.execute.call_args_list]
+    assert statements[0].startswith("INSERT IGNORE")
+    assert statements[0].count("(:cache_key_") == 1
+    assert statements[1].startswith("INSERT IGNORE")
+    mock_db.session.commit.assert_called_once()
+
+
+def test_pipeline_rolls_back_on_failure():
+    mock_db = _mock_db()
+    mock_db.session.execute.side_effect = Exception("boom")
+    client = MysqlRedisClient(mock_db)
+
+    pipe = client.pipeline()
+    pipe.set("a", "1")
+    assert pipe.execute() == [False]
+    mock_db.session.rollback.assert_called_once()
+
+
+def test_write_behind_buffers_matching_keys():
+    mock_db = _mock_db()
+    client = MysqlRedisClient(mock_db, write_behind_prefixes=["rate_limit:"])
+
+    client.setex("rate_limit:1", 60, "1")
+    client.setex("rate_limit:2", 60, "2")
+    client.expire("rate_limit:1", 120)
+    client.delete("rate_limit:2")
+    mock_db.session.execute.assert_not_called()
+
+    assert client.get("rate_limit:1") == b"1"
+    assert client.get("rate_limit:2") is None
+    mock_db.session.query.assert_not_called()
+
+    assert client.flush_write_behind() == 2
+    statements = [str(call.args[0]) for call in mock_db.session.execute.call_args_list]
+    assert statements[0].startswith("INSERT INTO caches")
+    assert statements[1].startswith("DELETE FROM caches")
+    mock_db.session.commit.assert_called_once()
+
+
+def test_write_behind_ignores_other_keys():
+    mock_db = _mock_db()
+    client = MysqlRedisClient(mock_db, write_behind_prefixes=["rate_limit:"])
+
+    client.set("critical", "1")
+    assert mock_db.session.execute.call_count == 1
+    assert client.flush_write_behind() == 0
+
+
+def test_getex_batches_ttl_refreshes():
+    mock_db = _mock_db()
+    client = MysqlRedisClient(mock_db, write_behind_interval=60)
+
+    assert client.getex("embedding_1", ex=600) == b"value"
+    assert client.getex("embedding_2", ex=600) == b"value"
+    assert client.getex("embedding_1", ex=600) == b"value"
+    mock_db.session.execute.assert_not_called()
+
+    assert client.flush_pending_expires() == 2
+    statements = [str(call.args[0]) for call in mock_db.session.execute.call_args_list]
+    assert statements[0].startswith("UPDATE caches SET expire_time")
+    assert [params["cache_key"] for params in mock_db.session.execute.call_args_list[0].args[1]] == [
+        "embedding_2",
+        "embedding_1",
+    ]
+    mock_db.session.commit.assert_called_once()
+
+
+def test_getex_refresh_is_dropped_by_later_write():
+    mock_db = _mock_db()
+    client = MysqlRedisClient(mock_db, write_behind_interval=60)
+
+    client.getex("embedding_1", ex=600)
+    client.setex("embedding_1", 60, "new")
+    mock_db.session.execute.reset_mock()
+    assert client.flush_pending_expires() == 0
+    mock_db.session.execute.assert_not_called()
+
+
+def test_getex_miss_does_not_refresh():
+    mock_db = _mock_db()
+    mock_db.session.query.return_value.filter.return_value.first.return_value = None
+    client = MysqlRedisClient(mock_db, write_behind_interval=60)
+
+    assert client.getex("missing", ex=600) is None
+    assert client.flush_pending_expires() == 0
+
+
+def _mock_lock_db(get_lock_result: int = 1, fencing_token: bytes = b"7"):
+    mock_db = MagicMock()
+    connection = mock_db.lock_engine.connect.return_value.execution_options.return_value
+
+    def execute(statement, params=None):
+        result = MagicMock()
+        sql = str(statement)
+        if "GET_LOCK" in sql and "RELEASE" not in sql:
+            result.scalar.return_value = get_lock_result
+        elif sql.startswith("SELECT cache_value"):
+            result.scalar.return_value = fencing_token
+        return result
+
+    connection.execute.side_effect = execute
+    return mock_db, connection
+
+
+def test_get_lock_acquire_and_release():
+    mock_db, connection = _mock_lock_db()
+    lock = MysqlRedisClient(mock_db).lock("dataset_lock", timeout=600)
+
+    with lock:
+        assert lock.owned()
+        assert lock.fencing_token == 7
+        # the waiter blocks in the server on a connection outside the cache pool
+        get_lock_call = connection.execute.call_args_list[0]
+        assert get_lock_call.args[1] == {"name": "dataset_lock", "timeout": 600}
+        mock_db.engine.connect.assert_not_called()
+        # the fence row expires long after its last acquisition
+        fence_params = connection.execute.call_args_list[1].args[1]
+        assert fence_params["cache_key"] == "lock_fence_dataset_lock"
+        assert fence_params["expire_time"] > datetime.now() + timedelta(days=6)
+
+    assert not lock.owned()
+    assert "RELEASE_LOCK" in str(connection.execute.call_args_list[-1].args[0])
+    connection.close.assert_called()
+
+
+def test_get_lock_non_blocking_failure():
+    mock_db, connection = _mock_lock_db(get_lock_result=0)
+    lock = MysqlRedisClient(mock_db).lock("dataset_lock", timeout=600)
+
+    assert lock.acquire(blocking=False) is False
+    assert connection.execute.call_args_list[0].args[1]["timeout"] == 0
+    connection.close.assert_called_once()
+    assert not lock.owned()
+
+
+def test_get_lock_extend_and_expiry():
+    mock_db, _ = _mock_lock_db()
+    lock = MysqlRedisClient(mock_db).lock("dataset_lock", timeout=0.05)
+
+    assert lock.acquire()
+    lock.extend(60, replace_ttl=True)
+    time.sleep(0.1)
+    assert lock.owned()
+    lock.release()
+
+    lock = MysqlRedisClient(mock_db).lock("dataset_lock", timeout=0.05)
+    assert lock.acquire()
+    time.sleep(0.2)
+    assert not lock.owned()
+    with pytest.raises(LockNotOwnedError):
+        lock.extend(1)
+
+
+def test_get_lock_shortens_long_names():
+    lock = MysqlRedisClient(MagicMock()).lock("vector_indexing_lock_" + "x" * 100)
+    assert len(lock.server_name) == 64
+
+
+def _mock_sweep_db(min_id: int, max_id: int, rows_per_batch: int = 3):
+    mock_db = MagicMock()
+    deletes = []
+
+    def execute(statement, params=None):
+        result = MagicMock()
+        sql = str(statement)
+        if "MIN(id), MAX(id)" in sql:
+            result.one.return_value = (min_id, max_id)
+        elif "DELETE FROM caches" in sql:
+            deletes.append((params["low"], params["high"]))
+            result.rowcount = rows_per_batch
+        elif "DELETE FROM cache_" in sql:
+            result.rowcount = 0
+        elif "MIN(expire_time)" in sql:
+            result.scalar.return_value = None
+        return result
+
+    mock_db.session.execute.side_effect = execute
+    return mock_db, deletes
+
+
+def test_sweeper_deletes_in_adaptive_primary_key_windows():
+    mock_db, deletes = _mock_sweep_db(min_id=1, max_id=2500)
+    client = MysqlRedisClient(mock_db, sweep_batch_size=1000, sweep_target_batch_time=10)
+
+    assert client.cleanup_expired() == 6
+    # fast batches double the window
+    assert deletes == [(0, 1000), (1000, 2500)]
+    metrics = client.sweep_metrics()
+    assert metrics["rows_swept"] == 6
+    assert metrics["batches"] == 2
+    assert metrics["cursor"] == 0
+    assert metrics["span"] == 4000
+
+
+def test_sweeper_resumes_after_deadline():
+    mock_db, deletes = _mock_sweep_db(min_id=5001, max_id=9000)
+    client = MysqlRedisClient(mock_db, sweep_batch_size=1000)
+
+    assert client._sweep(deadline=time.monotonic() - 1) == 0
+    assert deletes == []
+    assert client.sweep_metrics()["cursor"] == 5000
+
+
+def test_sweeper_runs_only_in_lock_holder():
+    mock_db, _ = _mock_lock_db(get_lock_result=0)
+    client = MysqlRedisClient(mock_db)
+
+    assert client._sweep_as_singleton() == 0
+    mock_db.session.execute.assert_not_called()
+
+
+def test_zremrangebyscore_builds_indexed_range_delete():
+    mock_db = MagicMock()
+    mock_db.session.execute.return_value.rowcount = 4
+    client = MysqlRedisClient(mock_db)
+
+    assert client.zremrangebyscore("attempts", "-inf", 1700000000.5) == 4
+    statement, params = mock_db.session.execute.call_args.args
+    assert str(statement) == "DELETE FROM cache_zsets WHERE cache_key = :cache_key AND score <= :max_score"
+    assert params == {"cache_key": "attempts", "max_score": 1700000000.5}
+
+    client.zremrangebyscore("attempts", "(1", "+inf")
+    statement, params = mock_db.session.execute.call_args.args
+    assert str(statement) == "DELETE FROM cache_zsets WHERE cache_key = :cache_key AND score > :min_score"
+
+
+def _mock_upsert_db(existing: int, expire_time: datetime | None = None):
+    mock_db = MagicMock()
+    count_result, ttl_result = MagicMock(), MagicMock()
+    count_result.scalar.return_value = existing
+    ttl_result.scalar.return_value = expire_time
+    # FOUND_ROWS makes MySQL report an unchanged row as affected, the result must not depend on it
+    mock_db.session.execute.side_effect = [count_result, ttl_result, MagicMock(rowcount=1)]
+    return mock_db
+
+
+def test_zadd_inherits_key_ttl():
+    expire_time = datetime.now() + timedelta(minutes=1)
+    mock_db = _mock_upsert_db(existing=1, expire_time=expire_time)
+    client = MysqlRedisClient(mock_db)
+
+    # one new member and one existing member
+    assert client.zadd("attempts", {"a": 1, "b": 2}) == 1
+    count_statement, count_params = mock_db.session.execute.call_args_list[0].args
+    assert "SELECT COUNT(*) FROM cache_zsets" in str(count_statement)
+    assert count_params["items"] == [b"a", b"b"]
+    statement, params = mock_db.session.execute.call_args.args
+    assert "INSERT INTO cache_zsets" in str(statement)
+    assert params["expire_time"] == expire_time
+    assert params["member_0"] == b"a"
+    assert params["score_1"] == 2.0
+
+
+def test_readding_unchanged_members_and_fields_adds_nothing():
+    client = MysqlRedisClient(_mock_upsert_db(existing=1))
+    assert client.zadd("attempts", {"a": 1}) == 0
+
+    client = MysqlRedisClient(_mock_upsert_db(existing=1))
+    assert client.hset("active_requests", "req-1", "1700000000.0") == 0
+
+    mock_db = _mock_upsert_db(existing=0)
+    assert MysqlRedisClient(mock_db).hset("active_requests", mapping={"req-1": "1", "req-2": "2"}) == 2
+    assert "SELECT COUNT(*) FROM cache_hashes" in str(mock_db.session.execute.call_args_list[0].args[0])
+
+
+def test_hash_commands():
+    mock_db = MagicMock()
+    client = MysqlRedisClient(mock_db)
+
+    mock_db.session.execute.return_value.fetchall.return_value = [(b"req-1", b"1700000000.0")]
+    assert client.hgetall("active_requests") == {b"req-1": b"1700000000.0"}
+
+    mock_db.session.execute.return_value.scalar.return_value = 5
+    assert client.hlen("active_requests") == 5
+
+    mock_db.session.execute.return_value.rowcount = 1
+    assert client.hdel("active_requests", "req-1") == 1
+    assert mock_db.session.execute.call_args.args[1]["fields"] == [b"req-1"]
+
+
+def test_delete_and_expire_cover_collection_tables():
+    mock_db = MagicMock()
+    client = MysqlRedisClient(mock_db)
+
+    client.delete("active_requests")
+    statements = [str(call.args[0]) for call in mock_db.session.execute.call_args_list]
+    assert any("DELETE FROM cache_zsets" in statement for statement in statements)
+    assert any("DELETE FROM cache_hashes" in statement for statement in statements)
+
+    mock_db.session.execute.reset_mock()
+    client.expire("active_requests", 60)
+    statements = [str(call.args[0]) for call in mock_db.session.execute.call_args_list]
+    assert len(statements) == 3
+    assert "UPDATE cache_hashes" in statements[2]
+
+
+@pytest.fixture
+def cache_db(tmp_path):
+    # SQLite lacks READ COMMITTED, SERIALIZABLE stands in for the transactions of multi-statement writes
+    with patch("extensions.ext_mysql_redis._TRANSACTION_ISOLATION_LEVEL", "SERIALIZABLE"):
+        cache_db = CacheDatabase(f"sqlite:///{tmp_path}/cache.db", pool_size=1, max_overflow=0, pool_timeout=0.05)
+        with cache_db.engine.begin() as connection:
+            connection.execute(
+                sa.text(
+                    "CREATE TABLE caches (id INTEGER PRIMARY KEY AUTOINCREMENT, cache_key VARCHAR(255) UNIQUE,"
+                    " cache_value BLOB NOT NULL, expire_time DATETIME, created_at DATETIME DEFAULT CURRENT_TIMESTAMP)"
+                )
+            )
+        yield cache_db
+        cache_db.remove_session()
+        cache_db.engine.dispose()
+
+
+def test_cache_commands_run_on_their_own_pool_and_session(cache_db):
+    client = MysqlRedisClient(cache_db)
+
+    assert client.incr("counter") == b"1"
+    assert client.incr("counter", 2) == b"3"
+    assert client.get("counter") == b"3"
+
+    # the cache session hands its connection back at the end of the app context
+    cache_db.remove_session()
+    with cache_db.engine.connect() as connection:
+        assert connection.execute(sa.text("SELECT cache_value FROM caches")).scalar() == b"3"
+
+    metrics = client.pool_metrics()
+    assert metrics["checkouts"] >= 3
+    assert metrics["checked_out"] == 0
+    assert metrics["timeouts"] == 0
+
+
+def test_pool_wait_timeouts_are_counted(cache_db):
+    client = MysqlRedisClient(cache_db)
+
+    with cache_db.engine.connect():
+        # the only connection is taken, the cache command gives up after the pool timeout
+        assert client.incr("counter") == b"0"
+
+    metrics = client.pool_metrics()
+    assert metrics["timeouts"] == 1
+    assert metrics["max_wait"] >= 0.05
+
+    # session locks are waited for and held outside the exhausted pool
+    with cache_db.engine.connect():
+        with cache_db.lock_engine.connect() as connection:
+            assert connection.execute(sa.text("SELECT 1")).scalar() == 1
+    assert isinstance(cache_db.lock_engine.pool, NullPool)
+    assert MysqlRedisClient(MagicMock()).pool_metrics() == {}
@@ -0,0 +1,176 @@
+from datetime import datetime
+from decimal import Decimal
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from services import app_statistic_service
+from services.app_statistic_service import (
+    ROLLUP_EPOCH,
+    ROLLUP_FROM_KEY,
+    ROLLUP_UNTIL_KEY,
+    AppStatisticService,
+    DailyStatistic,
+)
+
+
+class _FakeRedis:
+    def __init__(self):
+        self.values: dict[str, bytes] = {}
+
+    def get(self, name):
+        return self.values.get(name)
+
+    def set(self, name, value):
+        self.values[name] = value.encode()
+
+
+@pytest.fixture
+def redis():
+    redis = _FakeRedis()
+    with (
+        patch.object(app_statistic_service, "redis_client", redis),
+        patch("services.app_statistic_service.dify_config.ENABLE_APP_STATISTICS_ROLLUP_TASK", True),
+        patch("services.app_statistic_service.dify_config.APP_STATISTICS_ROLLUP_LAG", 2),
+    ):
+        yield redis
+
+
+def _set_watermarks(redis: _FakeRedis, rollup_from: datetime, rollup_until: datetime):
+    redis.set(ROLLUP_FROM_KEY, rollup_from.isoformat())
+    redis.set(ROLLUP_UNTIL_KEY, rollup_until.isoformat())
+
+
+def test_range_is_split_into_rollup_hours_and_raw_head_and_tail(redis):
+    _set_watermarks(redis, datetime(2026, 10, 1), datetime(2026, 10, 18, 12))
+
+    segments = AppStatisticService._get_segments(datetime(2026, 10, 11, 9, 30), None)
+
+    assert segments == (
+        (datetime(2026, 10, 11, 10), datetime(2026, 10, 18, 12)),
+        [(datetime(2026, 10, 11, 9, 30), datetime(2026, 10, 11, 10)), (datetime(2026, 10, 18, 12), None)],
+    )
+    # ranges ending before the watermark only read the rollups of their whole hours
+    assert AppStatisticService._get_segments(datetime(2026, 10, 11), datetime(2026, 10, 12, 6, 15)) == (
+        (datetime(2026, 10, 11), datetime(2026, 10, 12, 6)),
+        [(datetime(2026, 10, 12, 6), datetime(2026, 10, 12, 6, 15))],
+    )
+
+
+def test_ranges_not_covered_by_the_rollups_are_read_from_raw_tables(redis):
+    assert AppStatisticService._get_segments(datetime(2026, 10, 11), None) is None
+
+    _set_watermarks(redis, datetime(2026, 10, 1), datetime(2026, 10, 18, 12))
+    # starts before the rollups, or all time before the history was backfilled
+    assert AppStatisticService._get_segments(datetime(2026, 9, 30), None) is None
+    assert AppStatisticService._get_segments(None, None) is None
+    # within the hours after the last rollup
+    assert AppStatisticService._get_segments(datetime(2026, 10, 18, 12, 30), None) is None
+
+    redis.set(ROLLUP_FROM_KEY, ROLLUP_EPOCH.isoformat())
+    assert AppStatisticService._get_segments(None, None) == (
+        (ROLLUP_EPOCH, datetime(2026, 10, 18, 12)),
+        [(datetime(2026, 10, 18, 12), None)],
+    )
+
+
+@patch("services.app_statistic_service.db")
+def test_daily_statistic_unions_rollups_and_raw_rows(db, redis):
+    _set_watermarks(redis, datetime(2026, 10, 1), datetime(2026, 10, 18, 12))
+    conn = db.engine.begin.return_value.__enter__.return_value
+    row = MagicMock()
+    row._mapping = {"date": "2026-10-18", "message_count": Decimal(42)}
+    conn.execute.return_value.all.return_value = [row]
+
+    with patch("services.app_statistic_service.dify_config.SQLALCHEMY_DATABASE_URI_SCHEME", "mysql"):
+        rows = AppStatisticService.get_daily_statistic(
+            DailyStatistic.MESSAGES, "app-1", "Asia/Shanghai", datetime(2026, 10, 11, 9, 30)
+        )
+
+    assert rows is not None
+    assert [(r.date, r.message_count) for r in rows] == [("2026-10-18", 42)]
+    assert type(rows[0].message_count) is int
+    sql, params = str(conn.execute.call_args.args[0]), conn.execute.call_args.args[1]
+    assert sql.count("UNION ALL") == 2
+    assert "FROM app_statistic_hourly" in sql
+    assert params["rollup_start"] == datetime(2026, 10, 11, 10)
+    assert params["raw0_start"] == datetime(2026, 10, 11, 9, 30)
+    assert params["raw1_start"] == datetime(2026, 10, 18, 12)
+    assert "raw1_end" not in params
+    assert params["tz"] == "Asia/Shanghai"
+
+
+def test_daily_statistic_is_not_read_from_rollups_when_disabled(redis):
+    _set_watermarks(redis, ROLLUP_EPOCH, datetime(2026, 10, 18, 12))
+
+    with patch("services.app_statistic_service.dify_config.ENABLE_APP_STATISTICS_ROLLUP_TASK", False):
+        assert AppStatisticService.get_daily_statistic(DailyStatistic.MESSAGES, "app-1", "UTC") is None
+
+
+@patch.object(AppStatisticService, "_get_dirty_hours")
+@patch.object(AppStatisticService, "rollup_hour")
+def test_recent_hours_are_rolled_up_from_the_watermark(rollup_hour, get_dirty_hours, redis):
+    get_dirty_hours.return_value = {datetime(2026, 10, 1, 8): {"app-2", "app-1"}}
+
+    with patch("services.app_statistic_service.naive_utc_now", return_value=datetime(2026, 10, 18, 12, 5)):
+        assert AppStatisticService.rollup_recent_hours() == 3
+
+    assert [c.args for c in rollup_hour.call_args_list] == [
+        (datetime(2026, 10, 18, 10),),
+        (datetime(2026, 10, 18, 11),),
+        (datetime(2026, 10, 1, 8), ["app-1", "app-2"]),
+    ]
+    assert redis.get(ROLLUP_FROM_KEY) == b"2026-10-18T10:00:00"
+    assert redis.get(ROLLUP_UNTIL_KEY) == b"2026-10-18T12:00:00"
+
+    # the next run after an outage catches up from the watermark, keeping the start of the rollups
+    rollup_hour.reset_mock()
+    get_dirty_hours.return_value = {}
+    with patch("services.app_statistic_service.naive_utc_now", return_value=datetime(2026, 10, 18, 15, 1)):
+        assert AppStatisticService.rollup_recent_hours() == 5
+
+    assert rollup_hour.call_args_list[0].args == (datetime(2026, 10, 18, 10),)
+    assert redis.get(ROLLUP_FROM_KEY) == b"2026-10-18T10:00:00"
+    assert redis.get(ROLLUP_UNTIL_KEY) == b"2026-10-18T15:00:00"
+
+
+@patch("services.app_statistic_service.db")
+def test_dirty_marks_are_removed_with_the_recomputed_rollups(db, redis):
+    db.session.execute.return_value = []
+    with patch("services.app_statistic_service.naive_utc_now", return_value=datetime(2026, 10, 18, 12, 5)):
+        AppStatisticService.rollup_recent_hours()
+    assert db.session.commit.call_count == 2
+
+    # reading the marks does not remove them, a failed recompute leaves them for the next run
+    db.reset_mock()
+    db.session.execute.return_value = []
+    with (
+        patch("services.app_statistic_service.naive_utc_now", return_value=datetime(2026, 10, 18, 12, 5)),
+        patch.object(AppStatisticService, "rollup_hour", side_effect=RuntimeError("boom")),
+        pytest.raises(RuntimeError),
+    ):
+        AppStatisticService.rollup_recent_hours()
+    assert all(not str(c.args[0]).startswith("DELETE") for c in db.session.execute.call_args_list)
+    db.session.commit.assert_not_called()
+
+    db.reset_mock()
+    db.session.execute.return_value = []
+    AppStatisticService.rollup_hour(datetime(2026, 10, 1, 8), ["app-1"])
+    deletes = [str(c.args[0]) for c in db.session.execute.call_args_list if str(c.args[0]).startswith("DELETE")]
+    assert any("DELETE FROM app_statistic_dirty_hours" in sql for sql in deletes)
+    db.session.commit.assert_called_once()
+
+
+@patch("services.app_statistic_service.db")
+def test_only_hours_before_the_recomputed_ones_are_marked_dirty(db, redis):
+    with (
+        patch("services.app_statistic_service.naive_utc_now", return_value=datetime(2026, 10, 18, 12, 5)),
+        patch("services.app_statistic_service.dify_config.SQLALCHEMY_DATABASE_URI_SCHEME", "mysql"),
+    ):
+        AppStatisticService.mark_dirty("app-1", datetime(2026, 10, 18, 10, 59))
+        db.session.execute.assert_not_called()
+
+        AppStatisticService.mark_dirty("app-1", datetime(2026, 10, 18, 9, 59))
+
+    stmt = db.session.execute.call_args.args[0]
+    assert stmt.compile().params == {"app_id": "app-1", "hour": datetime(2026, 10, 18, 9)}
@@ -0,0 +1,114 @@
+from datetime import datetime
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from models.model import Message, MessageFeedback, MessageFile
+from services.retention_engine import MAX_THROTTLE_WAIT, RetentionEngine
+
+
+@pytest.fixture
+def db():
+    with (
+        patch("services.retention_engine.db") as db,
+        patch("services.retention_engine.dify_config.RETENTION_BATCH_INTERVAL", 0),
+        patch("services.retention_engine.dify_config.RETENTION_MAX_REPLICATION_LAG", 10),
+        patch("services.retention_engine.dify_config.RETENTION_REPLICATION_LAG_QUERY", None),
+        patch("services.retention_engine.dify_config.SQLALCHEMY_DATABASE_URI_SCHEME", "mysql"),
+    ):
+        yield db
+
+
+def test_batches_are_walked_after_the_last_row(db):
+    conn = db.engine.connect.return_value.__enter__.return_value
+    conn.execute.return_value.all.side_effect = [
+        [("m-1", datetime(2026, 1, 1)), ("m-2", datetime(2026, 1, 2))],
+        [("m-3", datetime(2026, 1, 2))],
+    ]
+    engine = RetentionEngine("messages", batch_size=2)
+
+    batches = list(engine.iter_batches(Message.id, Message.created_at, datetime(2026, 2, 1)))
+
+    assert [[row[0] for row in rows] for rows in batches] == [["m-1", "m-2"], ["m-3"]]
+    # the short batch ends the walk
+    assert conn.execute.call_count == 2
+    first, second = (call.args[0].compile() for call in conn.execute.call_args_list)
+    assert "ORDER BY messages.created_at, messages.id" in str(first)
+    assert "messages.id >" not in str(first)
+    assert "messages.id >" in str(second)
+    assert datetime(2026, 1, 2) in second.params.values()
+    assert "m-2" in second.params.values()
+    assert engine.stats.batches == 2
+
+
+def test_batch_is_deleted_with_one_statement_per_table(db):
+    session = MagicMock()
+    session.execute.return_value.rowcount = 2
+    engine = RetentionEngine("messages", session=session)
+
+    assert engine.delete_batch(Message.id, ["m-1", "m-2"], (MessageFeedback.message_id, MessageFile.message_id)) == 2
+
+    statements = [str(call.args[0]) for call in session.execute.call_args_list]
+    assert [statement.split()[2] for statement in statements] == ["message_feedbacks", "message_files", "messages"]
+    assert all(" IN (" in statement for statement in statements)
+    session.commit.assert_called_once()
+    assert engine.stats.deleted == {"message_feedbacks": 2, "message_files": 2, "messages": 2}
+    assert engine.stats.total == 6
+
+    session.reset_mock()
+    assert engine.delete_batch(Message.id, []) == 0
+    session.execute.assert_not_called()
+
+
+def test_rolled_back_deletes_are_not_counted(db):
+    session = MagicMock()
+    session.execute.return_value.rowcount = 3
+    engine = RetentionEngine("workflow run logs", session=session)
+
+    # a failed attempt of a batch, retried later
+    assert engine.delete_in(MessageFeedback.message_id, ["m-1"]) == 3
+    engine.rollback()
+    session.rollback.assert_called_once()
+    assert engine.stats.deleted == {}
+
+    engine.delete_in(MessageFeedback.message_id, ["m-1"])
+    engine.delete_in(Message.id, ["m-1"])
+    assert engine.stats.deleted == {}
+    engine.commit()
+    assert engine.stats.deleted == {"message_feedbacks": 3, "messages": 3}
+
+
+@patch("services.retention_engine.time.sleep")
+def test_batches_wait_for_replicas_to_catch_up(sleep, db):
+    conn = db.engine.connect.return_value.__enter__.return_value
+    with patch("services.retention_engine.dify_config.RETENTION_REPLICATION_LAG_QUERY", "SELECT lag"):
+        engine = RetentionEngine("messages")
+
+    conn.execute.return_value.scalar.side_effect = [30, 12.5, 3]
+    engine.throttle()
+    assert [call.args[0] for call in sleep.call_args_list] == [30, 12.5]
+    assert engine.stats.throttled == 42.5
+
+    # the wait is bounded
+    sleep.reset_mock()
+    conn.execute.return_value.scalar.side_effect = None
+    conn.execute.return_value.scalar.return_value = 1000
+    engine.throttle()
+    assert sum(call.args[0] for call in sleep.call_args_list) == MAX_THROTTLE_WAIT
+
+    # the check is given up when the lag cannot be read
+    sleep.reset_mock()
+    conn.execute.reset_mock()
+    conn.execute.side_effect = Exception("permission denied")
+    engine.throttle()
+    engine.throttle()
+    sleep.assert_not_called()
+    conn.execute.assert_called_once()
+
+
+def test_replication_lag_is_not_checked_on_mysql_by_default(db):
+    engine = RetentionEngine("messages")
+
+    engine.throttle()
+
+    db.engine.connect.assert_not_called()
@@ -0,0 +1,110 @@
+from datetime import datetime
+from unittest.mock import MagicMock, patch
+
+import pytest
+from sqlalchemy.dialects import mysql, postgresql
+
+from services.errors.workflow_service import LastWorkflowAppLogNotExistsError
+from services.workflow_app_service import SEARCH_TEXT_MAX_LENGTH, WorkflowAppService
+
+
+@pytest.fixture
+def app_model():
+    app_model = MagicMock()
+    app_model.id = "app-1"
+    app_model.tenant_id = "tenant-1"
+    return app_model
+
+
+@pytest.fixture
+def session():
+    session = MagicMock()
+    session.scalar.return_value = 3
+    session.scalars.return_value.all.return_value = ["log-1", "log-2", "log-3"]
+    return session
+
+
+def _sql(stmt, dialect=None) -> str:
+    return str(stmt.compile(dialect=dialect or mysql.dialect()))
+
+
+def test_search_text_joins_nested_strings_and_numbers():
+    search_text = WorkflowAppService.build_search_text(
+        {"query": "weather in 北京", "files": [{"name": "a.txt", "size": 12}], "debug": True, "note": None},
+        {"answer": "sunny", "temperature": 21.5},
+        "session-1",
+    )
+
+    assert search_text == "weather in 北京 a.txt 12 sunny 21.5 session-1"
+    assert WorkflowAppService.build_search_text(None, {}) == ""
+    assert len(WorkflowAppService.build_search_text({"text": "x" * 20000}, "tail")) == SEARCH_TEXT_MAX_LENGTH
+
+
+@pytest.mark.parametrize(
+    ("scheme", "dialect", "keyword", "expected"),
+    [
+        ("mysql", mysql.dialect(), "北京", "MATCH (workflow_app_logs.search_text) AGAINST (%s IN BOOLEAN MODE)"),
+        # shorter than an ngram, nothing to look up in the full-text index
+        ("mysql", mysql.dialect(), "京", "lower(workflow_app_logs.search_text) LIKE concat('%%', lower(%s), '%%')"),
+        # the trigram index serves substring matches, also of text without spaces
+        ("postgresql", postgresql.dialect(), "北京", "workflow_app_logs.search_text ILIKE '%%' || %(search_text_1)s"),
+    ],
+)
+def test_keyword_is_matched_through_the_search_text_index(scheme, dialect, keyword, expected, app_model, session):
+    with (
+        patch("services.workflow_app_service.dify_config.WORKFLOW_LOG_FULLTEXT_SEARCH_ENABLED", True),
+        patch("services.workflow_app_service.dify_config.SQLALCHEMY_DATABASE_URI_SCHEME", scheme),
+    ):
+        WorkflowAppService().get_paginate_workflow_app_logs(session=session, app_model=app_model, keyword=keyword)
+
+    sql = _sql(session.scalars.call_args.args[0], dialect)
+    assert expected in sql
+    assert "workflow_runs" not in sql
+
+
+def test_run_id_keyword_also_matches_the_search_text(app_model, session):
+    run_id = "3f0e8a34-7b3a-4a53-9d5d-0c7a2f1e9b11"
+    with (
+        patch("services.workflow_app_service.dify_config.WORKFLOW_LOG_FULLTEXT_SEARCH_ENABLED", True),
+        patch("services.workflow_app_service.dify_config.SQLALCHEMY_DATABASE_URI_SCHEME", "mysql"),
+    ):
+        WorkflowAppService().get_paginate_workflow_app_logs(session=session, app_model=app_model, keyword=run_id)
+
+    stmt = session.scalars.call_args.args[0]
+    sql = _sql(stmt)
+    assert "workflow_app_logs.workflow_run_id = %s OR MATCH (workflow_app_logs.search_text)" in sql
+    assert run_id in stmt.compile(dialect=mysql.dialect()).params.values()
+
+
+def test_logs_are_paginated_after_the_last_log(app_model, session):
+    last_log = MagicMock(id="log-0", created_at=datetime(2026, 10, 18, 12))
+    session.scalar.side_effect = [3, last_log]
+
+    result = WorkflowAppService().get_paginate_workflow_app_logs(
+        session=session, app_model=app_model, page=5, limit=2, last_id="log-0"
+    )
+
+    assert result["data"] == ["log-1", "log-2"]
+    assert result["has_more"] is True
+    stmt = session.scalars.call_args.args[0]
+    sql = _sql(stmt)
+    assert "workflow_app_logs.created_at < " in sql
+    assert "OFFSET" not in sql
+    assert "ORDER BY workflow_app_logs.created_at DESC, workflow_app_logs.id DESC" in sql
+    assert stmt.compile().params["param_1"] == 3
+
+    session.scalar.side_effect = [3, None]
+    with pytest.raises(LastWorkflowAppLogNotExistsError):
+        WorkflowAppService().get_paginate_workflow_app_logs(session=session, app_model=app_model, last_id="gone")
+
+
+def test_total_is_counted_up_to_the_count_limit(app_model, session):
+    with patch("services.workflow_app_service.dify_config.WORKFLOW_LOG_COUNT_LIMIT", 1000):
+        result = WorkflowAppService().get_paginate_workflow_app_logs(session=session, app_model=app_model, limit=5)
+
+    assert result["total"] == 3
+    assert result["has_more"] is False
+    count_stmt = session.scalar.call_args.args[0]
+    assert "LIMIT" in _sql(count_stmt)
+    assert "ORDER BY" not in _sql(count_stmt)
+    assert 1000 in count_stmt.compile().params.values()
@@ -3,7 +3,11 @@ from unittest.mock import ANY, MagicMock, call, patch
 import pytest
 import sqlalchemy as sa
 
-from tasks.remove_app_and_related_data_task import _delete_draft_variables, delete_draft_variables_batch
+from tasks.remove_app_and_related_data_task import (
+    _delete_app_statistic_rollups,
+    _delete_draft_variables,
+    delete_draft_variables_batch,
+)
 
 
 class TestDeleteDraftVariablesBatch:
@@ -241,3 +245,19 @@ class TestDeleteDraftVariablesBatch:
 
         assert result == expected_return
         mock_batch_delete.assert_called_once_with(app_id, batch_size=1000)
+
+
+@patch("tasks.remove_app_and_related_data_task.db")
+def test_delete_app_statistic_rollups(mock_db):
+    mock_conn = mock_db.engine.connect.return_value.__enter__.return_value
+
+    _delete_app_statistic_rollups("test-app-id")
+
+    statements = [str(c.args[0]) for c in mock_conn.execute.call_args_list]
+    assert [statement.split()[2] for statement in statements] == [
+        "app_statistic_hourly",
+        "app_statistic_hourly_members",
+        "app_statistic_dirty_hours",
+    ]
+    assert all("app_id = :app_id_1" in statement for statement in statements)
+    mock_conn.commit.assert_called_once()